@@ -0,0 +1,38 @@
+"""Admin API routes for reading request profiles.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import PlainTextResponse
+from app.core.profiling import list_profiles, load_profile
+from app.api.helper import require_admin
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+@router.get(
+    "/profiles",
+    summary="List Request Profiles",
+    description="Lists the stored request profiles of this worker, newest first."
+    "<br>A request is profiled when it carries `X-Profile-Token`; its profile id is returned in `X-Profile-Id`."
+)
+async def profiles():
+    try:
+        return {"profiles": list_profiles()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Get Request Profile",
+    description="Retrieves one request profile: sampled stacks and the SQL statements with their timings."
+    "<br>Pass `format=folded` to get only the folded stacks, as input for flamegraph.pl or speedscope."
+)
+async def profile(profile_id: str, format: str = "json"):
+    try:
+        result = load_profile(profile_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    if result is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse("\n".join(result["folded"]) + "\n")
+    return result
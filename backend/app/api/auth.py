@@ -4,6 +4,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.auth import LoginRequest, LoginResponse
 from app.services.auth_service import login
+from app.api.helper import call_llm_service
 
 router = APIRouter()
 
@@ -18,10 +19,12 @@ async def login_user(payload: LoginRequest):
     """Authenticate user via email and Google/Apple JWT and return token.
     """
     try:
-        result = login(payload.email, payload.google_jwt, payload.apple_jwt)
+        result = await call_llm_service(login, payload.email, payload.google_jwt, payload.apple_jwt)
         return {
             "user_id": result["user_id"],
             "token": result["token"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
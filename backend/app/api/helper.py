@@ -1,8 +1,81 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.security import AuthenticationError, Principal, resolve_principal
+from app.core.profiling import check_admin_token
+from app.core.rate_limit import rate_limiter
+from app.core.executors import Overloaded, run_llm, run_db
 
 security = HTTPBearer()
 
 def get_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Extract and return the bearer token from Authorization header"""
-    return credentials.credentials
\ No newline at end of file
+    return credentials.credentials
+
+def get_principal(request: Request, token: str = Depends(get_token)) -> Principal:
+    """
+    Verify the bearer token once per request and return the caller.
+    The principal is cached on request.state, so middleware and nested dependencies reuse it.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None and principal.token == token:
+        return principal
+    try:
+        principal = resolve_principal(token)
+    except AuthenticationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from e
+    request.state.principal = principal
+    return principal
+
+def require_admin(x_profile_token: Optional[str] = Header(default=None)):
+    """Allow the request only with the PROFILE_ADMIN_TOKEN in the X-Profile-Token header"""
+    if not check_admin_token(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+async def take_rate_limit(name: str, user_id: str):
+    """
+    Take one token from the user's bucket of the named limit, on the bounded db pool since the
+    database backend upserts; 429 with Retry-After when the bucket is empty.
+    """
+    decision = await call_db_service(rate_limiter.take, name, user_id)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded, retry later",
+            headers={"Retry-After": decision.retry_after_header},
+        )
+
+def rate_limit(name: str):
+    """
+    Build a dependency that takes one token from the caller's bucket of the named limit
+    and answers 429 with Retry-After when it is empty. Returns the principal.
+    """
+    async def dependency(principal: Principal = Depends(get_principal)) -> Principal:
+        await take_rate_limit(name, principal.user_id)
+        return principal
+    return dependency
+
+def _overloaded(e: Overloaded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
+async def call_llm_service(fn, *args, **kwargs):
+    """Run a blocking service call that waits on the LLM on the bounded llm pool; 503 when the pool is saturated"""
+    try:
+        return await run_llm(fn, *args, **kwargs)
+    except Overloaded as e:
+        raise _overloaded(e) from e
+
+async def call_db_service(fn, *args, **kwargs):
+    """Run a blocking service call that only uses the database on the bounded db pool; 503 when the pool is saturated"""
+    try:
+        return await run_db(fn, *args, **kwargs)
+    except Overloaded as e:
+        raise _overloaded(e) from e
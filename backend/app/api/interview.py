@@ -1,15 +1,22 @@
 """Interview API routes for starting interview and receive feedback
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from functools import partial
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header
 from app.models.interview import (
     InterviewStartRequest,
     InterviewFeedbackRequest,
     InterviewStartResponse,
-    InterviewFeedbackResponse
+    InterviewFeedbackResponse,
+    InterviewPrescoreRequest,
+    InterviewPrescoreResponse
 )
 from app.services.interview_service import interview_start, interview_feedback
-from app.api.helper import get_token
+from app.services.answer_scorer import prescore
+from app.api.helper import get_principal, rate_limit, take_rate_limit, call_llm_service, call_db_service
+from app.core.security import Principal
+from app.core.idempotency import IdempotencyInProgress, IdempotencyKeyReused, idempotency_store, request_fingerprint
 
 router = APIRouter(prefix="/interview")
 
@@ -17,21 +24,26 @@ router = APIRouter(prefix="/interview")
     "/start",
     summary="Start Interview",
     description="Initiates a new interview session based on the provided job description."
-    "<br>Generates relevant interview questions.",
+    "<br>Generates relevant interview questions."
+    "<br>Rate limited per user; answers 429 with Retry-After when the limit is reached.",
     response_model=InterviewStartResponse
 )
-async def start_interview(payload: InterviewStartRequest, token: str = Depends(get_token)):
+async def start_interview(payload: InterviewStartRequest, principal: Principal = Depends(rate_limit("interview_start"))):
     """Start a new interview session.
 
     Expects a job description and question type. 
     Returns a new interview ID with generated questions.
     """
     try:
-        result = interview_start(token, payload.job_description, payload.question_type)
+        result = await call_llm_service(
+            interview_start, principal.user_id, principal.token, payload.job_description, payload.question_type
+        )
         return {
             "interview_id": result["interview_id"],
             "interview_questions": result["interview_questions"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -39,25 +51,76 @@ async def start_interview(payload: InterviewStartRequest, token: str = Depends(g
     "/feedback",
     summary="Generate Interview Feedback",
     description="Analyzes the candidate's answer to an interview question."
-    "<br>Provides detailed feedback along with scores for each criterion",
+    "<br>Provides detailed feedback along with scores for each criterion"
+    "<br>Rate limited per user; answers 429 with Retry-After when the limit is reached."
+    "<br>Retries sent with the same Idempotency-Key header get the stored feedback of the first request,"
+    " without counting against the rate limit; 409 while it is still running, 422 when the key was used"
+    " for a different answer.",
     response_model=InterviewFeedbackResponse
 )
-async def feedback(payload: InterviewFeedbackRequest, token: str = Depends(get_token)):
+async def feedback(payload: InterviewFeedbackRequest, principal: Principal = Depends(get_principal),
+                   idempotency_key: Optional[str] = Header(default=None)):
     """Generate feedback for a candidate's interview answer.
 
     Expects an interview ID, type, question, and the user's answer.
     Returns structured feedback and scores for each criterion.
     """
     try:
-        result = interview_feedback(
-            token,
+        call = partial(
+            interview_feedback,
+            principal.user_id,
+            principal.token,
             payload.interview_id,
             payload.interview_type,
             payload.interview_question,
             payload.interview_answer
         )
+        if idempotency_key is None:
+            await take_rate_limit("interview_feedback", principal.user_id)
+            result = await call_llm_service(call)
+        else:
+            fingerprint = request_fingerprint(
+                payload.interview_id, payload.interview_type, payload.interview_question, payload.interview_answer
+            )
+            # A retry of a completed request is answered before it is charged a rate limit token.
+            result = await call_db_service(idempotency_store.replay, principal.user_id, idempotency_key, fingerprint)
+            if result is None:
+                await take_rate_limit("interview_feedback", principal.user_id)
+                result = await idempotency_store.run_async(
+                    principal.user_id, idempotency_key, fingerprint, call, call_db_service, call_llm_service
+                )
         return {
             "interview_feedback": result["interview_feedback"]
         }
+    except HTTPException:
+        raise
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"}) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.post(
+    "/prescore",
+    summary="Preview Answer Scores",
+    description="Estimates the rubric scores of an answer locally, in milliseconds and without the LLM."
+    "<br>Shown as provisional feedback while /interview/feedback is pending; nothing is saved.",
+    response_model=InterviewPrescoreResponse
+)
+async def prescore_answer(payload: InterviewPrescoreRequest, principal: Principal = Depends(get_principal)):
+    """Return provisional scores of an answer.
+
+    CPU only and fast, so it runs inline instead of on an executor.
+    """
+    try:
+        estimate = prescore(payload.interview_question, payload.interview_answer, payload.job_description)
+        return {
+            "provisional_feedback": estimate["feedback"],
+            "skip_llm": estimate["skip_llm"],
+            "reason": estimate["reason"]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
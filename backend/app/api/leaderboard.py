@@ -0,0 +1,26 @@
+"""Leaderboard API routes for XP and per-dimension average scores.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from app.models.leaderboard import LeaderboardResponse
+from app.services.leaderboard_service import get_leaderboard
+from app.api.helper import get_principal, call_db_service
+from app.core.security import Principal
+
+router = APIRouter()
+
+@router.get(
+    "/leaderboard",
+    summary="Get Leaderboard",
+    description="Retrieves the best users of one dimension: xp, clarity, relevance, keyword, confidence, conciseness or overall.",
+    response_model=LeaderboardResponse
+)
+async def leaderboard(dimension: str = "xp", limit: int = 10, principal: Principal = Depends(get_principal)):
+    try:
+        return await call_db_service(get_leaderboard, dimension, limit)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
@@ -0,0 +1,24 @@
+"""Metrics API route in the Prometheus text format.
+"""
+
+import os
+import hmac
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Response
+from app.core.metrics import registry, CONTENT_TYPE
+
+router = APIRouter()
+
+# When set, scrapers must send "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@router.get(
+    "/metrics",
+    summary="Get Metrics",
+    description="Request, upstream, SQL, connection pool and cache metrics of this worker in the Prometheus text format.",
+    response_class=Response
+)
+async def metrics(authorization: Optional[str] = Header(default=None)):
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,8 +1,12 @@
 from fastapi import FastAPI
-from app.api import auth, interview, user
+from app.api import auth, interview, session, user, leaderboard, metrics, admin
 
 def register_routers(app: FastAPI):
     """Unified registration of all routes"""
     app.include_router(auth.router, tags=["Authentication"])
     app.include_router(interview.router, tags=["Interview"])
-    app.include_router(user.router, tags=["User"])
\ No newline at end of file
+    app.include_router(session.router, tags=["Interview"])
+    app.include_router(user.router, tags=["User"])
+    app.include_router(leaderboard.router, tags=["Leaderboard"])
+    app.include_router(metrics.router, tags=["Monitoring"])
+    app.include_router(admin.router, tags=["Admin"])
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""WebSocket channel of an interview session.
+
+The token is verified and the user loaded once per connection, and feedback and badge
+unlocks are pushed as they complete instead of being polled for. JSON text frames:
+
+    client                                              server
+    {"type": "auth", "token": ...}                      {"type": "ready", "user_id": ...}
+        (first frame, unless an Authorization: Bearer header was sent)
+    {"type": "start", "job_description", "question_type"}
+                                                        {"type": "interview", "interview_id", "interview_type",
+                                                         "interview_questions"}
+    {"type": "resume", "interview_id"}                  {"type": "interview", "interview_id", "interview_type"}
+    {"type": "answer", "ref", "interview_question", "interview_answer", "idempotency_key"?}
+                                                        {"type": "feedback", "ref", "interview_feedback"}
+                                                        {"type": "badges", "badges": [...]}   (pushed)
+    {"type": "ping"}                                    {"type": "pong"}
+                                                        {"type": "error", "ref"?, "status", "detail", "retry_after"?}
+
+Answers are scored concurrently, up to SESSION_MAX_PENDING_ANSWERS per connection, and
+their feedback arrives in completion order with the client's ``ref``. Starts and answers
+take from the same per-user rate limits as the REST routes. The socket closes with 4401
+when the token is invalid or expires, and 4404 when the user does not exist.
+
+Configured from the environment (defaults in parentheses):
+    SESSION_MAX_PENDING_ANSWERS (4), SESSION_AUTH_TIMEOUT_SECONDS (10)
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from functools import partial
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from app.api.helper import call_llm_service, call_db_service, take_rate_limit
+from app.core.idempotency import IdempotencyInProgress, IdempotencyKeyReused, idempotency_store, request_fingerprint
+from app.core.metrics import registry, Counter
+from app.core.security import AuthenticationError, resolve_principal, token_expiry
+from app.models.interview import InterviewStartRequest, InterviewAnswerMessage
+from app.services.interview_session import InterviewSession, SessionError, session_hub
+
+logger = logging.getLogger(__name__)
+
+SESSION_MAX_PENDING_ANSWERS = int(os.getenv("SESSION_MAX_PENDING_ANSWERS", "4"))
+SESSION_AUTH_TIMEOUT_SECONDS = float(os.getenv("SESSION_AUTH_TIMEOUT_SECONDS", "10"))
+
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_UNKNOWN_USER = 4404
+
+session_messages = registry.register(Counter(
+    "session_messages_total", "Messages received on WebSocket interview sessions, by type.", ("type",)))
+
+router = APIRouter(prefix="/interview")
+
+
+def _error(status: int, detail: str, ref=None, retry_after: str = None) -> dict:
+    message = {"type": "error", "status": status, "detail": detail}
+    if ref is not None:
+        message["ref"] = ref
+    if retry_after is not None:
+        message["retry_after"] = retry_after
+    return message
+
+
+def _error_for(e: Exception, ref=None) -> dict:
+    """The error frame of a failed message, with the status the REST routes answer for the same failure."""
+    if isinstance(e, HTTPException):
+        return _error(e.status_code, str(e.detail), ref, (e.headers or {}).get("Retry-After"))
+    if isinstance(e, SessionError):
+        return _error(e.status, e.detail, ref)
+    if isinstance(e, IdempotencyKeyReused):
+        return _error(422, str(e), ref)
+    if isinstance(e, IdempotencyInProgress):
+        return _error(409, str(e), ref, "1")
+    if isinstance(e, (ValueError, ValidationError)):
+        return _error(400, str(e), ref)
+    logger.exception("session message failed")
+    return _error(500, str(e), ref)
+
+
+async def _authenticate(websocket: WebSocket):
+    """The principal of the connection, from the Authorization header or the first frame."""
+    scheme, _, token = (websocket.headers.get("authorization") or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        frame = await asyncio.wait_for(websocket.receive_text(), SESSION_AUTH_TIMEOUT_SECONDS)
+        message = json.loads(frame)
+        if not isinstance(message, dict) or message.get("type") != "auth":
+            raise AuthenticationError("The first message must authenticate")
+        token = str(message.get("token") or "")
+    return resolve_principal(token)
+
+
+def _fingerprint(interview, payload) -> str:
+    return request_fingerprint(interview.interview_id, interview.interview_type,
+                               payload.interview_question, payload.interview_answer)
+
+
+class _Connection:
+    """Message handling of one open socket; every frame goes out through ``outbox``."""
+    def __init__(self, websocket: WebSocket, session: InterviewSession):
+        self.websocket = websocket
+        self.session = session
+        self.outbox = asyncio.Queue()
+        self.loop = asyncio.get_running_loop()
+        self.pending = set()
+        self.expires_at = token_expiry(session.principal.token)
+
+    def push(self, message: dict):
+        """Queue a frame; safe to call from service threads, e.g. the projector's."""
+        self.loop.call_soon_threadsafe(self.outbox.put_nowait, message)
+
+    async def send_loop(self):
+        while True:
+            await self.websocket.send_json(await self.outbox.get())
+
+    async def start(self, message: dict):
+        payload = InterviewStartRequest(**message)
+        await take_rate_limit("interview_start", self.session.user_id)
+        result = await call_llm_service(self.session.start, payload.job_description, payload.question_type)
+        self.outbox.put_nowait({"type": "interview", "interview_id": result["interview_id"],
+                                "interview_type": payload.question_type,
+                                "interview_questions": result["interview_questions"]})
+
+    async def resume(self, message: dict):
+        interview = await call_db_service(self.session.resume, str(message.get("interview_id") or ""))
+        self.outbox.put_nowait({"type": "interview", "interview_id": interview.interview_id,
+                                "interview_type": interview.interview_type})
+
+    async def answer(self, message: dict):
+        ref = message.get("ref")
+        try:
+            payload = InterviewAnswerMessage(**message)
+            interview = self.session.current_interview()
+            if len(self.pending) >= SESSION_MAX_PENDING_ANSWERS:
+                raise HTTPException(status_code=429, detail="Too many answers pending", headers={"Retry-After": "1"})
+            if payload.idempotency_key is not None:
+                # A retry of a completed answer is replayed before it is charged a rate limit token.
+                replayed = await call_db_service(idempotency_store.replay, self.session.user_id,
+                                                 payload.idempotency_key, _fingerprint(interview, payload))
+                if replayed is not None:
+                    self.outbox.put_nowait({"type": "feedback", "ref": ref,
+                                            "interview_feedback": replayed["interview_feedback"]})
+                    return
+            await take_rate_limit("interview_feedback", self.session.user_id)
+        except Exception as e:
+            self.outbox.put_nowait(_error_for(e, ref))
+            return
+        task = asyncio.create_task(self._score(ref, interview, payload))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def _score(self, ref, interview, payload):
+        try:
+            call = (self.session.answer, interview, payload.interview_question, payload.interview_answer)
+            if payload.idempotency_key is None:
+                result = await call_llm_service(*call)
+            else:
+                result = await idempotency_store.run_async(
+                    self.session.user_id, payload.idempotency_key, _fingerprint(interview, payload), partial(*call),
+                    call_db_service, call_llm_service)
+            self.outbox.put_nowait({"type": "feedback", "ref": ref, "interview_feedback": result["interview_feedback"]})
+        except Exception as e:
+            self.outbox.put_nowait(_error_for(e, ref))
+
+    async def handle(self, frame: str):
+        try:
+            message = json.loads(frame)
+            if not isinstance(message, dict):
+                raise ValueError("Messages must be JSON objects")
+        except ValueError as e:
+            self.outbox.put_nowait(_error(400, f"Invalid message: {e}"))
+            return
+        kind = message.get("type")
+        session_messages.inc(type=kind if kind in ("start", "resume", "answer", "ping") else "other")
+        try:
+            if kind == "answer":
+                await self.answer(message)
+            elif kind == "start":
+                await self.start(message)
+            elif kind == "resume":
+                await self.resume(message)
+            elif kind == "ping":
+                self.outbox.put_nowait({"type": "pong"})
+            else:
+                raise ValueError(f"Unknown message type: {kind}")
+        except Exception as e:
+            self.outbox.put_nowait(_error_for(e, message.get("ref")))
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+
+@router.websocket("/session")
+async def interview_session(websocket: WebSocket):
+    """Run one interview session over a WebSocket; see the module docstring for the protocol."""
+    await websocket.accept()
+    try:
+        principal = await _authenticate(websocket)
+    except WebSocketDisconnect:
+        return
+    except (AuthenticationError, ValueError, asyncio.TimeoutError) as e:
+        await websocket.send_json(_error(401, str(e) or "Authentication timed out"))
+        await websocket.close(code=CLOSE_UNAUTHORIZED)
+        return
+
+    session = InterviewSession(principal)
+    if not await call_db_service(session.open):
+        await websocket.send_json(_error(404, "User not found"))
+        await websocket.close(code=CLOSE_UNKNOWN_USER)
+        return
+
+    connection = _Connection(websocket, session)
+    session_hub.add(session.user_id, connection.push)
+    sender = asyncio.create_task(connection.send_loop())
+    connection.outbox.put_nowait({"type": "ready", "user_id": session.user_id})
+    expired = False
+    try:
+        while True:
+            frame = await websocket.receive_text()
+            if connection.expired:
+                expired = True
+                break
+            await connection.handle(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session_hub.remove(session.user_id, connection.push)
+        # Answers already on the pools still finish and are saved, as REST requests of a closed client are.
+        for task in list(connection.pending):
+            task.cancel()
+        sender.cancel()
+    if expired:
+        await websocket.send_json(_error(401, "Token expired"))
+        await websocket.close(code=CLOSE_UNAUTHORIZED)
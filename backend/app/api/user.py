@@ -1,4 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.models.user import (
     UserDetailResponse,
     UserLikeRequest,
@@ -6,29 +9,45 @@ from app.models.user import (
     UserInterviewSummaryResponse,
     UserStatisticsResponse,
     UserTargetRequest,
-    UserTargetResponse
+    UserTargetResponse,
+    SearchResponse,
+    UserBankResponse
 )
+from app.models.leaderboard import UserRankResponse
 from app.services.user_service import (
     get_user_detail,
     like_interview,
     get_user_interview_summary,
     get_user_statistics,
     set_user_target,
-    get_user_target
+    get_user_target,
+    export_user_history,
+    search_user_history,
+    get_question_bank
 )
-from app.api.helper import get_token
+from app.services.leaderboard_service import get_user_rank
+from app.api.helper import get_principal, call_db_service
+from app.core.security import Principal
 
 router = APIRouter(prefix="/user")
 
 @router.get(
     "/detail",
     summary="Get User Details",
-    description="Retrieves complete user profile including full interviews detail and badges",
+    description="Retrieves complete user profile including full interviews detail and badges."
+    "<br>Pass `fields` (e.g. `interviews.interview_id,interviews.questions.feedback.overall_score`) "
+    "to receive only the listed fields; unrequested columns are not read from the database.",
     response_model=UserDetailResponse
 )
-async def user_detail(token: str = Depends(get_token)):
+async def user_detail(fields: Optional[str] = None, principal: Principal = Depends(get_principal)):
     try:
-        result = get_user_detail(token)
+        if fields:
+            result = await call_db_service(get_user_detail, principal.user_id, fields)
+            if result is None:
+                raise HTTPException(status_code=404, detail="User not found")
+            # A sparse response does not satisfy UserDetailResponse, so bypass response_model.
+            return JSONResponse(content=jsonable_encoder(result))
+        result = await call_db_service(get_user_detail, principal.user_id)
         return {
             
             "user_id": result["user_id"],
@@ -43,6 +62,73 @@ async def user_detail(token: str = Depends(get_token)):
             "interviews": result["interviews"],
             "badges": result["badges"]
         }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.get(
+    "/export",
+    summary="Export Interview History",
+    description="Streams the user's full interview history as NDJSON, one interview with its questions per line."
+    "<br>Each line carries a cursor; pass the last received cursor as `since` to resume an interrupted export.",
+    response_class=StreamingResponse
+)
+async def user_export(since: Optional[str] = None, principal: Principal = Depends(get_principal)):
+    try:
+        lines = export_user_history(principal.user_id, since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+@router.get(
+    "/search",
+    summary="Search Interview History",
+    description="Full-text search over the user's past questions and answers."
+    "<br>Results are ranked, paginated with `limit`/`offset`, and return snippets instead of whole answers.",
+    response_model=SearchResponse
+)
+async def user_search(
+    q: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    principal: Principal = Depends(get_principal)
+):
+    try:
+        return await call_db_service(search_user_history, principal.user_id, q, limit, offset)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.get(
+    "/bank",
+    summary="Get Question Bank",
+    description="Retrieves one page of the user's liked interviews, newest first, with their questions."
+    "<br>Optional filters: `interview_type`, `start_time` and `end_time` (Unix milliseconds). "
+    "Pass `next_cursor` of a page as `cursor` to get the next one.",
+    response_model=UserBankResponse
+)
+async def user_bank(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    interview_type: Optional[str] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    principal: Principal = Depends(get_principal)
+):
+    try:
+        return await call_db_service(get_question_bank, principal.user_id, limit, cursor, interview_type, start_time, end_time)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -52,12 +138,14 @@ async def user_detail(token: str = Depends(get_token)):
     description="Adds or removes an interview from the user's question bank by toggling the is_like status",
     response_model=UserLikeResponse
 )
-async def user_like(payload: UserLikeRequest, token: str = Depends(get_token)):
+async def user_like(payload: UserLikeRequest, principal: Principal = Depends(get_principal)):
     try:
-        result = like_interview(token, payload.interview_id)
+        result = await call_db_service(like_interview, principal.user_id, payload.interview_id)
         return {
             "is_like": result["is_like"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -67,9 +155,9 @@ async def user_like(payload: UserLikeRequest, token: str = Depends(get_token)):
     description="Retrieves the user's average scores across all interview questions for each evaluation criterion",
     response_model=UserInterviewSummaryResponse
 )
-async def interview_summary(token: str = Depends(get_token)):
+async def interview_summary(principal: Principal = Depends(get_principal)):
     try:
-        result = get_user_interview_summary(token)
+        result = await call_db_service(get_user_interview_summary, principal.user_id)
         if result is None:
             raise HTTPException(status_code=404, detail="User not found or no interview data available")
         return {
@@ -78,7 +166,13 @@ async def interview_summary(token: str = Depends(get_token)):
             "avg_keyword": result["avg_keyword"],
             "avg_confidence": result["avg_confidence"],
             "avg_conciseness": result["avg_conciseness"],
-            "avg_overall": result["avg_overall"]
+            "avg_overall": result["avg_overall"],
+            "percentile_clarity": result.get("percentile_clarity"),
+            "percentile_relevance": result.get("percentile_relevance"),
+            "percentile_keyword": result.get("percentile_keyword"),
+            "percentile_confidence": result.get("percentile_confidence"),
+            "percentile_conciseness": result.get("percentile_conciseness"),
+            "percentile_overall": result.get("percentile_overall")
         }
     except HTTPException:
         raise
@@ -91,13 +185,11 @@ async def interview_summary(token: str = Depends(get_token)):
     description="Retrieves comprehensive user statistics including all performance metrics, active days history, and achievement records",
     response_model=UserStatisticsResponse
 )
-async def user_statistics(token: str = Depends(get_token)):
+async def user_statistics(principal: Principal = Depends(get_principal)):
     try:
-        from app.services.auth_service import get_user_id_and_email
-        id_email = get_user_id_and_email(token)
-        user_id = id_email.get("id")
-
-        user_stats = get_user_statistics(user_id)
+        user_stats = await call_db_service(get_user_statistics, principal.user_id)
+        if user_stats is None:
+            raise HTTPException(status_code=404, detail="User not found")
         stats_dict = user_stats.get_dict()
 
         # Convert last_active_day date to string if it's a date object
@@ -105,6 +197,8 @@ async def user_statistics(token: str = Depends(get_token)):
             stats_dict["last_active_day"] = stats_dict["last_active_day"].isoformat()
 
         return stats_dict
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
     except Exception as e:
@@ -117,7 +211,7 @@ async def user_statistics(token: str = Depends(get_token)):
     description="Sets the user's target scores for each evaluation criterion (clarity, relevance, keyword, confidence, conciseness)",
     response_model=UserTargetResponse
 )
-async def set_target(payload: UserTargetRequest, token: str = Depends(get_token)):
+async def set_target(payload: UserTargetRequest, principal: Principal = Depends(get_principal)):
     try:
         target = {
             "target_clarity": payload.target_clarity,
@@ -126,7 +220,7 @@ async def set_target(payload: UserTargetRequest, token: str = Depends(get_token)
             "target_confidence": payload.target_confidence,
             "target_conciseness": payload.target_conciseness
         }
-        result = set_user_target(token, target)
+        result = await call_db_service(set_user_target, principal.user_id, target)
         if result is None:
             raise HTTPException(status_code=404, detail="User not found")
         return result
@@ -142,13 +236,34 @@ async def set_target(payload: UserTargetRequest, token: str = Depends(get_token)
     description="Retrieves the user's target scores for each evaluation criterion",
     response_model=UserTargetResponse
 )
-async def get_target(token: str = Depends(get_token)):
+async def get_target(principal: Principal = Depends(get_principal)):
+    try:
+        result = await call_db_service(get_user_target, principal.user_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+
+@router.get(
+    "/rank",
+    summary="Get User Rank",
+    description="Retrieves the user's rank on one leaderboard dimension: xp, clarity, relevance, keyword, confidence, conciseness or overall",
+    response_model=UserRankResponse
+)
+async def user_rank(dimension: str = "xp", principal: Principal = Depends(get_principal)):
     try:
-        result = get_user_target(token)
+        result = await call_db_service(get_user_rank, principal.user_id, dimension)
         if result is None:
             raise HTTPException(status_code=404, detail="User not found")
         return result
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
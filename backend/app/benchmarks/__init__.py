@@ -0,0 +1 @@
+"""Microbenchmarks of the service layer; run with ``python -m app.benchmarks``."""
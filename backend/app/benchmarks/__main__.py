@@ -0,0 +1,61 @@
+"""Run the service benchmarks, or compare two saved runs.
+
+    python -m app.benchmarks run [--sizes 10,100,1000] [--only NAME ...] [--min-time 0.2] [--output results.json]
+    python -m app.benchmarks compare baseline.json current.json [--threshold 0.15]
+
+Runs use an in-memory SQLite database (TESTING=1) and never call GPT. compare exits with
+status 1 when a benchmark's median is slower than the baseline by more than the threshold,
+so a saved baseline can gate a change in CI. Only compare runs made on the same machine.
+"""
+import os
+import sys
+import argparse
+
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.benchmarks.harness import compare, environment, format_params, load_results, save_results  # noqa: E402
+
+
+def _run(args) -> int:
+    from app.benchmarks.service_benchmarks import run_benchmarks
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run_benchmarks(sizes, set(args.only) if args.only else None, args.min_time)
+    if args.output:
+        save_results(args.output, results, {**environment(), "sizes": sizes, "min_time": args.min_time})
+        print(f"Saved {len(results)} results to {args.output}")
+    return 0
+
+
+def _compare(args) -> int:
+    rows = compare(load_results(args.baseline)["results"], load_results(args.current)["results"], args.threshold)
+    for row in rows:
+        before = f"{row.baseline_us:12.1f}" if row.baseline_us is not None else f"{'-':>12}"
+        after = f"{row.current_us:12.1f}" if row.current_us is not None else f"{'-':>12}"
+        ratio = f"{row.ratio:6.2f}x" if row.ratio is not None else f"{'':7}"
+        print(f"{row.name:24} {format_params(row.params):14} {before} {after} us {ratio}  {row.status}")
+    regressed = [row for row in rows if row.status == "regressed"]
+    print(f"{len(regressed)} of {len(rows)} benchmarks regressed by more than {args.threshold:.0%}")
+    return 1 if regressed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.benchmarks", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="time the benchmarks")
+    run.add_argument("--sizes", default="10,100,1000", help="comma separated question history sizes")
+    run.add_argument("--only", nargs="*", help="benchmark names to run")
+    run.add_argument("--min-time", type=float, default=0.2, help="seconds to time each benchmark for")
+    run.add_argument("--output", help="JSON file to save the results to")
+    run.set_defaults(handler=_run)
+    diff = commands.add_parser("compare", help="compare two saved runs")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.15, help="relative median change flagged")
+    diff.set_defaults(handler=_compare)
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""The corpus of real and malformed LLM replies, shared by the parser tests and the benchmarks.
+
+Each case of data/llm_outputs.json has a ``name``, a ``kind`` ("feedback" or "questions"),
+the raw ``reply`` and the parse ``expected`` from it.
+"""
+import os
+import json
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "llm_outputs.json")
+
+
+def load_corpus(kind: str = None) -> list:
+    """
+    Load the corpus cases.
+
+    Args:
+        kind: A string; only cases of this kind when given.
+
+    Returns:
+        list: A list of case dicts.
+    """
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        cases = json.load(f)
+    return [case for case in cases if kind is None or case["kind"] == kind]
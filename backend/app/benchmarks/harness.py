@@ -0,0 +1,132 @@
+"""Timing, result files and run comparison of the benchmark suite.
+
+Each benchmark is timed for at least ``min_time`` seconds after a warmup call, and
+reported by its median, which is stable enough between runs on one machine to compare
+against a saved baseline:
+
+    {"meta": {"python": ..., "platform": ..., "commit": ..., "created_at": ...},
+     "results": [{"name": "get_user_detail", "params": {"history": 1000}, "rounds": 412,
+                  "median_us": 480.2, "mean_us": 495.0, "p95_us": 610.7, "min_us": 455.1, "stdev_us": 40.3}]}
+"""
+import json
+import time
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+
+class Comparison(NamedTuple):
+    """One benchmark in two runs; ratio is current / baseline median."""
+    name: str
+    params: dict
+    baseline_us: float
+    current_us: float
+    ratio: float
+    status: str  # "regressed", "improved", "ok", "new" or "missing"
+
+
+def measure(fn, min_time: float = 0.2, max_rounds: int = 10000, warmup: int = 1) -> list:
+    """
+    Time repeated calls of ``fn``.
+
+    Args:
+        fn: A callable without arguments.
+        min_time: A float of seconds to keep calling for.
+        max_rounds: A int of the most calls timed.
+        warmup: A int of untimed calls first, to fill caches and pools.
+
+    Returns:
+        list: A list of seconds per call.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_rounds and (len(samples) < 3 or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(name: str, params: dict, samples: list) -> dict:
+    """The result entry of a benchmark, in microseconds."""
+    micros = sorted(s * 1e6 for s in samples)
+    return {
+        "name": name,
+        "params": params,
+        "rounds": len(micros),
+        "median_us": round(statistics.median(micros), 2),
+        "mean_us": round(statistics.fmean(micros), 2),
+        "p95_us": round(micros[min(len(micros) - 1, int(len(micros) * 0.95))], 2),
+        "min_us": round(micros[0], 2),
+        "stdev_us": round(statistics.stdev(micros), 2) if len(micros) > 1 else 0.0,
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    """Where a run happened, stored with its results."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": _commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def save_results(path: str, results: list, meta: dict = None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": environment() if meta is None else meta, "results": results}, f, indent=2)
+        f.write("\n")
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _key(result: dict) -> tuple:
+    return result["name"], tuple(sorted(result["params"].items()))
+
+
+def compare(baseline: list, current: list, threshold: float = 0.15) -> list:
+    """
+    Match the results of two runs and flag medians that moved by more than ``threshold``.
+
+    Args:
+        baseline: A list of result entries of the reference run.
+        current: A list of result entries of the run to check.
+        threshold: A float; 0.15 flags a median 15% slower as regressed, 15% faster as improved.
+
+    Returns:
+        list: A list of Comparison, in the order of the current run, then benchmarks missing from it.
+    """
+    base = {_key(r): r for r in baseline}
+    rows = []
+    for result in current:
+        before = base.pop(_key(result), None)
+        if before is None:
+            rows.append(Comparison(result["name"], result["params"], None, result["median_us"], None, "new"))
+            continue
+        ratio = result["median_us"] / before["median_us"] if before["median_us"] else float("inf")
+        status = "regressed" if ratio > 1 + threshold else "improved" if ratio < 1 - threshold else "ok"
+        rows.append(Comparison(result["name"], result["params"], before["median_us"], result["median_us"],
+                               round(ratio, 3), status))
+    for before in base.values():
+        rows.append(Comparison(before["name"], before["params"], before["median_us"], None, None, "missing"))
+    return rows
+
+
+def format_params(params: dict) -> str:
+    return ",".join(f"{k}={v}" for k, v in sorted(params.items())) or "-"
@@ -0,0 +1,74 @@
+# backend/app/benchmarks/llm_output.py
+"""Benchmark of LLM reply parsing over the malformed output corpus.
+
+Compares parse_feedback with the character-by-character brace matcher the interview
+service used before, on every feedback reply of the corpus (app.benchmarks.corpus) and on
+the replies both can parse, and reports how many replies each one parses and the mean
+time per reply.
+
+    python -m app.benchmarks.llm_output [rounds]
+"""
+import sys
+import json
+import time
+from app.services.llm_output import parse_feedback
+from app.benchmarks.corpus import load_corpus
+
+
+def brace_matcher(text: str):
+    """The previous parser: json.loads, else the first balanced {...} by a Python loop."""
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    in_string, quote, escape, depth, start = False, "", False, 0, None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == quote:
+                in_string = False
+            continue
+        if ch in ('"', "'"):
+            in_string, quote = True, ch
+        elif ch == "{":
+            start = i if depth == 0 else start
+            depth += 1
+        elif ch == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                try:
+                    return json.loads(text[start:i + 1])
+                except ValueError:
+                    return None
+    return None
+
+
+def run(parser, replies, rounds: int):
+    parsed = sum(isinstance(parser(reply), dict) for reply in replies)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for reply in replies:
+            parser(reply)
+    elapsed = time.perf_counter() - started
+    return parsed, elapsed / (rounds * len(replies)) * 1e6
+
+
+def main(rounds: int = 200):
+    cases = load_corpus("feedback")
+    replies = [case["reply"] for case in cases]
+    parseable = sum(case["expected"] is not None for case in cases)
+    print(f"{len(replies)} feedback replies, {parseable} parseable, {rounds} rounds")
+    shared = [reply for reply in replies if isinstance(brace_matcher(reply), dict) and parse_feedback(reply)]
+    for label, sample in (("all", replies), ("shared", shared)):
+        for name, parser in (("brace_matcher", brace_matcher), ("parse_feedback", parse_feedback)):
+            parsed, micros = run(parser, sample, rounds)
+            print(f"{label:6} {name:16} parsed {parsed:3}/{len(sample)}  {micros:8.1f} us/reply")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
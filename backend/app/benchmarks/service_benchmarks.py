@@ -0,0 +1,232 @@
+"""Service-layer hot paths, timed against SQLite with the GPT client stubbed.
+
+Sized benchmarks run once per history size: the database is reset and one user is given
+that many answered questions by app.db.generate_data (with their interviews, events and
+badges), so the numbers show how a path scales with a user's history. Write paths add
+rows while they are timed, so they are capped to a few rounds.
+
+The question pool and the job description index are switched off, so interview_start
+measures the generation path rather than a cache hit. The projector runs inline, as
+under test, so interview_feedback includes applying the answer to the user aggregates.
+"""
+import io
+import json
+import contextlib
+from typing import NamedTuple, Optional
+from unittest.mock import patch
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.db.init_badges import init_badges
+from app.db.generate_data import DatasetSpec, generate
+from app.db.models import Interview
+from app.db.crud import add_interview, get_user_basic
+from app.core.ids import new_id
+from app.benchmarks.corpus import load_corpus
+from app.prompt_builder import build_question_prompt, build_feedback_prompt
+from app.services import interview_service
+from app.services.badge_service import check_badges_for_user
+from app.services.interview_service import interview_start, interview_feedback, save_question, _extract_json_block
+from app.services.llm_output import parse_feedback
+from app.services.user_service import get_user_detail, get_user_statistics
+
+TOKEN = "benchmark-token"
+
+JOB_DESCRIPTION = (
+    "Senior Python Developer\n"
+    "We are looking for an engineer to build and operate our FastAPI services on AWS.\n"
+    "Requirements:\n"
+    "- 5+ years of Python, including asyncio and type hints\n"
+    "- PostgreSQL schema design and query tuning\n"
+    "- Docker, Kubernetes and CI/CD pipelines\n"
+    "Nice to have: Kafka, Terraform, observability with Prometheus.\n"
+)
+QUESTION = "How would you find and fix a slow endpoint in a FastAPI service backed by PostgreSQL?"
+ANSWER = (
+    "I would start by measuring: enable request timing and look at the p95 latency per route in Prometheus. "
+    "For the slow route I would log the SQL statements and run EXPLAIN ANALYZE on the worst query in PostgreSQL. "
+    "Often the fix is an index on the filtered column or removing an N+1 pattern with a joined load. "
+    "If the endpoint waits on another service I would make the call async or cache its result. "
+    "Finally I would add a regression test with a query budget so the problem does not come back."
+)
+QUESTION_REPLY = "1. Tell me about a FastAPI service you built.\n2. How do you tune PostgreSQL queries?\n3. How do you deploy to Kubernetes?"
+FEEDBACK_REPLY = json.dumps({
+    "clarity_structure_score": 4, "clarity_structure_feedback": "Clear steps.",
+    "relevance_score": 5, "relevance_feedback": "On topic.",
+    "keyword_alignment_score": 4, "keyword_alignment_feedback": "Mentions the stack.",
+    "confidence_score": 4, "confidence_feedback": "Confident.",
+    "conciseness_score": 4, "conciseness_feedback": "Mostly concise.",
+    "overall_summary": "A solid, structured answer.", "overall_score": 4.2,
+})
+
+
+class StubGPTClient:
+    """Stands in for GPTAccessClient: answers every prompt with ``reply``, without network."""
+    reply = ""
+
+    def __init__(self, token: str = None):
+        self.token = token
+
+    def send_prompt(self, prompt: str):
+        return {"answer": StubGPTClient.reply}
+
+
+class History(NamedTuple):
+    """The seeded user of a sized benchmark."""
+    size: int
+    user_id: str
+    interview_id: str
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: object  # setup(history or None) -> callable timed without arguments
+    sized: bool
+    max_rounds: int
+
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, sized: bool = True, max_rounds: int = 10000):
+    """Register a benchmark; the decorated function builds the callable to time."""
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, sized, max_rounds))
+        return setup
+    return register
+
+
+def seed_history(size: int) -> History:
+    """Reset the database and give one user ``size`` answered questions."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db(reset=True)
+        init_badges()
+        generate(DatasetSpec(users=1, questions=size, max_questions_per_user=max(size, 1), prefix="bench"))
+    user_id = "bench-0000000"
+    interview_id = new_id()
+    with SessionLocal() as db:
+        add_interview(Interview(interview_id=interview_id, user_id=user_id, interview_type="technical",
+                                job_description=JOB_DESCRIPTION), db)
+    return History(size, user_id, interview_id)
+
+
+def _corpus_replies() -> list:
+    return [case["reply"] for case in load_corpus("feedback")]
+
+
+# ------------------------------------------------------------------
+# Unsized: pure CPU
+# ------------------------------------------------------------------
+@benchmark("extract_json_block", sized=False)
+def _extract_json_block_bench(history: Optional[History]):
+    replies = _corpus_replies()
+    return lambda: [_extract_json_block(reply) for reply in replies]
+
+
+@benchmark("parse_feedback", sized=False)
+def _parse_feedback_bench(history: Optional[History]):
+    replies = _corpus_replies()
+    return lambda: [parse_feedback(reply) for reply in replies]
+
+
+@benchmark("build_question_prompt", sized=False)
+def _question_prompt_bench(history: Optional[History]):
+    return lambda: build_question_prompt(JOB_DESCRIPTION, "technical")
+
+
+@benchmark("build_feedback_prompt", sized=False)
+def _feedback_prompt_bench(history: Optional[History]):
+    return lambda: build_feedback_prompt(question=QUESTION, answer=ANSWER, user_info={},
+                                         job_description=JOB_DESCRIPTION)
+
+
+# ------------------------------------------------------------------
+# Sized by the user's history
+# ------------------------------------------------------------------
+@benchmark("interview_start", max_rounds=50)
+def _interview_start_bench(history: History):
+    def run():
+        StubGPTClient.reply = QUESTION_REPLY
+        interview_start(history.user_id, TOKEN, JOB_DESCRIPTION, "technical")
+    return run
+
+
+@benchmark("interview_feedback", max_rounds=50)
+def _interview_feedback_bench(history: History):
+    def run():
+        StubGPTClient.reply = FEEDBACK_REPLY
+        interview_feedback(history.user_id, TOKEN, history.interview_id, "technical", QUESTION, ANSWER)
+    return run
+
+
+@benchmark("save_question", max_rounds=50)
+def _save_question_bench(history: History):
+    feedback = json.loads(FEEDBACK_REPLY)
+
+    def run():
+        with SessionLocal() as db:
+            save_question(history.user_id, history.interview_id, "technical", QUESTION, ANSWER, feedback, db)
+    return run
+
+
+@benchmark("check_badges_for_user")
+def _check_badges_bench(history: History):
+    def run():
+        with SessionLocal() as db:
+            check_badges_for_user(get_user_basic(history.user_id, db), db)
+    return run
+
+
+@benchmark("get_user_detail")
+def _user_detail_bench(history: History):
+    return lambda: get_user_detail(history.user_id)
+
+
+@benchmark("get_user_statistics")
+def _user_statistics_bench(history: History):
+    return lambda: get_user_statistics(history.user_id)
+
+
+@contextlib.contextmanager
+def stubbed_services():
+    """GPT stubbed, question pool and job description index off."""
+    with patch.object(interview_service, "GPTAccessClient", StubGPTClient), \
+            patch.object(interview_service, "QUESTION_POOL_ENABLED", False), \
+            patch.object(interview_service, "JD_INDEX_ENABLED", False):
+        yield
+
+
+def run_benchmarks(sizes=(10, 100, 1000), only=None, min_time: float = 0.2, measure=None, progress=print) -> list:
+    """
+    Run the registered benchmarks.
+
+    Args:
+        sizes: Question history sizes of the sized benchmarks.
+        only: A set of benchmark names to run, all when None.
+        min_time: A float of seconds each benchmark is timed for.
+        measure: The timing function, app.benchmarks.harness.measure by default.
+        progress: A callable receiving one line per finished benchmark.
+
+    Returns:
+        list: A list of result entries (see app.benchmarks.harness.summarize).
+    """
+    from app.benchmarks.harness import measure as default_measure, summarize, format_params
+    measure = measure or default_measure
+    selected = [b for b in BENCHMARKS if only is None or b.name in only]
+    results = []
+
+    def run(bench, history, params):
+        samples = measure(bench.setup(history), min_time=min_time, max_rounds=bench.max_rounds)
+        result = summarize(bench.name, params, samples)
+        results.append(result)
+        progress(f"{bench.name:24} {format_params(params):14} {result['median_us']:12.1f} us  "
+                 f"({result['rounds']} rounds)")
+
+    with stubbed_services():
+        for bench in (b for b in selected if not b.sized):
+            run(bench, None, {})
+        sized = [b for b in selected if b.sized]
+        for size in sizes if sized else ():
+            history = seed_history(size)
+            for bench in sized:
+                run(bench, history, {"history": size})
+    return results
@@ -0,0 +1,146 @@
+"""Bounded thread pools for the blocking service calls of the async routes.
+
+The routes are ``async def`` and the services block (SQLAlchemy, requests), so every
+service call is handed to one of two dedicated pools instead of running on the event
+loop or on the unbounded default threadpool:
+    llm     calls that wait on the LLM and other external services (slow, few)
+    db      calls that only use the database (fast, many)
+
+Admission control: a pool accepts at most ``max_queue`` calls waiting for a worker.
+Beyond that, and for calls that waited longer than ``max_wait`` seconds before a worker
+picked them up, ``Overloaded`` is raised right away; the routes answer 503 rather than
+queueing work whose client will have timed out by the time it runs.
+
+Configured from the environment (defaults in parentheses):
+    EXECUTOR_LLM_WORKERS (8), EXECUTOR_LLM_QUEUE (16), EXECUTOR_LLM_MAX_WAIT_SECONDS (10)
+    EXECUTOR_DB_WORKERS (10), EXECUTOR_DB_QUEUE (50), EXECUTOR_DB_MAX_WAIT_SECONDS (5)
+
+Collected metrics: executor_queue_wait_seconds, executor_rejected_total, and the
+executor_queue_depth / executor_active gauges, all per pool.
+"""
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from app.core.metrics import registry, Counter, Gauge, Histogram
+from app.core.profiling import active_sampler_var
+
+executor_queue_wait = registry.register(Histogram(
+    "executor_queue_wait_seconds", "Time calls waited for a worker thread.", ("pool",)))
+executor_rejected = registry.register(Counter(
+    "executor_rejected_total", "Calls refused by admission control.", ("pool", "reason")))
+
+
+class Overloaded(Exception):
+    """Raised when a pool refuses a call because its queue is full or the call waited too long."""
+    def __init__(self, pool: str, reason: str):
+        super().__init__(f"Server busy ({pool} pool {reason}), retry later")
+        self.pool = pool
+        self.reason = reason
+
+
+def _run_sampled(fn, args, kwargs):
+    # A profiled request keeps sampling its work while it runs on this worker thread.
+    sampler = active_sampler_var.get()
+    if sampler is None:
+        return fn(*args, **kwargs)
+    thread_id = threading.get_ident()
+    sampler.add_thread(thread_id)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        sampler.remove_thread(thread_id)
+
+
+class BoundedExecutor:
+    """A fixed-size thread pool with a bounded wait queue."""
+    def __init__(self, name: str, workers: int, max_queue: int, max_wait: float = None):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-worker")
+        self.lock = threading.Lock()
+        self.pending = 0  # queued + running
+        self.active = 0
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.active)
+
+    def _admit(self):
+        with self.lock:
+            if self.pending >= self.workers + self.max_queue:
+                executor_rejected.inc(pool=self.name, reason="queue_full")
+                raise Overloaded(self.name, "queue full")
+            self.pending += 1
+
+    def _call(self, submitted: float, context, fn, args, kwargs):
+        waited = time.perf_counter() - submitted
+        executor_queue_wait.observe(waited, pool=self.name)
+        if self.max_wait is not None and waited > self.max_wait:
+            executor_rejected.inc(pool=self.name, reason="wait_timeout")
+            raise Overloaded(self.name, "wait timeout")
+        with self.lock:
+            self.active += 1
+        try:
+            return context.run(_run_sampled, fn, args, kwargs)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def _done(self, _future):
+        with self.lock:
+            self.pending -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run a blocking call on this pool and await its result.
+        The call sees the caller's context variables (request id, per-request SQL stats).
+
+        Raises:
+            Overloaded: If the queue is full, or the call waited longer than max_wait.
+        """
+        self._admit()
+        try:
+            future = self.pool.submit(self._call, time.perf_counter(), contextvars.copy_context(), fn, args, kwargs)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _from_env(name: str, workers: int, max_queue: int, max_wait: float) -> BoundedExecutor:
+    prefix = f"EXECUTOR_{name.upper()}_"
+    return BoundedExecutor(
+        name,
+        workers=int(os.getenv(prefix + "WORKERS", str(workers))),
+        max_queue=int(os.getenv(prefix + "QUEUE", str(max_queue))),
+        max_wait=float(os.getenv(prefix + "MAX_WAIT_SECONDS", str(max_wait))),
+    )
+
+
+llm_executor = _from_env("llm", workers=8, max_queue=16, max_wait=10.0)
+db_executor = _from_env("db", workers=10, max_queue=50, max_wait=5.0)
+EXECUTORS = (llm_executor, db_executor)
+
+registry.register(Gauge("executor_queue_depth", "Calls waiting for a worker thread.", ("pool",),
+                        lambda: {(e.name,): e.queued for e in EXECUTORS}))
+registry.register(Gauge("executor_active", "Calls running on a worker thread.", ("pool",),
+                        lambda: {(e.name,): e.active for e in EXECUTORS}))
+
+
+async def run_llm(fn, *args, **kwargs):
+    """Run a blocking call that waits on the LLM or another external service."""
+    return await llm_executor.run(fn, *args, **kwargs)
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking call that only uses the database."""
+    return await db_executor.run(fn, *args, **kwargs)
@@ -0,0 +1,292 @@
+"""Idempotency keys for retried POST requests.
+
+Mobile clients retry POST /interview/feedback on flaky networks; without a key each retry
+calls the LLM again and saves the answer again, counting XP and total_questions twice.
+A client sends the same ``Idempotency-Key`` header with every retry of one submission:
+    - the first request claims (user_id, key) in the idempotency_keys table as "pending",
+      runs, and stores its response as "completed"
+    - a retry of a completed request gets the stored response, with no LLM call and no write
+    - a retry arriving while the first request still runs waits for it, up to
+      IDEMPOTENCY_WAIT_SECONDS, and then gets its response (409 when it is still running);
+      async routes wait on the event loop with run_async, so only the first request holds a
+      worker of the pool running the call
+    - the same key with a different request body is refused (422)
+    - a failed request releases its claim, so the retry runs again
+Claims are one atomic upsert, so duplicates racing on different workers still run once.
+A pending claim older than IDEMPOTENCY_LOCK_SECONDS is treated as left behind by a crashed
+worker and taken over. Keys expire IDEMPOTENCY_TTL_SECONDS after their first use.
+
+Configured from the environment (defaults in parentheses):
+    IDEMPOTENCY_TTL_SECONDS (86400), IDEMPOTENCY_LOCK_SECONDS (120), IDEMPOTENCY_WAIT_SECONDS (30)
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from app.core.metrics import registry, Counter
+from app.services.utils import with_db_session
+from app.db import crud
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+PRUNE_EVERY = 100  # claims between deletions of expired keys
+
+idempotent_requests = registry.register(Counter(
+    "idempotent_requests_total", "Requests with an Idempotency-Key, by how they were answered.", ("outcome",)))
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a request with a different body."""
+
+
+class IdempotencyInProgress(Exception):
+    """The request that first used the key is still running."""
+
+
+def request_fingerprint(*parts) -> str:
+    """
+    Hash the fields of a request body.
+
+    Args:
+        parts: JSON serializable request fields.
+
+    Returns:
+        str: A hex sha256 digest.
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Runs a request at most once per (user_id, key) within the key lifetime."""
+    def __init__(self, ttl: float = 86400.0, lock_seconds: float = 120.0, wait_seconds: float = 30.0,
+                 poll_interval: float = 0.05, max_poll_interval: float = 0.5, clock=time.time):
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.clock = clock
+        # Requests in flight in this worker, so local duplicates wake up without polling.
+        self.running = {}
+        self.lock = threading.Lock()
+        self.claims = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+            lock_seconds=float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120")),
+            wait_seconds=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30")),
+        )
+
+    @staticmethod
+    @with_db_session
+    def _claim(user_id: str, key: str, request_hash: str, now: float, expire_before: float, stale_before: float,
+               db=None):
+        return crud.claim_idempotency_key(user_id, key, request_hash, now, expire_before, stale_before, db=db)
+
+    @staticmethod
+    @with_db_session
+    def _get(user_id: str, key: str, db=None):
+        return crud.get_idempotency_key(user_id, key, db=db)
+
+    @staticmethod
+    @with_db_session
+    def _complete(user_id: str, key: str, response, db=None):
+        crud.complete_idempotency_key(user_id, key, response, db=db)
+
+    @staticmethod
+    @with_db_session
+    def _release(user_id: str, key: str, db=None):
+        crud.release_idempotency_key(user_id, key, db=db)
+
+    @staticmethod
+    @with_db_session
+    def _prune(expire_before: float, db=None):
+        return crud.delete_expired_idempotency_keys(expire_before, db=db)
+
+    def _try_claim(self, user_id: str, key: str, request_hash: str):
+        now = self.clock()
+        claimed, row = self._claim(user_id, key, request_hash, now, now - self.ttl, now - self.lock_seconds)
+        if claimed:
+            with self.lock:
+                self.claims += 1
+                prune = self.claims % PRUNE_EVERY == 0
+            if prune:
+                self._prune(now - self.ttl)
+        return claimed, row
+
+    def _claimable(self, row) -> bool:
+        """Whether the claim upsert would take the key over; a completed row is replayed until it expires."""
+        if row is None:
+            return True
+        now = self.clock()
+        return row.created_at < now - self.ttl or (row.status == "pending" and row.created_at < now - self.lock_seconds)
+
+    @staticmethod
+    def _check_key(key: str):
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+    def _next_step(self, row, request_hash: str, deadline: float, waited: bool) -> str:
+        """
+        What a request that did not claim the key does next: "claim" it again, "replay" the
+        stored response, or "wait" for the request running with it.
+
+        Raises:
+            IdempotencyKeyReused: The key was used for a different request body.
+            IdempotencyInProgress: The wait is over.
+        """
+        if not self._claimable(row):
+            if row.request_hash != request_hash:
+                idempotent_requests.inc(outcome="reused")
+                raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+            if row.status == "completed":
+                idempotent_requests.inc(outcome="waited" if waited else "replayed")
+                return "replay"
+        if self.clock() >= deadline:
+            idempotent_requests.inc(outcome="in_progress")
+            raise IdempotencyInProgress("A request with this Idempotency-Key is still in progress")
+        # Claimable: released by a failed request, left pending by a crashed one, or expired.
+        return "claim" if self._claimable(row) else "wait"
+
+    def _execute(self, user_id: str, key: str, fn, *args, **kwargs):
+        """Run ``fn`` under a claimed key, then store its result, or release the key when it fails."""
+        idempotent_requests.inc(outcome="new")
+        done = threading.Event()
+        with self.lock:
+            self.running[(user_id, key)] = done
+        try:
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                self._release(user_id, key)
+                raise
+            if result is None:
+                self._release(user_id, key)
+            else:
+                self._complete(user_id, key, result)
+            return result
+        finally:
+            with self.lock:
+                self.running.pop((user_id, key), None)
+            done.set()
+
+    def replay(self, user_id: str, key: str, request_hash: str):
+        """
+        The stored response of a completed request with this key and body, without claiming it.
+        Lets a route answer a retry before charging it anything, e.g. a rate limit token.
+
+        Returns:
+            The stored result, or None when the request must run (or be refused) through run.
+        """
+        self._check_key(key)
+        row = self._get(user_id, key)
+        if row is None or self._claimable(row) or row.status != "completed" or row.request_hash != request_hash:
+            return None
+        idempotent_requests.inc(outcome="replayed")
+        return row.response
+
+    def run(self, user_id: str, key: str, request_hash: str, fn, *args, **kwargs):
+        """
+        Run ``fn`` once for the key, or return the response of the request that already used it.
+        Blocks the calling thread while waiting; async callers use run_async.
+
+        Args:
+            user_id: A string of user id, resolved from the verified token.
+            key: A string of Idempotency-Key header.
+            request_hash: A string of request_fingerprint of the request body.
+            fn: The blocking call handling the request; its result must be JSON serializable.
+
+        Returns:
+            The result of ``fn``, or the stored result of the first request with this key.
+
+        Raises:
+            IdempotencyKeyReused: The key was used for a different request body.
+            IdempotencyInProgress: The first request did not finish within the wait.
+        """
+        self._check_key(key)
+        claimed, row = self._try_claim(user_id, key, request_hash)
+        waited = False
+        deadline = self.clock() + self.wait_seconds
+        interval = self.poll_interval
+        while not claimed:
+            step = self._next_step(row, request_hash, deadline, waited)
+            if step == "replay":
+                return row.response
+            if step == "claim":
+                claimed, row = self._try_claim(user_id, key, request_hash)
+                continue
+            waited = True
+            with self.lock:
+                done = self.running.get((user_id, key))
+            if done is not None:
+                done.wait(max(0.0, deadline - self.clock()))
+            else:
+                time.sleep(interval)
+                interval = min(interval * 2, self.max_poll_interval)
+            row = self._get(user_id, key)
+        return self._execute(user_id, key, fn, *args, **kwargs)
+
+    async def run_async(self, user_id: str, key: str, request_hash: str, fn, run_db, run_call):
+        """
+        As run, for the async routes: a duplicate waits on the event loop instead of holding a
+        worker thread, so a burst of retries cannot fill the pool that runs ``fn``.
+
+        Args:
+            user_id: A string of user id, resolved from the verified token.
+            key: A string of Idempotency-Key header.
+            request_hash: A string of request_fingerprint of the request body.
+            fn: The blocking call handling the request; its result must be JSON serializable.
+            run_db: An async callable running a short blocking DB call, e.g. call_db_service.
+            run_call: An async callable running ``fn``, e.g. call_llm_service; only the request
+                      that claimed the key submits it.
+
+        Returns:
+            The result of ``fn``, or the stored result of the first request with this key.
+        """
+        self._check_key(key)
+        claimed, row = await run_db(self._try_claim, user_id, key, request_hash)
+        waited = False
+        deadline = self.clock() + self.wait_seconds
+        interval = self.poll_interval
+        while not claimed:
+            step = self._next_step(row, request_hash, deadline, waited)
+            if step == "replay":
+                return row.response
+            if step == "claim":
+                claimed, row = await run_db(self._try_claim, user_id, key, request_hash)
+                continue
+            waited = True
+            await asyncio.sleep(min(interval, max(0.0, deadline - self.clock())))
+            interval = min(interval * 2, self.max_poll_interval)
+            row = await run_db(self._get, user_id, key)
+
+        # A call refused by the pool, or abandoned before a worker picked it up, never runs
+        # _execute, so its claim is released here instead of staying pending for lock_seconds.
+        state = {"started": False, "abandoned": False}
+        state_lock = threading.Lock()
+
+        def start():
+            with state_lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = True
+            return self._execute(user_id, key, fn)
+
+        try:
+            return await run_call(start)
+        except BaseException:
+            with state_lock:
+                release = not state["started"]
+                state["abandoned"] = True
+            if release:
+                self._release(user_id, key)
+            raise
+
+
+idempotency_store = IdempotencyStore.from_env()
@@ -0,0 +1,254 @@
+"""Structured, non-blocking application logging.
+
+Records of the "app" logger tree are put on a bounded in-memory queue and written to
+stdout by a background thread, so a slow or blocked stdout never stalls a request.
+When the queue is full, records are dropped and counted instead of blocking.
+
+Every record carries the id of the request it was logged from (see RequestIdMiddleware),
+and any ``extra={...}`` fields are emitted as structured fields.
+
+Configured from the environment:
+    LOG_LEVEL           Level of the "app" loggers (default INFO)
+    LOG_FORMAT          "json" (default) or "text"
+    LOG_SAMPLE_RATES    Per-logger sampling of records below WARNING, e.g.
+                        "app.services.interview_service=0.1,app.services.user_service=0.5"
+                        A rate applies to the logger and its children; warnings and errors
+                        are never sampled.
+    LOG_QUEUE_SIZE      Capacity of the log queue (default 10000)
+"""
+import os
+import sys
+import copy
+import json
+import time
+import uuid
+import queue
+import random
+import atexit
+import logging
+import logging.handlers
+from contextvars import ContextVar
+
+APP_LOGGER = "app"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# LogRecord attributes that are not user supplied extra fields.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+def parse_sample_rates(spec: str) -> dict:
+    """
+    Parse "logger=rate,logger=rate" into {logger: rate}.
+
+    Args:
+        spec: A string of comma separated logger=rate pairs, rate between 0 and 1.
+
+    Returns:
+        dict: A dict of {logger name: rate}.
+    """
+    rates = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, sep, rate = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid log sample rate: {item}")
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp every record with the id of the current request; runs on the calling thread, before the queue."""
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records below WARNING of configured loggers."""
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self.cache = {}
+
+    def rate(self, name: str) -> float:
+        rate = self.cache.get(name)
+        if rate is None:
+            rate = 1.0
+            # The most specific configured prefix wins.
+            probe = name
+            while probe:
+                if probe in self.rates:
+                    rate = self.rates[probe]
+                    break
+                probe = probe.rpartition(".")[0]
+            self.cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, request_id, msg and any extra fields."""
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human readable lines for local development, extra fields appended as key=value."""
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        extras = [f"{k}={v}" for k, v in vars(record).items() if k not in _RECORD_ATTRS and not k.startswith("_")]
+        return f"{line} {' '.join(extras)}" if extras else line
+
+
+_exception_formatter = logging.Formatter()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that drops and counts records when the queue is full, instead of blocking or raising."""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        """
+        Merge the args into the message like QueueHandler.prepare, but keep the traceback out of it:
+        exc_info is formatted here, on the calling thread, into exc_text, which the formatters emit.
+        """
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_handler = None
+
+
+def setup_logging(level: str = None, fmt: str = None, sample_rates: str = None, queue_size: int = None, stream=None):
+    """
+    Route the "app" logger tree through a bounded queue to a background writer thread.
+    Safe to call more than once; later calls replace the previous configuration.
+
+    Args:
+        level: A string of log level, LOG_LEVEL by default.
+        fmt: A string of "json" or "text", LOG_FORMAT by default.
+        sample_rates: A string of per-logger sample rates, LOG_SAMPLE_RATES by default.
+        queue_size: A int of queue capacity, LOG_QUEUE_SIZE by default.
+        stream: The stream to write to, stdout by default.
+
+    Returns:
+        DroppingQueueHandler: The handler installed on the "app" logger.
+    """
+    global _listener, _handler
+    shutdown_logging()
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "json")).lower()
+    rates = parse_sample_rates(sample_rates if sample_rates is not None else os.getenv("LOG_SAMPLE_RATES", ""))
+    queue_size = queue_size or int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    _handler.addFilter(RequestIdFilter())
+    if rates:
+        _handler.addFilter(SamplingFilter(rates))
+    _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=False)
+    _listener.start()
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.handlers = [h for h in logger.handlers if not isinstance(h, DroppingQueueHandler)]
+    logger.addHandler(_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return _handler
+
+
+def shutdown_logging():
+    """Flush the queue and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that binds a request id to the logging context of each HTTP request.
+    An incoming X-Request-ID header is reused, otherwise a new id is generated; the id is
+    echoed in the response headers. Completed requests are logged with status and duration.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger(f"{APP_LOGGER}.access")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER.lower().encode())
+        request_id = incoming.decode("latin-1")[:64] if incoming else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            self.logger.info(
+                "request",
+                extra={
+                    "method": scope.get("method"),
+                    "path": scope.get("path"),
+                    "status": status["code"],
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                },
+            )
+            request_id_var.reset(token)
@@ -0,0 +1,320 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+Metrics are kept in memory by this worker and rendered by GET /metrics; no client
+library or external service is involved. Collected:
+    http_request_duration_seconds       per route template, method and status
+    http_request_db_queries             SQL statements issued per request, per route
+    http_request_db_seconds             time spent in SQL per request, per route
+    upstream_request_duration_seconds   per external client
+    upstream_requests_total             per external client and outcome (HTTP status or exception)
+    upstream_errors_total               per external client and error
+    db_query_duration_seconds           per statement type, from SQLAlchemy engine events
+    db_pool_*                           connection pool gauges, read at scrape time
+    cache_requests_total                per cache and result (hit/miss), with a derived cache_hit_ratio
+"""
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base of labelled metrics; one series per distinct label tuple."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self.series.get(self._key(labels), 0.0)
+
+    def render(self):
+        lines = self.header()
+        for key, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{_label_text(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Gauge(Metric):
+    """A gauge whose series are produced by a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels=(), collect=None):
+        super().__init__(name, documentation, labels)
+        self.collect = collect
+
+    def render(self):
+        lines = self.header()
+        for key, value in sorted((self.collect() if self.collect else {}).items()):
+            lines.append(f"{self.name}{_label_text(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum, count.
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self.series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self):
+        lines = self.header()
+        with self.lock:
+            snapshot = sorted((key, list(s[0]), s[1], s[2]) for key, s in self.series.items())
+        for key, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements issued per HTTP request.", ("route",), QUERY_COUNT_BUCKETS))
+http_request_db_seconds = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL per HTTP request.", ("route",)))
+upstream_request_duration = registry.register(Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external services.", ("client",)))
+upstream_requests = registry.register(Counter(
+    "upstream_requests_total", "Calls to external services by outcome.", ("client", "outcome")))
+upstream_errors = registry.register(Counter(
+    "upstream_errors_total", "Failed calls to external services.", ("client", "error")))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement latency.", ("operation",)))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by result.", ("cache", "result")))
+
+
+def _cache_hit_ratios():
+    totals = {}
+    for (cache, result), value in list(cache_requests.series.items()):
+        hits, lookups = totals.get(cache, (0.0, 0.0))
+        totals[cache] = (hits + (value if result == "hit" else 0.0), lookups + value)
+    return {(cache,): hits / lookups for cache, (hits, lookups) in totals.items() if lookups}
+
+
+registry.register(Gauge("cache_hit_ratio", "Share of cache lookups that hit, since start.", ("cache",), _cache_hit_ratios))
+
+
+def record_cache(cache: str, hit: bool):
+    """Count one lookup of a named in-process cache."""
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# ----------------------------------------------------------------------
+# External services
+# ----------------------------------------------------------------------
+class UpstreamCall:
+    """Outcome of one external call; set ``status`` to the HTTP status code once a response arrives."""
+    __slots__ = ("status",)
+
+    def __init__(self):
+        self.status = None
+
+
+@contextmanager
+def track_upstream(client: str):
+    """
+    Time one call to an external service and count its outcome.
+
+    Args:
+        client: A string of client name, e.g. "GPTAccessClient".
+
+    Yields:
+        UpstreamCall: Set its status to the HTTP status code of the response.
+    """
+    call = UpstreamCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        upstream_requests.inc(client=client, outcome=type(e).__name__)
+        upstream_errors.inc(client=client, error=type(e).__name__)
+        raise
+    else:
+        outcome = str(call.status) if call.status is not None else "ok"
+        upstream_requests.inc(client=client, outcome=outcome)
+        if call.status is not None and not 200 <= call.status < 300:
+            upstream_errors.inc(client=client, error=f"http_{call.status}")
+    finally:
+        upstream_request_duration.observe(time.perf_counter() - started, client=client)
+
+
+# ----------------------------------------------------------------------
+# Database
+# ----------------------------------------------------------------------
+class RequestStats:
+    """SQL work attributed to the current request; ``statements`` is a list only while the request is profiled."""
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = None
+
+
+request_stats_var: ContextVar = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    db_query_duration.observe(elapsed, operation=operation)
+    stats = request_stats_var.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if stats.statements is not None:
+            stats.statements.append((statement, elapsed))
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine):
+    """Attach query timing and pool gauges to a SQLAlchemy engine; safe to call once per engine."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    def pool_gauge(method):
+        def collect():
+            read = getattr(engine.pool, method, None)
+            return {(): read()} if callable(read) else {}
+        return collect
+
+    for method, documentation in (
+        ("size", "Configured size of the connection pool."),
+        ("checkedout", "Connections currently checked out of the pool."),
+        ("checkedin", "Idle connections in the pool."),
+        ("overflow", "Connections opened beyond the pool size."),
+    ):
+        registry.register(Gauge(f"db_pool_{method}", documentation, (), pool_gauge(method)))
+
+
+# ----------------------------------------------------------------------
+# HTTP
+# ----------------------------------------------------------------------
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by its route template, with the SQL work it caused."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats_var.set(stats)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_stats_var.reset(token)
+            route = scope.get("route")
+            # Templates keep label cardinality bounded; unmatched paths share one series.
+            path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - started,
+                                          method=scope.get("method"), route=path, status=status["code"])
+            http_request_db_queries.observe(stats.queries, route=path)
+            http_request_db_seconds.observe(stats.db_seconds, route=path)
@@ -0,0 +1,241 @@
+"""On-demand profiling of single requests in production.
+
+A request carrying ``X-Profile-Token: <PROFILE_ADMIN_TOKEN>`` runs under a sampling
+profiler: a background thread snapshots the serving thread's stack every
+PROFILE_INTERVAL_MS and folds the samples into flame graph input (the "folded stacks"
+format of flamegraph.pl and speedscope). The SQL statements the request issued, with
+their durations, are stored next to the samples. The profile id is returned in the
+``X-Profile-Id`` response header and the profile is read back from /admin/profiles.
+
+Costs nothing when disabled: without PROFILE_ADMIN_TOKEN the middleware is not installed.
+When enabled, at most PROFILE_MAX_PER_MINUTE requests per worker are profiled, one at a
+time; other flagged requests run normally with ``X-Profile-Status: rate-limited``.
+
+Samples are taken from the thread that serves the request, and from the executor worker
+threads running its service calls while they do (see app.core.executors). Async routes
+share the serving thread with other requests in flight, so their frames can show up in
+the same profile.
+"""
+import os
+import sys
+import json
+import hmac
+import time
+import uuid
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from app.core.metrics import RequestStats, request_stats_var
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN") or None
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_PER_MINUTE = int(os.getenv("PROFILE_MAX_PER_MINUTE", "6"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+# The sampler of the request being profiled, so threads working for it can join the sampling.
+active_sampler_var: ContextVar = ContextVar("active_sampler", default=None)
+
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    marker = os.sep + "app" + os.sep
+    if marker in filename:
+        filename = "app" + os.sep + filename.rsplit(marker, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Sample the stacks of a set of threads at a fixed interval, counting identical stacks."""
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_ids = {thread_id}
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[tuple(reversed(stack))] += 1
+
+    def add_thread(self, thread_id: int):
+        self.thread_ids = self.thread_ids | {thread_id}
+
+    def remove_thread(self, thread_id: int):
+        self.thread_ids = self.thread_ids - {thread_id}
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self) -> Counter:
+        self.stop_event.set()
+        self.thread.join()
+        return self.stacks
+
+
+class ProfileRateLimiter:
+    """At most ``per_minute`` profiles in any sliding minute, and one at a time."""
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.started = deque()
+        self.lock = threading.Lock()
+        self.running = False
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            while self.started and now - self.started[0] > 60:
+                self.started.popleft()
+            if self.running or len(self.started) >= self.per_minute:
+                return False
+            self.started.append(now)
+            self.running = True
+            return True
+
+    def release(self):
+        with self.lock:
+            self.running = False
+
+
+def folded_stacks(stacks: Counter) -> list:
+    """Render stacks as "root;child;leaf count" lines, heaviest first."""
+    return [f"{';'.join(stack)} {count}" for stack, count in stacks.most_common()]
+
+
+def save_profile(profile: dict, directory: str = None, keep: int = None) -> str:
+    """Write one profile as JSON and prune the oldest ones beyond ``keep``."""
+    directory = directory or PROFILE_DIR
+    keep = keep or PROFILE_KEEP
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{profile['profile_id']}.json"), "w") as f:
+        json.dump(profile, f)
+    files = sorted((e for e in os.scandir(directory) if e.name.endswith(".json")), key=lambda e: e.stat().st_mtime)
+    for entry in files[:-keep]:
+        os.remove(entry.path)
+    return profile["profile_id"]
+
+
+def load_profile(profile_id: str, directory: str = None) -> dict:
+    """Read a stored profile, or None if it does not exist."""
+    if not profile_id or not all(c in "0123456789abcdef" for c in profile_id):
+        return None
+    path = os.path.join(directory or PROFILE_DIR, f"{profile_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def list_profiles(directory: str = None) -> list:
+    """Summaries of stored profiles, newest first."""
+    directory = directory or PROFILE_DIR
+    if not os.path.isdir(directory):
+        return []
+    summaries = []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.stat().st_mtime, reverse=True):
+        if entry.name.endswith(".json"):
+            with open(entry.path) as f:
+                profile = json.load(f)
+            summaries.append({k: profile[k] for k in ("profile_id", "method", "path", "status", "duration_ms", "started_at")})
+    return summaries
+
+
+def check_admin_token(token: str, admin_token: str = None) -> bool:
+    admin_token = admin_token if admin_token is not None else PROFILE_ADMIN_TOKEN
+    return bool(admin_token) and bool(token) and hmac.compare_digest(token, admin_token)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware running admin-flagged requests under the stack sampler and SQL capture."""
+    def __init__(self, app, admin_token: str = None, directory: str = None,
+                 interval_ms: float = PROFILE_INTERVAL_MS, per_minute: int = PROFILE_MAX_PER_MINUTE):
+        self.app = app
+        self.admin_token = admin_token or PROFILE_ADMIN_TOKEN
+        self.directory = directory
+        self.interval = interval_ms / 1000.0
+        self.limiter = ProfileRateLimiter(per_minute)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = None
+        for name, value in scope.get("headers") or []:
+            if name == PROFILE_HEADER.encode():
+                token = value.decode("latin-1")
+                break
+        if token is None or not check_admin_token(token, self.admin_token):
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.acquire():
+            await self.app(scope, receive, self._with_headers(send, [(b"x-profile-status", b"rate-limited")]))
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+    @staticmethod
+    def _with_headers(send, extra):
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + extra
+            await send(message)
+        return send_with_headers
+
+    async def _profile(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex
+        stats = request_stats_var.get()
+        stats_token = None
+        if stats is None:
+            stats = RequestStats()
+            stats_token = request_stats_var.set(stats)
+        stats.statements = []
+        status = {"code": 500}
+        headers = [(b"x-profile-id", profile_id.encode()), (b"x-profile-status", b"profiled")]
+        inner_send = self._with_headers(send, headers)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await inner_send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler_token = active_sampler_var.set(sampler)
+        started_at = time.time()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            stacks = sampler.stop()
+            active_sampler_var.reset(sampler_token)
+            duration = time.perf_counter() - started
+            statements, stats.statements = stats.statements, None
+            if stats_token is not None:
+                request_stats_var.reset(stats_token)
+            save_profile({
+                "profile_id": profile_id,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status["code"],
+                "started_at": round(started_at, 3),
+                "duration_ms": round(duration * 1000, 2),
+                "interval_ms": self.interval * 1000,
+                "samples": sum(stacks.values()),
+                "folded": folded_stacks(stacks),
+                "sql": [{"statement": s, "duration_ms": round(e * 1000, 3)} for s, e in statements],
+                "sql_total_ms": round(sum(e for _, e in statements) * 1000, 3),
+            }, self.directory)
@@ -0,0 +1,173 @@
+"""Per-user token bucket rate limiting of the LLM-backed routes.
+
+Each (limit, user) pair has a bucket of ``capacity`` tokens that refills continuously at
+``capacity / period`` tokens per second; a request takes one token or is refused with the
+number of seconds until one is available (sent as ``Retry-After``).
+
+Configured from the environment:
+    RATE_LIMIT_BACKEND              "memory" (default) keeps buckets in this worker;
+                                    "database" keeps them in the rate_limit_buckets table,
+                                    so the limits hold across uvicorn workers and hosts
+    RATE_LIMIT_INTERVIEW_START      "capacity/period_seconds" for POST /interview/start (default "10/600")
+    RATE_LIMIT_INTERVIEW_FEEDBACK   "capacity/period_seconds" for POST /interview/feedback (default "60/600")
+                                    "off" disables a limit
+"""
+import os
+import math
+import time
+import threading
+from typing import NamedTuple
+from app.core.metrics import registry, Counter
+from app.services.utils import with_db_session
+from app.db import crud
+
+rate_limited_requests = registry.register(Counter(
+    "rate_limited_requests_total", "Requests refused by a per-user rate limit.", ("limit",)))
+
+
+class Limit(NamedTuple):
+    """A bucket of ``capacity`` tokens refilled at ``capacity / period`` tokens per second."""
+    capacity: float
+    period: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+    @property
+    def retry_after_header(self) -> str:
+        """Whole seconds, rounded up, as sent in Retry-After."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def parse_limit(spec: str):
+    """
+    Parse "capacity/period_seconds" into a Limit.
+
+    Args:
+        spec: A string like "10/600", or "off" to disable the limit.
+
+    Returns:
+        Limit: The parsed limit, or None when disabled.
+    """
+    spec = (spec or "").strip().lower()
+    if spec in ("", "off", "none", "0"):
+        return None
+    capacity, sep, period = spec.partition("/")
+    if not sep:
+        raise ValueError(f"Invalid rate limit: {spec}")
+    limit = Limit(float(capacity), float(period))
+    if limit.capacity <= 0 or limit.period <= 0:
+        raise ValueError(f"Invalid rate limit: {spec}")
+    return limit
+
+
+def refill(tokens: float, elapsed: float, limit: Limit) -> float:
+    """Tokens in a bucket ``elapsed`` seconds after it held ``tokens``."""
+    return min(limit.capacity, tokens + max(0.0, elapsed) * limit.refill_per_second)
+
+
+def decide(available: float, limit: Limit, cost: float = 1.0) -> Decision:
+    """Take ``cost`` tokens out of ``available`` if there are enough."""
+    if available >= cost:
+        return Decision(True, available - cost, 0.0)
+    return Decision(False, available, (cost - available) / limit.refill_per_second)
+
+
+class MemoryBuckets:
+    """Token buckets in a dict of this process; limits are per worker."""
+    def __init__(self, clock=time.monotonic, max_keys: int = 100_000):
+        self.clock = clock
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, cost: float = 1.0) -> Decision:
+        now = self.clock()
+        with self.lock:
+            tokens, updated, _ = self.buckets.get(key, (limit.capacity, now, limit.period))
+            decision = decide(refill(tokens, now - updated, limit), limit, cost)
+            if len(self.buckets) >= self.max_keys and key not in self.buckets:
+                self._prune(now)
+            self.buckets[key] = (decision.remaining, now, limit.period)
+        return decision
+
+    def _prune(self, now: float):
+        # A bucket untouched for a whole period has refilled, the same as no bucket at all.
+        self.buckets = {k: v for k, v in self.buckets.items() if now - v[1] < v[2]}
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class DatabaseBuckets:
+    """Token buckets in the rate_limit_buckets table, updated with one atomic statement per request."""
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
+    def take(self, key: str, limit: Limit, cost: float = 1.0) -> Decision:
+        now = self.clock()
+        taken, tokens, updated = self._take(key, limit, cost, now)
+        if taken:
+            return Decision(True, tokens, 0.0)
+        return decide(refill(tokens, now - updated, limit), limit, cost)
+
+    @staticmethod
+    @with_db_session
+    def _take(key: str, limit: Limit, cost: float, now: float, db=None):
+        return crud.take_rate_limit_tokens(key, limit.capacity, limit.refill_per_second, cost, now, db=db)
+
+    @staticmethod
+    @with_db_session
+    def reset(db=None):
+        crud.delete_rate_limit_buckets(db=db)
+
+
+class RateLimiter:
+    """Named per-user limits over one bucket store."""
+    def __init__(self, limits: dict, backend=None):
+        self.limits = limits
+        self.backend = backend or MemoryBuckets()
+
+    @classmethod
+    def from_env(cls):
+        backend_name = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+        if backend_name not in ("memory", "database"):
+            raise ValueError(f"Invalid RATE_LIMIT_BACKEND: {backend_name}")
+        return cls(
+            limits={
+                "interview_start": parse_limit(os.getenv("RATE_LIMIT_INTERVIEW_START", "10/600")),
+                "interview_feedback": parse_limit(os.getenv("RATE_LIMIT_INTERVIEW_FEEDBACK", "60/600")),
+            },
+            backend=DatabaseBuckets() if backend_name == "database" else MemoryBuckets(),
+        )
+
+    def take(self, name: str, user_id: str, cost: float = 1.0) -> Decision:
+        """
+        Take tokens from the user's bucket of a named limit.
+
+        Args:
+            name: A string of limit name, e.g. "interview_start".
+            user_id: A string of user id.
+            cost: A float of tokens the request takes.
+
+        Returns:
+            Decision: Whether the request may proceed, and if not, after how many seconds.
+        """
+        limit = self.limits.get(name)
+        if limit is None:
+            return Decision(True, math.inf, 0.0)
+        decision = self.backend.take(f"{name}:{user_id}", limit, cost)
+        if not decision.allowed:
+            rate_limited_requests.inc(limit=name)
+        return decision
+
+
+rate_limiter = RateLimiter.from_env()
@@ -0,0 +1,216 @@
+"""Local verification of bearer JWTs.
+
+Signing keys come from the environment and are cached in process:
+    JWT_SECRET                  HMAC secret (HS256 tokens)
+    JWT_PUBLIC_KEY              PEM public key (RS256/ES256 tokens)
+    JWT_JWKS_URL                JWKS endpoint; the key set is refreshed in the background
+                                every JWT_JWKS_REFRESH_SECONDS, and on an unknown key id
+    JWT_ALGORITHMS              Accepted algorithms, comma separated (default "HS256,RS256")
+    JWT_AUDIENCE, JWT_ISSUER    Checked when set
+    JWT_ALLOW_UNVERIFIED        When no key is configured, read tokens without verifying
+                                them instead of rejecting them; a test/dev opt-in, on by
+                                default only under TESTING=1
+
+A token is verified without any network call on the request path, except for the first
+JWKS fetch and for a rate-limited refetch when a token names a key id not seen yet.
+"""
+import logging
+import os
+import time
+import threading
+from typing import NamedTuple
+import jwt
+import requests
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+JWT_ALGORITHMS = [a.strip() for a in os.getenv("JWT_ALGORITHMS", "HS256,RS256").split(",") if a.strip()]
+JWT_AUDIENCE = os.getenv("JWT_AUDIENCE") or None
+JWT_ISSUER = os.getenv("JWT_ISSUER") or None
+JWT_ALLOW_UNVERIFIED = os.getenv(
+    "JWT_ALLOW_UNVERIFIED", "true" if os.getenv("TESTING") == "1" else "false").lower() in ("1", "true", "yes")
+JWT_JWKS_REFRESH_SECONDS = float(os.getenv("JWT_JWKS_REFRESH_SECONDS", "300"))
+# An unknown key id triggers a refetch at most this often, so bad tokens cannot hammer the JWKS endpoint.
+JWT_JWKS_MIN_REFETCH_SECONDS = float(os.getenv("JWT_JWKS_MIN_REFETCH_SECONDS", "30"))
+
+
+class AuthenticationError(Exception):
+    """Raised when a bearer token is malformed, unsigned where a signature is required, or fails verification."""
+    pass
+
+
+class Principal(NamedTuple):
+    """The authenticated caller of one request."""
+    user_id: str
+    email: str
+    token: str
+
+
+class SigningKeys:
+    """
+    A process-wide cache of verification keys, indexed by key id.
+    Static keys (secret or PEM) match any token; JWKS keys are looked up by the token's key id.
+    """
+    def __init__(self, secret: str = None, public_key: str = None, jwks_url: str = None,
+                 refresh_seconds: float = JWT_JWKS_REFRESH_SECONDS, timeout: float = 5.0):
+        self.jwks_url = jwks_url
+        self.refresh_seconds = refresh_seconds
+        self.timeout = timeout
+        self.static_keys = [k for k in (secret, public_key) if k]
+        self.keys = {}
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            secret=os.getenv("JWT_SECRET") or None,
+            public_key=os.getenv("JWT_PUBLIC_KEY") or None,
+            jwks_url=os.getenv("JWT_JWKS_URL") or None,
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.static_keys or self.jwks_url)
+
+    def refresh(self):
+        """Fetch the JWKS and swap in the new key set; the old set stays in use on failure."""
+        self.fetched_at = time.monotonic()
+        try:
+            response = requests.get(self.jwks_url, timeout=self.timeout)
+            response.raise_for_status()
+            key_set = jwt.PyJWKSet.from_dict(response.json())
+        except (requests.exceptions.RequestException, ValueError, jwt.PyJWTError) as e:
+            logger.warning("JWKS refresh failed", extra={"jwks_url": self.jwks_url, "error": str(e)})
+            return
+        self.keys = {k.key_id: k.key for k in key_set.keys}
+
+    def _refresh_loop(self):
+        while not self.stop_event.wait(self.refresh_seconds):
+            self.refresh()
+
+    def start(self):
+        """Load the key set once and keep it fresh from a daemon thread."""
+        with self.lock:
+            if self.thread is not None or not self.jwks_url:
+                return
+            self.refresh()
+            self.thread = threading.Thread(target=self._refresh_loop, name="jwks-refresh", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def candidates(self, kid: str = None) -> list:
+        """Keys that may have signed a token with this key id."""
+        if self.jwks_url:
+            self.start()
+            record_cache("jwks", hit=kid in self.keys)
+            if kid not in self.keys and time.monotonic() - self.fetched_at > JWT_JWKS_MIN_REFETCH_SECONDS:
+                with self.lock:
+                    if kid not in self.keys and time.monotonic() - self.fetched_at > JWT_JWKS_MIN_REFETCH_SECONDS:
+                        self.refresh()
+        keys = list(self.static_keys)
+        if kid in self.keys:
+            keys.insert(0, self.keys[kid])
+        elif kid is None:
+            keys.extend(self.keys.values())
+        return keys
+
+
+signing_keys = SigningKeys.from_env()
+_warned_unverified = False
+
+
+def decode_token(token: str, keys: SigningKeys = None) -> dict:
+    """
+    Verify a JWT against the cached signing keys and return its claims.
+
+    Args:
+        token: A string of JWT token.
+        keys: The SigningKeys to verify with, the process-wide cache by default.
+
+    Returns:
+        dict: A dict of the token claims.
+
+    Raises:
+        AuthenticationError: If the token is malformed or fails verification.
+    """
+    global _warned_unverified
+    keys = keys or signing_keys
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as e:
+        raise AuthenticationError("Invalid JWT format") from e
+
+    if not keys.configured:
+        if not JWT_ALLOW_UNVERIFIED:
+            raise AuthenticationError("No JWT signing key configured")
+        if not _warned_unverified:
+            _warned_unverified = True
+            logger.warning("No JWT signing key configured, bearer tokens are NOT verified.")
+        try:
+            return jwt.decode(token, options={"verify_signature": False})
+        except jwt.PyJWTError as e:
+            raise AuthenticationError("Invalid JWT format") from e
+
+    candidates = keys.candidates(header.get("kid"))
+    if not candidates:
+        raise AuthenticationError("Unknown JWT signing key")
+    error = None
+    for key in candidates:
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=JWT_ALGORITHMS,
+                audience=JWT_AUDIENCE,
+                issuer=JWT_ISSUER,
+                options={"verify_aud": JWT_AUDIENCE is not None},
+            )
+        except (jwt.InvalidSignatureError, jwt.InvalidKeyError, TypeError, ValueError) as e:
+            # Try the next key, e.g. an HMAC secret offered for an RS256 token. PyJWT raises
+            # TypeError for an HS256 token naming the kid of an RSA key.
+            error = e
+        except jwt.PyJWTError as e:
+            raise AuthenticationError(f"Invalid token: {e}") from e
+    raise AuthenticationError("Invalid token signature") from error
+
+
+def resolve_principal(token: str, keys: SigningKeys = None) -> Principal:
+    """
+    Verify a token and build the principal of its subject.
+
+    Args:
+        token: A string of JWT token.
+        keys: The SigningKeys to verify with, the process-wide cache by default.
+
+    Returns:
+        Principal: The user id and email from the token claims, and the token itself.
+    """
+    claims = decode_token(token, keys)
+    user_id = claims.get("id")
+    if not user_id:
+        raise AuthenticationError("Token has no user id")
+    return Principal(user_id=user_id, email=claims.get("email"), token=token)
+
+
+def token_expiry(token: str):
+    """
+    The expiry of a token already verified by resolve_principal, for connections that outlive one request.
+
+    Args:
+        token: A string of JWT token.
+
+    Returns:
+        float: Unix seconds of the exp claim, None if the token does not expire.
+    """
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return None
+    return float(exp) if exp is not None else None
@@ -1,7 +1,10 @@
 # app/db/crud.py
-from sqlalchemy.orm import Session, joinedload
+import re
+from sqlalchemy import select, or_, and_, func, update, delete, text, true, literal, union_all, cast, String, bindparam, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.db.db_config import with_db_session
-from app.db.models import Question, Interview, User, Badge, UserBadge, current_millis
+from app.db.models import Question, Interview, User, Badge, UserBadge, ScoreHistogramBin, RateLimitBucket, IdempotencyKey, IdAlias, QuestionEvent, ProjectorCheckpoint, current_millis, QUESTION_SEARCH_VECTOR
 
 
 def add_question(question: Question, db: Session = None):
@@ -20,7 +23,22 @@ def add_interview(interview: Interview, db: Session = None):
 
 
 def get_interview(interview_id: str, db: Session = None):
-    return db.query(Interview).filter(Interview.interview_id == interview_id).first()
+    interview = db.query(Interview).filter(Interview.interview_id == interview_id).first()
+    if interview is None:
+        # An id from before the UUIDv7 migration, still held by a client.
+        new_id = get_id_alias(interview_id, db)
+        if new_id is not None:
+            interview = db.query(Interview).filter(Interview.interview_id == new_id).first()
+    return interview
+
+
+def get_id_alias(old_id: str, db: Session = None):
+    """The id that replaced a legacy interview or question id in app.db.migrate_ids, or None."""
+    return db.execute(select(IdAlias.new_id).where(IdAlias.old_id == old_id)).scalar()
+
+
+def get_interview_job_description(interview_id: str, db: Session = None):
+    return db.execute(select(Interview.job_description).where(Interview.interview_id == interview_id)).scalar()
 
 
 def update_interview_like(interview_id: str, db: Session = None):
@@ -51,7 +69,8 @@ def update_user(user_id: str, update_data: dict, db: Session = None):
     update_data is a dictionary of fields to be updated, for example:
     {"last_login": date.today(), "total_login": 5}
     """
-    user = db.query(User).filter(User.user_id == user_id).first()
+    # Served from the identity map when the caller already loaded the user.
+    user = db.get(User, user_id)
     if not user:
         return None
 
@@ -65,13 +84,45 @@ def update_user(user_id: str, update_data: dict, db: Session = None):
 
 
 
+def get_top_user_scores(score_column: str, limit: int, db: Session = None):
+    """
+    Return (user_id, score) rows of the best scores in a users column, best first.
+    Served from the column's index, ties are broken by user_id.
+    """
+    column = getattr(User, score_column)
+    return (
+        db.query(User.user_id, column)
+        .order_by(column.desc(), User.user_id)
+        .limit(limit)
+        .all()
+    )
+
+
+
+def get_user_score(user_id: str, score_column: str, db: Session = None):
+    column = getattr(User, score_column)
+    return db.query(column).filter(User.user_id == user_id).scalar()
+
+
+
+def count_users_above_score(score_column: str, score, db: Session = None):
+    """
+    Count users with a strictly greater score, an index-only range scan on the score column.
+    The scan visits each counted entry: O(log n + r) for r users above, not O(log n).
+    """
+    column = getattr(User, score_column)
+    return db.query(func.count(User.user_id)).filter(column > score).scalar()
+
+
+
 def get_questions_by_user(user_id: str, db: Session = None):
     return db.query(Question).filter(Question.user_id == user_id).all()
 
 
 
 def get_user_basic(user_id: str, db: Session = None):
-    return db.query(User).filter(User.user_id == user_id).first()
+    # Session.get skips the SELECT when the user is already loaded and unexpired in this session.
+    return db.get(User, user_id)
 
 
 
@@ -85,6 +136,97 @@ def get_user_interviews(user_id: str, db: Session = None):
 
 
 
+def get_liked_interviews_page(user_id: str, limit: int, before: tuple = None, interview_type: str = None,
+                              start_time: int = None, end_time: int = None, db: Session = None):
+    """
+    One keyset page of a user's liked interviews, newest first, with their questions.
+    ``before`` is the (timestamp, interview_id) of the last row of the previous page.
+    The filter repeats the partial index predicate so the page is one index range scan;
+    questions are loaded for the page only.
+    """
+    query = (
+        db.query(Interview)
+        .options(selectinload(Interview.questions))
+        .filter(Interview.user_id == user_id, Interview.is_like == true())
+    )
+    if interview_type:
+        query = query.filter(Interview.interview_type == interview_type)
+    if start_time is not None:
+        query = query.filter(Interview.timestamp >= start_time)
+    if end_time is not None:
+        query = query.filter(Interview.timestamp < end_time)
+    if before is not None:
+        before_timestamp, before_id = before
+        query = query.filter(or_(
+            Interview.timestamp < before_timestamp,
+            and_(Interview.timestamp == before_timestamp, Interview.interview_id < before_id),
+        ))
+    return (
+        query.order_by(Interview.timestamp.desc(), Interview.interview_id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+
+def get_user_interviews_projected(user_id: str, interview_columns: list, question_columns: list = None,
+                                  feedback_keys: list = None, db: Session = None):
+    """
+    Projected variant of get_user_interviews for sparse fieldsets.
+    Only the named Interview/Question columns are selected, and feedback keys are
+    extracted from the JSON column in SQL, so unrequested Text/JSON columns are never read.
+    Columns are labelled "i_<name>", "q_<name>" and "f_<index>" (position in feedback_keys).
+    """
+    columns = [getattr(Interview, name).label(f"i_{name}") for name in interview_columns]
+    joined = bool(question_columns or feedback_keys)
+    if joined:
+        columns += [getattr(Question, name).label(f"q_{name}") for name in (question_columns or [])]
+        columns += [Question.feedback[key].label(f"f_{index}") for index, key in enumerate(feedback_keys or [])]
+    stmt = select(*columns).filter(Interview.user_id == user_id)
+    if joined:
+        stmt = stmt.outerjoin(Question, Question.interview_id == Interview.interview_id)
+    stmt = stmt.order_by(Interview.timestamp, Interview.interview_id)
+    if joined:
+        stmt = stmt.order_by(Question.timestamp, Question.question_id)
+    return db.execute(stmt).all()
+
+
+
+def iter_user_export_rows(user_id: str, after: tuple = None, batch_size: int = 500, db: Session = None):
+    """
+    Stream one user's interviews joined with their questions through a server-side cursor.
+    Rows are ordered by (interview timestamp, interview_id) so that ``after``, a
+    (timestamp, interview_id) tuple of the last exported interview, resumes the export.
+    """
+    stmt = (
+        select(
+            Interview.interview_id,
+            Interview.interview_type,
+            Interview.job_description,
+            Interview.timestamp,
+            Interview.is_like,
+            Question.question_id,
+            Question.question,
+            Question.question_type,
+            Question.answer,
+            Question.feedback,
+            Question.timestamp.label("question_timestamp"),
+        )
+        .outerjoin(Question, Question.interview_id == Interview.interview_id)
+        .filter(Interview.user_id == user_id)
+        .order_by(Interview.timestamp, Interview.interview_id, Question.timestamp, Question.question_id)
+    )
+    if after is not None:
+        after_timestamp, after_id = after
+        stmt = stmt.filter(or_(
+            Interview.timestamp > after_timestamp,
+            and_(Interview.timestamp == after_timestamp, Interview.interview_id > after_id),
+        ))
+    # yield_per implies stream_results, so rows are fetched batch by batch.
+    return db.execute(stmt.execution_options(yield_per=batch_size))
+
+
+
 def get_user_badges(user_id: str, db: Session = None):
     return (
         db.query(UserBadge)
@@ -94,6 +236,40 @@ def get_user_badges(user_id: str, db: Session = None):
 
 
 
+def get_user_statistics_rows(user_id: str, db: Session = None):
+    """
+    The user row with the ids and timestamps of their interviews and badges, in one round-trip.
+    Interviews and badges are merged by a UNION ALL of (kind, item_id, timestamp) and outer-joined
+    to the user, so no question or answer text is read.
+    Returns (user, interviews, badges), or None if the user does not exist; interviews are
+    (interview_id, timestamp) and badges are (badge_id, unlocked_timestamp) pairs.
+    """
+    items = union_all(
+        select(literal("i").label("kind"), Interview.interview_id.label("item_id"),
+               Interview.timestamp.label("item_timestamp"), Interview.user_id.label("owner_id"))
+        .where(Interview.user_id == user_id),
+        select(literal("b"), cast(UserBadge.badge_id, String), UserBadge.unlocked_timestamp, UserBadge.user_id)
+        .where(UserBadge.user_id == user_id),
+    ).subquery()
+    rows = db.execute(
+        select(User, items.c.kind, items.c.item_id, items.c.item_timestamp)
+        .outerjoin(items, items.c.owner_id == User.user_id)
+        .where(User.user_id == user_id)
+        .order_by(items.c.kind.desc(), items.c.item_timestamp, items.c.item_id)
+    ).all()
+    if not rows:
+        return None
+
+    interviews, badges = [], []
+    for _, kind, item_id, item_timestamp in rows:
+        if kind == "i":
+            interviews.append((item_id, item_timestamp))
+        elif kind == "b":
+            badges.append((int(item_id), item_timestamp))
+    return rows[0][0], interviews, badges
+
+
+
 def get_all_badges(db: Session = None):
     return db.query(Badge).all()
 
@@ -118,4 +294,313 @@ def unlock_badge(user_id: str, badge_id: int, db: Session = None):
     db.add(new_unlock)
     db.commit()
     db.refresh(new_unlock)
-    return new_unlock
\ No newline at end of file
+    return new_unlock
+
+
+
+def get_score_histograms(db: Session = None):
+    """Return {dimension: [count per bin]} for all score histograms."""
+    rows = (
+        db.query(ScoreHistogramBin.dimension, ScoreHistogramBin.bin, ScoreHistogramBin.count)
+        .order_by(ScoreHistogramBin.dimension, ScoreHistogramBin.bin)
+        .all()
+    )
+    histograms = {}
+    for dimension, _, count in rows:
+        histograms.setdefault(dimension, []).append(count)
+    return histograms
+
+
+
+def shift_score_histograms(changes: list, db: Session = None, commit: bool = True):
+    """
+    Apply (dimension, old_bin, new_bin) moves as atomic count updates, sent as one executemany.
+    old_bin is None for a user entering the histogram. With commit=False the caller commits.
+    """
+    params = []
+    for dimension, old_bin, new_bin in changes:
+        if old_bin is not None:
+            params.append({"d": dimension, "b": old_bin, "delta": -1})
+        params.append({"d": dimension, "b": new_bin, "delta": 1})
+    table = ScoreHistogramBin.__table__
+    db.connection().execute(
+        update(table)
+        .where(table.c.dimension == bindparam("d"), table.c.bin == bindparam("b"))
+        .values(count=table.c.count + bindparam("delta")),
+        params
+    )
+    if commit:
+        db.commit()
+
+
+
+def replace_score_histogram(dimension: str, counts: list, db: Session = None):
+    db.query(ScoreHistogramBin).filter(ScoreHistogramBin.dimension == dimension).delete()
+    db.add_all([ScoreHistogramBin(dimension=dimension, bin=index, count=count) for index, count in enumerate(counts)])
+    db.commit()
+
+
+
+
+_POSTGRES_SEARCH_SQL = f"""
+SELECT hit.question_id, hit.interview_id, hit.timestamp, hit.rank,
+       ts_headline('english', coalesce(hit.question, ''), hit.query, 'MaxFragments=1, MaxWords=20, MinWords=5') AS question_snippet,
+       ts_headline('english', coalesce(hit.answer, ''), hit.query, 'MaxFragments=2, MaxWords=20, MinWords=5') AS answer_snippet
+FROM (
+    SELECT q.question_id, q.interview_id, q.timestamp, q.question, q.answer, query,
+           ts_rank({QUESTION_SEARCH_VECTOR}, query) AS rank
+    FROM questions q
+    JOIN interviews i ON i.interview_id = q.interview_id,
+         plainto_tsquery('english', :query) query
+    WHERE i.user_id = :user_id AND {QUESTION_SEARCH_VECTOR} @@ query
+    ORDER BY rank DESC, q.question_id
+    LIMIT :limit OFFSET :offset
+) hit
+ORDER BY hit.rank DESC, hit.question_id
+"""
+
+_SQLITE_SEARCH_SQL = """
+SELECT q.question_id, q.interview_id, q.timestamp, -bm25(questions_fts) AS rank,
+       snippet(questions_fts, 0, '<b>', '</b>', '...', 12) AS question_snippet,
+       snippet(questions_fts, 1, '<b>', '</b>', '...', 24) AS answer_snippet
+FROM questions_fts
+JOIN questions q ON q.rowid = questions_fts.rowid
+JOIN interviews i ON i.interview_id = q.interview_id
+WHERE questions_fts MATCH :query AND i.user_id = :user_id
+ORDER BY bm25(questions_fts), q.question_id
+LIMIT :limit OFFSET :offset
+"""
+
+
+def search_user_questions(user_id: str, query: str, limit: int = 20, offset: int = 0, db: Session = None):
+    """
+    Ranked full-text search over one user's questions and answers, best match first.
+    Uses the GIN tsvector index on PostgreSQL and the FTS5 table on SQLite;
+    rows carry question/answer snippets instead of the full text.
+    """
+    params = {"user_id": user_id, "limit": limit, "offset": offset}
+    if db.get_bind().dialect.name == "sqlite":
+        # Quote every term so user input is never parsed as FTS5 query syntax.
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        params["query"] = " ".join(f'"{term}"' for term in terms)
+        return db.execute(text(_SQLITE_SEARCH_SQL), params).all()
+    params["query"] = query
+    return db.execute(text(_POSTGRES_SEARCH_SQL), params).all()
+
+
+
+def take_rate_limit_tokens(key: str, capacity: float, refill_per_second: float, cost: float, now: float,
+                           db: Session = None):
+    """
+    Refill a token bucket up to ``now`` and take ``cost`` tokens from it, in one atomic upsert.
+    The conditional ON CONFLICT update makes concurrent takes from several workers serialize on the row,
+    so a bucket is never overdrawn. A missing bucket starts full.
+
+    Returns:
+        tuple: (taken, tokens, updated_at) - whether the tokens were taken, and the bucket state
+        after the take, or as last stored when they were not.
+    """
+    table = RateLimitBucket.__table__
+    elapsed = case((table.c.updated_at > now, 0.0), else_=literal(now) - table.c.updated_at)
+    grown = table.c.tokens + elapsed * refill_per_second
+    refilled = case((grown > capacity, capacity), else_=grown)
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = (
+        insert(table)
+        .values(key=key, tokens=capacity - cost, updated_at=now)
+        .on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={"tokens": refilled - cost, "updated_at": now},
+            where=refilled >= cost,
+        )
+        .returning(table.c.tokens, table.c.updated_at)
+    )
+    row = db.execute(stmt).first()
+    db.commit()
+    if row is not None:
+        return True, row.tokens, row.updated_at
+    row = db.execute(select(table.c.tokens, table.c.updated_at).where(table.c.key == key)).first()
+    return False, row.tokens, row.updated_at
+
+
+
+def delete_rate_limit_buckets(db: Session = None):
+    db.execute(delete(RateLimitBucket))
+    db.commit()
+
+
+
+def claim_idempotency_key(user_id: str, key: str, request_hash: str, now: float, expire_before: float,
+                          stale_before: float, db: Session = None):
+    """
+    Claim an idempotency key for a new request, in one atomic upsert.
+    A missing key, an expired one (claimed before ``expire_before``) or a pending claim left by a crashed
+    request (claimed before ``stale_before``) is (re)claimed as pending; any other existing key is left as is.
+
+    Returns:
+        tuple: (claimed, row) - whether the key was claimed, and when it was not, the stored key row.
+    """
+    table = IdempotencyKey.__table__
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = (
+        insert(table)
+        .values(user_id=user_id, key=key, request_hash=request_hash, status="pending", response=None, created_at=now)
+        .on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.key],
+            set_={"request_hash": request_hash, "status": "pending", "response": None, "created_at": now},
+            where=or_(
+                table.c.created_at < expire_before,
+                and_(table.c.status == "pending", table.c.created_at < stale_before),
+            ),
+        )
+        .returning(table.c.key)
+    )
+    claimed = db.execute(stmt).first() is not None
+    db.commit()
+    if claimed:
+        return True, None
+    return False, db.execute(select(table).where(table.c.user_id == user_id, table.c.key == key)).first()
+
+
+
+def get_idempotency_key(user_id: str, key: str, db: Session = None):
+    table = IdempotencyKey.__table__
+    return db.execute(select(table).where(table.c.user_id == user_id, table.c.key == key)).first()
+
+
+
+def complete_idempotency_key(user_id: str, key: str, response: dict, db: Session = None):
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status="completed", response=response)
+    )
+    db.commit()
+
+
+
+def release_idempotency_key(user_id: str, key: str, db: Session = None):
+    """Delete a pending claim, so a retry of a failed request runs again."""
+    db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.status == "pending")
+    )
+    db.commit()
+
+
+
+def delete_expired_idempotency_keys(expire_before: float, db: Session = None):
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < expire_before))
+    db.commit()
+    return result.rowcount
+
+
+
+def get_scored_answers(limit: int, db: Session = None):
+    """The most recent answers with feedback, as (question, answer, feedback, job_description) rows."""
+    return db.execute(
+        select(Question.question, Question.answer, Question.feedback, Interview.job_description)
+        .join(Interview, Question.interview_id == Interview.interview_id)
+        .where(Question.answer.is_not(None))
+        .order_by(Question.timestamp.desc())
+        .limit(limit)
+    ).all()
+
+
+
+def add_question_with_event(question: Question, question_event: QuestionEvent, db: Session = None):
+    """Insert an answered question and its event in one transaction."""
+    db.add(question)
+    db.add(question_event)
+    db.commit()
+    return question
+
+
+
+def get_projector_checkpoint(name: str, lock: bool = False, db: Session = None) -> int:
+    """
+    The last event id a projector applied, creating its checkpoint at 0.
+    With lock=True the row is locked until the transaction ends (FOR UPDATE on PostgreSQL).
+    """
+    stmt = select(ProjectorCheckpoint.last_event_id).where(ProjectorCheckpoint.name == name)
+    if lock:
+        stmt = stmt.with_for_update()
+    last_event_id = db.execute(stmt).scalar()
+    if last_event_id is None:
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        db.execute(insert(ProjectorCheckpoint).values(name=name, last_event_id=0, updated_at=current_millis())
+                   .on_conflict_do_nothing(index_elements=["name"]))
+        last_event_id = db.execute(stmt).scalar()
+    return last_event_id
+
+
+
+def advance_projector_checkpoint(name: str, from_event_id: int, to_event_id: int, db: Session = None) -> bool:
+    """
+    Move a checkpoint from ``from_event_id`` to ``to_event_id`` unless another projector moved it first.
+    Not committed: the caller commits it with the applied events, or rolls both back when False.
+    """
+    result = db.execute(
+        update(ProjectorCheckpoint)
+        .where(ProjectorCheckpoint.name == name, ProjectorCheckpoint.last_event_id == from_event_id)
+        .values(last_event_id=to_event_id, updated_at=current_millis())
+    )
+    return result.rowcount == 1
+
+
+
+def get_question_events_after(event_id: int, limit: int, db: Session = None):
+    return (
+        db.query(QuestionEvent)
+        .filter(QuestionEvent.event_id > event_id)
+        .order_by(QuestionEvent.event_id)
+        .limit(limit)
+        .all()
+    )
+
+
+
+def iter_question_events(up_to_event_id: int, batch_size: int = 1000, db: Session = None):
+    """Stream every question event up to an id, in log order."""
+    return db.execute(
+        select(QuestionEvent)
+        .where(QuestionEvent.event_id <= up_to_event_id)
+        .order_by(QuestionEvent.event_id)
+        .execution_options(yield_per=batch_size)
+    ).scalars()
+
+
+
+def get_max_question_event_id(db: Session = None) -> int:
+    return db.execute(select(func.max(QuestionEvent.event_id))).scalar() or 0
+
+
+
+def get_questions_without_event(db: Session = None):
+    """(question_id, interview_id, user_id, feedback, timestamp) rows of questions saved before the event log."""
+    return db.execute(
+        select(Question.question_id, Question.interview_id, Interview.user_id, Question.feedback, Question.timestamp)
+        .join(Interview, Question.interview_id == Interview.interview_id)
+        .outerjoin(QuestionEvent, QuestionEvent.question_id == Question.question_id)
+        .where(QuestionEvent.event_id.is_(None))
+        .order_by(Question.timestamp, Question.question_id)
+    ).all()
+
+
+
+def get_users_by_ids(user_ids, db: Session = None):
+    return db.query(User).filter(User.user_id.in_(list(user_ids))).all()
+
+
+
+def get_unlocked_badge_ids(user_ids, db: Session = None) -> dict:
+    """{user_id: set of unlocked badge ids} for several users in one query."""
+    unlocked = {user_id: set() for user_id in user_ids}
+    rows = db.execute(
+        select(UserBadge.user_id, UserBadge.badge_id).where(UserBadge.user_id.in_(list(user_ids)))
+    ).all()
+    for user_id, badge_id in rows:
+        unlocked[user_id].add(badge_id)
+    return unlocked
@@ -69,9 +69,11 @@
 # app/db/db_config.py
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, declarative_base
 from functools import wraps
 from dotenv import load_dotenv
+from app.core.metrics import instrument_engine
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 ENV_PATH = os.path.join(BASE_DIR, ".env")
@@ -105,11 +107,15 @@ else:
 # Create engine
 # ----------------------------------------------------------------------
 # echo=True It allows you to see the SQL, for debugging purposes.
+# In testing, StaticPool shares the one in-memory database with the TestClient's worker thread.
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if IS_TEST else {}
+    connect_args={"check_same_thread": False} if IS_TEST else {},
+    **({"poolclass": StaticPool} if IS_TEST else {})
 )
 
+instrument_engine(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -6,7 +6,7 @@ Usage:
     python -m app.db.db_init        # Creates table if not exist
     python -m app.db.db_init reset  # Drops all tables
 """
-from sqlalchemy import text
+from sqlalchemy import text, inspect
 from app.db.db_config import engine, Base
 from app.db import models
 import sys
@@ -46,6 +46,62 @@ def reset_all():
     Base.metadata.create_all(bind=engine)
     print("All tables reset.")
 
+# SQL run once right after a column is added to an existing table, to backfill its values.
+COLUMN_BACKFILLS = {
+    ("users", "avg_clarity"): "UPDATE users SET avg_clarity = total_clarity * 1.0 / total_questions WHERE total_questions > 0",
+    ("users", "avg_relevance"): "UPDATE users SET avg_relevance = total_relevance * 1.0 / total_questions WHERE total_questions > 0",
+    ("users", "avg_keyword"): "UPDATE users SET avg_keyword = total_keyword * 1.0 / total_questions WHERE total_questions > 0",
+    ("users", "avg_confidence"): "UPDATE users SET avg_confidence = total_confidence * 1.0 / total_questions WHERE total_questions > 0",
+    ("users", "avg_conciseness"): "UPDATE users SET avg_conciseness = total_conciseness * 1.0 / total_questions WHERE total_questions > 0",
+    ("users", "avg_overall"): "UPDATE users SET avg_overall = total_overall * 1.0 / total_questions WHERE total_questions > 0",
+}
+
+
+def _column_default_sql(column) -> str:
+    """Render a scalar column default as a SQL literal for ALTER TABLE."""
+    default = column.default
+    if default is None or not default.is_scalar:
+        return ""
+    value = default.arg
+    if isinstance(value, bool):
+        return " DEFAULT TRUE" if value else " DEFAULT FALSE"
+    if isinstance(value, (int, float)):
+        return f" DEFAULT {value}"
+    return ""
+
+
+def upgrade_schema():
+    """Add columns and indexes introduced after a table was first created.
+    create_all() only creates missing tables, so existing databases are brought up to date here.
+    The SQLite full-text index is rebuilt too, since a VACUUM may have renumbered its rowids.
+    """
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}{_column_default_sql(column)}"
+                ))
+                backfill = COLUMN_BACKFILLS.get((table.name, column.name))
+                if backfill:
+                    conn.execute(text(backfill))
+                print(f"Added column {table.name}.{column.name}.")
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    print(f"Created index {index.name}.")
+        if "questions" in existing_tables:
+            models.create_question_search_index(conn, rebuild=True)
+
+
 def init_db(reset: bool = False):
     """Initialize the database.
     If reset=True, drop all tables before recreating.
@@ -55,6 +111,7 @@ def init_db(reset: bool = False):
         Base.metadata.drop_all(bind=engine)
     print("Creating all tables...")
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
     print("Database initialized successfully.")
 
 
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# app/db/generate_data.py
+"""
+Generate a synthetic dataset for scale testing, into the database of DATABASE_URL
+(SQLite or PostgreSQL, as configured for the app).
+
+Activity follows a power law: each user draws a Pareto weight (--alpha, smaller is more
+skewed) and the --questions are shared out in proportion, capped per user, so a few
+heavy users hold most of the history as in production. Questions are grouped into
+interviews of about --questions-per-interview, spread over the last --days, with feedback
+JSON in the shape the LLM returns and per-user skill levels. Users get the aggregates,
+streaks, XP and badge unlocks the write path and the projector would have produced, and
+every question has its question_events row, so the projector checkpoint starts caught up.
+
+Users are generated in chunks by a multiprocessing pool and each chunk is bulk inserted
+in one transaction (executemany, batches of --batch-size rows). SQLite has one writer at
+a time, so there chunks are written one after another while generation stays parallel.
+The full-text search index of questions is built once at the end rather than per row.
+Rows are a function of --seed and --prefix only, so runs are reproducible.
+
+Usage:
+    python -m app.db.generate_data --users 100000 --questions 10000000 --workers 8
+    python -m app.db.generate_data --users 1000 --questions 20000 --reset   # drop all tables first
+"""
+import sys
+import time
+import argparse
+import contextlib
+import multiprocessing
+from datetime import date, datetime
+from typing import NamedTuple
+import numpy as np
+from sqlalchemy import func, insert, select, text
+from app.db import crud
+from app.db.db_config import engine, SessionLocal
+from app.db.db_init import init_db
+from app.db.init_badges import init_badges
+from app.db.models import (
+    Badge, Interview, Question, QuestionEvent, User, UserBadge, create_question_search_index, current_millis
+)
+from app.core.ids import uuid7_at
+from app.services import badge_service
+from app.services.projector import PROJECTOR_NAME
+from app.services.percentile_service import rebuild_score_histograms
+
+# (question_events column, feedback key), in the order of the generated scores.
+SCORE_KEYS = (
+    ("clarity", "clarity_structure_score"),
+    ("relevance", "relevance_score"),
+    ("keyword", "keyword_alignment_score"),
+    ("confidence", "confidence_score"),
+    ("conciseness", "conciseness_score"),
+)
+
+INTERVIEW_TYPES = ("technical", "behavioral", "system design")
+
+JOB_DESCRIPTIONS = (
+    "Senior Python Developer with 5+ years experience in FastAPI, PostgreSQL, and AWS.",
+    "Frontend Engineer building React and TypeScript applications with a focus on accessibility.",
+    "Data Scientist to develop machine learning models in Python, SQL and Spark for pricing.",
+    "DevOps Engineer maintaining Kubernetes clusters, Terraform modules and CI/CD pipelines.",
+    "Product Manager for a B2B analytics platform, working with engineering and design.",
+    "Backend Engineer (Go) for high-throughput payment services; experience with Kafka preferred.",
+    "Mobile Developer shipping iOS and Android apps with Kotlin, Swift and React Native.",
+    "QA Automation Engineer writing end-to-end tests with Playwright and pytest.",
+)
+
+QUESTIONS = (
+    "Tell me about your experience with Python and FastAPI.",
+    "How do you handle error handling in REST APIs?",
+    "What's your approach to database optimization?",
+    "Describe a time you disagreed with a teammate and how you resolved it.",
+    "How would you design a URL shortener for millions of users?",
+    "Explain the difference between async and sync functions in Python.",
+    "Tell me about a project you are proud of.",
+    "How do you prioritize work when everything is urgent?",
+    "How would you scale a read-heavy service?",
+    "What is your testing strategy for a new feature?",
+)
+
+ANSWER_SENTENCES = (
+    "In my last role I owned the service end to end, from design to on-call.",
+    "I started by measuring where the time actually went before changing anything.",
+    "We added an index on the foreign key and the query went from seconds to milliseconds.",
+    "I would put a cache in front of the database and invalidate it on writes.",
+    "The key trade-off is consistency against latency, so I would clarify the requirements first.",
+    "I scheduled a short meeting, listened to their concerns and we agreed on an experiment.",
+    "Async functions let the event loop serve other requests while waiting on I/O.",
+    "I write unit tests for the core logic and a few end-to-end tests for the critical paths.",
+    "Afterwards we wrote a postmortem and added alerts so it would not happen again.",
+    "I break the work into small milestones and ship the riskiest part first.",
+    "Honestly I have not used that technology, but I would approach it like this.",
+    "The result was a 30 percent drop in p95 latency and fewer support tickets.",
+)
+
+FEEDBACK_TEXT = {
+    1: "The answer does not address this criterion.",
+    2: "The answer touches on this criterion but lacks substance.",
+    3: "The answer is adequate on this criterion, with room for more detail.",
+    4: "The answer is strong on this criterion, with minor gaps.",
+    5: "The answer is excellent on this criterion.",
+}
+
+
+# Answers of 1 to 6 sentences, drawn once so a question only picks an index.
+_answer_rng = np.random.default_rng(0)
+_ANSWERS = tuple(
+    " ".join(ANSWER_SENTENCES[i] for i in _answer_rng.choice(len(ANSWER_SENTENCES), n, replace=False))
+    for n in _answer_rng.integers(1, 7, 256)
+)
+
+# Share of sessions starting at each local hour: mostly day and evening, a few at night.
+_HOUR_WEIGHTS = np.array([1, 1, 1, 1, 1, 2, 4, 6, 10, 12, 12, 10, 8, 10, 12, 12, 10, 8, 10, 12, 12, 10, 6, 3], float)
+_HOUR_WEIGHTS /= _HOUR_WEIGHTS.sum()
+
+
+class DatasetSpec(NamedTuple):
+    """What to generate; every row is a function of these fields."""
+    users: int = 1000
+    questions: int = 20000
+    alpha: float = 1.2
+    max_questions_per_user: int = 5000
+    questions_per_interview: float = 5.0
+    days: int = 365
+    liked_share: float = 0.1
+    seed: int = 42
+    prefix: str = "synthetic"
+    batch_size: int = 5000
+
+
+def activity_counts(spec: DatasetSpec) -> np.ndarray:
+    """
+    Questions per user: a power-law share of spec.questions, capped at spec.max_questions_per_user.
+
+    Returns:
+        np.ndarray: An int64 array of spec.users counts, summing to spec.questions unless the cap makes it impossible.
+    """
+    rng = np.random.default_rng(spec.seed)
+    weights = rng.pareto(spec.alpha, spec.users) + 1.0
+    counts = rng.multinomial(spec.questions, weights / weights.sum()).astype(np.int64)
+    cap = spec.max_questions_per_user
+    for _ in range(20):
+        excess = int(np.clip(counts - cap, 0, None).sum())
+        open_users = counts < cap
+        if not excess or not open_users.any():
+            break
+        np.minimum(counts, cap, out=counts)
+        share = np.where(open_users, weights, 0.0)
+        counts += rng.multinomial(excess, share / share.sum())
+    np.minimum(counts, cap, out=counts)
+    return counts
+
+
+def plan_chunks(counts: np.ndarray, chunk_questions: int = 20000, chunk_users: int = 2000) -> list:
+    """Consecutive user ranges of bounded size: a list of (first_user, end_user, first_question_index)."""
+    chunks = []
+    start, offset, size = 0, 0, 0
+    for index, count in enumerate(counts.tolist()):
+        size += count
+        if size >= chunk_questions or index + 1 - start >= chunk_users:
+            chunks.append((start, index + 1, offset))
+            start, offset, size = index + 1, offset + size, 0
+    if start < len(counts):
+        chunks.append((start, len(counts), offset))
+    return chunks
+
+
+def _streaks(days: list) -> tuple:
+    """(consecutive days ending on the last day, longest run) of sorted distinct dates."""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest
+
+
+def _user_rows(spec, index, count, first_event_id, now_millis, rng, badges):
+    """The user, interviews, questions, events and badge unlocks of one user."""
+    user_id = f"{spec.prefix}-{index:07d}"
+    skill = rng.uniform(1.5, 4.8, len(SCORE_KEYS))
+    start_day = int(rng.integers(0, spec.days))
+    day_millis = 86_400_000
+    origin = now_millis - spec.days * day_millis
+
+    interviews, questions, events = [], [], []
+    n_interviews = max(1, round(count / spec.questions_per_interview)) if count else 0
+    sizes = [len(part) for part in np.array_split(np.arange(count), n_interviews)] if n_interviews else []
+    starts = np.sort(rng.integers(origin + start_day * day_millis, now_millis, n_interviews)) if n_interviews else []
+    hours = rng.choice(24, n_interviews, p=_HOUR_WEIGHTS)
+    # Per-question draws for all of the user's questions at once.
+    scores = np.clip(np.rint(skill + rng.normal(0, 0.8, (count, len(SCORE_KEYS)))), 1, 5).astype(np.int64)
+    overall = np.round(scores.sum(axis=1) / len(SCORE_KEYS), 1).tolist()
+    question_texts = rng.integers(len(QUESTIONS), size=count).tolist()
+    answer_texts = rng.integers(len(_ANSWERS), size=count).tolist()
+    score_rows = scores.tolist()
+
+    position = 0
+    for number, (size, started) in enumerate(zip(sizes, starts)):
+        started = int(started) - int(started) % day_millis + int(hours[number]) * 3_600_000 + int(rng.integers(0, 3_600_000))
+        started = min(started, now_millis - size * 120_000)
+        interview_id = uuid7_at(started, f"{user_id}/{number}")
+        interview_type = INTERVIEW_TYPES[int(rng.integers(len(INTERVIEW_TYPES)))]
+        interviews.append({
+            "interview_id": interview_id, "user_id": user_id, "interview_type": interview_type,
+            "job_description": JOB_DESCRIPTIONS[int(rng.integers(len(JOB_DESCRIPTIONS)))], "timestamp": started,
+            "is_like": bool(rng.random() < spec.liked_share),
+        })
+        for step in range(size):
+            timestamp = started + (step + 1) * 120_000
+            question_id = uuid7_at(timestamp, f"{user_id}/{number}/{step}")
+            feedback = {}
+            event = {"event_id": first_event_id + position, "user_id": user_id, "question_id": question_id,
+                     "interview_id": interview_id, "overall": overall[position], "created_at": timestamp}
+            for (column, key), score in zip(SCORE_KEYS, score_rows[position]):
+                feedback[key] = score
+                feedback[key.replace("_score", "_feedback")] = FEEDBACK_TEXT[score]
+                event[column] = score
+            feedback["overall_summary"] = FEEDBACK_TEXT[int(round(overall[position]))]
+            feedback["overall_score"] = overall[position]
+            questions.append({
+                "question_id": question_id, "interview_id": interview_id,
+                "question": QUESTIONS[question_texts[position]], "question_type": interview_type,
+                "answer": _ANSWERS[answer_texts[position]], "feedback": feedback, "timestamp": timestamp,
+            })
+            events.append(event)
+            position += 1
+
+    totals, maxima = {}, {}
+    for column_index, (column, _) in enumerate(SCORE_KEYS):
+        totals[column] = int(scores[:, column_index].sum()) if count else 0
+        maxima[column] = int(scores[:, column_index].max()) if count else 0
+    totals["overall"] = sum(overall, 0.0)
+    maxima["overall"] = max(overall, default=0.0)
+    xp = sum(int(value * 2) for value in overall)
+
+    # A day counts as active when an interview started or a question was answered on it.
+    active_days = sorted({date.fromtimestamp(ts / 1000) for ts in
+                          [i["timestamp"] for i in interviews] + [q["timestamp"] for q in questions]})
+    consecutive, longest = _streaks(active_days)
+    user = {
+        "user_id": user_id, "user_email": f"{user_id}@example.com",
+        "xp": 5 * len(active_days) + xp, "total_questions": count, "total_interviews": n_interviews,
+        "total_active_days": len(active_days),
+        "last_active_day": active_days[-1] if active_days else date.fromtimestamp((origin + start_day * day_millis) / 1000),
+        "consecutive_active_days": consecutive, "max_consecutive_active_days": longest,
+    }
+    for column in totals:
+        user[f"total_{column}"] = totals[column]
+        user[f"max_{column}"] = maxima[column]
+        user[f"avg_{column}"] = totals[column] / count if count else 0.0
+
+    unlocked = []
+    if badges:
+        answer_hours = {datetime.fromtimestamp(q["timestamp"] / 1000).hour for q in questions}
+        met = badge_service.badges_to_unlock(User(**user), badges, set(), answer_hours)
+        last = questions[-1]["timestamp"] if questions else now_millis
+        unlocked = [{"user_id": user_id, "badge_id": b.badge_id, "unlocked_timestamp": last} for b in met]
+    user["total_badges"] = len(unlocked)
+    return user, interviews, questions, events, unlocked
+
+
+def generate_chunk(spec: DatasetSpec, first_user: int, counts, first_event_id: int, now_millis: int,
+                   badges: list = ()) -> dict:
+    """
+    Rows of a range of users, without touching the database.
+
+    Args:
+        spec: The DatasetSpec.
+        first_user: A int index of the first user of the chunk.
+        counts: A sequence of question counts of the chunk's users.
+        first_event_id: A int event id of the chunk's first question.
+        now_millis: A int of Unix milliseconds the history ends at.
+        badges: A list of known Badge entries to unlock.
+
+    Returns:
+        dict: Lists of row dicts by table name.
+    """
+    rng = np.random.default_rng([spec.seed, first_user])
+    rows = {"users": [], "interviews": [], "questions": [], "question_events": [], "user_badges": []}
+    event_id = first_event_id
+    for index, count in enumerate(counts, start=first_user):
+        user, interviews, questions, events, unlocked = _user_rows(
+            spec, index, int(count), event_id, now_millis, rng, badges)
+        rows["users"].append(user)
+        rows["interviews"].extend(interviews)
+        rows["questions"].extend(questions)
+        rows["question_events"].extend(events)
+        rows["user_badges"].extend(unlocked)
+        event_id += int(count)
+    return rows
+
+
+_TABLES = (("users", User), ("interviews", Interview), ("questions", Question),
+           ("question_events", QuestionEvent), ("user_badges", UserBadge))
+
+
+def write_rows(conn, rows: dict, batch_size: int):
+    """Bulk insert the rows of a chunk, parents first, as executemany batches."""
+    for name, model in _TABLES:
+        table_rows = rows[name]
+        for start in range(0, len(table_rows), batch_size):
+            conn.execute(insert(model), table_rows[start:start + batch_size])
+
+
+# Set in each pool process by _init_worker.
+_worker_state = {}
+
+
+def _init_worker(spec, counts, badges, first_event_id, now_millis, write_lock, dispose=True):
+    if dispose:
+        # Connections inherited from the parent must not be shared with it.
+        engine.dispose(close=False)
+    _worker_state.update(spec=spec, counts=counts, first_event_id=first_event_id, now_millis=now_millis,
+                         badges=badge_service.known_badges([Badge(**b) for b in badges]), write_lock=write_lock)
+
+
+def _run_chunk(chunk) -> tuple:
+    first_user, end_user, first_question = chunk
+    state = _worker_state
+    rows = generate_chunk(state["spec"], first_user, state["counts"][first_user:end_user],
+                          state["first_event_id"] + first_question, state["now_millis"], state["badges"])
+    with state["write_lock"] or contextlib.nullcontext():
+        with engine.begin() as conn:
+            write_rows(conn, rows, state["spec"].batch_size)
+    return (len(rows["users"]), len(rows["interviews"]), len(rows["questions"]), len(rows["user_badges"]))
+
+
+@contextlib.contextmanager
+def _search_index_deferred():
+    """Build the full-text search index of questions once after the load, instead of row by row."""
+    with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.execute(text("DROP TRIGGER IF EXISTS questions_fts_ai"))
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text("DROP INDEX IF EXISTS ix_questions_search"))
+    try:
+        yield
+    finally:
+        with engine.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                conn.execute(text("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')"))
+            create_question_search_index(conn)
+
+
+def _finish(first_event_id: int, last_event_id: int):
+    """Move the event id sequence and the projector checkpoint past the generated events."""
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('question_events', 'event_id'), :last)"),
+                         {"last": last_event_id})
+    with SessionLocal() as db:
+        applied = crud.get_projector_checkpoint(PROJECTOR_NAME, db=db)
+        if applied == first_event_id - 1:
+            # The generated aggregates already include these events.
+            crud.advance_projector_checkpoint(PROJECTOR_NAME, applied, last_event_id, db=db)
+        else:
+            print("The projector is behind; run `python -m app.services.projector rebuild` to apply all events.")
+        db.commit()
+    rebuild_score_histograms()
+
+
+def generate(spec: DatasetSpec, workers: int = 1) -> dict:
+    """
+    Generate and insert a dataset.
+
+    Args:
+        spec: The DatasetSpec.
+        workers: A int of processes; 1 generates in this process.
+
+    Returns:
+        dict: Counts of "users", "interviews", "questions" and "badges" inserted, and "seconds" taken.
+    """
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if conn.execute(select(User.user_id).where(User.user_id.like(f"{spec.prefix}-%")).limit(1)).first():
+            raise ValueError(f"Users with prefix {spec.prefix!r} already exist; use another --prefix or --reset")
+        badges = [{"badge_id": i, "name": n, "description": d}
+                  for i, n, d in conn.execute(select(Badge.badge_id, Badge.name, Badge.description))]
+        first_event_id = (conn.execute(select(func.max(QuestionEvent.event_id))).scalar() or 0) + 1
+
+    counts = activity_counts(spec)
+    chunks = plan_chunks(counts)
+    write_lock = multiprocessing.Lock() if workers > 1 and engine.dialect.name == "sqlite" else None
+    args = (spec, counts, badges, first_event_id, current_millis(), write_lock)
+    totals = [0, 0, 0, 0]
+
+    def record(result):
+        for position, value in enumerate(result):
+            totals[position] += value
+        print(f"Inserted {totals[0]}/{spec.users} users, {totals[2]} questions "
+              f"({time.perf_counter() - started:.0f}s).")
+
+    with _search_index_deferred():
+        if workers <= 1:
+            _init_worker(*args, dispose=False)
+            for chunk in chunks:
+                record(_run_chunk(chunk))
+        else:
+            with multiprocessing.Pool(workers, initializer=_init_worker, initargs=args) as pool:
+                for result in pool.imap_unordered(_run_chunk, chunks):
+                    record(result)
+
+    if totals[2]:
+        _finish(first_event_id, first_event_id + totals[2] - 1)
+    users, interviews, questions, badges = totals
+    return {"users": users, "interviews": interviews, "questions": questions, "badges": badges,
+            "seconds": round(time.perf_counter() - started, 1)}
+
+
+if __name__ == "__main__":
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(description="Bulk-generate synthetic users, interviews, questions and badges.")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--questions", type=int, default=defaults.questions)
+    parser.add_argument("--alpha", type=float, default=defaults.alpha, help="Pareto shape of activity per user")
+    parser.add_argument("--max-questions-per-user", type=int, default=defaults.max_questions_per_user)
+    parser.add_argument("--questions-per-interview", type=float, default=defaults.questions_per_interview)
+    parser.add_argument("--days", type=int, default=defaults.days, help="Length of the generated history")
+    parser.add_argument("--liked-share", type=float, default=defaults.liked_share)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--prefix", default=defaults.prefix, help="User id prefix, to add several datasets")
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args()
+
+    init_db(reset=args.reset)
+    with engine.connect() as conn:
+        has_badges = conn.execute(select(Badge.badge_id).limit(1)).first() is not None
+    if not has_badges:
+        init_badges()
+    spec = DatasetSpec(users=args.users, questions=args.questions, alpha=args.alpha,
+                       max_questions_per_user=args.max_questions_per_user,
+                       questions_per_interview=args.questions_per_interview, days=args.days,
+                       liked_share=args.liked_share, seed=args.seed, prefix=args.prefix, batch_size=args.batch_size)
+    print(f"Generated: {generate(spec, workers=args.workers)}")
+    sys.exit(0)
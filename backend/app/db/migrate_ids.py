@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# app/db/migrate_ids.py
+"""
+Rewrite legacy interview and question ids as time-ordered UUIDv7.
+Interviews used random UUID4 ids and questions "<interview_id>_<millis>"; new rows get
+app.core.ids.new_id(). Each legacy id is replaced by uuid7_at(row timestamp, legacy id), so
+migrated ids sort by the stored timestamps, and the mapping is kept in id_aliases, where
+get_interview and interview_feedback look up ids still held by clients.
+Rows already on UUIDv7 are skipped, so the migration can be stopped and run again.
+
+Usage:
+    python -m app.db.migrate_ids              # migrate in batches of 500 interviews
+    python -m app.db.migrate_ids --dry-run    # count the legacy ids only
+"""
+import sys
+import time
+import argparse
+from sqlalchemy import select, insert, update, delete, literal
+from app.db.db_config import engine
+from app.db.db_init import init_db
+from app.db.models import Interview, Question, QuestionEvent, IdAlias
+from app.core.ids import is_uuid7, uuid7_at
+
+
+def _legacy_rows(conn, id_column, timestamp_column):
+    rows = conn.execute(select(id_column, timestamp_column)).all()
+    now = int(time.time() * 1000)
+    return [(old_id, timestamp if timestamp is not None else now) for old_id, timestamp in rows if not is_uuid7(old_id)]
+
+
+def _migrate_interview(conn, old_id: str, new_id: str):
+    # A primary key referenced by questions cannot be updated in place without ON UPDATE CASCADE:
+    # copy the row under the new id, move its questions, then drop the old row.
+    table = Interview.__table__
+    columns = [c for c in table.columns if c.name != "interview_id"]
+    conn.execute(
+        insert(table).from_select(
+            ["interview_id"] + [c.name for c in columns],
+            select(literal(new_id), *columns).where(table.c.interview_id == old_id),
+        )
+    )
+    conn.execute(update(Question).where(Question.interview_id == old_id).values(interview_id=new_id))
+    conn.execute(update(QuestionEvent).where(QuestionEvent.interview_id == old_id).values(interview_id=new_id))
+    conn.execute(delete(table).where(table.c.interview_id == old_id))
+
+
+def _migrate_question(conn, old_id: str, new_id: str):
+    # The event log matches questions by id (the projector backfill joins on it), so it moves too.
+    conn.execute(update(Question).where(Question.question_id == old_id).values(question_id=new_id))
+    conn.execute(update(QuestionEvent).where(QuestionEvent.question_id == old_id).values(question_id=new_id))
+
+
+def migrate(batch_size: int = 500, dry_run: bool = False) -> dict:
+    """
+    Replace every legacy interview and question id, one transaction per batch.
+    The question event log is rewritten in the same transaction as the rows it refers to.
+
+    Args:
+        batch_size: A int of rows migrated per transaction.
+        dry_run: A bool; when True nothing is written.
+
+    Returns:
+        dict: Counts of legacy "interviews" and "questions" found (and migrated unless dry_run).
+    """
+    with engine.connect() as conn:
+        interviews = _legacy_rows(conn, Interview.interview_id, Interview.timestamp)
+    counts = {"interviews": len(interviews)}
+    if not dry_run:
+        for start in range(0, len(interviews), batch_size):
+            with engine.begin() as conn:
+                for old_id, timestamp in interviews[start:start + batch_size]:
+                    new_id = uuid7_at(timestamp, old_id)
+                    _migrate_interview(conn, old_id, new_id)
+                    conn.execute(insert(IdAlias).values(old_id=old_id, new_id=new_id, kind="interview"))
+            print(f"Migrated {min(start + batch_size, len(interviews))}/{len(interviews)} interviews.")
+
+    with engine.connect() as conn:
+        questions = _legacy_rows(conn, Question.question_id, Question.timestamp)
+    counts["questions"] = len(questions)
+    if not dry_run:
+        for start in range(0, len(questions), batch_size):
+            with engine.begin() as conn:
+                for old_id, timestamp in questions[start:start + batch_size]:
+                    new_id = uuid7_at(timestamp, old_id)
+                    _migrate_question(conn, old_id, new_id)
+                    conn.execute(insert(IdAlias).values(old_id=old_id, new_id=new_id, kind="question"))
+            print(f"Migrated {min(start + batch_size, len(questions))}/{len(questions)} questions.")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite legacy interview and question ids as UUIDv7.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    init_db()
+    result = migrate(batch_size=args.batch_size, dry_run=args.dry_run)
+    print(f"{'Found' if args.dry_run else 'Migrated'} {result['interviews']} interviews and {result['questions']} questions.")
+    sys.exit(0)
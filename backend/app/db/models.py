@@ -1,5 +1,6 @@
 # app/db/models.py
-from sqlalchemy import Column, ForeignKey, Integer,String, Text, Float, BigInteger, JSON, DateTime, Date, Boolean
+from sqlalchemy import Column, ForeignKey, Integer,String, Text, Float, BigInteger, JSON, DateTime, Date, Boolean, Index, true
+from sqlalchemy import event, text
 from sqlalchemy.orm import relationship
 import time
 from datetime import date
@@ -12,6 +13,7 @@ def current_millis():
 
 class Question(Base):
     __tablename__ = "questions"
+    # UUIDv7 from app.core.ids.new_id, so ids sort by creation time; see app.db.migrate_ids for legacy ids.
     question_id = Column(String, primary_key=True, index=True)
     interview_id = Column(String, ForeignKey("interviews.interview_id"), nullable=False)
 
@@ -25,8 +27,68 @@ class Question(Base):
 
 
 
+# Full-text search over questions and answers.
+# PostgreSQL: a GIN index on this tsvector expression; queries must repeat it verbatim to use the index.
+QUESTION_SEARCH_VECTOR = "to_tsvector('english', coalesce(question, '') || ' ' || coalesce(answer, ''))"
+
+_POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_questions_search ON questions USING GIN ({QUESTION_SEARCH_VECTOR})",
+]
+
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# It is keyed by the implicit rowid of questions, whose primary key is a string, and VACUUM may
+# renumber such rowids; the index then points at the wrong questions until it is rebuilt, so
+# upgrade_schema rebuilds it on every init. Run app.db.db_init after a VACUUM of a live database.
+_SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5("
+    "question, answer, content='questions', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_ai AFTER INSERT ON questions BEGIN "
+    "INSERT INTO questions_fts(rowid, question, answer) VALUES (new.rowid, new.question, new.answer); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_ad AFTER DELETE ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, question, answer) "
+    "VALUES ('delete', old.rowid, old.question, old.answer); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_au AFTER UPDATE ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, question, answer) "
+    "VALUES ('delete', old.rowid, old.question, old.answer); "
+    "INSERT INTO questions_fts(rowid, question, answer) VALUES (new.rowid, new.question, new.answer); END",
+]
+
+
+def create_question_search_index(connection, rebuild: bool = False):
+    """
+    Create the full-text search structures for the questions table if they are missing.
+    With rebuild, the SQLite FTS table is reindexed from questions even if it already existed.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in _POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questions_fts'"
+        )).first()
+        for statement in _SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        if rebuild or not exists:
+            # Index rows that were written before the FTS table existed, or under old rowids.
+            connection.execute(text("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')"))
+
+
+@event.listens_for(Question.__table__, "after_create")
+def _create_question_search(table, connection, **kw):
+    create_question_search_index(connection)
+
+
+@event.listens_for(Question.__table__, "before_drop")
+def _drop_question_search(table, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS questions_fts"))
+
+
+
 class Interview(Base):
     __tablename__ = "interviews"
+    # UUIDv7 from app.core.ids.new_id, so ids sort by creation time; see app.db.migrate_ids for legacy ids.
     interview_id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.user_id"), nullable=False)
     interview_type = Column(String, nullable=False)
@@ -39,6 +101,17 @@ class Interview(Base):
 
 
 
+# Question bank: liked interviews of a user, newest first. Partial, so it only holds liked rows;
+# queries must filter on "is_like = true" literally for the planner to pick it.
+Index(
+    "ix_interviews_liked_user_timestamp",
+    Interview.user_id, Interview.timestamp, Interview.interview_id,
+    postgresql_where=Interview.is_like == true(),
+    sqlite_where=Interview.is_like == true(),
+)
+
+
+
 class User(Base):
     __tablename__ = "users"
     user_id = Column(String, primary_key=True, index=True)
@@ -47,7 +120,7 @@ class User(Base):
     interviews = relationship("Interview", back_populates="user", cascade="all, delete-orphan")
     user_badges = relationship("UserBadge", back_populates="user", cascade="all, delete-orphan")
 
-    xp = Column(Integer, default=0)
+    xp = Column(Integer, default=0, index=True)
     total_questions = Column(Integer, default=0)
     total_interviews = Column(Integer, default=0)
     total_badges = Column(Integer, default=0)
@@ -71,6 +144,14 @@ class User(Base):
     total_conciseness = Column(Integer, default=0)
     total_overall = Column(Float, default=0.0)
 
+    # Running averages (total_* / total_questions), stored so leaderboards can use an index.
+    avg_clarity = Column(Float, default=0.0, index=True)
+    avg_relevance = Column(Float, default=0.0, index=True)
+    avg_keyword = Column(Float, default=0.0, index=True)
+    avg_confidence = Column(Float, default=0.0, index=True)
+    avg_conciseness = Column(Float, default=0.0, index=True)
+    avg_overall = Column(Float, default=0.0, index=True)
+
     target_clarity = Column(Integer, default=0)
     target_relevance = Column(Integer, default=0)
     target_keyword = Column(Integer, default=0)
@@ -97,4 +178,86 @@ class UserBadge(Base):
     unlocked_timestamp = Column(BigInteger, default=current_millis)
 
     user = relationship("User", back_populates="user_badges")
-    badge = relationship("Badge", back_populates="unlocked_users")
\ No newline at end of file
+    badge = relationship("Badge", back_populates="unlocked_users")
+
+
+
+# Fixed-width score bins over [0, SCORE_HISTOGRAM_MAX] for the per-dimension average histograms.
+SCORE_HISTOGRAM_DIMENSIONS = ("clarity", "relevance", "keyword", "confidence", "conciseness", "overall")
+SCORE_HISTOGRAM_BINS = 50
+SCORE_HISTOGRAM_MAX = 5.0
+
+
+class ScoreHistogramBin(Base):
+    __tablename__ = "score_histograms"
+    dimension = Column(String, primary_key=True)
+    bin = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(ScoreHistogramBin.__table__, "after_create")
+def _seed_score_histograms(table, connection, **kw):
+    """Create every (dimension, bin) row up front so the write path only needs atomic UPDATEs."""
+    connection.execute(table.insert(), [
+        {"dimension": dimension, "bin": index, "count": 0}
+        for dimension in SCORE_HISTOGRAM_DIMENSIONS
+        for index in range(SCORE_HISTOGRAM_BINS)
+    ])
+
+
+class RateLimitBucket(Base):
+    """One token bucket of a per-user rate limit, shared by all workers (see app.core.rate_limit)."""
+    __tablename__ = "rate_limit_buckets"
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Epoch seconds of the last take; wall clock, so every host refills the bucket the same way.
+    updated_at = Column(Float, nullable=False)
+
+
+class IdAlias(Base):
+    """A legacy interview or question id and the UUIDv7 that replaced it (see app.db.migrate_ids)."""
+    __tablename__ = "id_aliases"
+    old_id = Column(String, primary_key=True)
+    new_id = Column(String, nullable=False)
+    kind = Column(String, nullable=False)  # "interview" or "question"
+
+
+class IdempotencyKey(Base):
+    """A client supplied Idempotency-Key of a user and the response of the request that used it (see app.core.idempotency)."""
+    __tablename__ = "idempotency_keys"
+    user_id = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    # Hash of the request body, so a key reused for a different request is rejected.
+    request_hash = Column(String, nullable=False)
+    # "pending" while the first request runs, "completed" once its response is stored.
+    status = Column(String, nullable=False)
+    response = Column(JSON)
+    # Epoch seconds the key was claimed; keys expire and stale pending claims are taken over from it.
+    created_at = Column(Float, nullable=False, index=True)
+
+
+class QuestionEvent(Base):
+    """
+    An answered question, appended by the feedback write path and applied to the user
+    aggregates by app.services.projector. Append only; event_id orders the log.
+    """
+    __tablename__ = "question_events"
+    event_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False, index=True)
+    question_id = Column(String, nullable=False, unique=True)
+    interview_id = Column(String, nullable=False)
+    clarity = Column(Integer, nullable=False, default=0)
+    relevance = Column(Integer, nullable=False, default=0)
+    keyword = Column(Integer, nullable=False, default=0)
+    confidence = Column(Integer, nullable=False, default=0)
+    conciseness = Column(Integer, nullable=False, default=0)
+    overall = Column(Float, nullable=False, default=0.0)
+    created_at = Column(BigInteger, nullable=False, default=current_millis)
+
+
+class ProjectorCheckpoint(Base):
+    """The last question event a projector applied; advanced in the transaction that applies the events."""
+    __tablename__ = "projector_checkpoints"
+    name = Column(String, primary_key=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(BigInteger, nullable=False, default=current_millis)
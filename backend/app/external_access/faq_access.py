@@ -3,6 +3,7 @@ import json
 import requests
 from dotenv import load_dotenv
 from typing import Dict, Any
+from app.core.metrics import track_upstream
 from .exceptions import InvalidTokenError, RequestFailedError, FAQAccessError
 
 # load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
@@ -32,7 +33,9 @@ class FAQAccessClient:
     def get_profile(self) -> Dict[str, Any]:
         """Send a question to FAQ_ACCESS and return parsed response."""
         try:
-            response = requests.post(self.api_url, headers=self.headers, json={}, timeout=self.timeout)
+            with track_upstream("FAQAccessClient") as call:
+                response = requests.post(self.api_url, headers=self.headers, json={}, timeout=self.timeout)
+                call.status = response.status_code
         except requests.exceptions.RequestException as e:
             raise RequestFailedError(f"Network error: {e}")
         
@@ -3,6 +3,7 @@ import json
 import requests
 from dotenv import load_dotenv
 from typing import Dict, Any
+from app.core.metrics import track_upstream
 from .exceptions import GPTAccessError, InvalidTokenError, RequestFailedError
 
 # load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
@@ -34,7 +35,9 @@ class GPTAccessClient:
         payload = {"question": question}
         # print(self.api_url, "\n", self.jwt_token)
         try:
-            response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=self.timeout)
+            with track_upstream("GPTAccessClient") as call:
+                response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=self.timeout)
+                call.status = response.status_code
         except requests.exceptions.RequestException as e:
             raise RequestFailedError(f"Network error: {e}")
 
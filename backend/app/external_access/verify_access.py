@@ -3,6 +3,7 @@ import json
 import requests
 from dotenv import load_dotenv
 from typing import Dict, Any
+from app.core.metrics import track_upstream
 from .exceptions import TokenVerifyError, InvalidTokenError, RequestFailedError
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
@@ -36,7 +37,9 @@ class VerifyAccessClient:
     def token_verify(self) -> Dict[str, Any]:
         """Send a question to Token_Verify and return parsed response."""
         try:
-            response = requests.post(self.api_url, headers=self.headers, json=self.payload, timeout=self.timeout)
+            with track_upstream("VerifyAccessClient") as call:
+                response = requests.post(self.api_url, headers=self.headers, json=self.payload, timeout=self.timeout)
+                call.status = response.status_code
         except requests.exceptions.RequestException as e:
             raise RequestFailedError(f"Network error: {e}")
 
@@ -4,6 +4,11 @@ from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import register_routers
+from app.core.log_config import setup_logging, RequestIdMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware, PROFILE_ADMIN_TOKEN
+
+setup_logging()
 
 app = FastAPI(title="Interview API", version="1.0.0")
 
@@ -22,6 +27,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Request id for log correlation ---
+app.add_middleware(RequestIdMiddleware)
+
+# --- On-demand request profiling, only installed when an admin token is configured ---
+if PROFILE_ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
+# --- Latency and SQL metrics per route, served by /metrics ---
+app.add_middleware(MetricsMiddleware)
+
 # --- Error Handler ---
 @app.exception_handler(Exception)
 async def default_exception_handler(request: Request, exc: Exception):
@@ -10,6 +10,11 @@ from app.models.user import (
     BadgeDetail,
     UserDetailResponse
 )
+from app.models.leaderboard import (
+    LeaderboardEntry,
+    LeaderboardResponse,
+    UserRankResponse
+)
 
 __all__ = [
     "LoginRequest",
@@ -21,4 +26,7 @@ __all__ = [
     "QuestionDetail",
     "BadgeDetail",
     "UserDetailResponse",
+    "LeaderboardEntry",
+    "LeaderboardResponse",
+    "UserRankResponse",
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 class InterviewStartRequest(BaseModel):
     job_description: str = Field(
@@ -29,6 +29,26 @@ class InterviewFeedbackRequest(BaseModel):
         example="Async functions allow for non-blocking operations..."
     )
 
+class InterviewAnswerMessage(BaseModel):
+    ref: Optional[str] = Field(
+        default=None,
+        description="Client reference echoed in the feedback or error of this answer",
+        example="q1"
+    )
+    interview_question: str = Field(
+        description="The interview question that was asked",
+        example="Explain the difference between async and sync functions in Python"
+    )
+    interview_answer: str = Field(
+        description="The candidate's answer to the question",
+        example="Async functions allow for non-blocking operations..."
+    )
+    idempotency_key: Optional[str] = Field(
+        default=None,
+        description="Same meaning as the Idempotency-Key header of /interview/feedback, for answers resent after a reconnect",
+        example="answer-1"
+    )
+
 class InterviewStartResponse(BaseModel):
     interview_id: str = Field(
         description="UUID identifier for the interview session",
@@ -60,4 +80,42 @@ class InterviewFeedbackResponse(BaseModel):
             "overall_summary": "Overall, the candidate demonstrated a strong understanding of the differences between Python 2 and 3, effectively communicating their importance for new projects. To improve, the candidate could incorporate more specific examples of libraries and maintain a more dynamic tone throughout.",
             "overall_score": 4.4
         }
-    )
\ No newline at end of file
+    )
+class InterviewPrescoreRequest(BaseModel):
+    interview_question: str = Field(
+        description="The interview question that was asked",
+        example="Explain the difference between async and sync functions in Python"
+    )
+    interview_answer: str = Field(
+        description="The candidate's answer to the question",
+        example="Async functions allow for non-blocking operations..."
+    )
+    job_description: Optional[str] = Field(
+        default=None,
+        description="Job description of the interview, used for keyword overlap",
+        example="Senior Python Developer with 5+ years experience in FastAPI, PostgreSQL, and AWS"
+    )
+
+class InterviewPrescoreResponse(BaseModel):
+    provisional_feedback: dict = Field(
+        description="Estimated scores in the keys of the LLM feedback, marked provisional",
+        example={
+            "clarity_structure_score": 4,
+            "relevance_score": 3,
+            "keyword_alignment_score": 3,
+            "confidence_score": 4,
+            "conciseness_score": 5,
+            "overall_score": 3.8,
+            "overall_summary": "Provisional estimate from the length, structure and wording of the answer.",
+            "provisional": True
+        }
+    )
+    skip_llm: bool = Field(
+        description="Whether the answer is too short to be sent to the LLM",
+        example=False
+    )
+    reason: Optional[str] = Field(
+        default=None,
+        description="Why the answer looks trivial: too_short, or off_topic as a provisional signal only",
+        example=None
+    )
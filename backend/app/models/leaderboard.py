@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class LeaderboardEntry(BaseModel):
+    rank: int = Field(
+        description="Rank on the leaderboard, users with equal scores share a rank",
+        example=1
+    )
+    user_id: str = Field(
+        description="Unique user identifier",
+        example="550e8400-e29b-41d4-a716-446655440000"
+    )
+    score: float = Field(
+        description="Score of the user on this dimension",
+        example=1250
+    )
+
+class LeaderboardResponse(BaseModel):
+    dimension: str = Field(
+        description="Leaderboard dimension: xp, clarity, relevance, keyword, confidence, conciseness or overall",
+        example="xp"
+    )
+    entries: List[LeaderboardEntry] = Field(
+        description="Best users of the dimension, best first",
+        example=[
+            {"rank": 1, "user_id": "550e8400-e29b-41d4-a716-446655440000", "score": 1250},
+            {"rank": 2, "user_id": "6fa459ea-ee8a-3ca4-894e-db77e160355e", "score": 980}
+        ]
+    )
+
+class UserRankResponse(BaseModel):
+    user_id: str = Field(
+        description="Unique user identifier",
+        example="550e8400-e29b-41d4-a716-446655440000"
+    )
+    dimension: str = Field(
+        description="Leaderboard dimension",
+        example="xp"
+    )
+    score: float = Field(
+        description="Score of the user on this dimension",
+        example=1250
+    )
+    rank: int = Field(
+        description="Rank of the user, 1 is the best",
+        example=42
+    )
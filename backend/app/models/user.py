@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 from datetime import date
 
 class QuestionDetail(BaseModel):
@@ -206,6 +206,36 @@ class UserInterviewSummaryResponse(BaseModel):
         description="Average overall score across all questions",
         example=4.34
     )
+    percentile_clarity: Optional[float] = Field(
+        default=None,
+        description="Percentage of users with a lower average clarity score",
+        example=72.5
+    )
+    percentile_relevance: Optional[float] = Field(
+        default=None,
+        description="Percentage of users with a lower average relevance score",
+        example=64.0
+    )
+    percentile_keyword: Optional[float] = Field(
+        default=None,
+        description="Percentage of users with a lower average keyword alignment score",
+        example=68.5
+    )
+    percentile_confidence: Optional[float] = Field(
+        default=None,
+        description="Percentage of users with a lower average confidence score",
+        example=81.0
+    )
+    percentile_conciseness: Optional[float] = Field(
+        default=None,
+        description="Percentage of users with a lower average conciseness score",
+        example=55.5
+    )
+    percentile_overall: Optional[float] = Field(
+        default=None,
+        description="Percentage of users with a lower average overall score",
+        example=70.0
+    )
 
 class UserStatisticsResponse(BaseModel):
     user_id: str = Field(
@@ -385,4 +415,75 @@ class UserTargetResponse(BaseModel):
     target_conciseness: int = Field(
         description="Target conciseness score",
         example=5
-    )
\ No newline at end of file
+    )
+
+class SearchResult(BaseModel):
+    question_id: str = Field(
+        description="Identifier of the matching question",
+        example="550e8400-e29b-41d4-a716-446655440000_1698796800000"
+    )
+    interview_id: str = Field(
+        description="Interview the question belongs to",
+        example="550e8400-e29b-41d4-a716-446655440000"
+    )
+    timestamp: int = Field(
+        description="Unix timestamp in milliseconds when the question was answered",
+        example=1698796800000
+    )
+    rank: float = Field(
+        description="Relevance of the match, higher is better",
+        example=0.61
+    )
+    question_snippet: str = Field(
+        description="Excerpt of the question with matches wrapped in <b></b>",
+        example="How would you design a <b>Kafka</b> consumer group..."
+    )
+    answer_snippet: str = Field(
+        description="Excerpt of the answer with matches wrapped in <b></b>",
+        example="...partitioned the topic so each <b>Kafka</b> consumer..."
+    )
+
+class SearchResponse(BaseModel):
+    query: str = Field(
+        description="The search terms",
+        example="kafka"
+    )
+    results: List[SearchResult] = Field(
+        description="Matching questions, best match first"
+    )
+    next_offset: Optional[int] = Field(
+        default=None,
+        description="Offset of the next page, null on the last page",
+        example=20
+    )
+
+class BankInterviewDetail(BaseModel):
+    interview_id: str = Field(
+        description="Unique identifier for the interview session",
+        example="550e8400-e29b-41d4-a716-446655440000"
+    )
+    interview_type: str = Field(
+        description="Type of the interview",
+        example="technical"
+    )
+    job_description: str = Field(
+        description="Job description the interview was generated for",
+        example="Senior Python Developer with 5+ years experience in FastAPI"
+    )
+    interview_time: int = Field(
+        description="Unix timestamp when the interview was conducted",
+        example=1698796800
+    )
+    questions: List[QuestionDetail] = Field(
+        description="List of questions asked in this interview"
+    )
+
+class UserBankResponse(BaseModel):
+    interviews: List[BankInterviewDetail] = Field(
+        description="Liked interviews of this page, newest first"
+    )
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor of the next page, null on the last page",
+        example="1698796800000:550e8400-e29b-41d4-a716-446655440000"
+    )
@@ -7,15 +7,20 @@ Functions:
 - build_question_prompt(job_description, question_type)
 - build_feedback_prompt(question, answer, user_info, job_description)
 - build_score_prompt(question, answer, criteria, job_description)
+
+Sections pasted into prompts are fitted to token budgets by prompt_budget (see budget.py).
 """
 
 from .question_builder import build_question_prompt
 from .feedback_builder import build_feedback_prompt, build_multicrit_feedback_prompt
 from .answer_builder import build_answer_prompt
+from .budget import estimate_tokens, prompt_budget
 
 __all__ = [
     "build_question_prompt", 
     "build_feedback_prompt", 
     "build_multicrit_feedback_prompt", 
-    "build_answer_prompt"
+    "build_answer_prompt",
+    "estimate_tokens",
+    "prompt_budget",
     ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from textwrap import dedent
+from .budget import prompt_budget
 
 def build_answer_prompt(
     question: str,
@@ -15,9 +16,11 @@ def build_answer_prompt(
         str: A formatted prompt string.
     """
     user_info = user_info or {}
+    question = prompt_budget.question(question, "answer")
+    job_description = prompt_budget.job_description(job_description, "answer")
     jd_text = f"\n\nJob Description:\n{job_description}" if job_description else ""
 
-    return dedent(f"""
+    prompt = dedent(f"""
     Act as an experienced job seeker and answer interview questions.
 
     Candidate Info:
@@ -32,3 +35,4 @@ def build_answer_prompt(
     Please output:
     Answer: Answers to interview questions, in the form of strings.
     """).strip()
+    return prompt_budget.record("answer", prompt)
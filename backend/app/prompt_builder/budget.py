@@ -0,0 +1,291 @@
+"""Token budgets for the sections pasted into prompts.
+
+Users paste ten-page postings and two-thousand-word answers, and every token of them is
+paid for twice: in GPT latency and in cost. The builders pass each free-text section
+through prompt_budget before formatting:
+    job description   compressed to PROMPT_JOB_DESCRIPTION_TOKENS: repeated lines and
+                      boilerplate (benefits, equal opportunity statements, about us) are
+                      dropped first, then the lines least likely to be requirements
+    answer            cut to PROMPT_ANSWER_TOKENS in the middle, at sentence boundaries,
+                      keeping the opening and the result at the end
+    question          cut to PROMPT_QUESTION_TOKENS
+Text within its budget is passed through unchanged. The feedback prompt uses the long
+rubric when the whole prompt still fits PROMPT_MAX_TOKENS with it, else the short one.
+
+Tokens are estimated locally from word and punctuation counts, close enough to GPT
+tokenizers for English prose to budget with. Per call, the estimated prompt size is
+observed in prompt_tokens, trimmed tokens are counted in prompt_trimmed_tokens_total
+and the rubric choice in prompt_rubric_total.
+
+Configured from the environment (defaults in parentheses):
+    PROMPT_BUDGET_ENABLED (true), PROMPT_MAX_TOKENS (2000),
+    PROMPT_JOB_DESCRIPTION_TOKENS (600), PROMPT_ANSWER_TOKENS (800), PROMPT_QUESTION_TOKENS (150)
+"""
+import os
+import re
+from app.core.metrics import registry, Counter, Histogram
+
+TOKEN_BUCKETS = (100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 8000)
+OMITTED = "[...]"
+
+prompt_tokens = registry.register(Histogram(
+    "prompt_tokens", "Estimated tokens of each built prompt.", ("prompt",), TOKEN_BUCKETS))
+prompt_trimmed_tokens = registry.register(Counter(
+    "prompt_trimmed_tokens_total", "Estimated tokens removed from prompt sections.", ("prompt", "section")))
+prompt_rubrics = registry.register(Counter(
+    "prompt_rubric_total", "Feedback prompts by the rubric chosen for the remaining budget.", ("rubric",)))
+
+_TOKEN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_BULLET = re.compile(r"^\s*(?:[-*•·▪‣◦]|\d+[.)])\s*")
+_LINE_KEY = re.compile(r"[^a-z0-9]+")
+
+REQUIREMENT_HEADINGS = (
+    "requirement", "qualification", "responsibilit", "skill", "experience", "what you", "you will",
+    "you'll", "must have", "nice to have", "preferred", "duties", "role", "tech stack", "about the role",
+)
+BOILERPLATE_HEADINGS = (
+    "about us", "about the company", "who we are", "our mission", "our culture", "benefit", "perk",
+    "why join", "what we offer", "we offer", "compensation", "how to apply", "equal opportunity",
+)
+BOILERPLATE_PHRASES = (
+    "equal opportunity", "regardless of race", "without regard to", "reasonable accommodation",
+    "protected veteran", "sexual orientation", "e-verify", "apply now", "click apply", "privacy policy",
+    "cookie", "recruitment agencies", "unsolicited", "401(k)", "paid time off", "health insurance",
+    "dental", "follow us", "all rights reserved",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the GPT tokens of a text without a tokenizer.
+
+    Args:
+        text: A string of prompt text.
+
+    Returns:
+        int: Estimated tokens; a word is one token per six letters, a number one per three
+             digits and every punctuation mark one.
+    """
+    if not text:
+        return 0
+    total = 0
+    for piece in _TOKEN.findall(text):
+        if piece[0].isalpha():
+            total += 1 + (len(piece) - 1) // 6
+        elif piece[0].isdigit():
+            total += 1 + (len(piece) - 1) // 3
+        else:
+            total += 1
+    return total
+
+
+def _cut_words(text: str, max_tokens: int) -> str:
+    """The longest prefix of whole words within max_tokens."""
+    kept, used = [], 0
+    for word in text.split():
+        cost = estimate_tokens(word)
+        if used + cost > max_tokens:
+            break
+        kept.append(word)
+        used += cost
+    return " ".join(kept)
+
+
+def truncate_head(text: str, max_tokens: int) -> str:
+    """
+    Cut a text to its opening within max_tokens.
+
+    Args:
+        text: A string of text.
+        max_tokens: A int of token budget.
+
+    Returns:
+        str: The text unchanged if it fits, else its first whole words followed by an omission marker.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return f"{_cut_words(text, max(0, max_tokens - 2))} {OMITTED}".strip()
+
+
+def truncate_middle(text: str, max_tokens: int, head_share: float = 0.6) -> str:
+    """
+    Cut the middle out of a text at sentence boundaries.
+
+    Args:
+        text: A string of text.
+        max_tokens: A int of token budget.
+        head_share: A float share of the budget kept from the start; the rest is kept from the end.
+
+    Returns:
+        str: The text unchanged if it fits, else its opening and closing sentences joined by
+             an omission marker.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sentences = [s.strip() for s in _SENTENCE_END.split(text.strip()) if s.strip()]
+    costs = [estimate_tokens(s) for s in sentences]
+    budget = max(0, max_tokens - 2)
+    head_budget = int(budget * head_share)
+
+    head, used = [], 0
+    for sentence, cost in zip(sentences, costs):
+        if used + cost > head_budget:
+            break
+        head.append(sentence)
+        used += cost
+    if not head:
+        # A first sentence longer than the head budget is cut by words.
+        head = [_cut_words(sentences[0], head_budget)]
+        used = estimate_tokens(head[0])
+
+    tail = []
+    for sentence, cost in zip(reversed(sentences[len(head):]), reversed(costs[len(head):])):
+        if used + cost > budget:
+            break
+        tail.insert(0, sentence)
+        used += cost
+    return " ".join(head + [OMITTED] + tail)
+
+
+def _is_heading(line: str) -> bool:
+    words = line.split()
+    return bool(words) and len(words) <= 6 and (line.endswith(":") or line.isupper() or line.istitle())
+
+
+def compress_job_description(text: str, max_tokens: int) -> str:
+    """
+    Shrink a job description to a token budget, keeping the requirements.
+
+    Lines are dropped in this order until the rest fits: repeated lines, boilerplate
+    (benefits, equal opportunity statements, company introductions), prose outside the
+    requirement sections, bullets outside them, and finally requirement prose. Requirement
+    bullets and the first line, usually the title, are dropped last, from the end.
+
+    Args:
+        text: A string of job description.
+        max_tokens: A int of token budget.
+
+    Returns:
+        str: The text unchanged if it fits, else the kept lines in their original order.
+    """
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+
+    # [line, priority, heading index]; priority 0 is kept first, headings (priority None)
+    # come with the first kept line of their section.
+    lines, seen, heading, section = [], set(), None, "other"
+    for raw in text.splitlines():
+        line = raw.strip()
+        key = _LINE_KEY.sub(" ", line.lower()).strip()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        lowered = line.lower()
+        if lines and _is_heading(line) and not _BULLET.match(line):
+            heading = len(lines)
+            if any(h in lowered for h in BOILERPLATE_HEADINGS):
+                section = "boilerplate"
+            elif any(h in lowered for h in REQUIREMENT_HEADINGS):
+                section = "requirements"
+            else:
+                section = "other"
+            lines.append([line, None, None])
+            continue
+        bullet = bool(_BULLET.match(line))
+        if not lines:
+            priority = 0
+        elif section == "boilerplate" or any(p in lowered for p in BOILERPLATE_PHRASES):
+            priority = 5
+        elif section == "requirements":
+            priority = 1 if bullet else 2
+        else:
+            priority = 3 if bullet else 4
+        lines.append([line, priority, heading])
+
+    kept, used = set(), 0
+    order = sorted((i for i, (_, p, _) in enumerate(lines) if p is not None and p < 5),
+                   key=lambda i: (lines[i][1], i))
+    for i in order:
+        line, _, owner = lines[i]
+        cost = estimate_tokens(line) + (estimate_tokens(lines[owner][0]) if owner is not None and owner not in kept else 0)
+        if used + cost > max_tokens:
+            continue
+        kept.add(i)
+        if owner is not None:
+            kept.add(owner)
+        used += cost
+    if not kept:
+        return truncate_head(lines[order[0]][0] if order else text, max_tokens)
+    return "\n".join(lines[i][0] for i in sorted(kept))
+
+
+class PromptBudget:
+    """Per section token budgets, applied by the prompt builders."""
+    def __init__(self, enabled: bool = True, max_tokens: int = 2000, job_description_tokens: int = 600,
+                 answer_tokens: int = 800, question_tokens: int = 150):
+        self.enabled = enabled
+        self.max_tokens = max_tokens
+        self.job_description_tokens = job_description_tokens
+        self.answer_tokens = answer_tokens
+        self.question_tokens = question_tokens
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.getenv("PROMPT_BUDGET_ENABLED", "true").lower() in ("1", "true", "yes"),
+            max_tokens=int(os.getenv("PROMPT_MAX_TOKENS", "2000")),
+            job_description_tokens=int(os.getenv("PROMPT_JOB_DESCRIPTION_TOKENS", "600")),
+            answer_tokens=int(os.getenv("PROMPT_ANSWER_TOKENS", "800")),
+            question_tokens=int(os.getenv("PROMPT_QUESTION_TOKENS", "150")),
+        )
+
+    def _fit(self, prompt: str, section: str, text: str, shrink, max_tokens: int) -> str:
+        if not self.enabled or not text:
+            return text
+        fitted = shrink(text, max_tokens)
+        if fitted != text:
+            prompt_trimmed_tokens.inc(estimate_tokens(text) - estimate_tokens(fitted), prompt=prompt, section=section)
+        return fitted
+
+    def job_description(self, text: str, prompt: str) -> str:
+        """The job description compressed to its budget."""
+        return self._fit(prompt, "job_description", text, compress_job_description, self.job_description_tokens)
+
+    def answer(self, text: str, prompt: str) -> str:
+        """The answer with its middle cut out to fit its budget."""
+        return self._fit(prompt, "answer", text, truncate_middle, self.answer_tokens)
+
+    def question(self, text: str, prompt: str) -> str:
+        """The question cut to its budget."""
+        return self._fit(prompt, "question", text, truncate_head, self.question_tokens)
+
+    def choose_rubric(self, prompt_tokens_without_rubric: int, rubrics: dict) -> str:
+        """
+        The name of the longest rubric the prompt still fits with.
+
+        Args:
+            prompt_tokens_without_rubric: A int of estimated tokens of the rest of the prompt.
+            rubrics: A dict of rubric name to rubric text, longest first; the last is used when
+                     none fits or budgeting is disabled.
+
+        Returns:
+            str: A rubric name.
+        """
+        names = list(rubrics)
+        chosen = names[-1]
+        if self.enabled:
+            for name in names:
+                if prompt_tokens_without_rubric + estimate_tokens(rubrics[name]) <= self.max_tokens:
+                    chosen = name
+                    break
+        prompt_rubrics.inc(rubric=chosen)
+        return chosen
+
+    def record(self, prompt: str, text: str) -> str:
+        """Observe the estimated size of a built prompt and return it unchanged."""
+        prompt_tokens.observe(estimate_tokens(text), prompt=prompt)
+        return text
+
+
+prompt_budget = PromptBudget.from_env()
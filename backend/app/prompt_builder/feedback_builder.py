@@ -1,5 +1,6 @@
 from textwrap import dedent
 from typing import List
+from .budget import estimate_tokens, prompt_budget
 
 CRITERIA_ORDER: List[str] = [
     "Clarity & Structure",
@@ -70,6 +71,7 @@ def build_feedback_prompt(
 ) -> str:
     """
     Build a prompt for GPT_ACCESS to generate structured feedback for a candidate's answer.
+    Sections are fitted to prompt_budget; the long rubric is used when the budget leaves room for it.
 
     Args:
         question: The interview question asked.
@@ -79,9 +81,19 @@ def build_feedback_prompt(
     Returns:
         str: A formatted prompt string.
     """
+    question = prompt_budget.question(question, "feedback")
+    answer = prompt_budget.answer(answer, "feedback")
+    job_description = prompt_budget.job_description(job_description, "feedback")
+    prompt = _feedback_prompt(question, answer, user_info, job_description, "")
+    rubrics = {"long": RUBRIC_TEXT, "short": SHORT_RUBRIC}
+    rubric = rubrics[prompt_budget.choose_rubric(estimate_tokens(prompt), rubrics)]
+    return prompt_budget.record("feedback", _feedback_prompt(question, answer, user_info, job_description, rubric))
+
+
+def _feedback_prompt(question: str, answer: str, user_info: dict | None, job_description: str | None,
+                     rubric: str) -> str:
     user_info = user_info or {}
     jd_text = job_description if job_description else "Unknown"
-    rubric = SHORT_RUBRIC
 
     return dedent(f"""
     Act as an experienced interviewer. Analyze the candidate's response and provide structured feedback.
@@ -140,10 +152,13 @@ def build_multicrit_feedback_prompt(
         str: A formatted prompt string.
     """
     user_info = user_info or {}
+    question = prompt_budget.question(question, "multicrit_feedback")
+    answer = prompt_budget.answer(answer, "multicrit_feedback")
+    job_description = prompt_budget.job_description(job_description, "multicrit_feedback")
     jd_text = job_description if job_description else "Unknown"
     # criteria = "\n".join([f"- {c}" for c in CRITERIA_ORDER])
 
-    return dedent(f"""
+    prompt = dedent(f"""
     Act as an experienced interviewer. Analyze the candidate's response and provide structured feedback.
 
     Candidate Info:
@@ -180,4 +195,5 @@ def build_multicrit_feedback_prompt(
     "overall_summary": "string",
     "overall_score": "float"}}
     """).strip()
+    return prompt_budget.record("multicrit_feedback", prompt)
 
@@ -1,3 +1,6 @@
+from .budget import prompt_budget
+
+
 def build_question_prompt(
     job_description: str, 
     question_type: str,
@@ -12,9 +15,11 @@ def build_question_prompt(
     Returns:
         str: A formatted prompt string.
     """
-    return (
+    job_description = prompt_budget.job_description(job_description, "question")
+    prompt = (
         f"Generate 3 {question_type} interview questions based on the following job description:\n\n"
         f"{job_description}\n\n"
         "These questions should be clear, relevant, and helpful in assessing the candidate's suitability for the position."
         "These questions should be separated by @ and not numbered."
     )
+    return prompt_budget.record("question", prompt)
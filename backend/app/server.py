@@ -1,7 +1,6 @@
 from fastapi import FastAPI, HTTPException, Request, status, Header, Depends
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uvicorn
@@ -10,12 +9,9 @@ from app.core.config import url, port
 from app.services.auth_service import login
 from app.services.interview_service import interview_start, interview_feedback
 from app.services.user_service import get_user_detail
+from app.api.helper import get_principal
+from app.core.security import Principal
 
-# Security
-security = HTTPBearer()
-
-def get_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    return credentials.credentials
 
 # Request Models
 class LoginRequest(BaseModel):
@@ -233,8 +229,8 @@ async def server_auth_login(payload: LoginRequest):
     response_model=InterviewStartResponse,
     tags=["Interview"]
 )
-async def server_interview_start(payload: QuestionRequest, token: str = Depends(get_token)):
-    ret = interview_start(token, payload.job_description, payload.question_type)
+async def server_interview_start(payload: QuestionRequest, principal: Principal = Depends(get_principal)):
+    ret = interview_start(principal.user_id, principal.token, payload.job_description, payload.question_type)
     return {
         "interview_id": ret["interview_id"],
         "interview_questions": ret["interview_questions"]
@@ -247,8 +243,8 @@ async def server_interview_start(payload: QuestionRequest, token: str = Depends(
     response_model=InterviewFeedbackResponse,
     tags=["Interview"]
 )
-async def server_interview_feedback(payload: FeedbackRequest, token: str = Depends(get_token)):
-    ret = interview_feedback(token, payload.interview_id, payload.interview_type, payload.interview_question, payload.interview_answer)
+async def server_interview_feedback(payload: FeedbackRequest, principal: Principal = Depends(get_principal)):
+    ret = interview_feedback(principal.user_id, principal.token, payload.interview_id, payload.interview_type, payload.interview_question, payload.interview_answer)
     return {
         "interview_feedback": ret["interview_feedback"]
     }
@@ -260,8 +256,8 @@ async def server_interview_feedback(payload: FeedbackRequest, token: str = Depen
     response_model=UserDetailResponse,
     tags=["User"]
 )
-async def server_user_detail(token: str = Depends(get_token)):
-    ret = get_user_detail(token)
+async def server_user_detail(principal: Principal = Depends(get_principal)):
+    ret = get_user_detail(principal.user_id)
     return {
         "user_id": ret["user_id"],
         "interviews": ret["interviews"],
@@ -0,0 +1,284 @@
+# app/services/answer_scorer.py
+"""Local heuristic scoring of interview answers.
+
+Estimates the five rubric dimensions of build_feedback_prompt in about a millisecond, from
+surface features of the answer, without calling GPT:
+    words               answer length (log scaled), and its distance from a focused length
+    filler / hedging    density of filler words ("um", "like") and hedges ("I think", "maybe")
+    STAR markers        how many of situation / task / action / result are signalled
+    structure           sequencing words and list items
+    overlap             share of the question's and the job description's content words used
+    specifics           numbers and percentages
+
+Features of a batch of answers form one matrix and the scores are a single product with a
+weight matrix, clipped to the 1-5 rubric scale. The estimates serve two purposes:
+    - instant provisional feedback while the LLM feedback is pending (POST /interview/prescore)
+    - skipping the LLM for empty or near-empty answers in interview_feedback
+Off-topic answers are only flagged in the provisional estimate: word overlap has no stemming
+or synonyms, so a correct answer in other words looks off-topic, and it still goes to the LLM.
+
+``python -m app.services.answer_scorer`` compares the estimates with the stored LLM scores
+and prints a calibration report, with least-squares weights fitted to those scores.
+
+Configured from the environment (defaults in parentheses):
+    PRESCORE_SKIP_LLM (true)            Score too short answers locally instead of calling GPT
+    PRESCORE_MIN_WORDS (3)              Answers shorter than this are too short
+    PRESCORE_OFF_TOPIC_MAX_WORDS (40)   Answers up to this long sharing no content word with the
+                                        question or job description are flagged off-topic
+"""
+import os
+import re
+import sys
+import numpy as np
+from app.services.utils import with_db_session
+
+PRESCORE_SKIP_LLM = os.getenv("PRESCORE_SKIP_LLM", "true").lower() in ("1", "true", "yes")
+PRESCORE_MIN_WORDS = int(os.getenv("PRESCORE_MIN_WORDS", "3"))
+PRESCORE_OFF_TOPIC_MAX_WORDS = int(os.getenv("PRESCORE_OFF_TOPIC_MAX_WORDS", "40"))
+
+# Reasons final enough to store local scores instead of asking the LLM.
+SKIP_REASONS = ("too_short",)
+
+# Rubric dimensions, as named in the LLM feedback.
+DIMENSIONS = ("clarity_structure", "relevance", "keyword_alignment", "confidence", "conciseness")
+
+FOCUSED_WORDS = 150  # answer length with no conciseness penalty
+# Any script's letters and digits; Chinese and Japanese are written without spaces, so each
+# of their characters counts as a word.
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_WORD = re.compile(rf"[{_CJK}]|(?:[^\W_{_CJK}]|')+")
+_SENTENCE = re.compile(r"[.!?]+(?:\s|$)")
+FILLERS = {"um", "uh", "umm", "erm", "like", "basically", "actually", "literally", "honestly", "so", "yeah", "okay", "ok"}
+HEDGES = ("i think", "i guess", "maybe", "not sure", "kind of", "sort of", "probably", "i believe", "perhaps")
+STAR_MARKERS = {
+    "situation": ("situation", "when i was", "at my previous", "in my last", "context", "background", "we were"),
+    "task": ("task", "my role", "responsible for", "goal was", "needed to", "had to", "challenge"),
+    "action": ("i decided", "i implemented", "i built", "i led", "i designed", "i created", "i worked", "approach", "steps"),
+    "result": ("result", "outcome", "as a result", "led to", "improved", "reduced", "increased", "achieved", "learned"),
+}
+SEQUENCE = ("first", "second", "third", "then", "next", "finally", "lastly", "in addition", "for example", "because")
+STOPWORDS = set("""
+a an the and or but if of to in on at by for with from as is are was were be been being it its this that these
+those there their they them we our you your he she his her i me my mine do does did done have has had having
+not no yes can could would should will shall may might must what which who whom whose when where why how
+about into over under again further more most some such only own same than too very just also any each all
+both few other out up down off so am
+""".split())
+
+FEATURES = ("bias", "length", "length_distance", "filler_density", "hedge_density", "star", "structure",
+            "question_overlap", "job_overlap", "specifics")
+
+# Weight of each feature (rows, FEATURES order) in each dimension (columns, DIMENSIONS order).
+WEIGHTS = np.array([
+    # clarity relevance keyword confidence conciseness
+    [1.6,     1.2,      1.2,    3.2,       4.6],   # bias
+    [1.2,     0.8,      0.6,    0.8,       0.0],   # length
+    [-0.5,    0.0,      0.0,    0.0,      -1.4],   # length_distance
+    [-4.0,    0.0,      0.0,   -12.0,     -4.0],   # filler_density
+    [0.0,     0.0,      0.0,   -10.0,      0.0],   # hedge_density
+    [1.4,     0.4,      0.0,    0.5,       0.0],   # star
+    [0.8,     0.0,      0.0,    0.2,       0.3],   # structure
+    [0.2,     2.4,      0.8,    0.0,       0.3],   # question_overlap
+    [0.0,     1.0,      3.0,    0.0,       0.0],   # job_overlap
+    [0.2,     0.2,      0.6,    0.3,       0.0],   # specifics
+], dtype=np.float64)
+
+
+def _content_words(text: str) -> set:
+    return {w for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS and len(w) > 2}
+
+
+def _overlap(reference: set, words: set) -> float:
+    # Without reference words there is nothing to be off-topic from; count it as fully on-topic.
+    return len(reference & words) / len(reference) if reference else 1.0
+
+
+def features(question: str, answer: str, job_description: str = None) -> np.ndarray:
+    """
+    Feature vector of one answer, in FEATURES order.
+
+    Args:
+        question: A string of interview question.
+        answer: A string of candidate answer.
+        job_description: A string of job description, optional.
+
+    Returns:
+        np.ndarray: A vector of len(FEATURES) floats.
+    """
+    text = (answer or "").lower()
+    words = _WORD.findall(text)
+    n = len(words)
+    padded = f" {' '.join(words)} "
+    answer_words = set(words)
+    fillers = sum(1 for w in words if w in FILLERS)
+    hedges = sum(padded.count(f" {h} ") for h in HEDGES)
+    star = sum(1 for markers in STAR_MARKERS.values() if any(f" {m} " in padded for m in markers))
+    sequence = sum(1 for s in SEQUENCE if f" {s} " in padded)
+    list_items = len(re.findall(r"(?m)^\s*(?:[-*•]|\d+[.)])\s+", answer or ""))
+    job_words = _content_words(job_description)
+    return np.array([
+        1.0,
+        min(np.log1p(n) / np.log1p(FOCUSED_WORDS), 1.0),
+        abs(np.log((n + 1) / FOCUSED_WORDS)) if n > FOCUSED_WORDS else 0.0,
+        fillers / n if n else 0.0,
+        hedges / n if n else 0.0,
+        star / len(STAR_MARKERS),
+        min((sequence + list_items) / 3.0, 1.0),
+        _overlap(_content_words(question), answer_words) if n else 0.0,
+        min(_overlap(job_words, answer_words) * 3.0, 1.0) if job_words and n else 0.0,
+        1.0 if re.search(r"\d", text) else 0.0,
+    ])
+
+
+def score_matrix(feature_rows: np.ndarray, weights: np.ndarray = WEIGHTS) -> np.ndarray:
+    """Rubric scores of a batch: one row of len(DIMENSIONS) scores per feature row, clipped to 1-5."""
+    return np.clip(np.atleast_2d(feature_rows) @ weights, 1.0, 5.0)
+
+
+def trivial_reason(row: np.ndarray, words: int) -> str:
+    """Why an answer looks trivial ("too_short" or "off_topic"), or None; only SKIP_REASONS skip the LLM."""
+    if words < PRESCORE_MIN_WORDS:
+        return "too_short"
+    question_overlap, job_overlap = row[FEATURES.index("question_overlap")], row[FEATURES.index("job_overlap")]
+    if words <= PRESCORE_OFF_TOPIC_MAX_WORDS and question_overlap == 0 and job_overlap == 0:
+        return "off_topic"
+    return None
+
+
+_FEEDBACK = {
+    "too_short": "The answer is too short to evaluate; answer in a few full sentences with a concrete example.",
+    "off_topic": "The answer does not address the question; restate the question and answer it directly.",
+}
+
+
+def prescore(question: str, answer: str, job_description: str = None) -> dict:
+    """
+    Estimate the rubric scores of an answer locally.
+
+    Args:
+        question: A string of interview question.
+        answer: A string of candidate answer.
+        job_description: A string of job description, optional.
+
+    Returns:
+        dict: feedback - the estimated scores, in the keys of the LLM feedback, marked provisional;
+              skip_llm - whether the answer is too short to send to the LLM;
+              reason - "too_short", "off_topic" (a provisional signal only) or None.
+    """
+    row = features(question, answer, job_description)
+    words = len(_WORD.findall((answer or "").lower()))
+    reason = trivial_reason(row, words)
+    scores = score_matrix(row)[0]
+    skip = reason in SKIP_REASONS
+    if skip:
+        # A near-empty answer earns the bottom of the scale whatever its surface features.
+        scores = np.ones_like(scores)
+    feedback = {f"{d}_score": int(round(s)) for d, s in zip(DIMENSIONS, scores)}
+    feedback["overall_score"] = round(float(np.mean([feedback[f"{d}_score"] for d in DIMENSIONS])), 1)
+    feedback["overall_summary"] = _FEEDBACK.get(reason, "Provisional estimate from the length, structure and wording of the answer.")
+    feedback["provisional"] = True
+    return {"feedback": feedback, "skip_llm": skip and PRESCORE_SKIP_LLM, "reason": reason}
+
+
+def heuristic_feedback(estimate: dict) -> dict:
+    """The feedback stored for an answer scored locally instead of by the LLM."""
+    feedback = dict(estimate["feedback"])
+    feedback.pop("provisional", None)
+    summary = feedback["overall_summary"]
+    for dimension in DIMENSIONS:
+        feedback[f"{dimension}_feedback"] = summary
+    feedback["scored_by"] = "heuristic"
+    return feedback
+
+
+# ----------------------------------------------------------------------
+# Calibration against stored LLM scores
+# ----------------------------------------------------------------------
+def _llm_scores(feedback: dict):
+    try:
+        return [float(feedback[f"{d}_score"]) for d in DIMENSIONS]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def calibration_data(rows) -> tuple:
+    """
+    Features and LLM scores of stored answers.
+
+    Args:
+        rows: An iterable of (question, answer, feedback, job_description).
+
+    Returns:
+        tuple: (features matrix, LLM scores matrix, word counts), one row per usable answer.
+    """
+    feature_rows, targets, words = [], [], []
+    for question, answer, feedback, job_description in rows:
+        if not isinstance(feedback, dict) or feedback.get("scored_by") == "heuristic":
+            continue
+        scores = _llm_scores(feedback)
+        if scores is None:
+            continue
+        feature_rows.append(features(question, answer, job_description))
+        targets.append(scores)
+        words.append(len(_WORD.findall((answer or "").lower())))
+    if not targets:
+        return np.zeros((0, len(FEATURES))), np.zeros((0, len(DIMENSIONS))), np.zeros(0, dtype=int)
+    return np.array(feature_rows), np.array(targets), np.array(words)
+
+
+def calibration_report(feature_rows: np.ndarray, targets: np.ndarray, words: np.ndarray,
+                       weights: np.ndarray = WEIGHTS) -> dict:
+    """
+    Agreement of the local estimates with the LLM scores.
+
+    Returns:
+        dict: answers - rows compared; dimensions - {dimension: mae, bias, correlation, within_one};
+              trivial - answers the scorer would skip, and their mean LLM overall score;
+              fitted_weights - least-squares weights, in the shape of WEIGHTS, or None with too few rows.
+    """
+    n = len(targets)
+    report = {"answers": n, "dimensions": {}, "trivial": {"answers": 0, "llm_mean_score": None}, "fitted_weights": None}
+    if n == 0:
+        return report
+    estimates = score_matrix(feature_rows, weights)
+    errors = estimates - targets
+    for j, dimension in enumerate(DIMENSIONS):
+        correlation = None
+        if n > 1 and estimates[:, j].std() > 0 and targets[:, j].std() > 0:
+            correlation = round(float(np.corrcoef(estimates[:, j], targets[:, j])[0, 1]), 3)
+        report["dimensions"][dimension] = {
+            "mae": round(float(np.abs(errors[:, j]).mean()), 3),
+            "bias": round(float(errors[:, j].mean()), 3),
+            "correlation": correlation,
+            "within_one": round(float((np.abs(errors[:, j]) <= 1.0).mean()), 3),
+        }
+    trivial = np.array([trivial_reason(row, w) in SKIP_REASONS for row, w in zip(feature_rows, words)])
+    if trivial.any():
+        report["trivial"] = {"answers": int(trivial.sum()),
+                             "llm_mean_score": round(float(targets[trivial].mean()), 3)}
+    if n >= len(FEATURES):
+        fitted, *_ = np.linalg.lstsq(feature_rows, targets, rcond=None)
+        report["fitted_weights"] = np.round(fitted, 3).tolist()
+    return report
+
+
+@with_db_session
+def calibrate(limit: int = 5000, db = None) -> dict:
+    """Calibration report over the most recent stored LLM feedback."""
+    from app.db.crud import get_scored_answers
+    return calibration_report(*calibration_data(get_scored_answers(limit, db)))
+
+
+if __name__ == "__main__":
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    report = calibrate(limit)
+    print(f"Answers compared: {report['answers']}")
+    print(f"{'dimension':<20}{'mae':>8}{'bias':>8}{'corr':>8}{'within 1':>10}")
+    for dimension, stats in report["dimensions"].items():
+        correlation = "-" if stats["correlation"] is None else f"{stats['correlation']:.3f}"
+        print(f"{dimension:<20}{stats['mae']:>8.3f}{stats['bias']:>8.3f}{correlation:>8}{stats['within_one']:>10.3f}")
+    print(f"Trivial answers: {report['trivial']['answers']}, mean LLM score {report['trivial']['llm_mean_score']}")
+    if report["fitted_weights"] is not None:
+        print("Fitted weights (rows: " + ", ".join(FEATURES) + "):")
+        for name, row in zip(FEATURES, report["fitted_weights"]):
+            print(f"  {name:<18}" + "".join(f"{w:>9.3f}" for w in row))
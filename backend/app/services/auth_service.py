@@ -1,4 +1,5 @@
 # app/services/auth_service.py
+import logging
 import base64
 import json
 from app.external_access.verify_access import VerifyAccessClient
@@ -6,6 +7,8 @@ from app.services.user_service import create_new_user
 from app.db.crud import get_user_basic
 from app.services.utils import with_db_session
 
+logger = logging.getLogger(__name__)
+
 def get_user_id_and_email(jwt_token: str) -> dict:
     """
     Get user id and email form JWT token.
@@ -56,7 +59,7 @@ def login(email: str, google_jwt: str = None, apple_jwt: str = None, db = None)
         # print(id_email)
         user = get_user_basic(user_id, db)
         if not user:
-            print("No user:", user_id)
+            logger.info("login of unknown user, creating it", extra={"user_id": user_id})
             user = create_new_user(user_id, user_email, db)
     else:
         user_id = None
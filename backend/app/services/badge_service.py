@@ -1,9 +1,12 @@
 """Badge checks for answering-related badges and time-of-day badges."""
+import logging
 from datetime import datetime
 from app.db.crud import get_unlocked_badges, get_all_badges, unlock_badge, update_user
 from app.db.models import User, Badge
 from app.services.utils import with_db_session
 
+logger = logging.getLogger(__name__)
+
 
 def _current_hour() -> int:
     """Return current local hour. Isolated for test patching."""
@@ -109,13 +112,16 @@ def condition_first_session(user: User) -> bool:
     return _getattr_int(user, "total_interviews", 0) == 1
 
 
-# Time-of-day
-def condition_night_owl(user: User) -> bool:
-    return _current_hour() >= 22
+# Time-of-day; ``hour`` is the local hour of the answer, now when not given
+def condition_night_owl(user: User, hour: int = None) -> bool:
+    return (_current_hour() if hour is None else hour) >= 22
+
 
+def condition_early_bird(user: User, hour: int = None) -> bool:
+    return (_current_hour() if hour is None else hour) < 7
 
-def condition_early_bird(user: User) -> bool:
-    return _current_hour() < 7
+
+_TIME_OF_DAY_BADGES = {"night owl", "early bird"}
 
 
 # Registry mapping normalized badge name -> predicate
@@ -170,7 +176,7 @@ def check_badges_for_user(user, db=None):
 
         if meets_condition(user, badge):
             unlock = unlock_badge(user.user_id, badge.badge_id, db)
-            print(f"User {user.user_id} unlock badge {badge.name} at {unlock.unlocked_timestamp}.")
+            logger.info("badge unlocked", extra={"user_id": user.user_id, "badge": badge.name, "unlocked_timestamp": unlock.unlocked_timestamp})
             newly_unlocked.append(badge)
 
     # Optionally update user's total_badges count
@@ -183,10 +189,43 @@ def check_badges_for_user(user, db=None):
     return newly_unlocked
 
 
-def meets_condition(user: User, badge: Badge) -> bool:
+def meets_condition(user: User, badge: Badge, hour: int = None) -> bool:
     """Evaluate whether a user meets the unlock condition for a given badge."""
     name = _norm(badge.name)
     predicate = _BADGE_CHECKS.get(name)
     if not predicate:
         return False
-    return bool(predicate(user))
\ No newline at end of file
+    if name in _TIME_OF_DAY_BADGES:
+        return bool(predicate(user, hour))
+    return bool(predicate(user))
+
+
+def known_badges(badges: list) -> list:
+    """The badges with a registered unlock condition."""
+    return [b for b in badges if _norm(b.name) in _BADGE_CHECKS]
+
+
+def badges_to_unlock(user: User, badges: list, unlocked_ids: set, hours=()) -> list:
+    """
+    The badges a user meets and has not unlocked, without touching the database.
+    Used by the question event projector, which unlocks them in bulk.
+
+    Args:
+        user: A SQLAlchemy entry of user, with aggregates already updated.
+        badges: A list of known_badges.
+        unlocked_ids: A set of badge ids the user already unlocked.
+        hours: Local hours of the answers applied; a time-of-day badge is met if any of them is.
+
+    Returns:
+        list: A list of Badge entries.
+    """
+    met = []
+    for badge in badges:
+        if badge.badge_id in unlocked_ids:
+            continue
+        if _norm(badge.name) in _TIME_OF_DAY_BADGES:
+            if any(meets_condition(user, badge, hour) for hour in hours):
+                met.append(badge)
+        elif meets_condition(user, badge):
+            met.append(badge)
+    return met
\ No newline at end of file
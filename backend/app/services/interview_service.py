@@ -1,17 +1,25 @@
 # app/services/interview_service.py
-import json
-import re
+import logging
 from typing import Any, Dict, List, Optional
-import uuid
+import os
 import time
-from app.db.crud import add_interview, add_question, get_user_basic, update_user, update_interview_like, get_interview
+from app.db.crud import add_interview, add_question_with_event, get_user_basic, update_user, update_interview_like, get_interview, get_interview_job_description, get_id_alias
 from app.db.models import Question, Interview
 from app.external_access.gpt_access import GPTAccessClient
 from app.external_access.faq_access import FAQAccessClient
-from app.services.auth_service import get_user_id_and_email
-from app.services.badge_service import check_badges_for_user
+from app.services.projector import projector, question_event
+from app.services.question_pool import question_pool, QUESTION_POOL_ENABLED
+from app.services.jd_index import jd_index, JD_INDEX_ENABLED
+from app.services.answer_scorer import prescore, heuristic_feedback
+from app.services.llm_output import find_json_object, parse_feedback, parse_question_list
 from app.prompt_builder import build_question_prompt, build_feedback_prompt
 from app.services.utils import with_db_session
+from app.core.ids import new_id
+
+logger = logging.getLogger(__name__)
+
+# GPT token of the background question pool refiller; GPTAccessClient falls back to TEST_JWT.
+QUESTION_POOL_GPT_TOKEN = os.getenv("QUESTION_POOL_GPT_TOKEN") or None
 
 # ---------------------------
 # Database Functions
@@ -31,7 +39,7 @@ def save_interview(user_id: str, interview_id: str, interview_type: str, job_des
         interview: A SQLAlchemy entry of interview, if it is None, means fails.
     """
     from app.services.user_service import update_user_active
-    print(f"Saving interview for user: {user_id}")
+    logger.debug("saving interview", extra={"user_id": user_id, "interview_id": interview_id})
     timestamp = int(time.time() * 1000)
     new_interview = Interview(interview_id=interview_id, 
                               user_id=user_id, 
@@ -45,10 +53,10 @@ def save_interview(user_id: str, interview_id: str, interview_type: str, job_des
     user = get_user_basic(user_id, db)
     if not user:
         return None
-    user = update_user_active(user_id, db)
-    user_data = {"total_interviews": interview.user.total_interviews + 1}
+    update_user_active(user_id, db)
+    user_data = {"total_interviews": user.total_interviews + 1}
     user = update_user(user_id, user_data, db)
-    print(f"Saved interview: {interview_id}")
+    logger.info("interview saved", extra={"user_id": user_id, "interview_id": interview_id})
     return interview
 
 
@@ -68,9 +76,9 @@ def save_question(user_id: str, interview_id: str, question_type: str, question_
     Returns:
         dict: A SQLAlchemy entry of interview, if it is None, means fails.
     """
-    print(f"Saving question for user: {user_id}, interview: {interview_id}")
+    logger.debug("saving question", extra={"user_id": user_id, "interview_id": interview_id})
     timestamp = int(time.time() * 1000)
-    question_id = f"{interview_id}_{timestamp}"
+    question_id = new_id()
     question = Question(question_id=question_id,
                             interview_id=interview_id,
                             question=question_text,
@@ -79,133 +87,44 @@ def save_question(user_id: str, interview_id: str, question_type: str, question_
                             feedback=feedback,
                             timestamp=timestamp
                             )
-    new_question = add_question(question, db)
-    print(f"Saved question: {new_question.question_id}")
+    # One insert on the request path; aggregates, streaks and badges follow from the projector.
+    new_question = add_question_with_event(question, question_event(user_id, question, feedback), db)
     if not new_question:
         return None
-    
-    user = get_user_basic(user_id, db)
-    if not user:
-        return None
-    clarity = feedback.get("clarity_structure_score", 0)
-    relevance = feedback.get("relevance_score", 0)
-    keyword = feedback.get("keyword_alignment_score", 0)
-    confidence = feedback.get("confidence_score", 0)
-    conciseness = feedback.get("conciseness_score", 0)
-    overall = feedback.get("overall_score", 0.0)
-
-    user_data = {
-        "xp": user.xp + int(overall * 2),
-        "total_questions": user.total_questions + 1,
-        "total_clarity": user.total_clarity + clarity,
-        "total_relevance": user.total_relevance + relevance,
-        "total_keyword": user.total_keyword + keyword,
-        "total_confidence": user.total_confidence + confidence,
-        "total_conciseness": user.total_conciseness + conciseness,
-        "total_overall": user.total_overall + overall
-        }
-    if clarity > user.max_clarity:
-        user_data["max_clarity"] = clarity
-    if relevance > user.max_relevance:
-        user_data["max_relevance"] = relevance
-    if keyword > user.max_keyword:
-        user_data["max_keyword"] = keyword
-    if confidence > user.max_confidence:
-        user_data["max_confidence"] = confidence
-    if conciseness > user.max_conciseness:
-        user_data["max_conciseness"] = conciseness
-    if overall > user.total_overall:
-        user_data["max_overall"] = overall
-    
-    user = update_user(user_id, user_data, db)
-    print("Update user after feedback.")
-    if not user:
-        return None
-    else:
-        print("Try to check badges")
-        newly_unlocked = check_badges_for_user(user, db)
-        if not newly_unlocked:
-            print("Not unlock new badges")
-
+    logger.info("question saved", extra={"user_id": user_id, "question_id": question_id})
+    projector.notify()
     return question
 
 # ---------------------------
 # Internal Helper Functions
 # ---------------------------
 
-def _find_first_json_object(text: str) -> Optional[str]:
-    if not text:
-        return None
-    in_string = False
-    string_quote = ''
-    escape_next = False
-    depth = 0
-    start_index: Optional[int] = None
-    for i, ch in enumerate(text):
-        if in_string:
-            if escape_next:
-                escape_next = False
-                continue
-            if ch == "\\":
-                escape_next = True
-                continue
-            if ch == string_quote:
-                in_string = False
-            continue
-        if ch in ('"', "'"):
-            in_string = True
-            string_quote = ch
-            continue
-        if ch == '{':
-            if depth == 0:
-                start_index = i
-            depth += 1
-            continue
-        if ch == '}':
-            if depth > 0:
-                depth -= 1
-                if depth == 0 and start_index is not None:
-                    return text[start_index : i + 1]
-    return None
+def _extract_json_block(text: str) -> Optional[dict]:
+    return find_json_object(text)
 
 
-def _extract_json_block(text: str) -> Optional[dict]:
-    if not text:
-        return None
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-    json_sub = _find_first_json_object(text)
-    if not json_sub:
-        return None
-    try:
-        return json.loads(json_sub)
-    except Exception:
-        return None
+def generate_question_set(token: str, job_description: str, question_type: str) -> List[str]:
+    """
+    Ask GPT for the interview questions of a job description.
 
+    Args:
+        token: A string of JWT token, forwarded to the GPT service.
+        job_description: A string of job description.
+        question_type: A string of question type.
 
-def _split_numbered_items(text: str) -> List[str]:
-    if not text:
-        return []
-    parts = re.split(r'(?:^|\n)\s*\d+\.\s*', text.strip())
-    parts = [p.strip() for p in parts if p and p.strip()]
-    return parts or [ln.strip() for ln in text.splitlines() if ln.strip()]
+    Returns:
+        list: A list of at least 3 question strings, padded with empty strings.
+    """
+    gpt = GPTAccessClient(token)
+    prompt = build_question_prompt(job_description, question_type)
+    result = gpt.send_prompt(prompt)
+    return parse_question_list((result or {}).get("answer") or "")
 
 
-def _unwrap_api_answer(answer_text: str) -> str:
-    if not answer_text:
-        return ""
-    try:
-        parsed = json.loads(answer_text)
-        if isinstance(parsed, dict) and "answer" in parsed:
-            inner = parsed.get("answer")
-            return inner if isinstance(inner, str) else json.dumps(inner, ensure_ascii=False)
-        if isinstance(parsed, str):
-            return parsed
-    except Exception:
-        pass
-    return answer_text
+def _generate_pooled_question_set(job_description: str, question_type: str) -> List[str]:
+    questions = generate_question_set(QUESTION_POOL_GPT_TOKEN, job_description, question_type)
+    # A set without any question is not worth serving instead of a live call.
+    return questions if any(questions) else None
 
 # ---------------------------
 # Main Business Logic
@@ -230,12 +149,15 @@ def change_interview_like(interview_id: str, db = None):
     return result
 
 @with_db_session
-def interview_start(token: str, job_description: str, question_type: str, db = None) -> Dict[str, Any]:
+def interview_start(user_id: str, token: str, job_description: str, question_type: str, db = None) -> Dict[str, Any]:
     """
     Generate some interview questions for the given job description.
+    A pre-generated set of a popular job description is served from the question pool when available,
+    otherwise a set generated for a near-identical job description is reused (see app.services.jd_index).
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id, resolved from the verified token.
+        token: A string of JWT token, forwarded to the GPT service.
         job_description: A string of job description.
         question_type: A string of question type, the same meaning of interview type.
         db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
@@ -243,28 +165,40 @@ def interview_start(token: str, job_description: str, question_type: str, db = N
     Returns:
         dict: A dict interview_id and a list of interview questions.
     """
-    id_email = get_user_id_and_email(token)
-    user_id = id_email["id"]
     user = get_user_basic(user_id, db)
     if not user:
-        print(f"User: {user_id} does not exist in the database.")
+        logger.warning("user does not exist", extra={"user_id": user_id})
         return None
+    return create_interview(user_id, token, job_description, question_type, db=db)
 
-    gpt = GPTAccessClient(token)
-    prompt = build_question_prompt(job_description, question_type)
-    result = gpt.send_prompt(prompt)
-    raw_api_answer = (result or {}).get("answer", "").strip()
-    raw = _unwrap_api_answer(raw_api_answer)
-
-    if "@" in raw:
-        items = [p.strip() for p in raw.split("@") if p and p.strip()]
-    else:
-        items = _split_numbered_items(raw)
+@with_db_session
+def create_interview(user_id: str, token: str, job_description: str, question_type: str, db = None) -> Dict[str, Any]:
+    """
+    Generate the questions and save the interview of a user known to exist.
+    Shared by interview_start and the WebSocket session (app.services.interview_session), which checks the user once.
 
-    while len(items) < 3:
-        items.append("")
+    Args:
+        user_id: A string of user id of an existing user.
+        token: A string of JWT token, forwarded to the GPT service.
+        job_description: A string of job description.
+        question_type: A string of question type, the same meaning of interview type.
+        db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
 
-    interview_id = str(uuid.uuid4())
+    Returns:
+        dict: A dict interview_id and a list of interview questions.
+    """
+    question_pool.record_demand(job_description, question_type)
+    if QUESTION_POOL_ENABLED:
+        question_pool.start(_generate_pooled_question_set)
+    items = question_pool.take(job_description, question_type)
+    if items is None and JD_INDEX_ENABLED:
+        items = jd_index.find_questions(job_description, question_type)
+    if items is None:
+        items = generate_question_set(token, job_description, question_type)
+        if JD_INDEX_ENABLED:
+            jd_index.add(job_description, question_type, items)
+
+    interview_id = new_id()
     save_interview(user_id=user_id, 
                    interview_id=interview_id, 
                    interview_type=question_type, 
@@ -275,12 +209,14 @@ def interview_start(token: str, job_description: str, question_type: str, db = N
     return {"interview_id": interview_id, "interview_questions": items}
 
 @with_db_session
-def interview_feedback(token: str, interview_id: str, interview_type: str, interview_question: str, interview_answer: str, db = None) -> Dict[str, Any]:
+def interview_feedback(user_id: str, token: str, interview_id: str, interview_type: str, interview_question: str, interview_answer: str, db = None) -> Dict[str, Any]:
     """
     Generate feedback and a 5-element score list.
+    Empty or near-empty answers are scored locally, without calling GPT (see app.services.answer_scorer).
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id, resolved from the verified token.
+        token: A string of JWT token, forwarded to the GPT service.
         interview_id: A string of interview id.
         interview_type: A string of interview type, the same meaning of question type.
         interview_question: A string of interview question text, here is just only one question.
@@ -293,11 +229,9 @@ def interview_feedback(token: str, interview_id: str, interview_type: str, inter
     if not interview_answer:
         return None
     
-    id_email = get_user_id_and_email(token)
-    user_id = id_email["id"]
     user = get_user_basic(user_id, db)
     if not user:
-        print(f"User: {user_id} does not exist in the database.")
+        logger.warning("user does not exist", extra={"user_id": user_id})
         return None
 
     user_info: Dict[str, Any] = {}
@@ -309,27 +243,63 @@ def interview_feedback(token: str, interview_id: str, interview_type: str, inter
     except Exception:
         user_info = {}
 
-    feedback_prompt = build_feedback_prompt(
-        question=interview_question,
-        answer=interview_answer,
-        user_info=user_info,
-    )
-
-    gpt = GPTAccessClient(token)
-    feedback_result = gpt.send_prompt(feedback_prompt)
-    feedback_raw_api = (feedback_result or {}).get("answer", "").strip()
-
-    try:
-        parsed_feedback = json.loads(feedback_raw_api)
-    except Exception:
-        parsed_feedback = {}
-
-    save_question(user_id, interview_id, interview_type, interview_question, interview_answer, parsed_feedback, db)
+    job_description = get_interview_job_description(interview_id, db)
+    if job_description is None:
+        # An id from before the UUIDv7 migration (app.db.migrate_ids), still held by a client.
+        interview_id = get_id_alias(interview_id, db) or interview_id
+        job_description = get_interview_job_description(interview_id, db)
+    parsed_feedback = score_answer(user_id, token, interview_id, interview_type, interview_question, interview_answer,
+                                   job_description, user_info, db=db)
 
     return {
         "interview_feedback": parsed_feedback
     }
 
+@with_db_session
+def score_answer(user_id: str, token: str, interview_id: str, interview_type: str, interview_question: str,
+                 interview_answer: str, job_description: Optional[str], user_info: Optional[dict] = None,
+                 db = None) -> Dict[str, Any]:
+    """
+    Score an answer and save it, once the user and the interview are known.
+    Shared by interview_feedback and the WebSocket session (app.services.interview_session), which loads them once.
+
+    Args:
+        user_id: A string of user id of an existing user.
+        token: A string of JWT token, forwarded to the GPT service.
+        interview_id: A string of interview id, already resolved.
+        interview_type: A string of interview type.
+        interview_question: A string of interview question text.
+        interview_answer: A string of answer text.
+        job_description: A string of job description of the interview, None if unknown.
+        user_info: A dict of profile information for the prompt.
+        db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
+
+    Returns:
+        dict: A dict of parsed feedback, empty if the reply could not be parsed.
+    """
+    estimate = prescore(interview_question, interview_answer, job_description)
+    if estimate["skip_llm"]:
+        logger.info("answer scored locally", extra={"user_id": user_id, "reason": estimate["reason"]})
+        parsed_feedback = heuristic_feedback(estimate)
+    else:
+        feedback_prompt = build_feedback_prompt(
+            question=interview_question,
+            answer=interview_answer,
+            user_info=user_info or {},
+            job_description=job_description,
+        )
+
+        gpt = GPTAccessClient(token)
+        feedback_result = gpt.send_prompt(feedback_prompt)
+        feedback_raw_api = (feedback_result or {}).get("answer") or ""
+        parsed_feedback = parse_feedback(feedback_raw_api)
+        if parsed_feedback is None:
+            logger.warning("unparseable feedback reply", extra={"user_id": user_id, "reply": feedback_raw_api[:200]})
+            parsed_feedback = {}
+
+    save_question(user_id, interview_id, interview_type, interview_question, interview_answer, parsed_feedback, db)
+    return parsed_feedback
+
 
 @with_db_session
 def get_interview_detail(token: str, interview_id: str, db = None):
@@ -0,0 +1,163 @@
+"""Context of a WebSocket interview session (see app.api.session).
+
+Over REST an interview is a login check, POST /interview/start and one POST
+/interview/feedback per answer, and every request verifies the bearer token, opens a
+database session and reloads the user and the interview's job description. A session
+does that once:
+    - the token is verified and the user row checked when the socket opens
+    - the current interview (id, type, job description) is kept in memory, so an answer
+      goes straight to score_answer
+    - badge unlocks applied by this worker's projector (app.services.projector) are pushed
+      to the open sessions of their user through session_hub
+"""
+import logging
+import threading
+from typing import NamedTuple, Optional
+from app.core.metrics import registry, Gauge
+from app.core.security import Principal
+from app.db.crud import get_user_basic, get_interview
+from app.services.interview_service import create_interview, score_answer
+from app.services.projector import projector
+from app.services.utils import with_db_session
+
+logger = logging.getLogger(__name__)
+
+
+class SessionError(Exception):
+    """A session message that cannot be served; ``status`` is the HTTP status the REST routes would answer."""
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class InterviewContext(NamedTuple):
+    """The interview a session is answering."""
+    interview_id: str
+    interview_type: str
+    job_description: Optional[str]
+
+
+@with_db_session
+def _user_exists(user_id: str, db = None) -> bool:
+    return get_user_basic(user_id, db) is not None
+
+
+@with_db_session
+def _load_interview(user_id: str, interview_id: str, db = None) -> Optional[InterviewContext]:
+    interview = get_interview(interview_id, db)
+    if interview is None or interview.user_id != user_id:
+        return None
+    return InterviewContext(interview.interview_id, interview.interview_type, interview.job_description)
+
+
+class InterviewSession:
+    """The user and interview of one WebSocket connection. Blocking methods run on the service pools."""
+    def __init__(self, principal: Principal):
+        self.principal = principal
+        self.interview: Optional[InterviewContext] = None
+
+    @property
+    def user_id(self) -> str:
+        return self.principal.user_id
+
+    def open(self) -> bool:
+        """Check once that the user exists; False closes the session."""
+        return _user_exists(self.user_id)
+
+    def start(self, job_description: str, question_type: str) -> dict:
+        """
+        Start a new interview and make it the session's current one.
+
+        Args:
+            job_description: A string of job description.
+            question_type: A string of question type.
+
+        Returns:
+            dict: A dict interview_id and a list of interview questions.
+        """
+        result = create_interview(self.user_id, self.principal.token, job_description, question_type)
+        self.interview = InterviewContext(result["interview_id"], question_type, job_description)
+        return result
+
+    def resume(self, interview_id: str) -> InterviewContext:
+        """
+        Continue an interview of the user, e.g. after a reconnect.
+
+        Args:
+            interview_id: A string of interview id; legacy ids are resolved.
+
+        Returns:
+            InterviewContext: The interview, now the session's current one.
+
+        Raises:
+            SessionError: 404 if the interview does not exist or belongs to another user.
+        """
+        interview = _load_interview(self.user_id, interview_id)
+        if interview is None:
+            raise SessionError(404, "Interview not found")
+        self.interview = interview
+        return interview
+
+    def current_interview(self) -> InterviewContext:
+        """The interview answers go to, captured when an answer arrives."""
+        if self.interview is None:
+            raise SessionError(400, "Start or resume an interview first")
+        return self.interview
+
+    def answer(self, interview: InterviewContext, question: str, answer: str) -> dict:
+        """
+        Score and save an answer to the given interview.
+
+        Args:
+            interview: The InterviewContext current when the answer arrived.
+            question: A string of interview question text.
+            answer: A string of answer text.
+
+        Returns:
+            dict: A dict interview_feedback, as POST /interview/feedback answers.
+        """
+        if not answer:
+            raise SessionError(400, "Empty answer")
+        feedback = score_answer(self.user_id, self.principal.token, interview.interview_id, interview.interview_type,
+                                question, answer, interview.job_description)
+        return {"interview_feedback": feedback}
+
+
+class SessionHub:
+    """The sessions open in this worker, by user, to push messages to."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+
+    def add(self, user_id: str, push):
+        """Register the thread-safe ``push(message)`` of a session."""
+        with self.lock:
+            self.sessions.setdefault(user_id, []).append(push)
+
+    def remove(self, user_id: str, push):
+        with self.lock:
+            pushes = self.sessions.get(user_id, [])
+            if push in pushes:
+                pushes.remove(push)
+            if not pushes:
+                self.sessions.pop(user_id, None)
+
+    def count(self) -> int:
+        with self.lock:
+            return sum(len(pushes) for pushes in self.sessions.values())
+
+    def publish_badges(self, unlocked: dict):
+        """Projector listener: push the badges each user just unlocked to their sessions."""
+        for user_id, badges in unlocked.items():
+            with self.lock:
+                pushes = list(self.sessions.get(user_id, ()))
+            for push in pushes:
+                push({"type": "badges", "badges": badges})
+
+
+session_hub = SessionHub()
+projector.subscribe(session_hub.publish_badges)
+
+registry.register(Gauge("interview_sessions_open", "WebSocket interview sessions open in this worker.", (),
+                        lambda: {(): session_hub.count()}))
@@ -0,0 +1,315 @@
+# app/services/jd_index.py
+"""Similarity index over the job descriptions questions were generated for.
+
+The same posting rarely arrives twice byte for byte: whitespace, the company name or the
+bullet order change. Each job description is embedded as a hashed bag of word unigrams
+and character 4-grams (sublinear term frequency, signed hashing into JD_INDEX_DIM buckets,
+L2 normalized), so reordered bullets and small edits keep a cosine similarity close to 1.
+interview_start reuses a question set of the most similar indexed description of the same
+question type when the similarity reaches JD_INDEX_MIN_SIMILARITY, instead of calling GPT.
+
+A hit keeps up to JD_INDEX_SETS_PER_ENTRY question sets per description. While an entry has
+fewer, a hit falls through to generation with probability JD_INDEX_REFRESH_PROBABILITY, so
+repeated postings gather several sets and starting the same posting again varies.
+
+Everything runs in process with NumPy. Vectors are kept in one float32 matrix per question
+type, grown by doubling, with a top-k cosine query as a single matrix-vector product. When
+JD_INDEX_MAX_ENTRIES is reached the oldest entries are overwritten. Only the question types
+of JD_INDEX_QUESTION_TYPES are indexed, since question_type is free text from the client and
+each type costs a matrix of up to JD_INDEX_MAX_ENTRIES x JD_INDEX_DIM floats (40 MB at the
+defaults); lookups never create one.
+
+The index is saved as a snapshot to JD_INDEX_PATH every JD_INDEX_SNAPSHOT_EVERY inserts, from
+a background thread, and at exit, and loaded from it on first use, so a restarted worker
+does not start cold.
+
+Configured from the environment (defaults in parentheses):
+    JD_INDEX_ENABLED (true), JD_INDEX_PATH (/tmp/jd_index.npz), JD_INDEX_DIM (2048),
+    JD_INDEX_MIN_SIMILARITY (0.9), JD_INDEX_MAX_ENTRIES (5000), JD_INDEX_SETS_PER_ENTRY (5),
+    JD_INDEX_REFRESH_PROBABILITY (0.2), JD_INDEX_SNAPSHOT_EVERY (20),
+    JD_INDEX_QUESTION_TYPES (technical,behavioral,situational,system design)
+"""
+import os
+import re
+import json
+import atexit
+import random
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+import numpy as np
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+CHAR_NGRAM = 4
+_WORD = re.compile(r"[a-z0-9+#]+")
+DEFAULT_QUESTION_TYPES = ("technical", "behavioral", "situational", "system design")
+
+
+def _type_key(question_type: str) -> str:
+    return (question_type or "").strip().lower()
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dim: int):
+    # A stable hash (unlike hash()), so snapshots stay valid across processes.
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+    return digest % dim, 1.0 if (digest >> 63) else -1.0
+
+
+def features(text: str) -> dict:
+    """Counts of the word unigrams and in-word character 4-grams of a text."""
+    counts = {}
+    for word in _WORD.findall((text or "").lower()):
+        counts["w:" + word] = counts.get("w:" + word, 0) + 1
+        padded = f"<{word}>"
+        for i in range(max(1, len(padded) - CHAR_NGRAM + 1)):
+            gram = "c:" + padded[i:i + CHAR_NGRAM]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def embed(text: str, dim: int) -> np.ndarray:
+    """
+    Hash a text into a unit float32 vector.
+
+    Args:
+        text: A string of job description.
+        dim: A int of vector dimension.
+
+    Returns:
+        np.ndarray: A vector of shape (dim,), all zeros for a text without words.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in features(text).items():
+        index, sign = _bucket(feature, dim)
+        vector[index] += sign * (1.0 + np.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Unit vectors in a growable matrix, each with a payload, queried by cosine similarity."""
+    def __init__(self, dim: int, max_entries: int, capacity: int = 16):
+        self.dim = dim
+        self.max_entries = max_entries
+        self.vectors = np.zeros((min(capacity, max_entries), dim), dtype=np.float32)
+        self.payloads = []
+        self.next_slot = 0  # slot overwritten next once the index is full
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def insert(self, vector: np.ndarray, payload) -> int:
+        if len(self.payloads) < self.max_entries:
+            slot = len(self.payloads)
+            if slot == len(self.vectors):
+                grown = np.zeros((min(2 * len(self.vectors), self.max_entries), self.dim), dtype=np.float32)
+                grown[:slot] = self.vectors
+                self.vectors = grown
+            self.payloads.append(payload)
+        else:
+            slot = self.next_slot
+            self.next_slot = (slot + 1) % self.max_entries
+            self.payloads[slot] = payload
+        self.vectors[slot] = vector
+        return slot
+
+    def query(self, vector: np.ndarray, k: int = 1) -> list:
+        """The k most similar entries as (similarity, slot), most similar first."""
+        n = len(self.payloads)
+        if n == 0:
+            return []
+        scores = self.vectors[:n] @ vector
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), int(i)) for i in top]
+
+
+class JobDescriptionIndex:
+    """Per question type vector indexes of job descriptions, with the question sets generated for them."""
+    def __init__(self, dim: int = 2048, min_similarity: float = 0.9, max_entries: int = 5000,
+                 sets_per_entry: int = 5, refresh_probability: float = 0.2, path: str = None,
+                 snapshot_every: int = 20, question_types=DEFAULT_QUESTION_TYPES, rng=None):
+        self.dim = dim
+        self.min_similarity = min_similarity
+        self.max_entries = max_entries
+        self.sets_per_entry = sets_per_entry
+        self.refresh_probability = refresh_probability
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.question_types = {_type_key(t) for t in question_types}
+        self.rng = rng or random.Random()
+        self.indexes = {}
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.unsaved = 0
+        self.save_thread = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            dim=int(os.getenv("JD_INDEX_DIM", "2048")),
+            min_similarity=float(os.getenv("JD_INDEX_MIN_SIMILARITY", "0.9")),
+            max_entries=int(os.getenv("JD_INDEX_MAX_ENTRIES", "5000")),
+            sets_per_entry=int(os.getenv("JD_INDEX_SETS_PER_ENTRY", "5")),
+            refresh_probability=float(os.getenv("JD_INDEX_REFRESH_PROBABILITY", "0.2")),
+            # No snapshot under test unless asked for, so runs never share an index.
+            path=os.getenv("JD_INDEX_PATH", "" if os.getenv("TESTING") == "1" else "/tmp/jd_index.npz") or None,
+            snapshot_every=int(os.getenv("JD_INDEX_SNAPSHOT_EVERY", "20")),
+            question_types=os.getenv("JD_INDEX_QUESTION_TYPES", ",".join(DEFAULT_QUESTION_TYPES)).split(","),
+        )
+
+    def _index(self, question_type: str, create: bool = False):
+        """The index of a question type; None for a type not indexed, or not seen yet unless ``create``."""
+        key = _type_key(question_type)
+        index = self.indexes.get(key)
+        if index is None and create and key in self.question_types:
+            index = self.indexes[key] = VectorIndex(self.dim, self.max_entries)
+        return index
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.loaded = True
+            if self.path and os.path.exists(self.path):
+                self.load(self.path)
+
+    def nearest(self, job_description: str, question_type: str, k: int = 1) -> list:
+        """
+        The k indexed job descriptions of this question type most similar to the given one.
+
+        Returns:
+            list: A list of (similarity, payload dict), most similar first.
+        """
+        if _type_key(question_type) not in self.question_types:
+            return []
+        vector = embed(job_description, self.dim)
+        with self.lock:
+            self._ensure_loaded()
+            index = self._index(question_type)
+            if index is None:
+                return []
+            return [(score, index.payloads[slot]) for score, slot in index.query(vector, k)]
+
+    def find_questions(self, job_description: str, question_type: str):
+        """
+        A question set generated for a similar enough job description.
+
+        Returns:
+            list: A list of question strings, or None if no indexed description is similar enough,
+                  or the hit falls through to generate another set for it.
+        """
+        matches = self.nearest(job_description, question_type, k=1)
+        hit = bool(matches) and matches[0][0] >= self.min_similarity
+        if hit:
+            sets = matches[0][1]["question_sets"]
+            hit = len(sets) >= self.sets_per_entry or self.rng.random() >= self.refresh_probability
+        record_cache("jd_index", hit=hit)
+        if not hit:
+            return None
+        return list(self.rng.choice(sets))
+
+    def add(self, job_description: str, question_type: str, questions: list):
+        """Index a job description with a question set generated for it."""
+        if not any(questions) or _type_key(question_type) not in self.question_types:
+            return
+        vector = embed(job_description, self.dim)
+        if not vector.any():
+            return
+        with self.lock:
+            self._ensure_loaded()
+            index = self._index(question_type, create=True)
+            matches = index.query(vector, 1)
+            if matches and matches[0][0] >= 0.999:
+                # The same description again: keep another set for variety instead of a new entry.
+                sets = index.payloads[matches[0][1]]["question_sets"]
+                sets.append(list(questions))
+                del sets[:-self.sets_per_entry]
+            else:
+                index.insert(vector, {"job_description": job_description, "question_sets": [list(questions)]})
+            self.unsaved += 1
+            save = self.path and self.unsaved >= self.snapshot_every and not self._saving()
+            if save:
+                self.save_thread = threading.Thread(target=self._save_in_background, name="jd-index-snapshot",
+                                                    daemon=True)
+        if save:
+            self.save_thread.start()
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def _saving(self) -> bool:
+        return self.save_thread is not None and self.save_thread.is_alive()
+
+    def _save_in_background(self):
+        try:
+            self.save()
+        except OSError as e:
+            logger.warning("could not save job description index snapshot", extra={"error": str(e)})
+
+    def save(self, path: str = None):
+        """Write all indexes to an .npz snapshot, atomically replacing the previous one."""
+        path = path or self.path
+        if not path:
+            return
+        with self.lock:
+            # Copies, so requests keep inserting while the file is written.
+            arrays = {}
+            meta = {"version": SNAPSHOT_VERSION, "dim": self.dim, "types": {}}
+            for n, (question_type, index) in enumerate(self.indexes.items()):
+                arrays[f"vectors_{n}"] = index.vectors[:len(index)].copy()
+                meta["types"][str(n)] = {
+                    "question_type": question_type,
+                    "payloads": index.payloads,
+                    "next_slot": index.next_slot,
+                }
+            meta = json.dumps(meta)
+            self.unsaved = 0
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp_path, meta=np.array(meta), **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """Replace the indexes with a snapshot; a snapshot of another version or dimension is ignored."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != SNAPSHOT_VERSION or meta.get("dim") != self.dim:
+                    logger.warning("ignoring incompatible job description index snapshot", extra={"path": path})
+                    return
+                indexes = {}
+                for n, entry in meta["types"].items():
+                    if entry["question_type"] not in self.question_types:
+                        continue
+                    vectors = data[f"vectors_{n}"]
+                    index = VectorIndex(self.dim, self.max_entries, capacity=max(16, len(vectors)))
+                    for vector, payload in zip(vectors[:self.max_entries], entry["payloads"]):
+                        index.insert(vector, payload)
+                    index.next_slot = entry["next_slot"] % self.max_entries
+                    indexes[entry["question_type"]] = index
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("could not load job description index snapshot", extra={"path": path, "error": str(e)})
+            return
+        self.indexes = indexes
+        logger.info("job description index loaded", extra={"path": path, "entries": sum(map(len, indexes.values()))})
+
+
+JD_INDEX_ENABLED = os.getenv("JD_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+jd_index = JobDescriptionIndex.from_env()
+
+
+@atexit.register
+def _save_on_exit():
+    if jd_index.save_thread is not None:
+        jd_index.save_thread.join()
+    if jd_index.unsaved:
+        try:
+            jd_index.save()
+        except OSError as e:
+            logger.warning("could not save job description index snapshot", extra={"error": str(e)})
@@ -0,0 +1,200 @@
+"""Leaderboards over XP and per-dimension average scores.
+
+Each board keeps an in-process top-N that is loaded from the indexed score column
+and updated incrementally from the write path once its transaction commits, so the
+top of a board is served without touching the database: O(log N) per lookup or update.
+
+The rank of a user outside the top-N is one index-only range count on the same column.
+A B-tree count visits every entry it counts, so this is O(log n + r) for r users ranked
+above, not O(log n); it reads index pages only, but costs most for users near the bottom.
+"""
+import logging
+import os
+import time
+import threading
+from bisect import bisect_left, insort
+from app.db.crud import get_top_user_scores, get_user_score, count_users_above_score
+from app.services.utils import with_db_session
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Public dimension name -> indexed users column.
+LEADERBOARD_DIMENSIONS = {
+    "xp": "xp",
+    "clarity": "avg_clarity",
+    "relevance": "avg_relevance",
+    "keyword": "avg_keyword",
+    "confidence": "avg_confidence",
+    "conciseness": "avg_conciseness",
+    "overall": "avg_overall",
+}
+
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+# Other workers update their own copies, so every board is reloaded at least this often.
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "60"))
+
+
+class TopN:
+    """
+    A bounded, sorted top-N of (user_id, score).
+    Entries are kept as (-score, user_id) so that the list sorts best first.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.entries = []
+        self.scores = {}
+        # True when the table may hold more users than are kept here.
+        self.truncated = False
+        self.stale = True
+        self.loaded_at = 0.0
+
+    def load(self, rows):
+        self.entries = sorted((-float(score or 0), user_id) for user_id, score in rows)
+        self.scores = {user_id: -neg for neg, user_id in self.entries}
+        self.truncated = len(self.entries) >= self.size
+        self.stale = False
+        self.loaded_at = time.monotonic()
+
+    def update(self, user_id: str, score: float):
+        score = float(score or 0)
+        old = self.scores.get(user_id)
+        if old is not None:
+            if old == score:
+                return
+            self.entries.pop(bisect_left(self.entries, (-old, user_id)))
+            del self.scores[user_id]
+            if score < old and self.truncated:
+                # A user outside the top-N may now rank higher; reload on next read.
+                self.stale = True
+        elif self.truncated and len(self.entries) >= self.size and (-score, user_id) >= self.entries[-1]:
+            return
+        insort(self.entries, (-score, user_id))
+        self.scores[user_id] = score
+        if len(self.entries) > self.size:
+            _, evicted = self.entries.pop()
+            del self.scores[evicted]
+            self.truncated = True
+
+    def top(self, limit: int):
+        return [(user_id, -neg) for neg, user_id in self.entries[:limit]]
+
+    def rank(self, user_id: str):
+        """Competition rank (ties share a rank), or None if the user is not kept here."""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return bisect_left(self.entries, (-score, "")) + 1
+
+
+class Leaderboard:
+    """Top-N boards for all dimensions, refreshed from the database when stale or expired."""
+    def __init__(self, size: int = LEADERBOARD_SIZE, refresh_seconds: float = LEADERBOARD_REFRESH_SECONDS):
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self.boards = {name: TopN(size) for name in LEADERBOARD_DIMENSIONS}
+        self.lock = threading.Lock()
+
+    def _board(self, dimension: str, db):
+        board = self.boards[dimension]
+        expired = time.monotonic() - board.loaded_at > self.refresh_seconds
+        record_cache("leaderboard", hit=not (board.stale or expired))
+        if board.stale or expired:
+            rows = get_top_user_scores(LEADERBOARD_DIMENSIONS[dimension], self.size, db)
+            board.load(rows)
+        return board
+
+    def top(self, dimension: str, limit: int, db):
+        with self.lock:
+            return self._board(dimension, db).top(limit)
+
+    def rank(self, dimension: str, user_id: str, db):
+        """Return (rank, score) of a user, or None if the user does not exist."""
+        with self.lock:
+            board = self._board(dimension, db)
+            rank = board.rank(user_id)
+            if rank is not None:
+                return rank, board.scores[user_id]
+        column = LEADERBOARD_DIMENSIONS[dimension]
+        score = get_user_score(user_id, column, db)
+        if score is None:
+            return None
+        return count_users_above_score(column, score, db) + 1, score
+
+    def record(self, user):
+        """Feed a committed user row into every board."""
+        self.record_scores(*board_scores(user))
+
+    def record_scores(self, user_id: str, scores: dict):
+        """Feed the board_scores of a user, taken before its transaction committed, into every board."""
+        with self.lock:
+            for dimension, score in scores.items():
+                board = self.boards[dimension]
+                if not board.stale:
+                    board.update(user_id, score)
+
+    def invalidate(self):
+        with self.lock:
+            for board in self.boards.values():
+                board.stale = True
+
+
+def board_scores(user) -> tuple:
+    """(user_id, {dimension: score}) of a user row, to record once the row is committed."""
+    return user.user_id, {dimension: getattr(user, column) for dimension, column in LEADERBOARD_DIMENSIONS.items()}
+
+
+leaderboard = Leaderboard()
+
+
+def _check_dimension(dimension: str):
+    if dimension not in LEADERBOARD_DIMENSIONS:
+        raise ValueError(f"Unknown leaderboard dimension: {dimension}")
+
+
+@with_db_session
+def get_leaderboard(dimension: str = "xp", limit: int = 10, db = None):
+    """
+    Get the best users of one leaderboard dimension.
+
+    Args:
+        dimension: A string of dimension, one of LEADERBOARD_DIMENSIONS.
+        limit: A int of number of entries, at most LEADERBOARD_SIZE.
+        db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
+
+    Returns:
+        dict: A dict of dimension and a list of ranked entries.
+    """
+    _check_dimension(dimension)
+    limit = max(1, min(limit, leaderboard.size))
+    entries = []
+    for user_id, score in leaderboard.top(dimension, limit, db):
+        if entries and score == entries[-1]["score"]:
+            rank = entries[-1]["rank"]
+        else:
+            rank = len(entries) + 1
+        entries.append({"rank": rank, "user_id": user_id, "score": score})
+    return {"dimension": dimension, "entries": entries}
+
+
+@with_db_session
+def get_user_rank(user_id: str, dimension: str = "xp", db = None):
+    """
+    Get the rank of the current user on one leaderboard dimension.
+
+    Args:
+        user_id: A string of user id.
+        dimension: A string of dimension, one of LEADERBOARD_DIMENSIONS.
+        db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
+
+    Returns:
+        dict: A dict of user_id, dimension, score and rank.
+        None: If user not in database.
+    """
+    _check_dimension(dimension)
+    found = leaderboard.rank(dimension, user_id, db)
+    if found is None:
+        logger.warning("user does not exist", extra={"user_id": user_id})
+        return None
+    rank, score = found
+    return {"user_id": user_id, "dimension": dimension, "score": score, "rank": rank}
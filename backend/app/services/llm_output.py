@@ -0,0 +1,268 @@
+# app/services/llm_output.py
+"""Parsing of GPT replies into the structures the services store.
+
+Replies are meant to be bare JSON (feedback) or "@"-separated text (questions), but arrive
+wrapped in markdown fences, quoted as a JSON string, inside an {"answer": ...} envelope,
+with trailing commas, smart quotes or Python literals. Every fix is tried in order of cost:
+    fast       the whole reply is valid JSON (one json.loads)
+    fenced     the content of a ```json fence is
+    embedded   a JSON value starts somewhere in the reply; candidates are found with
+               str.find and decoded with JSONDecoder.raw_decode, both running in C
+    repaired   a candidate is valid after removing trailing commas and normalizing quotes,
+               or is a Python dict literal
+Outcomes are counted in llm_output_parse_total by kind and outcome.
+
+Feedback rubric fields are coerced to the types the statistics expect: the five
+``*_score`` fields to ints in 1-5 ("4", 4.0, "4/5"), and ``overall_score`` to a float,
+derived from the five scores when it is missing.
+"""
+import re
+import ast
+import json
+import warnings
+from app.core.metrics import registry, Counter
+
+llm_output_parses = registry.register(Counter(
+    "llm_output_parse_total", "Parsed LLM replies by kind and the fix that was needed.", ("kind", "outcome")))
+
+RUBRIC_SCORES = ("clarity_structure_score", "relevance_score", "keyword_alignment_score", "confidence_score",
+                 "conciseness_score")
+OVERALL_SCORE = "overall_score"
+MAX_CANDIDATES = 64  # embedded JSON start positions tried per reply
+MAX_REPAIR_ENDS = 8  # closing brackets tried per start position when repairing
+
+_decoder = json.JSONDecoder()
+_FENCE = re.compile(r"```[ \t]*([a-zA-Z0-9_-]*)[ \t]*\n?(.*?)(?:```|\Z)", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+_SCORE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _loads(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _repair(text: str):
+    """Decode JSON with trailing commas or smart quotes, or a Python dict literal."""
+    fixed = _TRAILING_COMMA.sub(r"\1", text.translate(_SMART_QUOTES))
+    value = _loads(fixed)
+    if value is None and fixed.lstrip().startswith("{"):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")  # invalid escape sequences in the reply
+                value = ast.literal_eval(fixed)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            value = None
+    return value
+
+
+def _scan(text: str, opener: str, repair: bool = False):
+    """The first JSON value starting with ``opener`` that decodes, scanning left to right."""
+    start = text.find(opener)
+    tried = 0
+    while start != -1 and tried < MAX_CANDIDATES:
+        tried += 1
+        try:
+            return _decoder.raw_decode(text, start)[0]
+        except ValueError:
+            if repair:
+                closer = "}" if opener == "{" else "]"
+                end = text.rfind(closer)
+                for _ in range(MAX_REPAIR_ENDS):
+                    if end <= start:
+                        break
+                    value = _repair(text[start:end + 1])
+                    if value is not None:
+                        return value
+                    end = text.rfind(closer, start, end)
+        start = text.find(opener, start + 1)
+    return None
+
+
+def _unquote(value):
+    # A reply quoted as a JSON string, e.g. "\"{\\\"a\\\": 1}\"", is decoded once more.
+    if isinstance(value, str):
+        inner = value.strip()
+        if inner[:1] in "{[":
+            decoded = _loads(inner)
+            if decoded is not None:
+                return decoded
+    return value
+
+
+def _find(text: str, opener: str, accept):
+    """Decode the reply with the cheapest fix that yields an accepted value, as (value, outcome)."""
+    if not text or not text.strip():
+        return None, "empty"
+    stripped = text.strip()
+    value = _unquote(_loads(stripped))
+    if accept(value):
+        return value, "fast"
+    for match in _FENCE.finditer(stripped):
+        value = _unquote(_loads(match.group(2).strip()))
+        if accept(value):
+            return value, "fenced"
+    value = _scan(stripped, opener)
+    if accept(value):
+        return value, "embedded"
+    fenced = [m.group(2) for m in _FENCE.finditer(stripped)]
+    for candidate in fenced + [stripped]:
+        value = _scan(candidate, opener, repair=True)
+        if accept(value):
+            return value, "repaired"
+    return None, "failed"
+
+
+def find_json_object(text: str):
+    """
+    The first JSON object in an LLM reply.
+
+    Args:
+        text: A string of LLM reply.
+
+    Returns:
+        dict: The decoded object, or None if the reply holds none.
+    """
+    value, _ = _find(text, "{", lambda v: isinstance(v, dict))
+    return value
+
+
+def _coerce_score(value, low: float, high: float, integer: bool):
+    kind = type(value)
+    if kind is (int if integer else float) and low <= value <= high:
+        return value  # already well typed, the usual case
+    if kind is bool or value is None:
+        return None
+    if isinstance(value, str):
+        match = _SCORE.search(value)
+        if not match:
+            return None
+        value = match.group(0)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != number:  # NaN
+        return None
+    number = min(float(high), max(float(low), number))
+    return int(round(number)) if integer else round(number, 2)
+
+
+def coerce_feedback(feedback: dict) -> dict:
+    """
+    Type the rubric fields of a feedback object; other fields are kept as they are.
+
+    Args:
+        feedback: A dict of decoded LLM feedback.
+
+    Returns:
+        dict: A new dict with int ``*_score`` fields in 1-5 and a float overall_score.
+              A score that cannot be read is dropped.
+    """
+    result = {}
+    for key, value in feedback.items():
+        key = key.strip() if isinstance(key, str) else key
+        if key in RUBRIC_SCORES:
+            value = _coerce_score(value, 1, 5, integer=True)
+        elif key == OVERALL_SCORE:
+            value = _coerce_score(value, 0, 5, integer=False)
+        elif isinstance(value, str):
+            value = value.strip()
+        if value is not None:
+            result[key] = value
+    if OVERALL_SCORE not in result and all(k in result for k in RUBRIC_SCORES):
+        result[OVERALL_SCORE] = round(sum(result[k] for k in RUBRIC_SCORES) / len(RUBRIC_SCORES), 2)
+    return result
+
+
+def _looks_like_feedback(value) -> bool:
+    return isinstance(value, dict) and any(k in value for k in RUBRIC_SCORES + (OVERALL_SCORE,))
+
+
+def parse_feedback(text: str):
+    """
+    Parse an LLM feedback reply.
+
+    Args:
+        text: A string of LLM reply to build_feedback_prompt.
+
+    Returns:
+        dict: The coerced feedback, or None if the reply holds no feedback object.
+    """
+    value, outcome = _find(text, "{", lambda v: isinstance(v, dict))
+    if isinstance(value, dict) and not _looks_like_feedback(value):
+        # An envelope such as {"answer": "<feedback json>"}.
+        for inner in value.values():
+            if isinstance(inner, str):
+                nested, _ = _find(inner, "{", _looks_like_feedback)
+                if nested is not None:
+                    value = nested
+                    break
+            elif _looks_like_feedback(inner):
+                value = inner
+                break
+    llm_output_parses.inc(kind="feedback", outcome=outcome)
+    return coerce_feedback(value) if isinstance(value, dict) else None
+
+
+def unwrap_answer(text: str) -> str:
+    """The text of an {"answer": ...} envelope or of a JSON string, else the text itself."""
+    if not text:
+        return ""
+    parsed = _loads(text)
+    if isinstance(parsed, dict) and "answer" in parsed:
+        inner = parsed.get("answer")
+        return inner if isinstance(inner, str) else json.dumps(inner, ensure_ascii=False)
+    if isinstance(parsed, str):
+        return parsed
+    return text
+
+
+def split_numbered_items(text: str) -> list:
+    """Items of a numbered list, or the non-empty lines when the text is not numbered."""
+    if not text:
+        return []
+    parts = re.split(r'(?:^|\n)\s*\d+\.\s*', text.strip())
+    parts = [p.strip() for p in parts if p and p.strip()]
+    if len(parts) > 1:
+        return parts
+    return [ln.strip() for ln in text.splitlines() if ln.strip()]
+
+
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def parse_question_list(text: str, minimum: int = 3) -> list:
+    """
+    Parse an LLM reply to build_question_prompt into question strings.
+    Accepts "@"-separated text, a JSON list (fenced or not), numbered or bulleted lines.
+
+    Args:
+        text: A string of LLM reply.
+        minimum: A int of list length; shorter lists are padded with empty strings.
+
+    Returns:
+        list: A list of question strings.
+    """
+    raw = unwrap_answer((text or "").strip()).strip()
+    items, outcome = None, "text"
+    if raw[:3] == "```" or raw[:1] == "[":
+        value, outcome = _find(raw, "[", lambda v: isinstance(v, list) and all(isinstance(i, str) for i in v))
+        if value is not None:
+            items = [i.strip() for i in value if i.strip()]
+        else:
+            raw = _FENCE.sub(lambda m: m.group(2), raw).strip()
+    if items is None:
+        if "@" in raw:
+            items = [p.strip() for p in raw.split("@") if p and p.strip()]
+        else:
+            items = [_BULLET.sub("", p).strip() for p in split_numbered_items(raw)]
+            items = [i for i in items if i]
+        outcome = "text"
+    llm_output_parses.inc(kind="questions", outcome=outcome)
+    while len(items) < minimum:
+        items.append("")
+    return items
@@ -0,0 +1,111 @@
+"""Global percentiles of users' average scores.
+
+Every dimension keeps a histogram of user averages over fixed score bins in the
+score_histograms table. The question event projector moves a user between bins, and a
+percentile lookup reads the bins once, so it is O(bins) with no scan of users.
+
+Usage:
+    python -m app.services.percentile_service    # Rebuild all histograms from the users table
+
+The rebuild is a repair, run by hand (or by manage_docker.py init_db) while no projector is
+applying events; it is not part of the container start, since it scans every user and would
+race with the live projector. A projector rebuild also rebuilds the histograms.
+"""
+from array import array
+from app.db.crud import get_score_histograms, replace_score_histogram
+from app.db.models import User, SCORE_HISTOGRAM_DIMENSIONS, SCORE_HISTOGRAM_BINS, SCORE_HISTOGRAM_MAX
+from app.services.utils import with_db_session
+
+
+def score_bin(score: float) -> int:
+    """Map an average score to its bin index, clamping to the histogram range."""
+    index = int(float(score or 0.0) / SCORE_HISTOGRAM_MAX * SCORE_HISTOGRAM_BINS)
+    return max(0, min(index, SCORE_HISTOGRAM_BINS - 1))
+
+
+def user_averages(user) -> dict:
+    """Return {dimension: average} of a user, or None if the user has no answered questions."""
+    total_questions = int(user.total_questions or 0)
+    if total_questions < 1:
+        return None
+    return {d: float(getattr(user, f"total_{d}") or 0) / total_questions for d in SCORE_HISTOGRAM_DIMENSIONS}
+
+
+def percentile(counts, score: float) -> float:
+    """
+    Percentage of users scoring below the score, counting half of its own bin.
+
+    Args:
+        counts: A sequence of user counts per bin.
+        score: A float of average score.
+
+    Returns:
+        float: A float between 0 and 100.
+        None: If the histogram is empty.
+    """
+    total = sum(counts)
+    if total <= 0:
+        return None
+    index = score_bin(score)
+    below = sum(counts[:index])
+    return round((below + counts[index] / 2) * 100.0 / total, 1)
+
+
+def score_changes(old_averages: dict, new_averages: dict) -> list:
+    """
+    The histogram moves of a user whose averages changed.
+
+    Args:
+        old_averages: A dict of averages before the update, None if the user had no questions.
+        new_averages: A dict of averages after the update.
+
+    Returns:
+        list: A list of (dimension, old_bin, new_bin) for the dimensions whose bin changed.
+    """
+    changes = []
+    for dimension in SCORE_HISTOGRAM_DIMENSIONS:
+        new_bin = score_bin(new_averages[dimension])
+        old_bin = score_bin(old_averages[dimension]) if old_averages else None
+        if old_bin != new_bin:
+            changes.append((dimension, old_bin, new_bin))
+    return changes
+
+
+def get_user_percentiles(averages: dict, db = None) -> dict:
+    """
+    Look up the percentile of each average.
+
+    Args:
+        averages: A dict of {dimension: average}, None if the user has no questions.
+        db: The active SQLAlchemy database session.
+
+    Returns:
+        dict: A dict of {dimension: percentile or None}.
+    """
+    if not averages:
+        return {d: None for d in SCORE_HISTOGRAM_DIMENSIONS}
+    histograms = {d: array("q", counts) for d, counts in get_score_histograms(db).items()}
+    return {d: percentile(histograms.get(d, ()), averages[d]) for d in SCORE_HISTOGRAM_DIMENSIONS}
+
+
+@with_db_session
+def rebuild_score_histograms(db = None):
+    """
+    Recount every histogram from the users table.
+    Run once after the table is introduced, or to repair drift.
+    """
+    histograms = {d: array("q", [0] * SCORE_HISTOGRAM_BINS) for d in SCORE_HISTOGRAM_DIMENSIONS}
+    columns = [User.total_questions] + [getattr(User, f"total_{d}") for d in SCORE_HISTOGRAM_DIMENSIONS]
+    rows = db.query(*columns).filter(User.total_questions > 0).yield_per(1000)
+    for total_questions, *totals in rows:
+        for dimension, total in zip(SCORE_HISTOGRAM_DIMENSIONS, totals):
+            histograms[dimension][score_bin(float(total or 0) / total_questions)] += 1
+    for dimension, counts in histograms.items():
+        replace_score_histogram(dimension, list(counts), db)
+    return {d: sum(counts) for d, counts in histograms.items()}
+
+
+if __name__ == "__main__":
+    print("Rebuilding score histograms...")
+    users = rebuild_score_histograms()
+    print(f"Score histograms rebuilt: {users}")
@@ -0,0 +1,393 @@
+"""Projection of question events onto user aggregates and badges.
+
+The feedback write path no longer updates the ~15 counters of a user and evaluates badges
+in the request: save_question inserts the question with one question_events row, and the
+projector applies the log in batches:
+    - aggregate deltas: total_questions, XP, the per-dimension totals, averages and maxima
+    - streaks: the day of each answer counts as an active day (same rule as login)
+    - badges: evaluated once per user per batch and unlocked in bulk, time-of-day badges
+      against the local hour of the answers
+    - score histogram moves in one executemany, leaderboard updates after commit
+A batch and the move of its checkpoint in projector_checkpoints commit in one transaction.
+The checkpoint moves with a conditional UPDATE, so when several workers project at once
+only one applies a batch and the others roll back: every event is applied exactly once.
+Event ids are handed out before their transactions commit, so a batch stops at a gap in
+the ids until the gap is PROJECTOR_GAP_TIMEOUT_SECONDS old (then it was a rollback).
+
+Aggregates are repairable: rebuild() recomputes every user's question aggregates from the
+log, after backfilling events for questions saved before the log existed.
+
+Configured from the environment (defaults in parentheses):
+    PROJECTOR_MODE                  "thread" (default) runs in a daemon thread of each worker,
+                                    woken by every insert; "inline" projects right after the
+                                    insert, in the request (default under TESTING=1);
+                                    "external" leaves it to `python -m app.services.projector run`
+    PROJECTOR_BATCH_SIZE (500), PROJECTOR_INTERVAL_SECONDS (1.0), PROJECTOR_GAP_TIMEOUT_SECONDS (10)
+
+Usage:
+    python -m app.services.projector run        # Apply pending events until caught up
+    python -m app.services.projector rebuild    # Backfill events and rebuild all aggregates
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from datetime import date, datetime
+from app.core.metrics import registry, Counter, Gauge
+from app.db import crud
+from app.db.db_config import SessionLocal
+from app.db.models import QuestionEvent, ProjectorCheckpoint, User, UserBadge, current_millis
+from app.services import badge_service
+from app.services.leaderboard_service import leaderboard, board_scores
+from app.services.percentile_service import user_averages, score_changes, rebuild_score_histograms
+from app.services.user_service import active_day_changes
+
+logger = logging.getLogger(__name__)
+
+PROJECTOR_NAME = "user_aggregates"
+# (event column, feedback key); the User columns are total_<column>, avg_<column> and max_<column>.
+SCORE_FIELDS = (
+    ("clarity", "clarity_structure_score"),
+    ("relevance", "relevance_score"),
+    ("keyword", "keyword_alignment_score"),
+    ("confidence", "confidence_score"),
+    ("conciseness", "conciseness_score"),
+    ("overall", "overall_score"),
+)
+
+projected_events = registry.register(Counter(
+    "projector_events_total", "Question events applied to user aggregates.", ()))
+projector_conflicts = registry.register(Counter(
+    "projector_conflicts_total", "Batches rolled back because another projector moved the checkpoint first.", ()))
+
+
+def question_event(user_id: str, question, feedback: dict) -> QuestionEvent:
+    """
+    The event of an answered question.
+
+    Args:
+        user_id: A string of user id.
+        question: A SQLAlchemy entry of question.
+        feedback: A dict of feedback of the answer, including scores.
+
+    Returns:
+        QuestionEvent: A new, unsaved event.
+    """
+    feedback = feedback or {}
+    scores = {column: feedback.get(key) or 0 for column, key in SCORE_FIELDS}
+    return QuestionEvent(
+        user_id=user_id,
+        question_id=question.question_id,
+        interview_id=question.interview_id,
+        created_at=question.timestamp or current_millis(),
+        **{column: int(value) if column != "overall" else float(value) for column, value in scores.items()},
+    )
+
+
+def _event_day(event) -> date:
+    return datetime.fromtimestamp(event.created_at / 1000).date()
+
+
+def _event_hour(event) -> int:
+    return datetime.fromtimestamp(event.created_at / 1000).hour
+
+
+def apply_event(user: User, event) -> None:
+    """Add one answered question to a user's aggregates and streak, in place."""
+    total_questions = (user.total_questions or 0) + 1
+    user.total_questions = total_questions
+    user.xp = (user.xp or 0) + int(event.overall * 2)
+    for column, _ in SCORE_FIELDS:
+        score = getattr(event, column)
+        total = (getattr(user, f"total_{column}") or 0) + score
+        setattr(user, f"total_{column}", total)
+        setattr(user, f"avg_{column}", total / total_questions)
+        if score > (getattr(user, f"max_{column}") or 0):
+            setattr(user, f"max_{column}", score)
+    for key, value in (active_day_changes(user, _event_day(event)) or {}).items():
+        setattr(user, key, value)
+
+
+class Projector:
+    """Applies the question event log to users, in checkpointed batches."""
+    def __init__(self, mode: str = "thread", batch_size: int = 500, interval: float = 1.0,
+                 gap_timeout: float = 10.0, name: str = PROJECTOR_NAME):
+        if mode not in ("thread", "inline", "external"):
+            raise ValueError(f"Invalid PROJECTOR_MODE: {mode}")
+        self.mode = mode
+        self.batch_size = batch_size
+        self.interval = interval
+        self.gap_timeout = gap_timeout
+        self.name = name
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.listeners = []
+
+    @classmethod
+    def from_env(cls):
+        default_mode = "inline" if os.getenv("TESTING") == "1" else "thread"
+        return cls(
+            mode=os.getenv("PROJECTOR_MODE", default_mode).lower(),
+            batch_size=int(os.getenv("PROJECTOR_BATCH_SIZE", "500")),
+            interval=float(os.getenv("PROJECTOR_INTERVAL_SECONDS", "1.0")),
+            gap_timeout=float(os.getenv("PROJECTOR_GAP_TIMEOUT_SECONDS", "10")),
+        )
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+    def notify(self):
+        """Called after an event is committed."""
+        if self.mode == "inline":
+            self.run_until_caught_up()
+        elif self.mode == "thread":
+            self.start()
+            self.wake.set()
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            try:
+                self.run_until_caught_up()
+            except Exception as e:
+                logger.warning("question event projection failed", extra={"error": str(e)})
+
+    def start(self):
+        """Project from a daemon thread; safe to call more than once."""
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._loop, name="question-event-projector", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+
+    def subscribe(self, listener):
+        """
+        Call ``listener({user_id: [badge dicts]})`` after each batch that unlocked badges.
+        Runs on the projecting thread; only batches applied by this process are seen.
+        """
+        self.listeners.append(listener)
+        return listener
+
+    def _publish(self, unlocked: dict):
+        for listener in list(self.listeners):
+            try:
+                listener(unlocked)
+            except Exception as e:
+                logger.warning("badge unlock listener failed", extra={"error": str(e)})
+
+    # ------------------------------------------------------------------
+    # Projection
+    # ------------------------------------------------------------------
+    def _committed_prefix(self, events: list, last_event_id: int) -> list:
+        """The events up to the first gap in their ids that may still be filled by a commit in flight."""
+        expected = last_event_id + 1
+        now = current_millis()
+        for index, event in enumerate(events):
+            if event.event_id != expected and now - event.created_at < self.gap_timeout * 1000:
+                return events[:index]
+            expected = event.event_id + 1
+        return events
+
+    def _apply_batch(self, db):
+        """Apply the next batch in ``db`` without committing; (events, users, unlocked), or None on a conflict."""
+        last_event_id = crud.get_projector_checkpoint(self.name, db=db)
+        events = self._committed_prefix(crud.get_question_events_after(last_event_id, self.batch_size, db=db),
+                                        last_event_id)
+        if not events:
+            return [], [], {}
+        if not crud.advance_projector_checkpoint(self.name, last_event_id, events[-1].event_id, db=db):
+            return None
+
+        by_user = {}
+        for event in events:
+            by_user.setdefault(event.user_id, []).append(event)
+        users = crud.get_users_by_ids(by_user, db=db)
+        badges = badge_service.known_badges(crud.get_all_badges(db))
+        unlocked = crud.get_unlocked_badge_ids(by_user, db=db) if badges else {}
+        histogram_changes = []
+        unlocked_now = {}
+        now = current_millis()
+        for user in users:
+            user_events = by_user.pop(user.user_id)
+            old_averages = user_averages(user)
+            for event in user_events:
+                apply_event(user, event)
+            histogram_changes.extend(score_changes(old_averages, user_averages(user)))
+            hours = {_event_hour(event) for event in user_events}
+            new_badges = badge_service.badges_to_unlock(user, badges, unlocked.get(user.user_id, set()), hours)
+            if new_badges:
+                db.add_all([UserBadge(user_id=user.user_id, badge_id=b.badge_id, unlocked_timestamp=now)
+                            for b in new_badges])
+                user.total_badges = (user.total_badges or 0) + len(new_badges)
+                unlocked_now[user.user_id] = [
+                    {"badge_id": b.badge_id, "name": b.name, "description": b.description} for b in new_badges
+                ]
+                logger.info("badges unlocked", extra={"user_id": user.user_id, "badges": [b.name for b in new_badges]})
+        if by_user:
+            logger.warning("question events of unknown users skipped", extra={"user_ids": list(by_user)})
+        if histogram_changes:
+            crud.shift_score_histograms(histogram_changes, db, commit=False)
+        return events, users, unlocked_now
+
+    def run_once(self) -> int:
+        """
+        Apply one batch of events.
+
+        Returns:
+            int: The number of events applied; 0 when caught up or another projector took the batch.
+        """
+        with SessionLocal() as db:
+            try:
+                batch = self._apply_batch(db)
+                if batch is None:
+                    db.rollback()
+                    projector_conflicts.inc()
+                    return 0
+                events, users, unlocked = batch
+                db.flush()
+                scores = [board_scores(user) for user in users]  # read before commit expires the rows
+                db.commit()  # also keeps a newly created checkpoint when there was nothing to apply
+            except Exception:
+                db.rollback()
+                raise
+        # Only committed scores reach the boards, so a rollback never leaves them ahead of the table.
+        for user_id, user_scores in scores:
+            leaderboard.record_scores(user_id, user_scores)
+        projected_events.inc(len(events))
+        if unlocked and self.listeners:
+            self._publish(unlocked)
+        return len(events)
+
+    def run_until_caught_up(self, max_batches: int = 1000) -> int:
+        """Apply batches until no event is pending; returns the number of events applied."""
+        total = 0
+        for _ in range(max_batches):
+            applied = self.run_once()
+            total += applied
+            if applied < self.batch_size:  # caught up, stopped at a gap, or lost the batch to another projector
+                break
+        return total
+
+    def lag(self) -> int:
+        """Events in the log not applied yet."""
+        with SessionLocal() as db:
+            return crud.get_max_question_event_id(db) - crud.get_projector_checkpoint(self.name, db=db)
+
+    # ------------------------------------------------------------------
+    # Repair
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _backfill(db) -> int:
+        rows = crud.get_questions_without_event(db)
+        db.add_all([
+            question_event(user_id, _QuestionRow(question_id, interview_id, timestamp), feedback)
+            for question_id, interview_id, user_id, feedback, timestamp in rows
+        ])
+        return len(rows)
+
+    def rebuild(self, backfill: bool = True) -> dict:
+        """
+        Recompute every user's question aggregates from the event log.
+        Totals, averages, maxima, total_questions and XP (5 per active day plus the answers' XP)
+        are overwritten, missing badges are unlocked, and the histograms are recounted.
+        Active-day streaks, kept by logins as well, are left as they are.
+
+        Args:
+            backfill: A bool; when True, events are first written for questions saved before the log.
+
+        Returns:
+            dict: Counts of "backfilled" events, "events" replayed and "users" rewritten.
+        """
+        with SessionLocal() as db:
+            try:
+                # Blocks live projectors (on PostgreSQL) until the rebuild commits; they then roll back.
+                crud.get_projector_checkpoint(self.name, lock=True, db=db)
+                backfilled = self._backfill(db) if backfill else 0
+                db.flush()
+                up_to = crud.get_max_question_event_id(db)
+
+                totals = {}
+                events = 0
+                for event in crud.iter_question_events(up_to, db=db):
+                    events += 1
+                    entry = totals.setdefault(event.user_id, {"questions": 0, "xp": 0, "hours": set()})
+                    entry["questions"] += 1
+                    entry["xp"] += int(event.overall * 2)
+                    entry["hours"].add(_event_hour(event))
+                    for column, _ in SCORE_FIELDS:
+                        score = getattr(event, column)
+                        entry[f"total_{column}"] = entry.get(f"total_{column}", 0) + score
+                        entry[f"max_{column}"] = max(entry.get(f"max_{column}", 0), score)
+
+                users = db.query(User).all()
+                badges = badge_service.known_badges(crud.get_all_badges(db))
+                unlocked = crud.get_unlocked_badge_ids([u.user_id for u in users], db=db)
+                now = current_millis()
+                for user in users:
+                    entry = totals.get(user.user_id, {"questions": 0, "xp": 0, "hours": set()})
+                    questions = entry["questions"]
+                    user.total_questions = questions
+                    user.xp = 5 * (user.total_active_days or 0) + entry["xp"]
+                    for column, _ in SCORE_FIELDS:
+                        total = entry.get(f"total_{column}", 0)
+                        setattr(user, f"total_{column}", total)
+                        setattr(user, f"avg_{column}", total / questions if questions else 0.0)
+                        setattr(user, f"max_{column}", entry.get(f"max_{column}", 0))
+                    new_badges = badge_service.badges_to_unlock(user, badges, unlocked[user.user_id], entry["hours"])
+                    db.add_all([UserBadge(user_id=user.user_id, badge_id=b.badge_id, unlocked_timestamp=now)
+                                for b in new_badges])
+                    user.total_badges = len(unlocked[user.user_id]) + len(new_badges)
+                db.query(ProjectorCheckpoint).filter(ProjectorCheckpoint.name == self.name).update(
+                    {"last_event_id": up_to, "updated_at": now})
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        rebuild_score_histograms()
+        leaderboard.invalidate()
+        logger.info("user aggregates rebuilt", extra={"backfilled": backfilled, "events": events, "users": len(users)})
+        return {"backfilled": backfilled, "events": events, "users": len(users)}
+
+
+class _QuestionRow:
+    """The question fields an event is built from, for rows read without the ORM."""
+    def __init__(self, question_id, interview_id, timestamp):
+        self.question_id = question_id
+        self.interview_id = interview_id
+        self.timestamp = timestamp
+
+
+projector = Projector.from_env()
+
+registry.register(Gauge("projector_lag_events", "Question events not yet applied to user aggregates.", (),
+                        lambda: {(): _lag()}))
+
+
+def _lag() -> int:
+    try:
+        return projector.lag()
+    except Exception:
+        return -1
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    if command == "rebuild":
+        print(f"Rebuilt user aggregates: {projector.rebuild()}")
+    elif command == "run":
+        started = time.perf_counter()
+        print(f"Applied {projector.run_until_caught_up(max_batches=sys.maxsize)} question events "
+              f"in {time.perf_counter() - started:.1f}s.")
+    else:
+        print(__doc__)
+        sys.exit(2)
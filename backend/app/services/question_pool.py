@@ -0,0 +1,248 @@
+# app/services/question_pool.py
+"""Pre-generated question sets for popular job descriptions.
+
+Every /interview/start records demand for its normalized (job description, question type)
+key. Demand decays with a half-life, so the hot keys follow what users ask for now. For the
+hottest keys a background thread keeps a few question sets generated ahead of time, and
+interview_start serves one of them instead of waiting for GPT; each set is served once.
+
+The refiller only calls GPT while the llm executor is lightly loaded, so pre-generation
+never competes with live requests, and runs at most QUESTION_POOL_CONCURRENCY calls at once.
+It calls GPT with QUESTION_POOL_GPT_TOKEN (or TEST_JWT), never with a user's token.
+
+Configured from the environment (defaults in parentheses):
+    QUESTION_POOL_ENABLED (false)           Run the background refiller
+    QUESTION_POOL_SIZE (3)                  Sets kept per hot key
+    QUESTION_POOL_HOT_KEYS (20)             Keys kept filled
+    QUESTION_POOL_MIN_DEMAND (3)            Decayed request count that makes a key hot
+    QUESTION_POOL_HALF_LIFE_SECONDS (3600)  Demand half-life
+    QUESTION_POOL_TTL_SECONDS (86400)       Age after which a pooled set is discarded
+    QUESTION_POOL_REFILL_SECONDS (30)       Interval between refill rounds
+    QUESTION_POOL_CONCURRENCY (2)           GPT calls in flight per refill round
+    QUESTION_POOL_MAX_LLM_LOAD (0.5)        Share of busy llm workers above which no refill runs
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from app.core.metrics import record_cache
+from app.core.executors import llm_executor
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_KEYS = 1000
+
+
+def _env_bool(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+def normalize_key(job_description: str, question_type: str) -> tuple:
+    """
+    Reduce a request to its pool key: lower case, single spaces, no surrounding punctuation.
+
+    Args:
+        job_description: A string of job description.
+        question_type: A string of question type.
+
+    Returns:
+        tuple: (normalized job description, normalized question type).
+    """
+    def norm(text):
+        return re.sub(r"\s+", " ", (text or "").lower()).strip(" \t\n.,;:!?\"'")
+    return norm(job_description), norm(question_type)
+
+
+class Demand:
+    """Exponentially decayed request count of one key, with the request it was first seen on."""
+    __slots__ = ("score", "updated", "job_description", "question_type")
+
+    def __init__(self, job_description: str, question_type: str, now: float):
+        self.score = 0.0
+        self.updated = now
+        self.job_description = job_description
+        self.question_type = question_type
+
+    def value(self, now: float, half_life: float) -> float:
+        return self.score * 0.5 ** ((now - self.updated) / half_life)
+
+    def add(self, now: float, half_life: float):
+        self.score = self.value(now, half_life) + 1.0
+        self.updated = now
+
+
+class QuestionPool:
+    """Demand per key and the pre-generated question sets of the hot keys."""
+    def __init__(self, size: int = 3, hot_keys: int = 20, min_demand: float = 3.0, half_life: float = 3600.0,
+                 ttl: float = 86400.0, refill_seconds: float = 30.0, concurrency: int = 2,
+                 max_llm_load: float = 0.5, clock=time.time):
+        self.size = size
+        self.hot_keys = hot_keys
+        self.min_demand = min_demand
+        self.half_life = half_life
+        self.ttl = ttl
+        self.refill_seconds = refill_seconds
+        self.concurrency = concurrency
+        self.max_llm_load = max_llm_load
+        self.clock = clock
+        self.demand = {}
+        self.sets = {}  # key -> deque of (created, questions)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            size=int(os.getenv("QUESTION_POOL_SIZE", "3")),
+            hot_keys=int(os.getenv("QUESTION_POOL_HOT_KEYS", "20")),
+            min_demand=float(os.getenv("QUESTION_POOL_MIN_DEMAND", "3")),
+            half_life=float(os.getenv("QUESTION_POOL_HALF_LIFE_SECONDS", "3600")),
+            ttl=float(os.getenv("QUESTION_POOL_TTL_SECONDS", "86400")),
+            refill_seconds=float(os.getenv("QUESTION_POOL_REFILL_SECONDS", "30")),
+            concurrency=int(os.getenv("QUESTION_POOL_CONCURRENCY", "2")),
+            max_llm_load=float(os.getenv("QUESTION_POOL_MAX_LLM_LOAD", "0.5")),
+        )
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+    def record_demand(self, job_description: str, question_type: str):
+        """Count one request for this key."""
+        key = normalize_key(job_description, question_type)
+        now = self.clock()
+        with self.lock:
+            entry = self.demand.get(key)
+            if entry is None:
+                if len(self.demand) >= MAX_TRACKED_KEYS:
+                    self._forget_coldest(now)
+                entry = self.demand[key] = Demand(job_description, question_type, now)
+            entry.add(now, self.half_life)
+
+    def take(self, job_description: str, question_type: str):
+        """
+        Pop a pre-generated question set for this key.
+
+        Returns:
+            list: A list of question strings, or None if the pool of this key is empty.
+        """
+        key = normalize_key(job_description, question_type)
+        now = self.clock()
+        questions = None
+        with self.lock:
+            sets = self.sets.get(key)
+            while sets:
+                created, candidate = sets.popleft()
+                if now - created <= self.ttl:
+                    questions = candidate
+                    break
+        record_cache("question_pool", hit=questions is not None)
+        return questions
+
+    def _forget_coldest(self, now: float):
+        # Drop the least demanded tenth of the keys, with their pooled sets.
+        ranked = sorted(self.demand, key=lambda k: self.demand[k].value(now, self.half_life))
+        for key in ranked[:max(1, len(ranked) // 10)]:
+            del self.demand[key]
+            self.sets.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # Refill
+    # ------------------------------------------------------------------
+    def hot(self) -> list:
+        """The keys to keep filled, hottest first, as (key, Demand)."""
+        now = self.clock()
+        with self.lock:
+            scored = [(entry.value(now, self.half_life), key, entry) for key, entry in self.demand.items()]
+        scored = [s for s in scored if s[0] >= self.min_demand]
+        scored.sort(key=lambda s: s[0], reverse=True)
+        return [(key, entry) for _, key, entry in scored[:self.hot_keys]]
+
+    def missing(self) -> list:
+        """One (key, job_description, question_type) per set to generate, across the hot keys."""
+        now = self.clock()
+        hot = self.hot()
+        wanted = []
+        with self.lock:
+            hot_keys = {key for key, _ in hot}
+            # Sets of keys that cooled down are dropped, so memory follows demand.
+            for key in [k for k in self.sets if k not in hot_keys]:
+                del self.sets[key]
+            for key, entry in hot:
+                sets = self.sets.setdefault(key, deque())
+                while sets and now - sets[0][0] > self.ttl:
+                    sets.popleft()
+                wanted.extend([(key, entry.job_description, entry.question_type)] * (self.size - len(sets)))
+        return wanted
+
+    def add(self, key: tuple, questions: list):
+        with self.lock:
+            sets = self.sets.setdefault(key, deque())
+            if len(sets) < self.size:
+                sets.append((self.clock(), questions))
+
+    def refill_once(self, generate, may_run=None) -> int:
+        """
+        Generate the missing sets of the hot keys, at most ``concurrency`` at a time.
+
+        Args:
+            generate: A callable (job_description, question_type) -> list of questions.
+            may_run: A callable returning False to stop before the next generation, e.g. under load.
+
+        Returns:
+            int: The number of sets added.
+        """
+        wanted = self.missing()
+        if not wanted:
+            return 0
+        added = 0
+
+        def work(item):
+            key, job_description, question_type = item
+            if may_run is not None and not may_run():
+                return False
+            questions = generate(job_description, question_type)
+            if not questions:
+                return False
+            self.add(key, questions)
+            return True
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="question-pool") as pool:
+            for future in [pool.submit(work, item) for item in wanted]:
+                try:
+                    added += 1 if future.result() else 0
+                except Exception as e:
+                    logger.warning("question pool refill failed", extra={"error": str(e)})
+        if added:
+            logger.info("question pool refilled", extra={"sets": added, "keys": len(self.sets)})
+        return added
+
+    def llm_is_quiet(self) -> bool:
+        """True while live requests leave most llm workers idle and none queued."""
+        return llm_executor.queued == 0 and llm_executor.active < llm_executor.workers * self.max_llm_load
+
+    def _refill_loop(self, generate):
+        while not self.stop_event.wait(self.refill_seconds):
+            if self.llm_is_quiet():
+                self.refill_once(generate, self.llm_is_quiet)
+
+    def start(self, generate):
+        """Keep the hot keys filled from a daemon thread; safe to call more than once."""
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._refill_loop, args=(generate,),
+                                           name="question-pool-refill", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+QUESTION_POOL_ENABLED = _env_bool("QUESTION_POOL_ENABLED")
+question_pool = QuestionPool.from_env()
@@ -1,12 +1,18 @@
 # app/services/user_service.py
-from app.db.crud import add_user, update_user, get_user_basic, get_user_interviews, get_user_badges, get_all_badges, get_interview, update_interview_like
+import logging
+import json
+from app.db.crud import add_user, update_user, get_user_basic, get_user_interviews, get_user_badges, get_all_badges, get_interview, update_interview_like, iter_user_export_rows, get_user_interviews_projected, search_user_questions, get_liked_interviews_page, get_user_statistics_rows
 from app.db.models import current_millis, User
 from app.db.db_config import SessionLocal
 from app.services import badge_service
+from app.services.leaderboard_service import leaderboard
+from app.services.percentile_service import get_user_percentiles
 from datetime import datetime, timezone, date
 from app.services.utils import with_db_session
 from datetime import date
 
+logger = logging.getLogger(__name__)
+
 def day_from_millis(ms: int):
     """
     Convert millisecond timestamps to UTC days integers.
@@ -19,26 +25,146 @@ def day_from_millis(ms: int):
     """
     return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).date().toordinal()
 
+# Sparse fieldset names of /user/detail, mapped to the model attribute they are read from.
+DETAIL_USER_FIELDS = (
+    "user_id", "user_email", "xp", "total_interviews", "total_questions", "total_active_days",
+    "last_active_day", "consecutive_active_days", "max_consecutive_active_days"
+)
+DETAIL_INTERVIEW_FIELDS = {"interview_id": "interview_id", "interview_time": "timestamp", "is_like": "is_like"}
+DETAIL_QUESTION_FIELDS = {"question_id": "question_id", "question": "question", "answer": "answer",
+                          "feedback": "feedback", "timestamp": "timestamp"}
+DETAIL_FEEDBACK_KEYS = (
+    "clarity_structure_score", "clarity_structure_feedback", "relevance_score", "relevance_feedback",
+    "keyword_alignment_score", "keyword_alignment_feedback", "confidence_score", "confidence_feedback",
+    "conciseness_score", "conciseness_feedback", "overall_summary", "overall_score"
+)
+DETAIL_BADGE_FIELDS = ("badge_id", "unlock_date")
+
+
+def parse_detail_fields(fields: str):
+    """
+    Parse a sparse fieldset such as "xp,interviews.interview_id,interviews.questions.feedback.overall_score".
+    A container name on its own ("interviews", "interviews.questions", "badges") selects all of its fields.
+
+    Args:
+        fields: A comma separated string of dotted field paths.
+
+    Returns:
+        dict: A dict with "user", "interviews", "questions", "feedback" and "badges" field lists,
+            "questions" and "feedback" are None when questions are not requested.
+    """
+    spec = {"user": [], "interviews": None, "questions": None, "feedback": None, "badges": None}
+
+    def add(key, name):
+        if spec[key] is None:
+            spec[key] = []
+        if name is not None and name not in spec[key]:
+            spec[key].append(name)
+
+    for path in [p.strip() for p in fields.split(",") if p.strip()]:
+        parts = path.split(".")
+        head = parts[0]
+        if len(parts) == 1 and head in DETAIL_USER_FIELDS:
+            spec["user"].append(head)
+        elif head == "badges" and len(parts) <= 2:
+            names = parts[1:] or list(DETAIL_BADGE_FIELDS)
+            if any(n not in DETAIL_BADGE_FIELDS for n in names):
+                raise ValueError(f"Unknown field: {path}")
+            for n in names:
+                add("badges", n)
+        elif head == "interviews" and len(parts) == 1:
+            for n in DETAIL_INTERVIEW_FIELDS:
+                add("interviews", n)
+            for n in DETAIL_QUESTION_FIELDS:
+                add("questions", n)
+        elif head == "interviews" and len(parts) == 2 and parts[1] in DETAIL_INTERVIEW_FIELDS:
+            add("interviews", parts[1])
+        elif head == "interviews" and parts[1] == "questions" and len(parts) == 2:
+            add("interviews", None)
+            for n in DETAIL_QUESTION_FIELDS:
+                add("questions", n)
+        elif head == "interviews" and parts[1] == "questions" and len(parts) == 3 and parts[2] in DETAIL_QUESTION_FIELDS:
+            add("interviews", None)
+            add("questions", parts[2])
+        elif (head == "interviews" and parts[1] == "questions" and len(parts) == 4
+              and parts[2] == "feedback" and parts[3] in DETAIL_FEEDBACK_KEYS):
+            add("interviews", None)
+            add("questions", None)
+            add("feedback", parts[3])
+        else:
+            raise ValueError(f"Unknown field: {path}")
+    return spec
+
+
+def _projected_interviews(user_id: str, spec: dict, db = None):
+    """
+    Build the "interviews" list of a sparse /user/detail response.
+    Identifier columns are always selected for grouping but only emitted when requested.
+    """
+    interview_fields = spec["interviews"]
+    question_fields = spec["questions"]
+    feedback_keys = spec["feedback"] or []
+    with_questions = question_fields is not None
+    # Whole feedback requested: sub-keys would be redundant.
+    if question_fields and "feedback" in question_fields:
+        feedback_keys = []
+
+    interview_columns = ["interview_id"] + [DETAIL_INTERVIEW_FIELDS[n] for n in interview_fields if n != "interview_id"]
+    question_columns = None
+    if with_questions:
+        question_columns = ["question_id"] + [DETAIL_QUESTION_FIELDS[n] for n in question_fields if n != "question_id"]
+
+    rows = get_user_interviews_projected(user_id, interview_columns, question_columns, feedback_keys, db)
+
+    interviews = []
+    current_id = None
+    for row in rows:
+        mapping = row._mapping
+        if mapping["i_interview_id"] != current_id:
+            current_id = mapping["i_interview_id"]
+            item = {n: mapping[f"i_{DETAIL_INTERVIEW_FIELDS[n]}"] for n in interview_fields}
+            if with_questions:
+                item["questions"] = []
+            interviews.append(item)
+        if not with_questions or mapping["q_question_id"] is None:
+            continue
+        question = {n: mapping[f"q_{DETAIL_QUESTION_FIELDS[n]}"] for n in question_fields}
+        if feedback_keys:
+            question["feedback"] = {key: mapping[f"f_{index}"] for index, key in enumerate(feedback_keys)}
+        interviews[-1]["questions"].append(question)
+    return interviews
+
+
 @with_db_session
-def get_user_detail(token: str, db = None):
+def get_user_detail(user_id: str, fields: str = None, db = None):
     """
     Integrates user basic information, interview records (including questions), and badge unlocking information.
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id.
+        fields: A string of sparse fieldset (see parse_detail_fields), optional. When given, only the
+            requested fields are selected from the database and returned.
         db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
         
     Returns:
         dict: A dict of user detail.
         None: If user not in database.
     """
-    from app.services.auth_service import get_user_id_and_email
-    id_email = get_user_id_and_email(token)
-    user_id = id_email.get("id")
+    spec = parse_detail_fields(fields) if fields else None
     user = get_user_basic(user_id, db)
     if not user:
         return None
 
+    if spec is not None:
+        result = {name: getattr(user, name) for name in spec["user"]}
+        if spec["interviews"] is not None:
+            result["interviews"] = _projected_interviews(user_id, spec, db)
+        if spec["badges"] is not None:
+            badges = get_user_badges(user_id, db)
+            badge_values = {"badge_id": lambda b: b.badge_id, "unlock_date": lambda b: b.unlocked_timestamp}
+            result["badges"] = [{n: badge_values[n](b) for n in spec["badges"]} for b in badges]
+        return result
+
     interviews = get_user_interviews(user_id, db)
     badges = get_user_badges(user_id, db)
 
@@ -99,6 +225,168 @@ def get_user_detail(token: str, db = None):
     return result
 
 
+def parse_interview_cursor(cursor: str):
+    """
+    Parse an interview keyset cursor of the form "<interview_timestamp>:<interview_id>",
+    as returned by /user/export and /user/bank.
+
+    Args:
+        cursor: A string of cursor, taken from the last received line or page.
+
+    Returns:
+        tuple: A (timestamp, interview_id) tuple.
+        None: If cursor is empty.
+    """
+    if not cursor:
+        return None
+    timestamp, sep, interview_id = cursor.partition(":")
+    if not sep or not interview_id or not timestamp.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(timestamp), interview_id
+
+
+def _export_lines(user_id: str, after: tuple = None):
+    """
+    Yield one NDJSON line per interview, with its questions nested.
+    Owns its own session so that the server-side cursor lives as long as the stream.
+    """
+    db = SessionLocal()
+    try:
+        current = None
+        for row in iter_user_export_rows(user_id, after, db=db):
+            if current is not None and current["interview_id"] != row.interview_id:
+                yield json.dumps(current, ensure_ascii=False) + "\n"
+                current = None
+            if current is None:
+                current = {
+                    "interview_id": row.interview_id,
+                    "interview_type": row.interview_type,
+                    "job_description": row.job_description,
+                    "interview_time": row.timestamp,
+                    "is_like": row.is_like,
+                    "questions": [],
+                    "cursor": f"{row.timestamp}:{row.interview_id}"
+                }
+            if row.question_id is not None:
+                current["questions"].append({
+                    "question_id": row.question_id,
+                    "question_type": row.question_type,
+                    "question": row.question,
+                    "answer": row.answer,
+                    "feedback": row.feedback,
+                    "timestamp": row.question_timestamp
+                })
+        if current is not None:
+            yield json.dumps(current, ensure_ascii=False) + "\n"
+    finally:
+        db.close()
+
+
+def export_user_history(user_id: str, since: str = None):
+    """
+    Export the full interview history of a user as a stream of NDJSON lines.
+    Each line is one interview with its questions and carries a "cursor";
+    passing the cursor of the last received line as ``since`` resumes the export after it.
+
+    Args:
+        user_id: A string of user id.
+        since: A string of export cursor, optional.
+
+    Returns:
+        generator: A generator of NDJSON lines, rows are read through a server-side cursor.
+    """
+    after = parse_interview_cursor(since)
+    return _export_lines(user_id, after)
+
+
+@with_db_session
+def search_user_history(user_id: str, query: str, limit: int = 20, offset: int = 0, db = None):
+    """
+    Full-text search over the user's past questions and answers.
+
+    Args:
+        user_id: A string of user id.
+        query: A string of search terms.
+        limit: A int of page size.
+        offset: A int of number of results to skip.
+        db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
+
+    Returns:
+        dict: A dict of ranked results with snippets, and next_offset (None on the last page).
+    """
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("Search query must not be empty")
+
+    # Fetch one extra row to know whether another page exists.
+    rows = search_user_questions(user_id, query, limit + 1, offset, db)
+    results = [
+        {
+            "question_id": r.question_id,
+            "interview_id": r.interview_id,
+            "timestamp": r.timestamp,
+            "rank": float(r.rank),
+            "question_snippet": r.question_snippet,
+            "answer_snippet": r.answer_snippet
+        } for r in rows[:limit]
+    ]
+    return {
+        "query": query,
+        "results": results,
+        "next_offset": offset + limit if len(rows) > limit else None
+    }
+
+
+@with_db_session
+def get_question_bank(user_id: str, limit: int = 20, cursor: str = None, interview_type: str = None,
+                      start_time: int = None, end_time: int = None, db = None):
+    """
+    Get one page of the user's question bank (liked interviews), newest first.
+
+    Args:
+        user_id: A string of user id.
+        limit: A int of page size.
+        cursor: A string of cursor from the previous page, optional.
+        interview_type: A string of interview type to filter by, optional.
+        start_time: A int of Unix millisecond timestamp, only interviews at or after it, optional.
+        end_time: A int of Unix millisecond timestamp, only interviews before it, optional.
+        db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
+
+    Returns:
+        dict: A dict of interviews with their questions, and next_cursor (None on the last page).
+    """
+    before = parse_interview_cursor(cursor)
+
+    # Fetch one extra row to know whether another page exists.
+    interviews = get_liked_interviews_page(user_id, limit + 1, before, interview_type, start_time, end_time, db)
+    page = interviews[:limit]
+    next_cursor = None
+    if len(interviews) > limit:
+        last = page[-1]
+        next_cursor = f"{last.timestamp}:{last.interview_id}"
+
+    return {
+        "interviews": [
+            {
+                "interview_id": i.interview_id,
+                "interview_type": i.interview_type,
+                "job_description": i.job_description,
+                "interview_time": i.timestamp,
+                "questions": [
+                    {
+                        "question_id": q.question_id,
+                        "question": q.question,
+                        "answer": q.answer,
+                        "feedback": q.feedback,
+                        "timestamp": q.timestamp
+                    } for q in i.questions
+                ]
+            } for i in page
+        ],
+        "next_cursor": next_cursor
+    }
+
+
 def create_new_user(user_id: str, user_email: str, db = None):
     """
     Create a new user entity and insert it into the users table.
@@ -111,7 +399,7 @@ def create_new_user(user_id: str, user_email: str, db = None):
     Returns:
         user: A SQLAlchemy entry of user, if it is None, means fails.
     """
-    print("Create new user:", user_id)
+    logger.info("user created", extra={"user_id": user_id})
     user = User(
         user_id=user_id,
         user_email=user_email,
@@ -150,6 +438,37 @@ def create_new_user(user_id: str, user_email: str, db = None):
     return user
 
 
+def active_day_changes(user, active_day: date):
+    """
+    The streak and XP fields to update when a user is active on a day.
+    Shared by the login path and the question event projector (app.services.projector).
+
+    Args:
+        user: A SQLAlchemy entry of user.
+        active_day: A date the user was active on.
+
+    Returns:
+        dict: A dict of fields to update, None if the user was already counted active that day.
+    """
+    days = (active_day - user.last_active_day).days
+    if days == 1 or user.total_active_days == 0:
+        update_data = {"last_active_day": active_day,
+                       "consecutive_active_days": user.consecutive_active_days + 1,
+                       "total_active_days": user.total_active_days + 1,
+                       "xp": user.xp + 5
+                       }
+        if user.max_consecutive_active_days <= user.consecutive_active_days:
+            update_data["max_consecutive_active_days"] = user.max_consecutive_active_days + 1
+        return update_data
+    if days > 1:
+        return {"last_active_day": active_day,
+                "consecutive_active_days": 1,
+                "total_active_days": user.total_active_days + 1,
+                "xp": user.xp + 5
+                }
+    return None
+
+
 def update_user_active(user_id: str, db = None):
     """
     Update the user profile after the user start interview for check user active.
@@ -162,59 +481,34 @@ def update_user_active(user_id: str, db = None):
         user: A SQLAlchemy entry of user, if it is None, means fails.
         None: If user not in database.
     """
-    print("User active:", user_id)
+    logger.debug("user active", extra={"user_id": user_id})
     user = get_user_basic(user_id, db)
     if not user:
         return None
     
-    new_active_day = date.today()
-    if (new_active_day - user.last_active_day).days == 1 or user.total_active_days == 0:
-        max_consecutive_active_days = user.max_consecutive_active_days
-        if max_consecutive_active_days <= user.consecutive_active_days:
-            update_data = {"last_active_day": new_active_day, 
-                            "consecutive_active_days": user.consecutive_active_days + 1,
-                            "max_consecutive_active_days": user.max_consecutive_active_days + 1,
-                            "total_active_days": user.total_active_days + 1,
-                            "xp": user.xp + 5
-                            }
-        else:
-            update_data = {"last_active_day": new_active_day, 
-                            "consecutive_active_days": user.consecutive_active_days + 1,
-                            "total_active_days": user.total_active_days + 1,
-                            "xp": user.xp + 5
-                            }
-    elif (new_active_day - user.last_active_day).days > 1:
-        update_data = {"last_active_day": new_active_day, 
-                        "consecutive_active_days": 1,
-                        "total_active_days": user.total_active_days + 1,
-                        "xp": user.xp + 5
-                        }
-    else:
-        update_data = None
-
+    update_data = active_day_changes(user, date.today())
     if update_data:
         user = update_user(user_id, update_data, db)
+        if user:
+            leaderboard.record(user)
     
     return user
 
 
 
 @with_db_session
-def get_user_full_detail(token: str, db = None):
+def get_user_full_detail(user_id: str, db = None):
     """
     Integrates user basic information, interview records (including questions), and badge unlocking information.
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id.
         db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
         
     Returns:
         dict: A dict of user detail, in anther format.
         None: If user not in database.
     """
-    from app.services.auth_service import get_user_id_and_email
-    id_email = get_user_id_and_email(token)
-    user_id = id_email.get("id")
     user = get_user_basic(user_id, db)
     if not user:
         return None
@@ -262,24 +556,22 @@ def get_user_full_detail(token: str, db = None):
     return full_result    
 
 @with_db_session
-def get_user_interview_summary(token: str, db = None):
+def get_user_interview_summary(user_id: str, db = None):
     """
     The system analyzes user interviews and returns the average score for each question.
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id.
         db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
         
     Returns:
-        dict: A dict of user avg score in each field.
+        dict: A dict of user avg score in each field, and the global percentile of each average
+            (None until the user has answered a question).
         None: If user not in database.
     """
-    from app.services.auth_service import get_user_id_and_email
-    id_email = get_user_id_and_email(token)
-    user_id = id_email.get("id")
     user = get_user_basic(user_id, db)
     if not user:
-        print(f"User: {user_id} does not exist in the database.")
+        logger.warning("user does not exist", extra={"user_id": user_id})
         return None
     
     questions_number = float(user.total_questions)
@@ -293,147 +585,61 @@ def get_user_interview_summary(token: str, db = None):
         "avg_conciseness": user.total_conciseness / questions_number,
         "avg_overall": user.total_overall / questions_number
     }
+    averages = None
+    if user.total_questions >= 1:
+        averages = {dimension: result[f"avg_{dimension}"]
+                    for dimension in ("clarity", "relevance", "keyword", "confidence", "conciseness", "overall")}
+    for dimension, value in get_user_percentiles(averages, db).items():
+        result[f"percentile_{dimension}"] = value
     return result
 
 
 class UserStatistics:
     """
-    A class that conveniently displays user status information, containing all fields of the user database, as well as some fields of the corresponding sub-tables interviews and badges.
+    A compact value object of user status information, containing all statistic fields of the user
+    database, as well as the ids and timestamps of the user's interviews and badges.
     """
-    def __init__(self, user, interviews=None, badges=None):
-        self.user_id = user.user_id
-        self.user_email = user.user_email
-        self.xp = user.xp
-
-        self.interviews = [{"interview_id": i.interview_id, "timestamp": i.timestamp} for i in interviews]
-        self.badges = [{"badge_id": b.badge_id, "unlocked_timestamp": b.unlocked_timestamp} for b in badges]
-
-        self.total_questions = user.total_questions
-        self.total_interviews = user.total_interviews
-        self.total_badges = user.total_badges
-
-        self.total_active_days = user.total_active_days
-        self.last_active_day = user.last_active_day
-        self.consecutive_active_days = user.consecutive_active_days
-        self.max_consecutive_active_days = user.max_consecutive_active_days
-
-        self.max_clarity = user.max_clarity
-        self.max_relevance = user.max_relevance
-        self.max_keyword = user.max_keyword
-        self.max_confidence = user.max_confidence
-        self.max_conciseness = user.max_conciseness
-        self.max_overall = user.max_overall
-
-        self.total_clarity = user.total_clarity
-        self.total_relevance = user.total_relevance
-        self.total_keyword = user.total_keyword
-        self.total_confidence = user.total_confidence
-        self.total_conciseness = user.total_conciseness
-        self.total_overall = user.total_overall
-
-        self.target_clarity = user.target_clarity
-        self.target_relevance = user.target_relevance
-        self.target_keyword = user.target_keyword
-        self.target_confidence = user.target_confidence
-        self.target_conciseness = user.target_conciseness
+    # Copied from the user row, in output order.
+    USER_FIELDS = (
+        "user_id", "user_email", "xp",
+        "total_questions", "total_interviews", "total_badges",
+        "total_active_days", "last_active_day", "consecutive_active_days", "max_consecutive_active_days",
+        "max_clarity", "max_relevance", "max_keyword", "max_confidence", "max_conciseness", "max_overall",
+        "total_clarity", "total_relevance", "total_keyword", "total_confidence", "total_conciseness", "total_overall",
+        "target_clarity", "target_relevance", "target_keyword", "target_confidence", "target_conciseness",
+    )
+    __slots__ = USER_FIELDS + ("interviews", "badges")
 
+    def __init__(self, user, interviews=(), badges=()):
+        for field in self.USER_FIELDS:
+            setattr(self, field, getattr(user, field))
+        self.interviews = [{"interview_id": interview_id, "timestamp": timestamp} for interview_id, timestamp in interviews]
+        self.badges = [{"badge_id": badge_id, "unlocked_timestamp": unlocked_timestamp} for badge_id, unlocked_timestamp in badges]
 
     @classmethod
     def from_db(cls, user_id, db = None):
-        user = get_user_basic(user_id, db)
-        interviews = get_user_interviews(user_id, db)
-        badges = get_user_badges(user_id, db)
-
-        if not user:
+        found = get_user_statistics_rows(user_id, db)
+        if not found:
             raise ValueError(f"User {user_id} not found")
+        user, interviews, badges = found
         return cls(user, interviews=interviews, badges=badges)
-    
+
     def show(self):
-        print(f"user_id: {self.user_id}")
-        print(f"user_email: {self.user_email}")
-        print(f"xp: {self.xp}")
-
-        print(f"total_questions: {self.total_questions}")
-        print(f"total_interviews: {self.total_interviews}")
-        print(f"total_badges: {self.total_badges}")
-
-        print(f"total_active_days: {self.total_active_days}")
-        print(f"last_active_day: {self.last_active_day}")
-        print(f"consecutive_active_days: {self.consecutive_active_days}")
-        print(f"max_consecutive_active_days: {self.max_consecutive_active_days}")
-
-        print(f"max_clarity: {self.max_clarity}")
-        print(f"max_relevance: {self.max_relevance}")
-        print(f"max_keyword: {self.max_keyword}")
-        print(f"max_confidence: {self.max_confidence}")
-        print(f"max_conciseness: {self.max_conciseness}")
-        print(f"max_overall: {self.max_overall}")
-
-        print(f"total_clarity: {self.total_clarity}")
-        print(f"total_relevance: {self.total_relevance}")
-        print(f"total_keyword: {self.total_keyword}")
-        print(f"total_confidence: {self.total_confidence}")
-        print(f"total_conciseness: {self.total_conciseness}")
-        print(f"total_overall: {self.total_overall}")
-
-        print(f"target_clarity: {self.target_clarity}")
-        print(f"target_relevance: {self.target_relevance}")
-        print(f"target_keyword: {self.target_keyword}")
-        print(f"target_confidence: {self.target_confidence}")
-        print(f"target_conciseness: {self.target_conciseness}")
-
-        print("interives: ")
+        for field in self.USER_FIELDS:
+            print(f"{field}: {getattr(self, field)}")
         print("interviews: ")
         for i in self.interviews:
-            interview_id = i["interview_id"]
-            timestamp = i["timestamp"]
-            print(f"    initerview_id: {interview_id}   timestamp: {timestamp}")
+            print(f"    interview_id: {i['interview_id']}   timestamp: {i['timestamp']}")
         print("badges: ")
         for b in self.badges:
-            badge_id = b["badge_id"]
-            unlocked_timestamp = b["unlocked_timestamp"]
-            print(f"    badge_id: {badge_id}   unlocked_timestamp: {unlocked_timestamp}")
+            print(f"    badge_id: {b['badge_id']}   unlocked_timestamp: {b['unlocked_timestamp']}")
 
-    
     def get_dict(self):
-        result = {}
-
-        result["user_id"] = self.user_id
-        result["user_email"] = self.user_email
-        result["xp"] = self.xp
-
+        result = {field: getattr(self, field) for field in self.USER_FIELDS[:3]}
         result["interviews"] = self.interviews
         result["badges"] = self.badges
-
-        result["total_questions"] = self.total_questions
-        result["total_interviews"] = self.total_interviews
-        result["total_badges"] = self.total_badges
-
-        result["total_active_days"] = self.total_active_days
-        result["last_active_day"] = self.last_active_day
-        result["consecutive_active_days"] = self.consecutive_active_days
-        result["max_consecutive_active_days"] = self.max_consecutive_active_days
-
-        result["max_clarity"] = self.max_clarity
-        result["max_relevance"] = self.max_relevance
-        result["max_keyword"] = self.max_keyword
-        result["max_confidence"] = self.max_confidence
-        result["max_conciseness"] = self.max_conciseness
-        result["max_overall"] = self.max_overall
-
-        result["total_clarity"] = self.total_clarity
-        result["total_relevance"] = self.total_relevance
-        result["total_keyword"] = self.total_keyword
-        result["total_confidence"] = self.total_confidence
-        result["total_conciseness"] = self.total_conciseness
-        result["total_overall"] = self.total_overall
-
-        result["target_clarity"] = self.target_clarity
-        result["target_relevance"] = self.target_relevance
-        result["target_keyword"] = self.target_keyword
-        result["target_confidence"] = self.target_confidence
-        result["target_conciseness"] = self.target_conciseness
-
+        for field in self.USER_FIELDS[3:]:
+            result[field] = getattr(self, field)
         return result
 
 
@@ -450,36 +656,32 @@ def get_user_statistics(user_id: str, db = None):
         UserStatistics: A UserStatistics entity containing user information.
         None: If user not in database.
     """
-    user = get_user_basic(user_id, db)
-    if not user:
-        print(f"User: {user_id} does not exist in the database.")
+    try:
+        return UserStatistics.from_db(user_id, db)
+    except ValueError:
+        logger.warning("user does not exist", extra={"user_id": user_id})
         return None
-    user_statistics = UserStatistics.from_db(user_id, db)
-    return user_statistics
 
 
 @with_db_session
-def like_interview(token: str, interview_id: str, db = None):
+def like_interview(user_id: str, interview_id: str, db = None):
     """
     Invert the is_like field of the determined interview.
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id.
         interview_id: A string of interview_id, it is a UUID.
         db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
         
     Returns:
         dict: A dict interview_id and new is_like value.
     """
-    from app.services.auth_service import get_user_id_and_email
-    id_email = get_user_id_and_email(token)
-    user_id = id_email.get("id")
     interview = update_interview_like(interview_id, db)
     if not interview:
-        print(f"Interview: {interview_id} does not exist in the database.")
+        logger.warning("interview does not exist", extra={"user_id": user_id, "interview_id": interview_id})
         return None
     
-    print(f"User: {user_id} change interview {interview_id} is_like value to {interview.is_like}.")
+    logger.info("interview like changed", extra={"user_id": user_id, "interview_id": interview_id, "is_like": interview.is_like})
     result = {
         "interview_id": interview.interview_id,
         "is_like": interview.is_like
@@ -489,12 +691,12 @@ def like_interview(token: str, interview_id: str, db = None):
 
 
 @with_db_session
-def set_user_target(token: str, target: dict, db = None):
+def set_user_target(user_id: str, target: dict, db = None):
     """
     Set target scores for users across various dimensions.
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id.
         target: A dict of target, include target_clarity, target_relevance, target_keyword, target_confidence and target_conciseness.
         db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
         
@@ -502,13 +704,10 @@ def set_user_target(token: str, target: dict, db = None):
         dict: A dict of target from database.
         None: If user not in database.
     """
-    from app.services.auth_service import get_user_id_and_email
-    id_email = get_user_id_and_email(token)
-    user_id = id_email.get("id")
 
     user = get_user_basic(user_id, db)
     if not user:
-        print(f"User: {user_id} does not exist in the database.")
+        logger.warning("user does not exist", extra={"user_id": user_id})
         return None
 
     update_data = {
@@ -521,7 +720,7 @@ def set_user_target(token: str, target: dict, db = None):
 
     user = update_user(user_id, update_data, db)
     if not user:
-        print(f"User: {user_id} does not exist in the database.")
+        logger.warning("user does not exist", extra={"user_id": user_id})
         return None
     
     result = {
@@ -537,24 +736,21 @@ def set_user_target(token: str, target: dict, db = None):
 
 
 @with_db_session
-def get_user_target(token: str, db = None):
+def get_user_target(user_id: str, db = None):
     """
     Get target scores for users across various dimensions.
 
     Args:
-        token: A string of JWT token.
+        user_id: A string of user id.
         db: The active SQLAlchemy database session, automatically injected by the @with_db_session decorator.
         
     Returns:
         dict: A dict of target from database.
         None: If user not in database.
     """
-    from app.services.auth_service import get_user_id_and_email
-    id_email = get_user_id_and_email(token)
-    user_id = id_email.get("id")
     user = get_user_basic(user_id, db)
     if not user:
-        print(f"User: {user_id} does not exist in the database.")
+        logger.warning("user does not exist", extra={"user_id": user_id})
         return None
     result = {
         "user_id": user.user_id,
@@ -155,13 +155,14 @@ def test_auth():
 
 def test_interview():
     token = JWT_TOKEN
+    user_id = get_user_id_and_email(token).get("id")
     job_description = "We are looking for a passionate and skilled Python Developer to join our technical team. You will be responsible for designing, developing, testing, and deploying efficient, scalable, and reliable software solutions. If you are familiar with the Python ecosystem, have a deep understanding of backend development, and enjoy collaborating with cross-functional teams, we encourage you to apply."
     question_type = "Technical"
-    interview = interview_start(token, job_description, question_type)
+    interview = interview_start(user_id, token, job_description, question_type)
     print(interview)
     # interview_id = "2b283ef0-4b93-4913-8efd-bd6bbf5e5917"
     interview_id = interview["interview_id"]
-    feedback = interview_feedback(token, interview_id, question_type, question, answer)
+    feedback = interview_feedback(user_id, token, interview_id, question_type, question, answer)
     # print("feedback:\n", feedback)
     # print()
     result = change_interview_like(interview_id)
@@ -174,11 +175,12 @@ def test_interview():
     print()
 
 def test_user():
-    result = get_user_detail(JWT_TOKEN)
+    token_user_id = get_user_id_and_email(JWT_TOKEN).get("id")
+    result = get_user_detail(token_user_id)
     print("user_detail:")
     pprint(result)
     print()
-    result = get_user_interview_summary(JWT_TOKEN)
+    result = get_user_interview_summary(token_user_id)
     print("interview_summary:")
     pprint(result)
     print()
@@ -188,8 +190,8 @@ def test_user():
     # user_statistics.show()
     print(user_statistics.get_dict())
     print()
-    result = like_interview(JWT_TOKEN, user_statistics.interviews[0]["interview_id"])
-    print("result of like_interview(JWT_TOKEN, user_statistics.interviews[0][\"interview_id\"]):")
+    result = like_interview(token_user_id, user_statistics.interviews[0]["interview_id"])
+    print("result of like_interview(token_user_id, user_statistics.interviews[0][\"interview_id\"]):")
     print(result)
     print()
 
@@ -211,7 +213,7 @@ def test_badges(db = None):
 
 def test_target():
     from app.services.user_service import set_user_target, get_user_target
-    token = JWT_TOKEN
+    user_id = get_user_id_and_email(JWT_TOKEN).get("id")
     target_dict = {
         "target_clarity": 4,
         "target_relevance": 4,
@@ -219,12 +221,12 @@ def test_target():
         "target_confidence": 4,
         "target_conciseness": 4
     }
-    target_db = get_user_target(token)
+    target_db = get_user_target(user_id)
     print("target_db (before setting target): ")
     pprint(target_db)
     print()
 
-    target = set_user_target(token, target_dict)
+    target = set_user_target(user_id, target_dict)
     print("target (after setting target): ")
     pprint(target)
     print()
@@ -0,0 +1,78 @@
+# backend/app/tests/query_counter.py
+"""Query budgets for tests.
+
+Wrap a service call or a request in ``query_budget(n)`` to fail the test when it issues
+more than ``n`` SQL statements, or when the same statement runs repeatedly with different
+parameters (an N+1 pattern: one query per row of a previous result):
+
+    with query_budget(4):
+        client.get("/user/statistics", headers=auth_headers)
+"""
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from sqlalchemy import event
+from app.db.db_config import engine
+
+# Repeats of one statement with distinct parameters at or above this count are reported as N+1.
+N_PLUS_ONE_THRESHOLD = 3
+
+# Transaction control and schema introspection are not counted.
+IGNORED = re.compile(r"^\s*(SAVEPOINT|RELEASE|ROLLBACK|COMMIT|BEGIN|PRAGMA)\b", re.IGNORECASE)
+
+
+class QueryCounter:
+    """Record the SQL statements issued on the engine while active."""
+    def __init__(self, target=engine):
+        self.target = target
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not IGNORED.match(statement):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.target, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.target, "before_cursor_execute", self._record)
+        return False
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict:
+        """Statements executed ``threshold`` or more times with distinct parameters: {statement: count}."""
+        params = defaultdict(set)
+        for statement, parameters in self.statements:
+            params[statement].add(repr(parameters))
+        return {statement: len(p) for statement, p in params.items() if len(p) >= threshold}
+
+    def report(self) -> str:
+        return "\n".join(f"  {n + 1}. {' '.join(s.split())[:200]}" for n, (s, _) in enumerate(self.statements))
+
+
+@contextmanager
+def query_budget(max_queries: int, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+    """
+    Fail when the wrapped block exceeds its query budget or shows an N+1 pattern.
+
+    Args:
+        max_queries: A int of the most SQL statements the block may issue.
+        n_plus_one_threshold: A int of repeats of one statement with distinct parameters that counts as N+1.
+
+    Yields:
+        QueryCounter: The counter, for further assertions.
+    """
+    with QueryCounter() as counter:
+        yield counter
+    repeated = counter.repeated(n_plus_one_threshold)
+    assert not repeated, (
+        "Possible N+1: the same statement ran with different parameters:\n"
+        + "\n".join(f"  x{n}: {' '.join(s.split())[:200]}" for s, n in repeated.items())
+    )
+    assert counter.count <= max_queries, (
+        f"Query budget exceeded: {counter.count} > {max_queries} statements\n{counter.report()}"
+    )
@@ -0,0 +1,154 @@
+# backend/app/tests/test_answer_scorer.py
+
+import time
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.answer_scorer import (
+    DIMENSIONS, FEATURES, WEIGHTS, calibrate, calibration_data, calibration_report, features, prescore, score_matrix
+)
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.db.models import User, Interview, Question
+from app.tests.test_route import FAKE_TOKEN
+
+
+QUESTION = "Tell me about a time you improved the performance of a Python service."
+JOB = "Senior Python Developer: FastAPI, PostgreSQL, AWS, performance tuning and caching."
+STRONG = (
+    "In my last role the situation was that our FastAPI service had a p99 latency of 2 seconds. "
+    "My task was to bring it under 300ms. First, I profiled the endpoints and found repeated queries "
+    "against PostgreSQL. Then I implemented eager loading and added caching for hot reads. "
+    "As a result latency dropped by 80% and our AWS costs were reduced by 30%."
+)
+RAMBLING = "um so like i think maybe i did some performance stuff on a service, i guess, not sure, basically yeah"
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    yield
+
+
+# ============================================================
+# Scoring
+# ============================================================
+
+def test_features_shape_and_ranges():
+    row = features(QUESTION, STRONG, JOB)
+    assert row.shape == (len(FEATURES),)
+    assert row[FEATURES.index("star")] == 1.0
+    assert row[FEATURES.index("specifics")] == 1.0
+    assert 0 < row[FEATURES.index("question_overlap")] <= 1
+
+
+def test_strong_answer_outscores_rambling_one():
+    strong = prescore(QUESTION, STRONG, JOB)
+    rambling = prescore(QUESTION, RAMBLING, JOB)
+    assert not strong["skip_llm"] and not rambling["skip_llm"]
+    assert strong["feedback"]["provisional"] is True
+    assert strong["feedback"]["overall_score"] > rambling["feedback"]["overall_score"]
+    assert strong["feedback"]["confidence_score"] > rambling["feedback"]["confidence_score"]
+    for dimension in DIMENSIONS:
+        assert 1 <= strong["feedback"][f"{dimension}_score"] <= 5
+
+
+@pytest.mark.parametrize("answer", ["", "Yes.", "No idea."])
+def test_near_empty_answers_skip_llm(answer):
+    estimate = prescore(QUESTION, answer, JOB)
+    assert estimate["skip_llm"]
+    assert estimate["reason"] == "too_short"
+    assert estimate["feedback"]["overall_score"] == 1.0
+
+
+@pytest.mark.parametrize("question, answer", [
+    ("什么是闭包？", "闭包是一个函数，它可以捕获并记住其外部作用域中的变量，即使外部函数已经返回之后仍然可以访问这些变量。"),
+    ("Qu'est-ce qu'une fermeture en JavaScript ?",
+     "Une fermeture est une fonction qui mémorise les variables de sa portée englobante, même après son exécution."),
+])
+def test_non_ascii_answers_are_counted_and_matched(question, answer):
+    estimate = prescore(question, answer, None)
+    assert not estimate["skip_llm"]
+    assert estimate["reason"] is None
+
+
+@pytest.mark.parametrize("question, answer", [
+    (QUESTION, "My favourite holiday destination is the beach in summer with family."),
+    ("What is a closure?", "A function capturing variables from its enclosing scope."),
+])
+def test_off_topic_is_only_provisional(question, answer):
+    estimate = prescore(question, answer, JOB)
+    assert estimate["reason"] == "off_topic"
+    assert not estimate["skip_llm"]
+
+
+def test_batch_scoring_is_fast():
+    rows = np.array([features(QUESTION, STRONG, JOB)] * 1000)
+    started = time.perf_counter()
+    scores = score_matrix(rows)
+    assert time.perf_counter() - started < 0.05
+    assert scores.shape == (1000, len(DIMENSIONS))
+    assert np.all((scores >= 1) & (scores <= 5))
+
+
+# ============================================================
+# Calibration
+# ============================================================
+
+def llm_feedback(score):
+    feedback = {f"{d}_score": score for d in DIMENSIONS}
+    feedback["overall_score"] = float(score)
+    return feedback
+
+
+def test_calibration_report_against_llm_scores():
+    rows = [(QUESTION, STRONG, llm_feedback(5), JOB)] * 6 + [(QUESTION, RAMBLING, llm_feedback(2), JOB)] * 6
+    rows += [
+        (QUESTION, "No.", llm_feedback(1), JOB),
+        (QUESTION, "No.", dict(llm_feedback(1), scored_by="heuristic"), JOB),  # not an LLM score
+        (QUESTION, STRONG, {"overall_summary": "missing scores"}, JOB),
+    ]
+    report = calibration_report(*calibration_data(rows))
+
+    assert report["answers"] == 13
+    assert set(report["dimensions"]) == set(DIMENSIONS)
+    assert report["dimensions"]["confidence"]["correlation"] > 0.8
+    assert report["trivial"] == {"answers": 1, "llm_mean_score": 1.0}
+    assert np.array(report["fitted_weights"]).shape == WEIGHTS.shape
+
+
+def test_calibrate_reads_stored_feedback():
+    with SessionLocal() as db:
+        db.add(User(user_id="u1", user_email="u1@example.com"))
+        db.add(Interview(interview_id="iv1", user_id="u1", interview_type="technical", job_description=JOB))
+        db.add_all([
+            Question(question_id=f"q{n}", interview_id="iv1", question=QUESTION, question_type="technical",
+                     answer=STRONG, feedback=llm_feedback(4), timestamp=n)
+            for n in range(3)
+        ])
+        db.commit()
+
+    report = calibrate()
+    assert report["answers"] == 3
+    assert report["fitted_weights"] is None
+
+
+# ============================================================
+# Route
+# ============================================================
+
+def test_prescore_route_returns_provisional_feedback():
+    client = TestClient(app)
+    response = client.post(
+        "/interview/prescore",
+        json={"interview_question": QUESTION, "interview_answer": STRONG, "job_description": JOB},
+        headers={"Authorization": f"Bearer {FAKE_TOKEN}"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["skip_llm"] is False
+    assert body["provisional_feedback"]["provisional"] is True
+    assert body["provisional_feedback"]["overall_score"] >= 3
@@ -0,0 +1,69 @@
+# backend/app/tests/test_benchmarks.py
+
+import json
+import pytest
+
+from app.benchmarks.__main__ import main
+from app.benchmarks.harness import compare, load_results, measure, save_results, summarize
+from app.benchmarks.service_benchmarks import BENCHMARKS, StubGPTClient, run_benchmarks
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.db.models import Question
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    yield
+
+
+def result(name, median, **params):
+    return {"name": name, "params": params, "median_us": median}
+
+
+def test_measure_and_summarize():
+    calls = []
+    samples = measure(lambda: calls.append(1), min_time=0, max_rounds=5, warmup=2)
+    assert len(samples) == 3 and len(calls) == 5
+    summary = summarize("noop", {}, [0.001, 0.002, 0.003])
+    assert summary["median_us"] == 2000.0 and summary["min_us"] == 1000.0 and summary["rounds"] == 3
+
+
+def test_compare_flags_moves_beyond_threshold():
+    baseline = [result("a", 100.0, history=10), result("b", 100.0), result("c", 100.0), result("gone", 5.0)]
+    current = [result("a", 130.0, history=10), result("b", 80.0), result("c", 110.0), result("added", 5.0)]
+    rows = {row.name: row for row in compare(baseline, current, threshold=0.15)}
+    assert rows["a"].status == "regressed" and rows["a"].ratio == 1.3
+    assert rows["b"].status == "improved"
+    assert rows["c"].status == "ok"
+    assert rows["added"].status == "new" and rows["gone"].status == "missing"
+    assert compare([result("a", 100.0, history=10)], [result("a", 300.0, history=100)])[0].status == "new"
+
+
+def test_compare_command_exits_nonzero_on_regression(tmp_path, capsys):
+    save_results(tmp_path / "base.json", [result("a", 100.0)], meta={})
+    save_results(tmp_path / "slow.json", [result("a", 150.0)], meta={})
+    assert load_results(tmp_path / "slow.json") == {"meta": {}, "results": [result("a", 150.0)]}
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "base.json")]) == 0
+    assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "slow.json")]) == 1
+    assert "1 of 1 benchmarks regressed" in capsys.readouterr().out
+
+
+def test_suite_runs_every_benchmark_without_gpt(tmp_path):
+    prompts = []
+    send_prompt = StubGPTClient.send_prompt
+    StubGPTClient.send_prompt = lambda self, prompt: prompts.append(prompt) or send_prompt(self, prompt)
+    try:
+        results = run_benchmarks(sizes=[5], min_time=0, progress=lambda line: None,
+                                 measure=lambda fn, min_time, max_rounds: measure(fn, min_time, 3, warmup=0))
+    finally:
+        StubGPTClient.send_prompt = send_prompt
+
+    assert sorted(r["name"] for r in results) == sorted(b.name for b in BENCHMARKS)
+    assert {r["name"]: r["params"] for r in results}["get_user_detail"] == {"history": 5}
+    assert len(prompts) == 6  # three interview starts and three answers scored
+    with SessionLocal() as db:
+        assert db.query(Question).count() == 5 + 3 + 3
+    save_results(tmp_path / "run.json", results)
+    assert json.loads((tmp_path / "run.json").read_text())["meta"]["python"]
@@ -2,17 +2,20 @@
 
 import pytest
 import time
-from sqlalchemy import inspect, text
+from sqlalchemy import inspect, text, event
 
-from app.db.db_init import init_db, reset_all, reset_table
+from app.db.db_init import init_db, reset_all, reset_table, upgrade_schema
 from app.db.db_config import SessionLocal, engine
+from app.tests.query_counter import query_budget
 from app.db.models import Base, User, Interview, Question, Badge, UserBadge
 
 from app.db.crud import (
     add_user, get_user_basic, update_user,
     add_interview, get_interview, update_interview_like,
     add_question, get_questions_by_user, get_user_interviews,
-    get_all_badges, unlock_badge, get_user_badges, get_unlocked_badges
+    get_all_badges, unlock_badge, get_user_badges, get_unlocked_badges,
+    iter_user_export_rows, get_user_interviews_projected, search_user_questions,
+    get_liked_interviews_page, get_user_statistics_rows
 )
 
 
@@ -73,6 +76,22 @@ def test_reset_table_truncates_table(db_session):
     assert db_session.query(User).count() == 0
 
 
+def test_upgrade_schema_adds_missing_columns():
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_users_avg_overall"))
+        conn.execute(text("ALTER TABLE users DROP COLUMN avg_overall"))
+        conn.execute(text("INSERT INTO users (user_id, user_email, total_questions, total_overall) "
+                          "VALUES ('up01', 'up@test.com', 4, 10.0)"))
+
+    upgrade_schema()
+
+    inspector = inspect(engine)
+    assert "avg_overall" in {c["name"] for c in inspector.get_columns("users")}
+    assert "ix_users_avg_overall" in {i["name"] for i in inspector.get_indexes("users")}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT avg_overall FROM users WHERE user_id = 'up01'")).scalar() == 2.5
+
+
 # ================================================================
 # User CRUD
 # ================================================================
@@ -205,6 +224,219 @@ def test_get_user_interviews(db_session):
     assert len(res) == 2
 
 
+def test_iter_user_export_rows_ordered_and_resumable(db_session):
+    add_user(User(user_id="u009", user_email="export@test.com"), db_session)
+    add_interview(Interview(interview_id="int009_b", user_id="u009", interview_type="Tech",
+                            job_description="JD", timestamp=2000), db_session)
+    add_interview(Interview(interview_id="int009_a", user_id="u009", interview_type="Tech",
+                            job_description="JD", timestamp=1000), db_session)
+    add_question(Question(question_id="q009_1", interview_id="int009_a", question="Q1",
+                          question_type="Tech", answer="A1", feedback={}, timestamp=1001), db_session)
+    add_question(Question(question_id="q009_2", interview_id="int009_a", question="Q2",
+                          question_type="Tech", answer="A2", feedback={}, timestamp=1002), db_session)
+
+    rows = list(iter_user_export_rows("u009", db=db_session))
+    assert [(r.interview_id, r.question_id) for r in rows] == [
+        ("int009_a", "q009_1"),
+        ("int009_a", "q009_2"),
+        ("int009_b", None),
+    ]
+
+    resumed = list(iter_user_export_rows("u009", after=(1000, "int009_a"), db=db_session))
+    assert [r.interview_id for r in resumed] == ["int009_b"]
+
+
+def test_get_user_interviews_projected_reads_only_requested_columns(db_session):
+    add_user(User(user_id="u010", user_email="sparse@test.com"), db_session)
+    add_interview(Interview(interview_id="int010", user_id="u010", interview_type="Tech",
+                            job_description="JD", timestamp=1000), db_session)
+    add_question(Question(question_id="q010", interview_id="int010", question="Q", question_type="Tech",
+                          answer="A very long answer", feedback={"overall_score": 4.5, "overall_summary": "x"},
+                          timestamp=1001), db_session)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        rows = get_user_interviews_projected("u010", ["interview_id", "timestamp"], ["question_id"],
+                                             ["overall_score"], db_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(rows) == 1
+    row = rows[0]._mapping
+    assert row["i_interview_id"] == "int010"
+    assert row["q_question_id"] == "q010"
+    assert row["f_0"] == 4.5
+    assert not any("answer" in st or "job_description" in st for st in statements)
+
+
+def test_search_user_questions_fts(db_session):
+    for user_id in ("u011", "u012"):
+        add_user(User(user_id=user_id, user_email=f"{user_id}@test.com"), db_session)
+        add_interview(Interview(interview_id=f"int_{user_id}", user_id=user_id, interview_type="Tech",
+                                job_description="JD", timestamp=1000), db_session)
+    add_question(Question(question_id="q011_1", interview_id="int_u011", question="How does Kafka store data?",
+                          question_type="Tech", answer="Kafka uses partitioned logs; Kafka brokers replicate them.",
+                          timestamp=1001), db_session)
+    add_question(Question(question_id="q011_2", interview_id="int_u011", question="Explain REST",
+                          question_type="Tech", answer="Stateless HTTP APIs, unlike a Kafka topic.",
+                          timestamp=1002), db_session)
+    add_question(Question(question_id="q011_3", interview_id="int_u011", question="Explain SQL joins",
+                          question_type="Tech", answer="Inner and outer joins.", timestamp=1003), db_session)
+    add_question(Question(question_id="q012_1", interview_id="int_u012", question="Kafka?",
+                          question_type="Tech", answer="Kafka", timestamp=1004), db_session)
+
+    rows = search_user_questions("u011", "kafka", db=db_session)
+    assert [r.question_id for r in rows] == ["q011_1", "q011_2"]
+    assert "<b>Kafka</b>" in rows[0].answer_snippet
+
+    page = search_user_questions("u011", "kafka", limit=1, offset=1, db=db_session)
+    assert [r.question_id for r in page] == ["q011_2"]
+
+    # FTS syntax in user input is treated as plain terms
+    assert search_user_questions("u011", 'joins" *', db=db_session)[0].question_id == "q011_3"
+
+    # Updates are picked up by the sync triggers
+    update_q = db_session.get(Question, "q011_3")
+    update_q.answer = "Kafka streams can join too."
+    db_session.commit()
+    assert len(search_user_questions("u011", "kafka", db=db_session)) == 3
+
+
+def test_upgrade_schema_rebuilds_fts_index(db_session):
+    add_user(User(user_id="u014", user_email="u014@test.com"), db_session)
+    add_interview(Interview(interview_id="int014", user_id="u014", interview_type="Tech",
+                            job_description="JD", timestamp=1000), db_session)
+    add_question(Question(question_id="q014", interview_id="int014", question="How does Kafka store data?",
+                          question_type="Tech", answer="Partitioned logs.", timestamp=1001), db_session)
+    # Stands in for an index left stale by a VACUUM that renumbered the questions rowids.
+    db_session.execute(text("INSERT INTO questions_fts(questions_fts) VALUES ('delete-all')"))
+    db_session.commit()
+    assert search_user_questions("u014", "kafka", db=db_session) == []
+
+    upgrade_schema()
+
+    assert [r.question_id for r in search_user_questions("u014", "kafka", db=db_session)] == ["q014"]
+
+
+def test_get_liked_interviews_page_keyset(db_session):
+    add_user(User(user_id="u013", user_email="bank@test.com"), db_session)
+    for n, liked in enumerate([True, False, True, True]):
+        add_interview(Interview(interview_id=f"int013_{n}", user_id="u013", interview_type="Tech" if n else "HR",
+                                job_description="JD", timestamp=1000 + n, is_like=liked), db_session)
+    add_question(Question(question_id="q013", interview_id="int013_3", question="Q", question_type="Tech",
+                          answer="A", feedback={}, timestamp=1010), db_session)
+
+    page = get_liked_interviews_page("u013", 2, db=db_session)
+    assert [i.interview_id for i in page] == ["int013_3", "int013_2"]
+    assert [q.question_id for q in page[0].questions] == ["q013"]
+
+    rest = get_liked_interviews_page("u013", 2, before=(1002, "int013_2"), db=db_session)
+    assert [i.interview_id for i in rest] == ["int013_0"]
+
+    assert [i.interview_id for i in get_liked_interviews_page("u013", 5, interview_type="HR", db=db_session)] \
+        == ["int013_0"]
+    assert [i.interview_id for i in get_liked_interviews_page("u013", 5, start_time=1001, end_time=1003,
+                                                              db=db_session)] == ["int013_2"]
+
+    plan = db_session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT interview_id FROM interviews "
+        "WHERE user_id = 'u013' AND is_like = 1 ORDER BY timestamp DESC, interview_id DESC"
+    )).all()
+    assert any("ix_interviews_liked_user_timestamp" in str(row) for row in plan)
+
+
+def test_get_user_statistics_rows_single_round_trip(db_session):
+    add_user(User(user_id="u014", user_email="stats@test.com"), db_session)
+    add_user(User(user_id="u015", user_email="other@test.com"), db_session)
+    add_interview(Interview(interview_id="int014_b", user_id="u014", interview_type="Tech",
+                            job_description="JD", timestamp=2000), db_session)
+    add_interview(Interview(interview_id="int014_a", user_id="u014", interview_type="Tech",
+                            job_description="JD", timestamp=1000), db_session)
+    add_question(Question(question_id="q014", interview_id="int014_a", question="Q", question_type="Tech",
+                          answer="A long answer", feedback={}, timestamp=1001), db_session)
+    add_interview(Interview(interview_id="int015", user_id="u015", interview_type="Tech",
+                            job_description="JD", timestamp=1500), db_session)
+    db_session.add(Badge(badge_id=7, name="Stats", description="x"))
+    db_session.commit()
+    unlock_badge("u014", 7, db_session)
+    db_session.expire_all()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        user, interviews, badges = get_user_statistics_rows("u014", db_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(statements) == 1
+    assert "FROM questions" not in statements[0] and "JOIN questions" not in statements[0]
+    assert user.user_email == "stats@test.com"
+    assert interviews == [("int014_a", 1000), ("int014_b", 2000)]
+    assert [badge_id for badge_id, _ in badges] == [7]
+
+    assert get_user_statistics_rows("u015", db_session)[2] == []
+    assert get_user_statistics_rows("missing", db_session) is None
+
+
+def test_liked_interviews_page_loads_questions_in_one_query(db_session):
+    add_user(User(user_id="u016", user_email="budget@test.com"), db_session)
+    for n in range(4):
+        add_interview(Interview(interview_id=f"int016_{n}", user_id="u016", interview_type="Tech",
+                                job_description="JD", timestamp=1000 + n, is_like=True), db_session)
+        add_question(Question(question_id=f"q016_{n}", interview_id=f"int016_{n}", question="Q",
+                              question_type="Tech", answer="A", feedback={}, timestamp=2000 + n), db_session)
+    db_session.expire_all()
+
+    with query_budget(2):
+        page = get_liked_interviews_page("u016", 10, db=db_session)
+        assert sum(len(i.questions) for i in page) == 4
+
+
+def test_query_budget_flags_n_plus_one(db_session):
+    add_user(User(user_id="u017", user_email="n1@test.com"), db_session)
+    for n in range(3):
+        add_interview(Interview(interview_id=f"int017_{n}", user_id="u017", interview_type="Tech",
+                                job_description="JD", timestamp=1000 + n), db_session)
+    db_session.expire_all()
+
+    with pytest.raises(AssertionError, match="N\\+1"):
+        with query_budget(10):
+            for n in range(3):
+                get_interview(f"int017_{n}", db_session)
+
+    with pytest.raises(AssertionError, match="budget exceeded"):
+        with query_budget(1):
+            get_user_basic("u017", db_session)
+            get_user_badges("u017", db_session)
+
+
+def test_save_question_query_budget(db_session, monkeypatch):
+    from app.services.interview_service import save_interview, save_question
+    from app.services.projector import projector
+    monkeypatch.setattr(projector, "mode", "external")
+    add_user(User(user_id="u018", user_email="save@test.com"), db_session)
+
+    with query_budget(7):
+        save_interview("u018", "int018", "Tech", "JD", db_session)
+    with query_budget(2):
+        save_question("u018", "int018", "Tech", "Q", "A", {"overall_score": 4.0, "clarity_structure_score": 4},
+                      db_session)
+
+    assert projector.run_until_caught_up() == 1
+    db_session.expire_all()
+    user = get_user_basic("u018", db_session)
+    assert (user.total_questions, user.xp, user.max_overall, user.max_clarity) == (1, 8 + 5, 4.0, 4)
+
+
 # ================================================================
 # Badge + UserBadge
 # ================================================================
@@ -0,0 +1,124 @@
+# backend/app/tests/test_executors.py
+
+import asyncio
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.main import app
+from app.core.executors import BoundedExecutor, Overloaded, executor_queue_wait, executor_rejected, llm_executor
+from app.core.log_config import request_id_var
+from app.core.profiling import StackSampler, active_sampler_var
+from app.tests.test_route import FAKE_TOKEN
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# ============================================================
+# BoundedExecutor
+# ============================================================
+
+def test_runs_call_on_worker_thread_with_caller_context():
+    executor = BoundedExecutor("test-context", workers=1, max_queue=1)
+
+    def work(x):
+        return x * 2, threading.current_thread().name, request_id_var.get()
+
+    async def main():
+        request_id_var.set("req-1")
+        return await executor.run(work, 21)
+
+    result, thread_name, request_id = run(main())
+    assert result == 42
+    assert thread_name.startswith("test-context-worker")
+    assert request_id == "req-1"
+    assert executor_queue_wait.count(pool="test-context") == 1
+    assert executor.pending == 0
+
+
+def test_propagates_exceptions():
+    executor = BoundedExecutor("test-errors", workers=1, max_queue=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        run(executor.run(fail))
+    assert executor.pending == 0
+
+
+def test_rejects_when_queue_is_full():
+    executor = BoundedExecutor("test-full", workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await executor.run(release.wait)
+        assert executor.queued == 1
+        release.set()
+        return await asyncio.gather(running, queued)
+
+    assert run(main()) == [True, True]
+    assert executor_rejected.value(pool="test-full", reason="queue_full") == 1
+    assert executor.pending == 0
+
+
+def test_drops_calls_that_waited_too_long():
+    executor = BoundedExecutor("test-wait", workers=1, max_queue=5, max_wait=0.01)
+    release = threading.Event()
+    calls = []
+
+    async def main():
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        late = asyncio.ensure_future(executor.run(calls.append, "late"))
+        await asyncio.sleep(0.05)
+        release.set()
+        await blocker
+        with pytest.raises(Overloaded):
+            await late
+
+    run(main())
+    assert calls == []
+    assert executor_rejected.value(pool="test-wait", reason="wait_timeout") == 1
+
+
+def test_profiled_request_samples_worker_thread():
+    executor = BoundedExecutor("test-profile", workers=1, max_queue=1)
+    sampler = StackSampler(threading.get_ident(), 0.001)
+    seen = []
+
+    def work():
+        seen.append(set(sampler.thread_ids))
+
+    async def main():
+        active_sampler_var.set(sampler)
+        await executor.run(work)
+
+    run(main())
+    assert len(seen[0]) == 2
+    assert sampler.thread_ids == {threading.get_ident()}
+
+
+# ============================================================
+# Routes
+# ============================================================
+
+def test_route_answers_503_when_llm_pool_is_saturated():
+    client = TestClient(app)
+    with patch.object(llm_executor, "_admit", side_effect=Overloaded("llm", "queue full")), \
+         patch("app.api.interview.interview_start") as mock_start:
+        response = client.post(
+            "/interview/start",
+            json={"job_description": "Python developer", "question_type": "technical"},
+            headers={"Authorization": f"Bearer {FAKE_TOKEN}"},
+        )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    mock_start.assert_not_called()
@@ -0,0 +1,79 @@
+# backend/app/tests/test_generate_data.py
+
+import contextlib
+import io
+import pytest
+from sqlalchemy import func
+
+from app.db import crud
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.db.generate_data import DatasetSpec, activity_counts, generate, generate_chunk, plan_chunks
+from app.db.init_badges import init_badges
+from app.db.models import Interview, Question, QuestionEvent, User, UserBadge
+from app.services.projector import PROJECTOR_NAME, Projector
+
+SPEC = DatasetSpec(users=60, questions=1500, max_questions_per_user=200, batch_size=100)
+AGGREGATES = ("xp", "total_questions", "total_badges", "total_clarity", "max_clarity", "max_overall")
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_badges()
+    yield
+
+
+def test_activity_is_power_law_and_capped():
+    counts = activity_counts(DatasetSpec(users=1000, questions=100000, max_questions_per_user=2000))
+    assert counts.sum() == 100000
+    assert counts.max() <= 2000
+    top_tenth = sorted(counts.tolist(), reverse=True)[:100]
+    assert sum(top_tenth) > 0.3 * 100000
+
+
+def test_chunks_cover_every_user_once():
+    counts = activity_counts(SPEC)
+    chunks = plan_chunks(counts, chunk_questions=200, chunk_users=10)
+    assert chunks[0][0] == 0 and chunks[-1][1] == SPEC.users
+    for (_, end, offset), (start, _, next_offset) in zip(chunks, chunks[1:]):
+        assert end == start
+        assert next_offset == counts[:start].sum()
+
+
+def test_chunks_are_reproducible():
+    counts = activity_counts(SPEC)[:5]
+    first = generate_chunk(SPEC, 0, counts, 1, 1_800_000_000_000)
+    second = generate_chunk(SPEC, 0, counts, 1, 1_800_000_000_000)
+    assert first == second
+    assert len(first["questions"]) == len(first["question_events"]) == counts.sum()
+
+
+def test_generated_aggregates_match_a_projector_rebuild():
+    result = generate(SPEC)
+
+    with SessionLocal() as db:
+        assert result["users"] == db.query(User).count() == SPEC.users
+        assert result["questions"] == db.query(Question).count() == db.query(QuestionEvent).count() == 1500
+        assert result["interviews"] == db.query(Interview).count()
+        assert result["badges"] == db.query(UserBadge).count() > 0
+        assert crud.get_projector_checkpoint(PROJECTOR_NAME, db=db) == 1500
+        assert db.query(func.sum(User.total_questions)).scalar() == 1500
+        generated = {u.user_id: [getattr(u, c) for c in AGGREGATES] for u in db.query(User)}
+        heavy = max(generated, key=lambda user_id: generated[user_id][1])
+        assert crud.search_user_questions(heavy, "postmortem", 5, db=db)
+
+    Projector(mode="external").rebuild(backfill=False)
+
+    with SessionLocal() as db:
+        for user in db.query(User):
+            assert [getattr(user, c) for c in AGGREGATES] == pytest.approx(generated[user.user_id])
+
+
+def test_prefix_already_used_is_refused():
+    generate(SPEC._replace(users=3, questions=10))
+    with pytest.raises(ValueError):
+        generate(SPEC._replace(users=3, questions=10))
+    assert generate(SPEC._replace(users=3, questions=10, prefix="second"))["questions"] == 10
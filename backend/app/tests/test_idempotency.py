@@ -0,0 +1,235 @@
+# backend/app/tests/test_idempotency.py
+
+import asyncio
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from app.main import app
+from app.core.executors import Overloaded
+from app.core.idempotency import (
+    IdempotencyInProgress, IdempotencyKeyReused, IdempotencyStore, idempotent_requests, request_fingerprint
+)
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.db.models import IdempotencyKey, Interview, Question, User
+from app.tests.test_route import FAKE_TOKEN, FAKE_USER_ID
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    yield
+
+
+@pytest.fixture
+def store():
+    return IdempotencyStore(ttl=3600, lock_seconds=60, wait_seconds=5, poll_interval=0.01)
+
+
+FEEDBACK = {"interview_feedback": {"overall_score": 4.0}}
+
+
+# ============================================================
+# Store
+# ============================================================
+
+def test_retry_returns_stored_response_without_running_again(store):
+    fn = MagicMock(return_value=FEEDBACK)
+    replayed = idempotent_requests.value(outcome="replayed")
+    assert store.run("u1", "k1", "h1", fn) == FEEDBACK
+    assert store.run("u1", "k1", "h1", fn) == FEEDBACK
+    assert fn.call_count == 1
+    assert idempotent_requests.value(outcome="replayed") == replayed + 1
+
+
+def test_keys_are_per_user(store):
+    fn = MagicMock(return_value=FEEDBACK)
+    store.run("u1", "k1", "h1", fn)
+    store.run("u2", "k1", "h1", fn)
+    assert fn.call_count == 2
+
+
+def test_key_reused_for_other_request_is_refused(store):
+    store.run("u1", "k1", "h1", MagicMock(return_value=FEEDBACK))
+    with pytest.raises(IdempotencyKeyReused):
+        store.run("u1", "k1", "h2", MagicMock())
+
+
+def test_failed_request_releases_key(store):
+    failing = MagicMock(side_effect=RuntimeError("GPT down"))
+    with pytest.raises(RuntimeError):
+        store.run("u1", "k1", "h1", failing)
+    fn = MagicMock(return_value=FEEDBACK)
+    assert store.run("u1", "k1", "h1", fn) == FEEDBACK
+    assert fn.call_count == 1
+
+
+def test_invalid_key_is_refused(store):
+    with pytest.raises(ValueError):
+        store.run("u1", "x" * 256, "h1", MagicMock())
+
+
+def test_concurrent_duplicates_wait_for_the_first():
+    store = IdempotencyStore(wait_seconds=5)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return FEEDBACK
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(store.run("u1", "k1", "h1", slow)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(store.run("u1", "k1", "h1", slow)))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert len(calls) == 1
+    assert results == [FEEDBACK, FEEDBACK]
+
+
+def test_wait_gives_up_while_first_is_running():
+    clock = FakeClock()
+    store = IdempotencyStore(lock_seconds=60, wait_seconds=0, clock=clock)
+    IdempotencyStore._claim("u1", "k1", "h1", clock.now, 0, 0)  # another worker's claim
+    with pytest.raises(IdempotencyInProgress):
+        store.run("u1", "k1", "h1", MagicMock())
+
+
+def test_stale_pending_claim_and_expired_key_are_taken_over():
+    clock = FakeClock()
+    store = IdempotencyStore(ttl=3600, lock_seconds=60, wait_seconds=0, clock=clock)
+    IdempotencyStore._claim("u1", "k1", "h1", clock.now, 0, 0)  # claimed by a worker that crashed
+    clock.now += 61
+    fn = MagicMock(return_value=FEEDBACK)
+    assert store.run("u1", "k1", "h1", fn) == FEEDBACK
+
+    clock.now += 3601
+    assert store.run("u1", "k1", "h2", fn) == FEEDBACK
+    assert fn.call_count == 2
+
+
+def test_retry_after_lock_seconds_returns_stored_response():
+    clock = FakeClock()
+    store = IdempotencyStore(ttl=3600, lock_seconds=60, wait_seconds=0, clock=clock)
+    fn = MagicMock(return_value=FEEDBACK)
+    assert store.run("u1", "k1", "h1", fn) == FEEDBACK
+    clock.now += 121
+    with patch.object(IdempotencyStore, "_claim", wraps=IdempotencyStore._claim) as claim:
+        assert store.run("u1", "k1", "h1", fn) == FEEDBACK
+    assert fn.call_count == 1
+    assert claim.call_count == 1
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+def test_async_duplicate_waits_on_the_loop_and_only_the_first_is_submitted(store):
+    started, release = threading.Event(), threading.Event()
+    submitted = []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return FEEDBACK
+
+    async def run_call(fn):
+        submitted.append(fn)
+        return await asyncio.to_thread(fn)
+
+    async def main():
+        first = asyncio.create_task(store.run_async("u1", "k1", "h1", slow, run_inline, run_call))
+        await asyncio.to_thread(started.wait, 5)
+        second = asyncio.create_task(store.run_async("u1", "k1", "h1", slow, run_inline, run_call))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(main()) == [FEEDBACK, FEEDBACK]
+    assert len(submitted) == 1
+
+
+def test_async_claim_is_released_when_the_pool_refuses(store):
+    async def refuse(fn):
+        raise Overloaded("llm", "queue full")
+
+    with pytest.raises(Overloaded):
+        asyncio.run(store.run_async("u1", "k1", "h1", MagicMock(), run_inline, refuse))
+    fn = MagicMock(return_value=FEEDBACK)
+    assert asyncio.run(store.run_async("u1", "k1", "h1", fn, run_inline, run_inline)) == FEEDBACK
+    assert fn.call_count == 1
+
+
+# ============================================================
+# Route
+# ============================================================
+
+@pytest.fixture
+def interview():
+    with SessionLocal() as db:
+        db.add(User(user_id=FAKE_USER_ID, user_email="test@example.com"))
+        db.add(Interview(interview_id="iv1", user_id=FAKE_USER_ID, interview_type="technical", job_description="JD"))
+        db.commit()
+
+
+def post_feedback(client, answer, key):
+    return client.post(
+        "/interview/feedback",
+        json={"interview_id": "iv1", "interview_type": "technical", "interview_question": "What is Python?",
+              "interview_answer": answer},
+        headers={"Authorization": f"Bearer {FAKE_TOKEN}", "Idempotency-Key": key},
+    )
+
+
+@patch("app.services.interview_service.GPTAccessClient")
+def test_feedback_retry_saves_once(mock_gpt, interview):
+    mock_gpt.return_value.send_prompt.return_value = {"answer": '{"relevance_score": 4, "overall_score": 4.0}'}
+    client = TestClient(app)
+    answer = "Python is a dynamically typed programming language with a large standard library."
+
+    first = post_feedback(client, answer, "submit-1")
+    retry = post_feedback(client, answer, "submit-1")
+    other = post_feedback(client, answer + " It is also popular.", "submit-1")
+
+    assert first.status_code == retry.status_code == 200
+    assert first.json() == retry.json()
+    assert other.status_code == 422
+    assert mock_gpt.return_value.send_prompt.call_count == 1
+    with SessionLocal() as db:
+        assert db.query(Question).count() == 1
+        assert db.get(User, FAKE_USER_ID).total_questions == 1
+        assert db.query(IdempotencyKey).one().status == "completed"
+
+
+@patch("app.api.interview.interview_feedback")
+def test_feedback_without_key_is_not_deduplicated(mock_feedback):
+    mock_feedback.return_value = FEEDBACK
+    client = TestClient(app)
+    body = {"interview_id": "iv1", "interview_type": "technical", "interview_question": "Q", "interview_answer": "A"}
+    for _ in range(2):
+        response = client.post("/interview/feedback", json=body, headers={"Authorization": f"Bearer {FAKE_TOKEN}"})
+        assert response.status_code == 200
+    assert mock_feedback.call_count == 2
+
+
+def test_request_fingerprint_depends_on_every_field():
+    assert request_fingerprint("iv1", "A") == request_fingerprint("iv1", "A")
+    assert request_fingerprint("iv1", "A") != request_fingerprint("iv1", "B")
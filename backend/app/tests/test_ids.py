@@ -0,0 +1,145 @@
+# backend/app/tests/test_ids.py
+
+import uuid
+import threading
+import pytest
+
+from app.core.ids import UUID7Generator, id_millis, is_uuid7, new_id, uuid7_at
+from app.db.crud import get_interview
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.db.migrate_ids import migrate
+from app.db.models import IdAlias, Interview, Question, QuestionEvent, User
+
+
+class FakeClock:
+    """Nanoseconds, as time.time_ns."""
+    def __init__(self, millis: int = 1_700_000_000_000):
+        self.now = millis * 1_000_000
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    yield
+
+
+# ============================================================
+# UUIDv7
+# ============================================================
+
+def test_new_id_is_uuid7_of_now():
+    value = new_id()
+    parsed = uuid.UUID(value)
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+    assert is_uuid7(value)
+    assert not is_uuid7(str(uuid.uuid4()))
+    assert not is_uuid7("iv1_1700000000000")
+
+
+def test_ids_in_one_millisecond_are_strictly_increasing():
+    clock = FakeClock()
+    generate = UUID7Generator(clock=clock)
+    ids = [generate() for _ in range(10000)]  # more than the 4096 counter values of one millisecond
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert id_millis(ids[0]) == clock.now // 1_000_000
+
+
+def test_ids_keep_increasing_when_clock_steps_back():
+    clock = FakeClock()
+    generate = UUID7Generator(clock=clock)
+    first = generate()
+    clock.now -= 5_000_000_000
+    assert generate() > first
+
+
+def test_concurrent_ids_are_unique():
+    generate = UUID7Generator()
+    ids = []
+
+    def worker():
+        ids.extend(generate() for _ in range(2000))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 8000
+
+
+def test_uuid7_at_is_deterministic_and_time_ordered():
+    assert uuid7_at(1000, "a") == uuid7_at(1000, "a")
+    assert uuid7_at(1000, "a") != uuid7_at(1000, "b")
+    assert uuid7_at(1000, "z") < uuid7_at(1001, "a")
+    assert id_millis(uuid7_at(1234, "a")) == 1234
+
+
+# ============================================================
+# Migration of legacy ids
+# ============================================================
+
+def seed_legacy_rows():
+    with SessionLocal() as db:
+        db.add(User(user_id="u1", user_email="u1@example.com"))
+        for n, interview_id in enumerate(("b2f1c5e4-legacy", "0a9d-legacy")):
+            db.add(Interview(interview_id=interview_id, user_id="u1", interview_type="technical",
+                             job_description="JD", timestamp=1000 + n))
+            db.add(Question(question_id=f"{interview_id}_{2000 + n}", interview_id=interview_id, question="Q",
+                            question_type="technical", answer="A", timestamp=2000 + n))
+        db.add(Interview(interview_id=new_id(), user_id="u1", interview_type="technical", job_description="JD"))
+        db.commit()
+
+
+def test_migrate_rewrites_legacy_ids_in_timestamp_order():
+    seed_legacy_rows()
+    assert migrate(dry_run=True) == {"interviews": 2, "questions": 2}
+
+    assert migrate(batch_size=1) == {"interviews": 2, "questions": 2}
+
+    with SessionLocal() as db:
+        interviews = db.query(Interview).order_by(Interview.interview_id).all()
+        assert all(is_uuid7(i.interview_id) for i in interviews)
+        assert [i.timestamp for i in interviews[:2]] == [1000, 1001]
+        for interview in interviews[:2]:
+            assert [is_uuid7(q.question_id) for q in interview.questions] == [True]
+        assert db.query(IdAlias).count() == 4
+        assert get_interview("b2f1c5e4-legacy", db).timestamp == 1000
+
+    assert migrate() == {"interviews": 0, "questions": 0}
+
+
+def test_feedback_on_legacy_interview_id_after_migration():
+    from app.services.interview_service import interview_feedback
+
+    seed_legacy_rows()
+    migrate()
+    # A trivially short answer is scored locally, so no GPT call is made.
+    assert interview_feedback("u1", "token", "0a9d-legacy", "technical", "Q", "Yes.") is not None
+    with SessionLocal() as db:
+        interview = get_interview("0a9d-legacy", db)
+        assert len(interview.questions) == 2
+        assert all(is_uuid7(q.question_id) for q in interview.questions)
+
+
+def test_rebuild_after_migration_does_not_count_questions_twice():
+    from app.services.projector import Projector
+
+    seed_legacy_rows()
+    projector = Projector(mode="external")
+    assert projector.rebuild()["backfilled"] == 2
+    migrate()
+    assert projector.rebuild()["backfilled"] == 0
+
+    with SessionLocal() as db:
+        assert db.get(User, "u1").total_questions == 2
+        question_ids = {q.question_id for q in db.query(Question)}
+        events = db.query(QuestionEvent).all()
+        assert {e.question_id for e in events} == question_ids
+        assert all(is_uuid7(e.interview_id) for e in events)
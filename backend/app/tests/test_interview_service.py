@@ -21,11 +21,9 @@ FAKE_INTERVIEW_ID = "interview123"
 
 @patch("app.services.interview_service.GPTAccessClient")
 @patch("app.services.interview_service.get_user_basic")
-@patch("app.services.interview_service.get_user_id_and_email")
 @patch("app.services.interview_service.save_interview")
 def test_interview_start(
     mock_save_interview,
-    mock_get_user_id_email,
     mock_get_user_basic,
     mock_gpt_client
 ):
@@ -41,12 +39,11 @@ def test_interview_start(
     mock_gpt_client.return_value = mock_instance
 
     # --- mock user info ---
-    mock_get_user_id_email.return_value = {"id": FAKE_USER_ID}
     mock_get_user_basic.return_value = {"user_id": FAKE_USER_ID}
 
     # --- execute service ---
     result = interview_service.interview_start(
-        FAKE_TOKEN, "Python job", "Technical"
+        FAKE_USER_ID, FAKE_TOKEN, "Python job", "Technical"
     )
 
     # --- assertions ---
@@ -55,6 +52,29 @@ def test_interview_start(
     assert result["interview_questions"] == ["Q1", "Q2", "Q3"]
 
     mock_save_interview.assert_called_once()
+    assert mock_save_interview.call_args.kwargs["user_id"] == FAKE_USER_ID
+    mock_gpt_client.assert_called_once_with(FAKE_TOKEN)
+
+
+@patch("app.services.interview_service.GPTAccessClient")
+@patch("app.services.interview_service.get_user_basic")
+@patch("app.services.interview_service.save_interview")
+def test_interview_start_serves_pooled_question_set(
+    mock_save_interview,
+    mock_get_user_basic,
+    mock_gpt_client
+):
+    mock_get_user_basic.return_value = {"user_id": FAKE_USER_ID}
+    pool = interview_service.question_pool
+    key = ("pooled role", "technical")
+    pool.add(key, ["P1", "P2", "P3"])
+
+    result = interview_service.interview_start(FAKE_USER_ID, FAKE_TOKEN, "  Pooled ROLE. ", "Technical")
+
+    assert result["interview_questions"] == ["P1", "P2", "P3"]
+    mock_gpt_client.assert_not_called()
+    mock_save_interview.assert_called_once()
+    assert pool.demand[key].score >= 1
 
 
 # ============================================================
@@ -63,11 +83,11 @@ def test_interview_start(
 
 @patch("app.services.interview_service.GPTAccessClient")
 @patch("app.services.interview_service.save_question")
+@patch("app.services.interview_service.get_interview_job_description")
 @patch("app.services.interview_service.get_user_basic")
-@patch("app.services.interview_service.get_user_id_and_email")
 def test_interview_feedback(
-    mock_get_user_id_email,
     mock_get_user_basic,
+    mock_get_job_description,
     mock_save_question,
     mock_gpt_client
 ):
@@ -83,11 +103,12 @@ def test_interview_feedback(
     mock_gpt_client.return_value = client_instance
 
     # --- mock user info ---
-    mock_get_user_id_email.return_value = {"id": FAKE_USER_ID}
     mock_get_user_basic.return_value = {"user_id": FAKE_USER_ID}
+    mock_get_job_description.return_value = "Python developer"
 
     # --- run feedback ---
     result = interview_service.interview_feedback(
+        FAKE_USER_ID,
         FAKE_TOKEN,
         FAKE_INTERVIEW_ID,
         "Technical",
@@ -103,6 +124,30 @@ def test_interview_feedback(
     mock_save_question.assert_called_once()
 
 
+@patch("app.services.interview_service.GPTAccessClient")
+@patch("app.services.interview_service.save_question")
+@patch("app.services.interview_service.get_interview_job_description")
+@patch("app.services.interview_service.get_user_basic")
+def test_interview_feedback_scores_trivial_answer_locally(
+    mock_get_user_basic,
+    mock_get_job_description,
+    mock_save_question,
+    mock_gpt_client
+):
+    mock_get_user_basic.return_value = {"user_id": FAKE_USER_ID}
+    mock_get_job_description.return_value = "Python developer"
+
+    result = interview_service.interview_feedback(
+        FAKE_USER_ID, FAKE_TOKEN, FAKE_INTERVIEW_ID, "Technical", "What is Python?", "No idea."
+    )
+
+    feedback = result["interview_feedback"]
+    assert feedback["scored_by"] == "heuristic"
+    assert feedback["overall_score"] == 1.0
+    mock_gpt_client.assert_not_called()
+    mock_save_question.assert_called_once()
+
+
 # ============================================================
 #  Test change_interview_like()
 #   (does not need database — mock update_interview_like)
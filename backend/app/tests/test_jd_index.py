@@ -0,0 +1,158 @@
+# backend/app/tests/test_jd_index.py
+
+import numpy as np
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import interview_service
+from app.services.jd_index import JobDescriptionIndex, VectorIndex, embed
+
+
+POSTING = """Acme Corp is hiring a Senior Python Developer.
+- Build REST APIs with FastAPI and PostgreSQL
+- Write unit tests with pytest
+- Deploy services with Docker and Kubernetes
+"""
+
+REORDERED = """Globex is hiring a Senior Python Developer.
+
+- Deploy services with Docker and Kubernetes
+- Write unit tests with pytest
+- Build REST APIs with FastAPI   and PostgreSQL
+"""
+
+UNRELATED = """We are looking for a pastry chef to bake bread, croissants and cakes
+in our downtown bakery. Early mornings, weekends required."""
+
+
+@pytest.fixture
+def index():
+    return JobDescriptionIndex(dim=4096, min_similarity=0.8, max_entries=10, refresh_probability=0)
+
+
+# ============================================================
+# Embeddings and the vector index
+# ============================================================
+
+def test_embed_is_unit_length_and_deterministic():
+    vector = embed(POSTING, 4096)
+    assert vector.dtype == np.float32
+    assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
+    assert np.array_equal(vector, embed(POSTING, 4096))
+    assert not embed("  ... ", 4096).any()
+
+
+def test_near_duplicates_are_similar_and_unrelated_text_is_not():
+    posting, reordered, unrelated = (embed(t, 4096) for t in (POSTING, REORDERED, UNRELATED))
+    assert float(posting @ reordered) > 0.85
+    assert float(posting @ unrelated) < 0.3
+
+
+def test_vector_index_top_k_and_growth():
+    index = VectorIndex(dim=3, max_entries=100, capacity=1)
+    for n, vector in enumerate(([1, 0, 0], [0, 1, 0], [0.8, 0.6, 0])):
+        index.insert(np.array(vector, dtype=np.float32), n)
+    assert len(index) == 3
+    assert index.vectors.shape[0] == 4
+    matches = index.query(np.array([1, 0, 0], dtype=np.float32), k=2)
+    assert [slot for _, slot in matches] == [0, 2]
+    assert matches[1][0] == pytest.approx(0.8)
+
+
+def test_vector_index_overwrites_oldest_when_full():
+    index = VectorIndex(dim=2, max_entries=2)
+    for payload in ("a", "b", "c"):
+        index.insert(np.array([1, 0], dtype=np.float32), payload)
+    assert index.payloads == ["c", "b"]
+
+
+# ============================================================
+# Question reuse
+# ============================================================
+
+def test_find_questions_reuses_similar_job_description(index):
+    index.add(POSTING, "Technical", ["Q1", "Q2", "Q3"])
+    assert index.find_questions(REORDERED, "technical") == ["Q1", "Q2", "Q3"]
+    assert index.find_questions(UNRELATED, "technical") is None
+    assert index.find_questions(REORDERED, "behavioral") is None
+
+
+def test_same_job_description_keeps_several_sets(index):
+    for n in range(7):
+        index.add(POSTING, "technical", [f"Q{n}"])
+    ((_, payload),) = index.nearest(POSTING, "technical")
+    assert len(index.indexes["technical"]) == 1
+    assert payload["question_sets"] == [[f"Q{n}"] for n in range(2, 7)]
+
+
+def test_hits_fall_through_until_an_entry_has_enough_sets():
+    index = JobDescriptionIndex(dim=4096, sets_per_entry=3, refresh_probability=1)
+    index.add(POSTING, "technical", ["Q0"])
+    for n in (1, 2):
+        assert index.find_questions(POSTING, "technical") is None
+        index.add(POSTING, "technical", [f"Q{n}"])
+    assert index.find_questions(POSTING, "technical") in (["Q0"], ["Q1"], ["Q2"])
+
+
+def test_from_env_defaults_are_bounded(monkeypatch):
+    for name in ("JD_INDEX_DIM", "JD_INDEX_MAX_ENTRIES", "JD_INDEX_QUESTION_TYPES"):
+        monkeypatch.delenv(name, raising=False)
+    index = JobDescriptionIndex.from_env()
+    assert index.dim == 2048
+    assert index.max_entries == 5000
+    assert "technical" in index.question_types
+
+
+def test_only_known_question_types_are_indexed(index):
+    assert index.find_questions(POSTING, "technical") is None
+    index.add(POSTING, "made up type", ["Q1"])
+    assert index.find_questions(POSTING, "made up type") is None
+    assert index.indexes == {}
+
+
+def test_snapshot_round_trip(index, tmp_path):
+    path = str(tmp_path / "index.npz")
+    index.add(POSTING, "technical", ["Q1", "Q2", "Q3"])
+    index.add(UNRELATED, "behavioral", ["B1"])
+    index.save(path)
+
+    restored = JobDescriptionIndex(dim=4096, min_similarity=0.8, max_entries=10, refresh_probability=0, path=path)
+    assert restored.find_questions(REORDERED, "technical") == ["Q1", "Q2", "Q3"]
+    assert restored.find_questions(UNRELATED, "behavioral") == ["B1"]
+
+
+def test_snapshot_of_other_dimension_is_ignored(index, tmp_path):
+    path = str(tmp_path / "index.npz")
+    index.add(POSTING, "technical", ["Q1"])
+    index.save(path)
+    restored = JobDescriptionIndex(dim=2048, path=path)
+    assert restored.find_questions(POSTING, "technical") is None
+
+
+def test_snapshot_is_written_every_n_inserts(tmp_path):
+    path = tmp_path / "index.npz"
+    index = JobDescriptionIndex(dim=1024, path=str(path), snapshot_every=2)
+    index.add(POSTING, "technical", ["Q1"])
+    assert not path.exists()
+    index.add(UNRELATED, "technical", ["Q2"])
+    index.save_thread.join(5)
+    assert path.exists()
+
+
+@patch("app.services.interview_service.GPTAccessClient")
+@patch("app.services.interview_service.get_user_basic")
+@patch("app.services.interview_service.save_interview")
+def test_interview_start_reuses_questions_of_similar_posting(mock_save_interview, mock_get_user_basic, mock_gpt_client):
+    mock_get_user_basic.return_value = {"user_id": "user123"}
+    gpt = MagicMock()
+    gpt.send_prompt.return_value = {"status": "OK", "answer": "Q1 @ Q2 @ Q3"}
+    mock_gpt_client.return_value = gpt
+
+    with patch.object(interview_service, "jd_index", JobDescriptionIndex(dim=4096, min_similarity=0.8, refresh_probability=0)), \
+         patch.object(interview_service, "JD_INDEX_ENABLED", True):
+        first = interview_service.interview_start("user123", "token", POSTING, "technical")
+        second = interview_service.interview_start("user123", "token", REORDERED, "technical")
+
+    assert first["interview_questions"] == second["interview_questions"] == ["Q1", "Q2", "Q3"]
+    assert gpt.send_prompt.call_count == 1
+    assert mock_save_interview.call_count == 2
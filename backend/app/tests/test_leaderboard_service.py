@@ -0,0 +1,102 @@
+# backend/app/tests/test_leaderboard_service.py
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.db.db_init import init_db
+from app.db.db_config import SessionLocal
+from app.db.models import User
+from app.services.leaderboard_service import TopN, Leaderboard
+
+
+# ============================================================
+# Fixtures
+# ============================================================
+
+@pytest.fixture
+def db_session():
+    init_db(reset=True)
+    session = SessionLocal()
+    scores = {"u1": 50, "u2": 300, "u3": 120, "u4": 120, "u5": 10}
+    for user_id, xp in scores.items():
+        session.add(User(user_id=user_id, user_email=f"{user_id}@test.com", xp=xp))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def fake_user(user_id, xp):
+    user = MagicMock()
+    user.user_id = user_id
+    user.xp = xp
+    for column in ("avg_clarity", "avg_relevance", "avg_keyword", "avg_confidence", "avg_conciseness", "avg_overall"):
+        setattr(user, column, 0.0)
+    return user
+
+
+# ============================================================
+# TopN
+# ============================================================
+
+def test_topn_keeps_best_entries():
+    board = TopN(3)
+    board.load([("a", 30), ("b", 20), ("c", 10)])
+
+    board.update("d", 25)
+
+    assert board.top(3) == [("a", 30.0), ("d", 25.0), ("b", 20.0)]
+    assert board.rank("d") == 2
+    assert board.rank("c") is None
+
+
+def test_topn_ignores_scores_below_the_cutoff():
+    board = TopN(2)
+    board.load([("a", 30), ("b", 20)])
+
+    board.update("c", 5)
+
+    assert board.top(2) == [("a", 30.0), ("b", 20.0)]
+    assert not board.stale
+
+
+def test_topn_marks_stale_when_member_drops():
+    board = TopN(2)
+    board.load([("a", 30), ("b", 20)])
+
+    board.update("a", 1)
+
+    assert board.stale
+
+
+def test_topn_ties_share_rank():
+    board = TopN(5)
+    board.load([("a", 30), ("b", 20), ("c", 20), ("d", 10)])
+
+    assert board.rank("b") == board.rank("c") == 2
+    assert board.rank("d") == 4
+
+
+# ============================================================
+# Leaderboard
+# ============================================================
+
+def test_leaderboard_top_and_rank(db_session):
+    board = Leaderboard(size=3, refresh_seconds=3600)
+
+    assert board.top("xp", 3, db_session) == [("u2", 300.0), ("u3", 120.0), ("u4", 120.0)]
+    # In the cached top-N
+    assert board.rank("xp", "u4", db_session) == (2, 120.0)
+    # Outside the top-N, counted from the index
+    assert board.rank("xp", "u5", db_session) == (5, 10)
+    assert board.rank("xp", "missing", db_session) is None
+
+
+def test_leaderboard_record_updates_without_reload(db_session):
+    board = Leaderboard(size=3, refresh_seconds=3600)
+    board.top("xp", 3, db_session)
+
+    board.record(fake_user("u1", 500))
+
+    assert board.top("xp", 1, None) == [("u1", 500.0)]
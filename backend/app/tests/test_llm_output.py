@@ -0,0 +1,104 @@
+# backend/app/tests/test_llm_output.py
+
+import json
+import random
+import pytest
+
+from app.benchmarks.corpus import load_corpus
+from app.services.llm_output import (
+    RUBRIC_SCORES, coerce_feedback, find_json_object, llm_output_parses, parse_feedback, parse_question_list
+)
+
+
+CORPUS = load_corpus()
+
+FEEDBACK = next(case["expected"] for case in CORPUS if case["name"] == "bare_json")
+
+
+# ============================================================
+# Corpus of malformed replies
+# ============================================================
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["name"] for case in CORPUS])
+def test_corpus(case):
+    if case["kind"] == "feedback":
+        assert parse_feedback(case["reply"]) == case["expected"]
+    else:
+        assert parse_question_list(case["reply"]) == case["expected"]
+
+
+def test_outcomes_are_counted():
+    def count(outcome):
+        return llm_output_parses.value(kind="feedback", outcome=outcome)
+
+    before = {outcome: count(outcome) for outcome in ("fast", "fenced", "embedded", "repaired", "failed")}
+    parse_feedback(json.dumps(FEEDBACK))
+    parse_feedback("```json\n" + json.dumps(FEEDBACK) + "\n```")
+    parse_feedback("Here you go: " + json.dumps(FEEDBACK))
+    parse_feedback(json.dumps(FEEDBACK)[:-1] + ",}")
+    parse_feedback("no json here")
+    for outcome, value in before.items():
+        assert count(outcome) == value + 1, outcome
+
+
+# ============================================================
+# Coercion
+# ============================================================
+
+def test_coerce_feedback_types_rubric_fields():
+    coerced = coerce_feedback({
+        " relevance_score ": "4/5", "clarity_structure_score": 0, "confidence_score": True,
+        "conciseness_score": "n/a", "overall_score": 9, "overall_summary": "  fine  ",
+    })
+    assert coerced == {"relevance_score": 4, "clarity_structure_score": 1, "overall_score": 5.0,
+                       "overall_summary": "fine"}
+    assert isinstance(coerced["relevance_score"], int)
+    assert isinstance(coerced["overall_score"], float)
+
+
+def test_find_json_object_skips_lists_and_prose():
+    assert find_json_object('see [1, 2] and {"a": 1}') == {"a": 1}
+    assert find_json_object("no object {here") is None
+
+
+# ============================================================
+# Fuzzing
+# ============================================================
+
+PREFIXES = ["", "Sure!\n", "Here is the feedback:\n\n", "Feedback {draft}: ", "```json\n", "```\n"]
+SUFFIXES = ["", "\n", "\n```", "\n\nHope this helps!", " }", "\n```\nAnything else?"]
+
+
+def mutate(rng, feedback):
+    reply = json.dumps(feedback, indent=rng.choice([None, 2, 4]))
+    if rng.random() < 0.3:
+        reply = reply.replace("}", ",}")
+    prefix, suffix = rng.choice(PREFIXES), rng.choice(SUFFIXES)
+    if prefix.startswith("```") and "```" not in suffix:
+        suffix += "\n```"
+    return prefix + reply + suffix
+
+
+def test_fuzz_wrapped_feedback_still_parses():
+    rng = random.Random(42)
+    for _ in range(500):
+        reply = mutate(rng, FEEDBACK)
+        assert parse_feedback(reply) == FEEDBACK, reply
+
+
+def test_fuzz_garbage_never_raises():
+    rng = random.Random(7)
+    alphabet = '{}[]",:\'`\\ \n' + "abc0123456789.-“”"
+    sample = json.dumps(FEEDBACK)
+    for _ in range(500):
+        if rng.random() < 0.5:
+            reply = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 200)))
+        else:
+            cut = sorted(rng.randint(0, len(sample)) for _ in range(2))
+            reply = sample[:cut[0]] + rng.choice(alphabet) + sample[cut[1]:]
+        feedback = parse_feedback(reply)
+        assert feedback is None or isinstance(feedback, dict)
+        if feedback:
+            for key in RUBRIC_SCORES:
+                assert key not in feedback or 1 <= feedback[key] <= 5
+        assert len(parse_question_list(reply)) >= 3
@@ -0,0 +1,113 @@
+# backend/app/tests/test_log_config.py
+
+import io
+import json
+import queue
+import logging
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.log_config import (
+    parse_sample_rates, SamplingFilter, DroppingQueueHandler, JsonFormatter,
+    RequestIdFilter, request_id_var, setup_logging, shutdown_logging
+)
+
+
+def make_record(name="app.services.user_service", level=logging.INFO, msg="user active", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, (), None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+# ============================================================
+# Sampling
+# ============================================================
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("app.services=0.1, app.access=2") == {"app.services": 0.1, "app.access": 1.0}
+    assert parse_sample_rates("") == {}
+    with pytest.raises(ValueError):
+        parse_sample_rates("app.services")
+
+
+def test_sampling_filter_most_specific_prefix_and_warnings_kept():
+    sampler = SamplingFilter({"app.services": 0.0, "app.services.badge_service": 1.0})
+
+    assert not sampler.filter(make_record("app.services.user_service"))
+    assert sampler.filter(make_record("app.services.badge_service"))
+    assert sampler.filter(make_record("app.db.crud"))
+    assert sampler.filter(make_record("app.services.user_service", level=logging.WARNING))
+
+
+# ============================================================
+# Queue handler and formatting
+# ============================================================
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    token = request_id_var.set("req-1")
+    try:
+        record = make_record(user_id="u1")
+        RequestIdFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["request_id"] == "req-1"
+    assert entry["user_id"] == "u1"
+    assert entry["msg"] == "user active"
+    assert entry["level"] == "INFO"
+
+
+def test_setup_logging_writes_through_background_thread():
+    stream = io.StringIO()
+    setup_logging(level="DEBUG", fmt="json", sample_rates="", stream=stream)
+    try:
+        logging.getLogger("app.services.interview_service").info("interview saved", extra={"interview_id": "iv1"})
+    finally:
+        shutdown_logging()
+
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry["interview_id"] == "iv1"
+    assert entry["logger"] == "app.services.interview_service"
+    setup_logging()
+
+
+def test_setup_logging_keeps_exception_apart_from_message():
+    stream = io.StringIO()
+    setup_logging(level="DEBUG", fmt="json", sample_rates="", stream=stream)
+    try:
+        try:
+            {}["missing"]
+        except KeyError:
+            logging.getLogger("app.services.interview_service").exception("feedback failed for %s", "iv1")
+    finally:
+        shutdown_logging()
+
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry["msg"] == "feedback failed for iv1"
+    assert entry["exc"].startswith("Traceback") and "KeyError: 'missing'" in entry["exc"]
+    setup_logging()
+
+
+# ============================================================
+# Request id middleware
+# ============================================================
+
+def test_request_id_header_echoed_and_generated():
+    from app.main import app
+    client = TestClient(app)
+
+    assert client.get("/", headers={"X-Request-ID": "abc123"}).headers["X-Request-ID"] == "abc123"
+    assert len(client.get("/").headers["X-Request-ID"]) == 32
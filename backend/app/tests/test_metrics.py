@@ -0,0 +1,96 @@
+# backend/app/tests/test_metrics.py
+
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.metrics import (
+    Histogram, Counter, track_upstream, record_cache, request_stats_var, RequestStats,
+    upstream_requests, upstream_errors
+)
+from app.db.db_config import engine
+from app.external_access.gpt_access import GPTAccessClient
+
+
+# ============================================================
+# Metric types
+# ============================================================
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5.0, route="/a")
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_total", "Test.", ("error",))
+    counter.inc(error='say "hi"')
+
+    assert 'test_total{error="say \\"hi\\""} 1' in counter.render()
+
+
+# ============================================================
+# Instrumentation
+# ============================================================
+
+@patch("app.external_access.gpt_access.requests.post")
+def test_track_upstream_counts_status_and_errors(mock_post, monkeypatch):
+    monkeypatch.setenv("GPT_ACCESS_URL", "https://gpt.test")
+    mock_post.return_value = MagicMock(status_code=500, text="boom")
+    before_requests = upstream_requests.value(client="GPTAccessClient", outcome="500")
+    before_errors = upstream_errors.value(client="GPTAccessClient", error="http_500")
+
+    with pytest.raises(Exception):
+        GPTAccessClient("fake.jwt.token").send_prompt("Q")
+
+    assert upstream_requests.value(client="GPTAccessClient", outcome="500") == before_requests + 1
+    assert upstream_errors.value(client="GPTAccessClient", error="http_500") == before_errors + 1
+
+
+def test_track_upstream_counts_exceptions():
+    before = upstream_errors.value(client="TestClient", error="TimeoutError")
+
+    with pytest.raises(TimeoutError):
+        with track_upstream("TestClient"):
+            raise TimeoutError()
+
+    assert upstream_errors.value(client="TestClient", error="TimeoutError") == before + 1
+
+
+def test_sql_work_attributed_to_request():
+    stats = RequestStats()
+    token = request_stats_var.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        request_stats_var.reset(token)
+
+    assert stats.queries == 2
+    assert stats.db_seconds > 0
+
+
+def test_metrics_endpoint():
+    from app.main import app
+    client = TestClient(app)
+    record_cache("test_cache", hit=True)
+    record_cache("test_cache", hit=False)
+
+    client.get("/")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/",status="200"}' in response.text
+    assert 'cache_hit_ratio{cache="test_cache"} 0.5' in response.text
+    assert "db_pool_checkedout" in response.text
@@ -0,0 +1,96 @@
+# backend/app/tests/test_percentile_service.py
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.db.db_init import init_db
+from app.db.db_config import SessionLocal
+from app.db.models import User, SCORE_HISTOGRAM_BINS, SCORE_HISTOGRAM_DIMENSIONS
+from app.db.crud import get_score_histograms
+from app.services import percentile_service
+
+
+# ============================================================
+# Fixtures
+# ============================================================
+
+@pytest.fixture
+def db_session():
+    init_db(reset=True)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def fake_user(total_questions, score):
+    user = MagicMock()
+    user.total_questions = total_questions
+    for dimension in ("clarity", "relevance", "keyword", "confidence", "conciseness", "overall"):
+        setattr(user, f"total_{dimension}", score * total_questions)
+    return user
+
+
+# ============================================================
+# Pure helpers
+# ============================================================
+
+def test_score_bin_clamps_to_range():
+    assert percentile_service.score_bin(0) == 0
+    assert percentile_service.score_bin(2.5) == SCORE_HISTOGRAM_BINS // 2
+    assert percentile_service.score_bin(5.0) == SCORE_HISTOGRAM_BINS - 1
+    assert percentile_service.score_bin(-1) == 0
+
+
+def test_percentile_counts_half_of_own_bin():
+    counts = [0] * SCORE_HISTOGRAM_BINS
+    counts[percentile_service.score_bin(2.0)] = 2
+    counts[percentile_service.score_bin(4.0)] = 2
+
+    assert percentile_service.percentile(counts, 4.0) == 75.0
+    assert percentile_service.percentile(counts, 1.0) == 0.0
+    assert percentile_service.percentile([0] * SCORE_HISTOGRAM_BINS, 3.0) is None
+
+
+def test_user_averages_without_questions():
+    assert percentile_service.user_averages(fake_user(0, 0)) is None
+
+
+def test_score_changes_lists_only_moved_bins():
+    old = percentile_service.user_averages(fake_user(1, 2.0))
+    new = percentile_service.user_averages(fake_user(2, 4.0))
+
+    assert [d for d, old_bin, _ in percentile_service.score_changes(None, old)] == list(SCORE_HISTOGRAM_DIMENSIONS)
+    assert ("clarity", percentile_service.score_bin(2.0), percentile_service.score_bin(4.0)) in \
+        percentile_service.score_changes(old, new)
+    assert percentile_service.score_changes(new, new) == []
+
+
+# ============================================================
+# Histogram table
+# ============================================================
+
+def test_histograms_seeded_on_create(db_session):
+    histograms = get_score_histograms(db_session)
+
+    assert set(histograms) == {"clarity", "relevance", "keyword", "confidence", "conciseness", "overall"}
+    assert all(len(counts) == SCORE_HISTOGRAM_BINS and sum(counts) == 0 for counts in histograms.values())
+
+
+def test_rebuild_and_lookup(db_session):
+    for index, score in enumerate([1.0, 2.0, 3.0, 4.0]):
+        db_session.add(User(user_id=f"p{index}", user_email="p@test.com", total_questions=2,
+                            total_clarity=int(score * 2), total_relevance=0, total_keyword=0,
+                            total_confidence=0, total_conciseness=0, total_overall=score * 2))
+    db_session.add(User(user_id="p_new", user_email="p@test.com", total_questions=0))
+    db_session.commit()
+
+    users = percentile_service.rebuild_score_histograms(db=db_session)
+    percentiles = percentile_service.get_user_percentiles({"clarity": 4.0, "relevance": 0.0, "keyword": 0.0,
+                                                           "confidence": 0.0, "conciseness": 0.0, "overall": 4.0},
+                                                          db_session)
+
+    assert users["clarity"] == 4
+    assert percentiles["clarity"] == 87.5
+    assert percentiles["relevance"] == 50.0
@@ -0,0 +1,105 @@
+# backend/app/tests/test_profiling.py
+
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.profiling import ProfilingMiddleware, ProfileRateLimiter, load_profile, list_profiles, save_profile
+from app.db.db_config import engine
+
+
+ADMIN_TOKEN = "admin-secret"
+
+
+# ============================================================
+# Helper fixtures
+# ============================================================
+
+def slow_work():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiled_client(tmp_path):
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        slow_work()
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, admin_token=ADMIN_TOKEN, directory=str(tmp_path),
+                       interval_ms=1, per_minute=2)
+    return TestClient(app), str(tmp_path)
+
+
+# ============================================================
+# Middleware
+# ============================================================
+
+def test_profiled_request_stores_samples_and_sql(profiled_client):
+    client, directory = profiled_client
+
+    response = client.get("/slow", headers={"X-Profile-Token": ADMIN_TOKEN})
+
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Status"] == "profiled"
+    profile = load_profile(response.headers["X-Profile-Id"], directory)
+    assert profile["path"] == "/slow"
+    assert profile["samples"] > 0
+    assert any("slow_work" in line for line in profile["folded"])
+    assert [s["statement"] for s in profile["sql"]] == ["SELECT 1"]
+
+
+def test_unflagged_or_wrong_token_not_profiled(profiled_client):
+    client, directory = profiled_client
+
+    assert "X-Profile-Id" not in client.get("/slow").headers
+    assert "X-Profile-Id" not in client.get("/slow", headers={"X-Profile-Token": "guess"}).headers
+    assert list_profiles(directory) == []
+
+
+def test_profiling_rate_limited(profiled_client):
+    client, _ = profiled_client
+    headers = {"X-Profile-Token": ADMIN_TOKEN}
+
+    statuses = [client.get("/slow", headers=headers).headers["X-Profile-Status"] for _ in range(3)]
+
+    assert statuses == ["profiled", "profiled", "rate-limited"]
+
+
+def test_rate_limiter_one_at_a_time():
+    limiter = ProfileRateLimiter(per_minute=10)
+
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    limiter.release()
+    assert limiter.acquire()
+
+
+def test_save_profile_prunes_oldest(tmp_path):
+    for n in range(3):
+        save_profile({"profile_id": f"{n:032x}"}, str(tmp_path), keep=2)
+        time.sleep(0.01)
+
+    assert load_profile(f"{0:032x}", str(tmp_path)) is None
+    assert load_profile(f"{2:032x}", str(tmp_path)) is not None
+    assert load_profile("../etc/passwd", str(tmp_path)) is None
+
+
+# ============================================================
+# Admin routes
+# ============================================================
+
+def test_admin_profiles_require_token():
+    from app.main import app
+    client = TestClient(app)
+
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Profile-Token": "guess"}).status_code == 403
@@ -0,0 +1,194 @@
+# backend/app/tests/test_projector.py
+
+import pytest
+from datetime import date, datetime, timedelta
+
+from app.db import crud
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.core.ids import new_id
+from app.db.models import Badge, Interview, Question, QuestionEvent, User, UserBadge, current_millis
+from app.services import projector as projector_module
+from app.services.projector import Projector, question_event, projector_conflicts
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    yield
+
+
+@pytest.fixture
+def projector():
+    return Projector(mode="external", batch_size=2, gap_timeout=10)
+
+
+@pytest.fixture
+def users():
+    with SessionLocal() as db:
+        for user_id in ("u1", "u2"):
+            db.add(User(user_id=user_id, user_email=f"{user_id}@test.com"))
+            db.add(Interview(interview_id=f"iv-{user_id}", user_id=user_id, interview_type="technical",
+                             job_description="JD"))
+        db.commit()
+
+
+def millis(day: date, hour: int = 12) -> int:
+    return int(datetime(day.year, day.month, day.day, hour).timestamp() * 1000)
+
+
+def answer(user_id: str, overall: float, clarity: int = 0, timestamp: int = None, with_event: bool = True):
+    question = Question(question_id=new_id(), interview_id=f"iv-{user_id}",
+                        question="Q", question_type="technical", answer="A",
+                        feedback={"overall_score": overall, "clarity_structure_score": clarity},
+                        timestamp=timestamp or current_millis())
+    with SessionLocal() as db:
+        if with_event:
+            crud.add_question_with_event(question, question_event(user_id, question, question.feedback), db)
+        else:
+            crud.add_question(question, db)
+
+
+def get_user(user_id: str) -> User:
+    with SessionLocal() as db:
+        return db.get(User, user_id)
+
+
+def test_batches_apply_aggregate_deltas(projector, users):
+    today = date.today()
+    for overall, clarity in ((4.0, 80), (2.0, 60), (5.0, 70)):
+        answer("u1", overall, clarity, millis(today))
+    answer("u2", 3.0, 50, millis(today))
+
+    assert projector.run_once() == 2
+    assert projector.run_until_caught_up() == 2
+    assert projector.run_until_caught_up() == 0
+    assert projector.lag() == 0
+
+    u1 = get_user("u1")
+    assert u1.total_questions == 3
+    assert u1.total_overall == 11.0 and u1.avg_overall == pytest.approx(11.0 / 3)
+    assert u1.max_overall == 5.0 and u1.max_clarity == 80
+    assert u1.xp == 8 + 4 + 10 + 5  # answers plus one active day
+    assert get_user("u2").total_questions == 1
+    with SessionLocal() as db:
+        histograms = crud.get_score_histograms(db)
+    assert sum(histograms["overall"]) == 2
+
+
+def test_max_overall_compares_against_max(projector, users):
+    # The old write path compared the new score with total_overall and never raised the maximum.
+    answer("u1", 3.0)
+    answer("u1", 4.0)
+    projector.run_until_caught_up()
+    assert get_user("u1").max_overall == 4.0
+
+
+def test_lost_checkpoint_race_applies_nothing(projector, users, monkeypatch):
+    answer("u1", 4.0)
+    projector.run_until_caught_up()
+    before = projector_conflicts.value()
+
+    # Another projector read the checkpoint before this one moved it.
+    answer("u1", 2.0)
+    monkeypatch.setattr(projector_module.crud, "get_projector_checkpoint", lambda name, lock=False, db=None: 0)
+    assert projector.run_once() == 0
+
+    assert projector_conflicts.value() == before + 1
+    assert get_user("u1").total_questions == 1
+
+
+def test_failed_commit_leaves_leaderboard_untouched(projector, users, monkeypatch):
+    board = projector_module.leaderboard
+    with SessionLocal() as db:
+        board.top("xp", 10, db)
+    answer("u1", 4.0)
+
+    def fail(self):
+        raise RuntimeError("commit failed")
+    with monkeypatch.context() as patched, pytest.raises(RuntimeError):
+        patched.setattr(projector_module.SessionLocal.class_, "commit", fail)
+        projector.run_once()
+
+    assert dict(board.top("xp", 10, None))["u1"] == 0
+    projector.run_until_caught_up()
+    assert dict(board.top("xp", 10, None))["u1"] > 0
+
+
+def test_young_gap_holds_back_later_events(projector, users):
+    now = current_millis()
+    with SessionLocal() as db:
+        # Event 2 is still uncommitted somewhere, or was rolled back.
+        db.add(QuestionEvent(event_id=1, user_id="u1", question_id="a", interview_id="iv-u1", clarity=0, relevance=0,
+                             keyword=0, confidence=0, conciseness=0, overall=4.0, created_at=now))
+        db.add(QuestionEvent(event_id=3, user_id="u1", question_id="b", interview_id="iv-u1", clarity=0, relevance=0,
+                             keyword=0, confidence=0, conciseness=0, overall=4.0, created_at=now))
+        db.commit()
+
+    assert projector.run_until_caught_up() == 1
+    assert get_user("u1").total_questions == 1
+
+    old = Projector(mode="external", gap_timeout=0)
+    assert old.run_until_caught_up() == 1
+    assert get_user("u1").total_questions == 2
+
+
+def test_badges_unlock_in_bulk_by_answer_hour(projector, users):
+    with SessionLocal() as db:
+        db.add_all([Badge(badge_id=1, name="Ice Breaker", description="x"),
+                    Badge(badge_id=2, name="Night Owl", description="x"),
+                    Badge(badge_id=3, name="Early Bird", description="x")])
+        db.commit()
+    answer("u1", 4.0, timestamp=millis(date.today(), hour=23))
+    answer("u1", 4.0, timestamp=millis(date.today(), hour=23))
+    answer("u2", 4.0, timestamp=millis(date.today(), hour=12))
+    projector.run_until_caught_up()
+
+    with SessionLocal() as db:
+        assert {b.badge_id for b in crud.get_unlocked_badges("u1", db)} == {1, 2}
+        assert {b.badge_id for b in crud.get_unlocked_badges("u2", db)} == {1}
+        assert db.query(UserBadge).count() == 3
+    assert get_user("u1").total_badges == 2
+
+
+def test_answers_on_consecutive_days_extend_streak(projector, users):
+    start = date.today() - timedelta(days=5)
+    for offset in (0, 1, 1, 2, 4):
+        answer("u1", 0.0, timestamp=millis(start + timedelta(days=offset)))
+    projector.run_until_caught_up()
+
+    u1 = get_user("u1")
+    assert u1.total_active_days == 4
+    assert u1.max_consecutive_active_days == 3
+    assert u1.consecutive_active_days == 1
+    assert u1.last_active_day == start + timedelta(days=4)
+    assert u1.xp == 4 * 5
+
+
+def test_rebuild_repairs_aggregates_and_backfills_legacy_questions(projector, users):
+    answer("u1", 4.0, 80)
+    answer("u1", 2.0, 60, with_event=False)  # saved before the event log existed
+    projector.run_until_caught_up()
+    with SessionLocal() as db:
+        db.add(Badge(badge_id=1, name="Ice Breaker", description="x"))
+        db.get(User, "u1").total_overall = 99.0  # drifted
+        db.commit()
+
+    result = projector.rebuild()
+
+    assert result == {"backfilled": 1, "events": 2, "users": 2}
+    u1 = get_user("u1")
+    assert u1.total_questions == 2
+    assert u1.total_overall == 6.0 and u1.avg_clarity == 70.0 and u1.max_overall == 4.0
+    assert u1.xp == 5 * u1.total_active_days + 8 + 4
+    assert u1.total_badges == 1
+    assert get_user("u2").total_questions == 0
+    assert projector.lag() == 0
+    assert projector.run_until_caught_up() == 0
+    assert projector.rebuild()["backfilled"] == 0
+
+
+def test_invalid_mode_is_refused():
+    with pytest.raises(ValueError):
+        Projector(mode="sometimes")
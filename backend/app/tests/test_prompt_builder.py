@@ -1,11 +1,17 @@
 # backend/app/tests/test_prompt_builder.py
 
+from unittest.mock import patch
+
 from app.prompt_builder import (
     build_question_prompt,
     build_feedback_prompt,
     build_multicrit_feedback_prompt,
     build_answer_prompt,
 )
+from app.prompt_builder.budget import (
+    OMITTED, PromptBudget, compress_job_description, estimate_tokens, prompt_rubrics, prompt_tokens,
+    prompt_trimmed_tokens, truncate_middle,
+)
 
 JOB_DESCRIPTION = (
     "We are looking for a passionate and skilled Python Developer to join our technical team. "
@@ -89,4 +95,85 @@ def test_build_answer_prompt_contains_all_fields():
     assert len(prompt) > 0
 
     assert QUESTION in prompt
-    assert JOB_DESCRIPTION in prompt
\ No newline at end of file
+    assert JOB_DESCRIPTION in prompt
+
+# ============================================================
+# Prompt budget
+# ============================================================
+
+LONG_POSTING = """Senior Python Developer
+About Us:
+Acme is a fast-growing fintech company with offices in twelve countries and a mission to make money simple.
+We value curiosity, ownership and teamwork in everything we do.
+Responsibilities:
+- Build REST APIs with FastAPI and PostgreSQL
+- Mentor junior engineers
+Requirements:
+- 5+ years of Python experience
+- Experience with AWS, Docker and Kubernetes
+Benefits:
+- Health insurance, dental and vision
+- Unlimited paid time off
+Acme is an equal opportunity employer and considers all applicants regardless of race, religion or sex.
+- Build REST APIs with FastAPI and PostgreSQL
+""" * 5
+LONG_RUBRIC_LINE = "- 5: Extremely clear, logical flow"
+SHORT_RUBRIC_LINE = "Scoring Guide: 5 = Excellent"
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello, world!") == 4
+    assert estimate_tokens("internationalization 2024") == 6
+
+
+def test_compress_job_description_keeps_requirements():
+    compressed = compress_job_description(LONG_POSTING, 60)
+    assert estimate_tokens(compressed) <= 60
+    assert compressed.splitlines()[0] == "Senior Python Developer"
+    assert compressed.count("- Build REST APIs with FastAPI and PostgreSQL") == 1
+    assert "- 5+ years of Python experience" in compressed
+    assert "equal opportunity" not in compressed
+    assert "Health insurance" not in compressed
+    assert compress_job_description(JOB_DESCRIPTION, 600) == JOB_DESCRIPTION
+
+
+def test_truncate_middle_keeps_opening_and_result():
+    answer = " ".join(f"Step {n} of the migration went fine." for n in range(100)) + " Latency dropped by 80%."
+    truncated = truncate_middle(answer, 50)
+    assert estimate_tokens(truncated) <= 50
+    assert truncated.startswith("Step 0 of the migration went fine.")
+    assert truncated.endswith("Latency dropped by 80%.")
+    assert OMITTED in truncated
+    assert truncate_middle(ANSWER, 800) == ANSWER
+
+
+def test_feedback_prompt_chooses_rubric_by_remaining_budget():
+    long_answer = " ".join(["I built and deployed a FastAPI service on AWS."] * 60)
+    budget = PromptBudget(max_tokens=900, answer_tokens=500)
+    with patch("app.prompt_builder.feedback_builder.prompt_budget", budget):
+        short_prompt = build_feedback_prompt(QUESTION, "I used Python 3 for type hints.", job_description=JOB_DESCRIPTION)
+        long_prompt = build_feedback_prompt(QUESTION, long_answer, job_description=JOB_DESCRIPTION)
+    assert LONG_RUBRIC_LINE in short_prompt
+    assert SHORT_RUBRIC_LINE in long_prompt and LONG_RUBRIC_LINE not in long_prompt
+    assert OMITTED in long_prompt
+
+
+def test_prompt_size_metrics_are_recorded():
+    observed = prompt_tokens.count(prompt="question")
+    trimmed = prompt_trimmed_tokens.value(prompt="question", section="job_description")
+    rubrics = prompt_rubrics.value(rubric="long") + prompt_rubrics.value(rubric="short")
+    with patch("app.prompt_builder.question_builder.prompt_budget", PromptBudget(job_description_tokens=60)):
+        prompt = build_question_prompt(LONG_POSTING, "technical")
+    build_feedback_prompt(QUESTION, ANSWER, job_description=JOB_DESCRIPTION)
+    assert estimate_tokens(prompt) < estimate_tokens(LONG_POSTING)
+    assert prompt_tokens.count(prompt="question") == observed + 1
+    assert prompt_trimmed_tokens.value(prompt="question", section="job_description") > trimmed
+    assert prompt_rubrics.value(rubric="long") + prompt_rubrics.value(rubric="short") == rubrics + 1
+
+
+def test_disabled_budget_passes_sections_through():
+    with patch("app.prompt_builder.feedback_builder.prompt_budget", PromptBudget(enabled=False)):
+        prompt = build_feedback_prompt(QUESTION, ANSWER, job_description=LONG_POSTING)
+    assert LONG_POSTING.strip() in prompt
+    assert SHORT_RUBRIC_LINE in prompt
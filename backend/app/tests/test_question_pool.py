@@ -0,0 +1,139 @@
+# backend/app/tests/test_question_pool.py
+
+import threading
+import time
+from unittest.mock import patch
+
+from app.services.question_pool import QuestionPool, normalize_key
+from app.core.executors import llm_executor
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_pool(**kwargs):
+    clock = FakeClock()
+    options = {"size": 2, "hot_keys": 2, "min_demand": 2, "half_life": 100.0, "ttl": 50.0, "clock": clock}
+    options.update(kwargs)
+    return QuestionPool(**options), clock
+
+
+def numbered(prefix):
+    count = {"n": 0}
+    lock = threading.Lock()
+
+    def generate(job_description, question_type):
+        with lock:
+            count["n"] += 1
+            return [f"{prefix} {job_description} {question_type} {count['n']}"]
+    return generate, count
+
+
+# ============================================================
+# Keys and demand
+# ============================================================
+
+def test_normalize_key():
+    assert normalize_key("  Senior Python   Developer.\n", "Technical") == ("senior python developer", "technical")
+
+
+def test_demand_decays_with_half_life():
+    pool, clock = make_pool()
+    for _ in range(4):
+        pool.record_demand("Python developer", "technical")
+    assert [entry.job_description for _, entry in pool.hot()] == ["Python developer"]
+
+    clock.now += 100  # one half-life: 4 -> 2
+    assert len(pool.hot()) == 1
+    clock.now += 1
+    assert pool.hot() == []
+
+
+def test_hot_keys_are_the_most_demanded():
+    pool, _ = make_pool(hot_keys=1)
+    for _ in range(3):
+        pool.record_demand("a", "technical")
+    for _ in range(5):
+        pool.record_demand("b", "technical")
+    assert [key for key, _ in pool.hot()] == [("b", "technical")]
+
+
+# ============================================================
+# Refill and take
+# ============================================================
+
+def test_refill_fills_hot_keys_only():
+    pool, _ = make_pool()
+    for _ in range(2):
+        pool.record_demand("Hot role", "technical")
+    pool.record_demand("cold role", "technical")
+    generate, count = numbered("Q")
+
+    assert pool.refill_once(generate) == 2
+    assert count["n"] == 2
+    assert pool.refill_once(generate) == 0
+
+    first = pool.take("hot role", "Technical")
+    assert first[0].startswith("Q Hot role technical")
+    assert pool.take("hot role", "technical") != first
+    assert pool.take("hot role", "technical") is None
+    assert pool.take("cold role", "technical") is None
+
+
+def test_take_discards_expired_sets():
+    pool, clock = make_pool()
+    pool.add(("role", "technical"), ["old"])
+    clock.now += 51
+    assert pool.take("role", "technical") is None
+
+
+def test_refill_stops_when_llm_is_busy():
+    pool, _ = make_pool(concurrency=1)
+    for _ in range(2):
+        pool.record_demand("role", "technical")
+    generate, count = numbered("Q")
+    assert pool.refill_once(generate, may_run=lambda: False) == 0
+    assert count["n"] == 0
+
+
+def test_refill_limits_concurrency():
+    pool, _ = make_pool(size=4, concurrency=2)
+    for _ in range(2):
+        pool.record_demand("role", "technical")
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def generate(job_description, question_type):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return ["Q"]
+
+    assert pool.refill_once(generate) == 4
+    assert state["peak"] == 2
+
+
+def test_refill_survives_generation_errors():
+    pool, _ = make_pool()
+    for _ in range(2):
+        pool.record_demand("role", "technical")
+
+    def generate(job_description, question_type):
+        raise RuntimeError("GPT down")
+
+    assert pool.refill_once(generate) == 0
+
+
+def test_llm_is_quiet_follows_executor_load():
+    pool, _ = make_pool(max_llm_load=0.5)
+    assert pool.llm_is_quiet()
+    with patch.object(llm_executor, "active", llm_executor.workers):
+        assert not pool.llm_is_quiet()
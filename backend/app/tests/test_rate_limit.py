@@ -0,0 +1,202 @@
+# backend/app/tests/test_rate_limit.py
+
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from app.main import app
+from app.core.rate_limit import (
+    Limit, MemoryBuckets, DatabaseBuckets, RateLimiter, parse_limit, rate_limiter, rate_limited_requests
+)
+from app.db.db_init import init_db
+from app.tests.test_route import FAKE_TOKEN, FAKE_USER_ID
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    yield
+
+
+@pytest.fixture(params=["memory", "database"])
+def buckets(request):
+    clock = FakeClock()
+    store = MemoryBuckets(clock=clock) if request.param == "memory" else DatabaseBuckets(clock=clock)
+    return store, clock
+
+
+# ============================================================
+# Limits
+# ============================================================
+
+def test_parse_limit():
+    assert parse_limit("10/600") == Limit(10.0, 600.0)
+    assert parse_limit("off") is None
+    assert parse_limit("") is None
+    with pytest.raises(ValueError):
+        parse_limit("10")
+    with pytest.raises(ValueError):
+        parse_limit("10/0")
+
+
+# ============================================================
+# Buckets, on both backends
+# ============================================================
+
+def test_bucket_allows_burst_then_refuses(buckets):
+    store, _ = buckets
+    limit = Limit(3, 60)  # one token every 20s
+    assert [store.take("k", limit).allowed for _ in range(4)] == [True, True, True, False]
+
+    refused = store.take("k", limit)
+    assert not refused.allowed
+    assert refused.retry_after == pytest.approx(20.0)
+    assert refused.retry_after_header == "20"
+
+
+def test_bucket_refills_over_time(buckets):
+    store, clock = buckets
+    limit = Limit(2, 20)  # one token every 10s
+    store.take("k", limit)
+    store.take("k", limit)
+    assert not store.take("k", limit).allowed
+
+    clock.now += 5
+    decision = store.take("k", limit)
+    assert not decision.allowed
+    assert decision.retry_after == pytest.approx(5.0)
+
+    clock.now += 5
+    assert store.take("k", limit).allowed
+    # Refill stops at capacity.
+    clock.now += 1000
+    assert [store.take("k", limit).allowed for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_are_per_key(buckets):
+    store, _ = buckets
+    limit = Limit(1, 60)
+    assert store.take("a", limit).allowed
+    assert not store.take("a", limit).allowed
+    assert store.take("b", limit).allowed
+
+
+def test_database_buckets_are_shared_across_instances():
+    """Two workers, each with its own DatabaseBuckets, draw from the same rows."""
+    clock = FakeClock()
+    limit = Limit(2, 60)
+    worker_a, worker_b = DatabaseBuckets(clock=clock), DatabaseBuckets(clock=clock)
+    assert worker_a.take("k", limit).allowed
+    assert worker_b.take("k", limit).allowed
+    assert not worker_a.take("k", limit).allowed
+
+
+def test_memory_buckets_concurrent_takes_never_overdraw():
+    store = MemoryBuckets(clock=FakeClock())
+    limit = Limit(50, 600)
+    results = []
+
+    def worker():
+        for _ in range(20):
+            results.append(store.take("k", limit).allowed)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results.count(True) == 50
+
+
+def test_memory_buckets_prune_refilled_buckets():
+    clock = FakeClock()
+    store = MemoryBuckets(clock=clock, max_keys=2)
+    limit = Limit(1, 10)
+    store.take("a", limit)
+    store.take("b", limit)
+    clock.now += 11
+    store.take("c", limit)
+    assert set(store.buckets) == {"c"}
+
+
+def test_rate_limiter_disabled_limit_always_allows():
+    limiter = RateLimiter({"interview_start": None})
+    assert all(limiter.take("interview_start", "u1").allowed for _ in range(100))
+
+
+# ============================================================
+# Routes
+# ============================================================
+
+def test_interview_start_answers_429_with_retry_after():
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {FAKE_TOKEN}"}
+    payload = {"job_description": "Python developer", "question_type": "technical"}
+    limiter = RateLimiter({"interview_start": Limit(2, 60)}, MemoryBuckets(clock=FakeClock()))
+    refused_before = rate_limited_requests.value(limit="interview_start")
+
+    with patch.object(rate_limiter, "limits", limiter.limits), patch.object(rate_limiter, "backend", limiter.backend), \
+         patch("app.api.interview.interview_start") as mock_start:
+        mock_start.return_value = {"interview_id": "i1", "interview_questions": ["Q"]}
+        codes = [client.post("/interview/start", json=payload, headers=headers).status_code for _ in range(2)]
+        response = client.post("/interview/start", json=payload, headers=headers)
+
+    assert codes == [200, 200]
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert mock_start.call_count == 2
+    assert rate_limited_requests.value(limit="interview_start") == refused_before + 1
+
+
+def test_feedback_limit_is_separate_from_start():
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {FAKE_TOKEN}"}
+    limiter = RateLimiter({"interview_start": Limit(1, 60), "interview_feedback": Limit(1, 60)},
+                          MemoryBuckets(clock=FakeClock()))
+    limiter.take("interview_start", FAKE_USER_ID)
+
+    with patch.object(rate_limiter, "limits", limiter.limits), patch.object(rate_limiter, "backend", limiter.backend), \
+         patch("app.api.interview.interview_feedback") as mock_feedback:
+        mock_feedback.return_value = {"interview_feedback": {}}
+        response = client.post(
+            "/interview/feedback",
+            json={
+                "interview_id": "i1",
+                "interview_type": "technical",
+                "interview_question": "Q",
+                "interview_answer": "A",
+            },
+            headers=headers,
+        )
+
+    assert response.status_code != 429
+    assert mock_feedback.called
+
+
+def test_feedback_retry_of_completed_key_is_not_charged():
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {FAKE_TOKEN}", "Idempotency-Key": "submit-1"}
+    body = {"interview_id": "i1", "interview_type": "technical", "interview_question": "Q", "interview_answer": "A"}
+    limiter = RateLimiter({"interview_feedback": Limit(1, 60)}, MemoryBuckets(clock=FakeClock()))
+
+    with patch.object(rate_limiter, "limits", limiter.limits), patch.object(rate_limiter, "backend", limiter.backend), \
+         patch("app.api.interview.interview_feedback") as mock_feedback:
+        mock_feedback.return_value = {"interview_feedback": {"overall_score": 4.0}}
+        first = client.post("/interview/feedback", json=body, headers=headers)
+        retry = client.post("/interview/feedback", json=body, headers=headers)
+        other = client.post("/interview/feedback", json=body, headers={**headers, "Idempotency-Key": "submit-2"})
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert other.status_code == 429
+    assert mock_feedback.call_count == 1
@@ -1,9 +1,11 @@
 # backend/app/tests/test_routes.py
 
+import jwt
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from app.main import app
+from app.tests.query_counter import query_budget
 
 # Create test client
 client = TestClient(app)
@@ -12,8 +14,9 @@ client = TestClient(app)
 #  Test Data
 # ============================================================
 
-FAKE_TOKEN = "fake.jwt.token"
 FAKE_USER_ID = "user123"
+# No signing key is configured under test, so tokens are decoded without verifying the signature.
+FAKE_TOKEN = jwt.encode({"id": FAKE_USER_ID, "email": "test@example.com"}, "test-secret", algorithm="HS256")
 FAKE_INTERVIEW_ID = "550e8400-e29b-41d4-a716-446655440000"
 
 
@@ -102,10 +105,8 @@ def test_login_service_error(mock_login):
 # ============================================================
 
 @patch("app.api.interview.interview_start")
-@patch("app.api.interview.get_token")
-def test_interview_start_success(mock_get_token, mock_interview_start, auth_headers):
+def test_interview_start_success(mock_interview_start, auth_headers):
     """Test POST /interview/start with valid data"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_interview_start.return_value = {
         "interview_id": FAKE_INTERVIEW_ID,
         "interview_questions": [
@@ -144,10 +145,8 @@ def test_interview_start_missing_auth():
     assert response.status_code == 403
 
 
-@patch("app.api.interview.get_token")
-def test_interview_start_missing_fields(mock_get_token, auth_headers):
+def test_interview_start_missing_fields(auth_headers):
     """Test POST /interview/start with missing required fields"""
-    mock_get_token.return_value = FAKE_TOKEN
     
     response = client.post(
         "/interview/start",
@@ -162,10 +161,8 @@ def test_interview_start_missing_fields(mock_get_token, auth_headers):
 
 
 @patch("app.api.interview.interview_feedback")
-@patch("app.api.interview.get_token")
-def test_interview_feedback_success(mock_get_token, mock_feedback, auth_headers):
+def test_interview_feedback_success(mock_feedback, auth_headers):
     """Test POST /interview/feedback with valid data"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_feedback.return_value = {
         "interview_feedback": {
             "clarity_structure_score": 5,
@@ -220,10 +217,8 @@ def test_interview_feedback_missing_auth():
 # ============================================================
 
 @patch("app.api.user.get_user_detail")
-@patch("app.api.user.get_token")
-def test_user_detail_success(mock_get_token, mock_get_detail, auth_headers):
+def test_user_detail_success(mock_get_detail, auth_headers):
     """Test GET /user/detail returns user data"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_get_detail.return_value = {
         "user_id": FAKE_USER_ID,
         "user_email": "test@example.com",
@@ -249,6 +244,53 @@ def test_user_detail_success(mock_get_token, mock_get_detail, auth_headers):
     assert data["xp"] == 1250
 
 
+@patch("app.api.user.get_user_detail")
+def test_user_detail_sparse_fields(mock_get_detail, auth_headers):
+    """Test GET /user/detail?fields= returns only the projected fields"""
+    mock_get_detail.return_value = {
+        "interviews": [{"interview_id": FAKE_INTERVIEW_ID, "questions": [{"feedback": {"overall_score": 4.4}}]}]
+    }
+
+    response = client.get(
+        "/user/detail?fields=interviews.interview_id,interviews.questions.feedback.overall_score",
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json() == mock_get_detail.return_value
+
+
+@patch("app.api.user.get_user_detail")
+def test_user_detail_unknown_field(mock_get_detail, auth_headers):
+    """Test GET /user/detail with an unknown field returns 400"""
+    mock_get_detail.side_effect = ValueError("Unknown field: secret")
+
+    response = client.get("/user/detail?fields=secret", headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_user_detail_invalid_token():
+    """Test GET /user/detail with a malformed bearer token returns 401"""
+    response = client.get("/user/detail", headers={"Authorization": "Bearer fake.jwt.token"})
+
+    assert response.status_code == 401
+
+
+@patch("app.api.user.get_user_target")
+@patch("app.api.helper.resolve_principal")
+def test_principal_resolved_once_per_request(mock_resolve, mock_get_target, auth_headers):
+    """Test the bearer token is decoded once and only user_id reaches the service"""
+    from app.core.security import Principal
+    mock_resolve.return_value = Principal(FAKE_USER_ID, "test@example.com", FAKE_TOKEN)
+    mock_get_target.return_value = None
+
+    client.get("/user/target", headers=auth_headers)
+
+    mock_resolve.assert_called_once_with(FAKE_TOKEN)
+    mock_get_target.assert_called_once_with(FAKE_USER_ID)
+
+
 def test_user_detail_missing_auth():
     """Test GET /user/detail without auth returns 403"""
     response = client.get("/user/detail")
@@ -256,11 +298,100 @@ def test_user_detail_missing_auth():
     assert response.status_code == 403
 
 
+@patch("app.api.user.export_user_history")
+def test_user_export_streams_ndjson(mock_export, auth_headers):
+    """Test GET /user/export streams one JSON object per line"""
+    mock_export.return_value = iter([
+        '{"interview_id": "iv1", "questions": [], "cursor": "1:iv1"}\n',
+        '{"interview_id": "iv2", "questions": [], "cursor": "2:iv2"}\n'
+    ])
+
+    response = client.get(
+        "/user/export?since=0:iv0",
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.strip().splitlines()
+    assert len(lines) == 2
+    mock_export.assert_called_once_with(FAKE_USER_ID, "0:iv0")
+
+
+@patch("app.api.user.export_user_history")
+def test_user_export_invalid_cursor(mock_export, auth_headers):
+    """Test GET /user/export with a malformed cursor returns 400"""
+    mock_export.side_effect = ValueError("Invalid export cursor: abc")
+
+    response = client.get(
+        "/user/export?since=abc",
+        headers=auth_headers
+    )
+
+    assert response.status_code == 400
+
+
+@patch("app.api.user.search_user_history")
+def test_user_search_success(mock_search, auth_headers):
+    """Test GET /user/search returns ranked snippets"""
+    mock_search.return_value = {
+        "query": "kafka",
+        "results": [{
+            "question_id": "q1",
+            "interview_id": FAKE_INTERVIEW_ID,
+            "timestamp": 1698796800000,
+            "rank": 1.5,
+            "question_snippet": "How does <b>Kafka</b> work?",
+            "answer_snippet": "<b>Kafka</b> uses logs"
+        }],
+        "next_offset": None
+    }
+
+    response = client.get("/user/search?q=kafka&limit=10", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["question_id"] == "q1"
+    mock_search.assert_called_once_with(FAKE_USER_ID, "kafka", 10, 0)
+
+
+def test_user_search_missing_query(auth_headers):
+    """Test GET /user/search without q returns 422"""
+    response = client.get("/user/search", headers=auth_headers)
+
+    assert response.status_code == 422
+
+
+@patch("app.api.user.get_question_bank")
+def test_user_bank_success(mock_bank, auth_headers):
+    """Test GET /user/bank returns a page of liked interviews"""
+    mock_bank.return_value = {
+        "interviews": [{
+            "interview_id": FAKE_INTERVIEW_ID,
+            "interview_type": "technical",
+            "job_description": "Python developer",
+            "interview_time": 1698796800000,
+            "questions": []
+        }],
+        "next_cursor": f"1698796800000:{FAKE_INTERVIEW_ID}"
+    }
+
+    response = client.get("/user/bank?limit=1&interview_type=technical", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] == f"1698796800000:{FAKE_INTERVIEW_ID}"
+    mock_bank.assert_called_once_with(FAKE_USER_ID, 1, None, "technical", None, None)
+
+
+def test_user_bank_limit_too_large(auth_headers):
+    """Test GET /user/bank with limit above 100 returns 422"""
+    response = client.get("/user/bank?limit=500", headers=auth_headers)
+
+    assert response.status_code == 422
+
+
 @patch("app.api.user.like_interview")
-@patch("app.api.user.get_token")
-def test_user_like_success(mock_get_token, mock_like, auth_headers):
+def test_user_like_success(mock_like, auth_headers):
     """Test POST /user/like toggles interview like status"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_like.return_value = {
         "interview_id": FAKE_INTERVIEW_ID,
         "is_like": True
@@ -280,10 +411,8 @@ def test_user_like_success(mock_get_token, mock_like, auth_headers):
 
 
 @patch("app.api.user.get_user_interview_summary")
-@patch("app.api.user.get_token")
-def test_user_interview_summary_success(mock_get_token, mock_summary, auth_headers):
+def test_user_interview_summary_success(mock_summary, auth_headers):
     """Test GET /user/interview_summary returns average scores"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_summary.return_value = {
         "avg_clarity": 4.5,
         "avg_relevance": 4.2,
@@ -305,10 +434,8 @@ def test_user_interview_summary_success(mock_get_token, mock_summary, auth_heade
 
 
 @patch("app.api.user.get_user_interview_summary")
-@patch("app.api.user.get_token")
-def test_user_interview_summary_no_data(mock_get_token, mock_summary, auth_headers):
+def test_user_interview_summary_no_data(mock_summary, auth_headers):
     """Test GET /user/interview_summary when user not found"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_summary.return_value = None
     
     response = client.get(
@@ -319,13 +446,9 @@ def test_user_interview_summary_no_data(mock_get_token, mock_summary, auth_heade
     assert response.status_code == 404
 
 
-@patch("app.services.auth_service.get_user_id_and_email")  # Patch where it's defined
 @patch("app.api.user.get_user_statistics")
-@patch("app.api.user.get_token")
-def test_user_statistics_success(mock_get_token, mock_stats, mock_get_id, auth_headers):
+def test_user_statistics_success(mock_stats, auth_headers):
     """Test GET /user/statistics returns comprehensive stats"""
-    mock_get_token.return_value = FAKE_TOKEN
-    mock_get_id.return_value = {"id": FAKE_USER_ID}
     
     mock_user_stats = MagicMock()
     mock_user_stats.get_dict.return_value = {
@@ -374,10 +497,8 @@ def test_user_statistics_success(mock_get_token, mock_stats, mock_get_id, auth_h
 
 
 @patch("app.api.user.set_user_target")
-@patch("app.api.user.get_token")
-def test_user_set_target_success(mock_get_token, mock_set_target, auth_headers):
+def test_user_set_target_success(mock_set_target, auth_headers):
     """Test POST /user/target sets user goals"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_set_target.return_value = {
         "user_id": FAKE_USER_ID,
         "target_clarity": 5,
@@ -404,10 +525,8 @@ def test_user_set_target_success(mock_get_token, mock_set_target, auth_headers):
     assert data["target_clarity"] == 5
 
 
-@patch("app.api.user.get_token")
-def test_user_set_target_invalid_range(mock_get_token, auth_headers):
+def test_user_set_target_invalid_range(auth_headers):
     """Test POST /user/target with invalid score range"""
-    mock_get_token.return_value = FAKE_TOKEN
     
     response = client.post(
         "/user/target",
@@ -425,10 +544,8 @@ def test_user_set_target_invalid_range(mock_get_token, auth_headers):
 
 
 @patch("app.api.user.get_user_target")
-@patch("app.api.user.get_token")
-def test_user_get_target_success(mock_get_token, mock_get_target, auth_headers):
+def test_user_get_target_success(mock_get_target, auth_headers):
     """Test GET /user/target retrieves user goals"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_get_target.return_value = {
         "user_id": FAKE_USER_ID,
         "target_clarity": 5,
@@ -448,6 +565,42 @@ def test_user_get_target_success(mock_get_token, mock_get_target, auth_headers):
     assert data["target_clarity"] == 5
 
 
+@patch("app.api.leaderboard.get_leaderboard")
+def test_leaderboard_success(mock_board, auth_headers):
+    """Test GET /leaderboard returns ranked entries"""
+    mock_board.return_value = {
+        "dimension": "xp",
+        "entries": [{"rank": 1, "user_id": FAKE_USER_ID, "score": 1250}]
+    }
+
+    response = client.get("/leaderboard?dimension=xp&limit=5", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["entries"][0]["user_id"] == FAKE_USER_ID
+    mock_board.assert_called_once_with("xp", 5)
+
+
+@patch("app.api.leaderboard.get_leaderboard")
+def test_leaderboard_unknown_dimension(mock_board, auth_headers):
+    """Test GET /leaderboard with an unknown dimension returns 400"""
+    mock_board.side_effect = ValueError("Unknown leaderboard dimension: height")
+
+    response = client.get("/leaderboard?dimension=height", headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+@patch("app.api.user.get_user_rank")
+def test_user_rank_success(mock_rank, auth_headers):
+    """Test GET /user/rank returns the user's rank"""
+    mock_rank.return_value = {"user_id": FAKE_USER_ID, "dimension": "clarity", "score": 4.2, "rank": 7}
+
+    response = client.get("/user/rank?dimension=clarity", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["rank"] == 7
+
+
 # ============================================================
 #  Error Handling Tests
 # ============================================================
@@ -460,10 +613,8 @@ def test_invalid_endpoint():
 
 
 @patch("app.api.interview.interview_start")
-@patch("app.api.interview.get_token")
-def test_service_exception_handling(mock_get_token, mock_start, auth_headers):
+def test_service_exception_handling(mock_start, auth_headers):
     """Test that service exceptions are properly handled"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_start.side_effect = Exception("Database error")
     
     response = client.post(
@@ -516,10 +667,8 @@ def test_login_with_empty_email():
 
 
 @patch("app.api.interview.interview_start")
-@patch("app.api.interview.get_token")
-def test_interview_start_with_empty_job_description(mock_get_token, mock_start, auth_headers):
+def test_interview_start_with_empty_job_description(mock_start, auth_headers):
     """Test interview start with empty job description"""
-    mock_get_token.return_value = FAKE_TOKEN
     mock_start.return_value = {
         "interview_id": FAKE_INTERVIEW_ID,
         "interview_questions": ["Q1", "Q2", "Q3"]
@@ -534,4 +683,69 @@ def test_interview_start_with_empty_job_description(mock_get_token, mock_start,
         }
     )
     
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+# ============================================================
+#  Query Budgets (real services on the test database)
+# ============================================================
+
+@pytest.fixture
+def seeded_db():
+    """A user with 5 liked interviews of 3 questions each, owned by FAKE_USER_ID"""
+    from app.db.db_init import init_db
+    from app.db.db_config import SessionLocal
+    from app.db.models import User, Interview, Question
+    from app.db.crud import add_user, add_interview, add_question
+
+    init_db(reset=True)
+    session = SessionLocal()
+    add_user(User(user_id=FAKE_USER_ID, user_email="test@example.com"), session)
+    for n in range(5):
+        add_interview(Interview(interview_id=f"iv{n}", user_id=FAKE_USER_ID, interview_type="technical",
+                                job_description="JD", timestamp=1000 + n, is_like=True), session)
+        for k in range(3):
+            add_question(Question(question_id=f"iv{n}_q{k}", interview_id=f"iv{n}", question="Q",
+                                  question_type="technical", answer="A", feedback={"overall_score": 3.0},
+                                  timestamp=2000 + n * 10 + k), session)
+    session.close()
+
+
+@pytest.mark.parametrize("path,budget", [
+    ("/user/statistics", 1),
+    ("/user/detail", 3),
+    ("/user/detail?fields=interviews.interview_id,interviews.questions.question_id", 2),
+    ("/user/bank?limit=3", 2),
+    ("/user/interview_summary", 2),
+    ("/user/target", 1),
+    ("/user/search?q=A", 1),
+])
+def test_user_route_query_budget(seeded_db, auth_headers, path, budget):
+    """Test user routes stay within their query budget and issue no per-row queries"""
+    with query_budget(budget):
+        response = client.get(path, headers=auth_headers)
+
+    assert response.status_code == 200
+
+
+@patch("app.services.interview_service.GPTAccessClient")
+def test_interview_feedback_query_budget(mock_gpt, seeded_db, auth_headers, monkeypatch):
+    """Test POST /interview/feedback, which saves the question and its event; the projector runs elsewhere"""
+    from app.services.projector import projector
+    monkeypatch.setattr(projector, "mode", "external")
+    mock_gpt.return_value.send_prompt.return_value = {
+        "answer": '{"clarity_structure_score": 4, "relevance_score": 4, "overall_score": 4.0}'
+    }
+
+    with query_budget(4):
+        response = client.post(
+            "/interview/feedback",
+            headers=auth_headers,
+            json={
+                "interview_id": "iv0",
+                "interview_type": "technical",
+                "interview_question": "What is Python?",
+                "interview_answer": "Python is a dynamically typed programming language with a large standard library."
+            }
+        )
+
+    assert response.status_code == 200
@@ -0,0 +1,112 @@
+# backend/app/tests/test_security.py
+
+import time
+import jwt
+import pytest
+from unittest.mock import patch, MagicMock
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.core import security
+from app.core.security import SigningKeys, AuthenticationError, decode_token, resolve_principal
+
+
+CLAIMS = {"id": "user123", "email": "test@example.com"}
+
+
+# ============================================================
+# Helper fixtures
+# ============================================================
+
+@pytest.fixture
+def rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def jwks_response(private_key, kid):
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    response = MagicMock()
+    response.json.return_value = {"keys": [jwk]}
+    return response
+
+
+# ============================================================
+# decode_token
+# ============================================================
+
+def test_decode_token_hs256():
+    keys = SigningKeys(secret="s3cret")
+    token = jwt.encode(CLAIMS, "s3cret", algorithm="HS256")
+
+    assert decode_token(token, keys)["id"] == "user123"
+
+    forged = jwt.encode(CLAIMS, "other", algorithm="HS256")
+    with pytest.raises(AuthenticationError):
+        decode_token(forged, keys)
+
+
+def test_decode_token_expired():
+    keys = SigningKeys(secret="s3cret")
+    token = jwt.encode({**CLAIMS, "exp": int(time.time()) - 60}, "s3cret", algorithm="HS256")
+
+    with pytest.raises(AuthenticationError):
+        decode_token(token, keys)
+
+
+def test_decode_token_malformed():
+    with pytest.raises(AuthenticationError):
+        decode_token("fake.jwt.token", SigningKeys(secret="s3cret"))
+
+
+@patch("app.core.security.requests.get")
+def test_decode_token_jwks_cached_and_refetched_on_new_kid(mock_get, rsa_key):
+    mock_get.return_value = jwks_response(rsa_key, "k1")
+    keys = SigningKeys(jwks_url="https://issuer.test/jwks")
+    keys.thread = MagicMock()    # no background thread in tests
+    token = jwt.encode(CLAIMS, rsa_key, algorithm="RS256", headers={"kid": "k1"})
+
+    keys.refresh()
+    assert decode_token(token, keys)["email"] == "test@example.com"
+    assert decode_token(token, keys)["email"] == "test@example.com"
+    assert mock_get.call_count == 1
+
+    rotated = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    mock_get.return_value = jwks_response(rotated, "k2")
+    keys.fetched_at = 0.0
+    new_token = jwt.encode(CLAIMS, rotated, algorithm="RS256", headers={"kid": "k2"})
+    assert decode_token(new_token, keys)["id"] == "user123"
+    assert mock_get.call_count == 2
+
+
+@patch("app.core.security.requests.get")
+def test_decode_token_hs256_naming_an_rsa_kid_is_rejected(mock_get, rsa_key):
+    mock_get.return_value = jwks_response(rsa_key, "k1")
+    keys = SigningKeys(jwks_url="https://issuer.test/jwks")
+    keys.thread = MagicMock()
+    keys.refresh()
+    forged = jwt.encode(CLAIMS, "guessed", algorithm="HS256", headers={"kid": "k1"})
+
+    with pytest.raises(AuthenticationError):
+        decode_token(forged, keys)
+
+
+def test_decode_token_unverified_fallback():
+    token = jwt.encode(CLAIMS, "anything", algorithm="HS256")
+
+    with patch.object(security, "JWT_ALLOW_UNVERIFIED", True):
+        assert decode_token(token, SigningKeys())["id"] == "user123"
+
+    with patch.object(security, "JWT_ALLOW_UNVERIFIED", False):
+        with pytest.raises(AuthenticationError):
+            decode_token(token, SigningKeys())
+
+
+def test_resolve_principal_requires_user_id():
+    keys = SigningKeys(secret="s3cret")
+    principal = resolve_principal(jwt.encode(CLAIMS, "s3cret", algorithm="HS256"), keys)
+
+    assert principal.user_id == "user123"
+    assert principal.email == "test@example.com"
+
+    with pytest.raises(AuthenticationError):
+        resolve_principal(jwt.encode({"email": "x@y.z"}, "s3cret", algorithm="HS256"), keys)
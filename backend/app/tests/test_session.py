@@ -0,0 +1,146 @@
+# backend/app/tests/test_session.py
+
+import time
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from unittest.mock import patch
+
+from app.main import app
+from app.db.db_config import SessionLocal
+from app.db.db_init import init_db
+from app.db.models import Badge, Interview, Question, User
+from app.services.interview_session import session_hub
+from app.tests.query_counter import QueryCounter
+from app.tests.test_route import FAKE_TOKEN, FAKE_USER_ID
+
+client = TestClient(app)
+AUTH = {"Authorization": f"Bearer {FAKE_TOKEN}"}
+ANSWER = "Python is a dynamically typed programming language with a large standard library."
+
+
+@pytest.fixture(autouse=True)
+def testing_env(monkeypatch):
+    monkeypatch.setenv("TESTING", "1")
+    init_db(reset=True)
+    yield
+
+
+@pytest.fixture
+def interview():
+    with SessionLocal() as db:
+        db.add(User(user_id=FAKE_USER_ID, user_email="test@example.com"))
+        db.add(User(user_id="other", user_email="other@example.com"))
+        db.add(Interview(interview_id="iv1", user_id=FAKE_USER_ID, interview_type="technical", job_description="JD"))
+        db.add(Interview(interview_id="iv-other", user_id="other", interview_type="technical", job_description="JD"))
+        db.commit()
+
+
+def receive_until(ws, kind: str) -> dict:
+    for _ in range(10):
+        message = ws.receive_json()
+        if message["type"] == kind:
+            return message
+    raise AssertionError(f"no {kind} message")
+
+
+@patch("app.services.interview_service.GPTAccessClient")
+def test_answers_get_feedback_and_badge_pushes(mock_gpt, interview):
+    mock_gpt.return_value.send_prompt.return_value = {"answer": '{"relevance_score": 4, "overall_score": 4.0}'}
+    with SessionLocal() as db:
+        db.add(Badge(badge_id=1, name="Ice Breaker", description="Answer a question"))
+        db.commit()
+
+    with client.websocket_connect("/interview/session", headers=AUTH) as ws:
+        assert ws.receive_json() == {"type": "ready", "user_id": FAKE_USER_ID}
+        ws.send_json({"type": "resume", "interview_id": "iv1"})
+        assert ws.receive_json() == {"type": "interview", "interview_id": "iv1", "interview_type": "technical"}
+        ws.send_json({"type": "answer", "ref": "a1", "interview_question": "What is Python?", "interview_answer": ANSWER})
+        received = [ws.receive_json(), ws.receive_json()]
+
+    by_type = {m["type"]: m for m in received}
+    assert by_type["feedback"]["ref"] == "a1"
+    assert by_type["feedback"]["interview_feedback"]["overall_score"] == 4.0
+    assert [b["name"] for b in by_type["badges"]["badges"]] == ["Ice Breaker"]
+    assert session_hub.count() == 0
+    with SessionLocal() as db:
+        assert db.query(Question).filter(Question.interview_id == "iv1").count() == 1
+        assert db.get(User, FAKE_USER_ID).total_questions == 1
+
+
+@patch("app.services.interview_service.GPTAccessClient")
+def test_answer_skips_user_and_interview_reloads(mock_gpt, interview, monkeypatch):
+    from app.services.projector import projector
+    monkeypatch.setattr(projector, "mode", "external")
+    mock_gpt.return_value.send_prompt.return_value = {"answer": '{"overall_score": 3.0}'}
+
+    with client.websocket_connect("/interview/session", headers=AUTH) as ws:
+        ws.receive_json()
+        ws.send_json({"type": "resume", "interview_id": "iv1"})
+        ws.receive_json()
+        with QueryCounter() as counter:
+            ws.send_json({"type": "answer", "ref": "a1", "interview_question": "Q", "interview_answer": ANSWER})
+            assert ws.receive_json()["type"] == "feedback"
+
+    tables = " ".join(statement for statement, _ in counter.statements)
+    assert "FROM users" not in tables and "FROM interviews" not in tables
+    assert counter.count == 2  # the question and its event
+
+
+@patch("app.services.interview_service.generate_question_set")
+def test_start_makes_interview_current(mock_generate, interview):
+    mock_generate.return_value = ["What is Python?", "What is a decorator?"]
+    with client.websocket_connect("/interview/session") as ws:
+        ws.send_json({"type": "auth", "token": FAKE_TOKEN})
+        ws.receive_json()
+        ws.send_json({"type": "start", "job_description": "Python developer", "question_type": "technical"})
+        started = ws.receive_json()
+
+    assert started["type"] == "interview"
+    assert started["interview_questions"] == ["What is Python?", "What is a decorator?"]
+    with SessionLocal() as db:
+        assert db.get(Interview, started["interview_id"]).user_id == FAKE_USER_ID
+
+
+def test_answer_before_interview_and_bad_messages_are_errors(interview):
+    with client.websocket_connect("/interview/session", headers=AUTH) as ws:
+        ws.receive_json()
+        ws.send_json({"type": "answer", "ref": "a1", "interview_question": "Q", "interview_answer": "A"})
+        assert ws.receive_json() == {"type": "error", "ref": "a1", "status": 400,
+                                     "detail": "Start or resume an interview first"}
+        ws.send_text("not json")
+        assert ws.receive_json()["status"] == 400
+        ws.send_json({"type": "resume", "interview_id": "iv-other"})
+        assert ws.receive_json()["status"] == 404
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+
+def test_invalid_token_closes_session():
+    with client.websocket_connect("/interview/session") as ws:
+        ws.send_json({"type": "auth", "token": "not-a-jwt"})
+        assert ws.receive_json()["status"] == 401
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 4401
+
+
+def test_unknown_user_closes_session():
+    with client.websocket_connect("/interview/session", headers=AUTH) as ws:
+        assert ws.receive_json()["status"] == 404
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 4404
+
+
+def test_expired_token_closes_session(interview):
+    token = jwt.encode({"id": FAKE_USER_ID, "exp": int(time.time()) + 1}, "test-secret", algorithm="HS256")
+    with client.websocket_connect("/interview/session", headers={"Authorization": f"Bearer {token}"}) as ws:
+        ws.receive_json()
+        with patch("app.api.session.time.time", return_value=time.time() + 60):
+            ws.send_json({"type": "ping"})
+            assert ws.receive_json() == {"type": "error", "status": 401, "detail": "Token expired"}
+            with pytest.raises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+    assert closed.value.code == 4401
@@ -1,12 +1,12 @@
 # backend/app/tests/test_user_service.py
 
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 
 import app.services.user_service as user_service
 
 
-FAKE_TOKEN = "fake.jwt"
 FAKE_USER_ID = "user123"
 FAKE_INTERVIEW_ID = "iv999"
 
@@ -73,24 +73,113 @@ def fake_badge():
 # get_user_detail
 # ============================================================
 
-@patch("app.services.auth_service.get_user_id_and_email")
 @patch("app.services.user_service.get_user_interviews")
 @patch("app.services.user_service.get_user_badges")
 @patch("app.services.user_service.get_user_basic")
-def test_get_user_detail(mock_basic, mock_badges, mock_interviews, mock_get_id, fake_user, fake_interview, fake_badge):
+def test_get_user_detail(mock_basic, mock_badges, mock_interviews, fake_user, fake_interview, fake_badge):
 
-    mock_get_id.return_value = {"id": FAKE_USER_ID}
     mock_basic.return_value = fake_user
     mock_interviews.return_value = [fake_interview]
     mock_badges.return_value = [fake_badge]
 
-    result = user_service.get_user_detail(FAKE_TOKEN)
+    result = user_service.get_user_detail(FAKE_USER_ID)
 
     assert result["user_id"] == FAKE_USER_ID
     assert len(result["interviews"]) == 1
     assert len(result["badges"]) == 1
 
 
+def test_parse_detail_fields():
+    spec = user_service.parse_detail_fields(
+        "xp,interviews.interview_id,interviews.questions.feedback.overall_score,badges"
+    )
+
+    assert spec["user"] == ["xp"]
+    assert spec["interviews"] == ["interview_id"]
+    assert spec["questions"] == []
+    assert spec["feedback"] == ["overall_score"]
+    assert spec["badges"] == ["badge_id", "unlock_date"]
+
+
+def test_parse_detail_fields_unknown():
+    with pytest.raises(ValueError):
+        user_service.parse_detail_fields("interviews.questions.secret")
+
+
+@patch("app.services.user_service.get_user_interviews_projected")
+@patch("app.services.user_service.get_user_badges")
+@patch("app.services.user_service.get_user_basic")
+def test_get_user_detail_sparse(mock_basic, mock_badges, mock_projected, fake_user):
+
+    def row(**values):
+        r = MagicMock()
+        r._mapping = values
+        return r
+
+    mock_basic.return_value = fake_user
+    mock_projected.return_value = [
+        row(i_interview_id="iv1", i_timestamp=100, q_question_id="q1", f_0=4.0),
+        row(i_interview_id="iv1", i_timestamp=100, q_question_id="q2", f_0=3.0),
+        row(i_interview_id="iv2", i_timestamp=200, q_question_id=None, f_0=None),
+    ]
+
+    result = user_service.get_user_detail(
+        FAKE_USER_ID, "xp,interviews.interview_time,interviews.questions.feedback.overall_score"
+    )
+
+    assert result == {
+        "xp": fake_user.xp,
+        "interviews": [
+            {"interview_time": 100, "questions": [{"feedback": {"overall_score": 4.0}},
+                                                  {"feedback": {"overall_score": 3.0}}]},
+            {"interview_time": 200, "questions": []},
+        ],
+    }
+    mock_badges.assert_not_called()
+    assert mock_projected.call_args.args[1:4] == (["interview_id", "timestamp"], ["question_id"], ["overall_score"])
+
+
+# ============================================================
+# export_user_history
+# ============================================================
+
+@patch("app.services.user_service.SessionLocal")
+@patch("app.services.user_service.iter_user_export_rows")
+def test_export_user_history(mock_rows, mock_session):
+
+    def row(interview_id, timestamp, question_id):
+        r = MagicMock()
+        r.interview_id = interview_id
+        r.interview_type = "Technical"
+        r.job_description = "JD"
+        r.timestamp = timestamp
+        r.is_like = False
+        r.question_id = question_id
+        r.question_type = "Technical"
+        r.question = "Q"
+        r.answer = "A"
+        r.feedback = {"overall_score": 4.0}
+        r.question_timestamp = timestamp + 1
+        return r
+
+    mock_rows.return_value = [row("iv1", 100, "q1"), row("iv1", 100, "q2"), row("iv2", 200, None)]
+
+    lines = list(user_service.export_user_history(FAKE_USER_ID, "50:iv0"))
+
+    assert len(lines) == 2
+    first = json.loads(lines[0])
+    assert first["cursor"] == "100:iv1"
+    assert [q["question_id"] for q in first["questions"]] == ["q1", "q2"]
+    assert json.loads(lines[1])["questions"] == []
+    assert mock_rows.call_args.args[1] == (50, "iv0")
+    mock_session.return_value.close.assert_called_once()
+
+
+def test_parse_interview_cursor_invalid():
+    with pytest.raises(ValueError):
+        user_service.parse_interview_cursor("not-a-cursor")
+
+
 # ============================================================
 # create_new_user
 # ============================================================
@@ -130,17 +219,20 @@ def test_update_user_active(mock_basic, mock_update, fake_user):
 # get_user_interview_summary
 # ============================================================
 
-@patch("app.services.auth_service.get_user_id_and_email")
+@patch("app.services.user_service.get_user_percentiles")
 @patch("app.services.user_service.get_user_basic")
-def test_get_user_interview_summary(mock_basic, mock_get_id, fake_user):
+def test_get_user_interview_summary(mock_basic, mock_percentiles, fake_user):
 
-    mock_get_id.return_value = {"id": FAKE_USER_ID}
     mock_basic.return_value = fake_user
+    mock_percentiles.return_value = {"clarity": 75.0, "overall": 40.0}
 
-    result = user_service.get_user_interview_summary(FAKE_TOKEN)
+    result = user_service.get_user_interview_summary(FAKE_USER_ID)
 
     assert result["avg_clarity"] == fake_user.total_clarity / fake_user.total_questions
     assert "avg_overall" in result
+    assert result["percentile_clarity"] == 75.0
+    averages = mock_percentiles.call_args.args[0]
+    assert averages["overall"] == fake_user.total_overall / fake_user.total_questions
 
 
 # ============================================================
@@ -159,23 +251,45 @@ def test_get_user_statistics(mock_basic, mock_from_db, fake_user):
 
     assert result == mock_instance
     mock_from_db.assert_called_once()
+    mock_basic.assert_not_called()
+
+
+@patch("app.services.user_service.get_user_statistics_rows")
+def test_user_statistics_from_db(mock_rows, fake_user):
+
+    mock_rows.return_value = (fake_user, [(FAKE_INTERVIEW_ID, 1000)], [(1, 2000)])
+
+    stats = user_service.UserStatistics.from_db(FAKE_USER_ID)
+    result = stats.get_dict()
+
+    assert result["user_id"] == FAKE_USER_ID
+    assert result["interviews"] == [{"interview_id": FAKE_INTERVIEW_ID, "timestamp": 1000}]
+    assert result["badges"] == [{"badge_id": 1, "unlocked_timestamp": 2000}]
+    assert list(result)[:5] == ["user_id", "user_email", "xp", "interviews", "badges"]
+    assert not hasattr(stats, "__dict__")
+
+
+@patch("app.services.user_service.get_user_statistics_rows")
+def test_get_user_statistics_missing_user(mock_rows):
+
+    mock_rows.return_value = None
+
+    assert user_service.get_user_statistics(FAKE_USER_ID) is None
 
 
 # ============================================================
 # like_interview
 # ============================================================
 
-@patch("app.services.auth_service.get_user_id_and_email")
 @patch("app.services.user_service.update_interview_like")
-def test_like_interview(mock_update_like, mock_get_id):
+def test_like_interview(mock_update_like):
 
-    mock_get_id.return_value = {"id": FAKE_USER_ID}
     iv_mock = MagicMock()
     iv_mock.interview_id = FAKE_INTERVIEW_ID
     iv_mock.is_like = True
     mock_update_like.return_value = iv_mock
 
-    result = user_service.like_interview(FAKE_TOKEN, FAKE_INTERVIEW_ID)
+    result = user_service.like_interview(FAKE_USER_ID, FAKE_INTERVIEW_ID)
 
     assert result["interview_id"] == FAKE_INTERVIEW_ID
     assert result["is_like"] is True
@@ -188,8 +302,7 @@ def test_like_interview(mock_update_like, mock_get_id):
 @patch("app.services.utils.with_db_session", lambda f: f)   # no mock argument
 @patch("app.services.user_service.get_user_basic")
 @patch("app.services.user_service.update_user")
-@patch("app.services.auth_service.get_user_id_and_email")
-def test_set_user_target(mock_get_id, mock_update, mock_basic):
+def test_set_user_target(mock_update, mock_basic):
     
     fake_user = MagicMock()
     fake_user.user_id = FAKE_USER_ID
@@ -199,7 +312,6 @@ def test_set_user_target(mock_get_id, mock_update, mock_basic):
     fake_user.target_confidence = 5
     fake_user.target_conciseness = 1
 
-    mock_get_id.return_value = {"id": FAKE_USER_ID}
     mock_update.return_value = fake_user
 
     target_dict = {
@@ -210,7 +322,7 @@ def test_set_user_target(mock_get_id, mock_update, mock_basic):
         "target_conciseness": 1,
     }
 
-    result = user_service.set_user_target(FAKE_TOKEN, target_dict)
+    result = user_service.set_user_target(FAKE_USER_ID, target_dict)
 
     assert result["target_clarity"] == 4
     assert result["target_relevance"] == 3
@@ -223,13 +335,11 @@ def test_set_user_target(mock_get_id, mock_update, mock_basic):
 # get_user_target
 # ============================================================
 
-@patch("app.services.auth_service.get_user_id_and_email")
 @patch("app.services.user_service.get_user_basic")
-def test_get_user_target(mock_basic, mock_get_id, fake_user):
+def test_get_user_target(mock_basic, fake_user):
 
-    mock_get_id.return_value = {"id": FAKE_USER_ID}
     mock_basic.return_value = fake_user
 
-    result = user_service.get_user_target(FAKE_TOKEN)
+    result = user_service.get_user_target(FAKE_USER_ID)
 
     assert result["target_confidence"] == fake_user.target_confidence
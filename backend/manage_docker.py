@@ -74,6 +74,8 @@ def init_db():
     run_command(f"docker exec -it {BACKEND_CONTAINER} python -m app.db.db_init")
     print("Loading default badge data...")
     run_command(f"docker exec -it {BACKEND_CONTAINER} python -m app.db.init_badges")
+    print("Rebuilding score histograms...")
+    run_command(f"docker exec -it {BACKEND_CONTAINER} python -m app.services.percentile_service")
 
 def reset_db():
     """Drop all tables and recreate them."""